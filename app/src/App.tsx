@@ -5,9 +5,14 @@ import 'react-pdf/dist/Page/AnnotationLayer.css';
 import 'react-pdf/dist/Page/TextLayer.css';
 import './App.css';
 import PDFFrame from './components/PDFFrame';
+import { useDocumentEvents } from './hooks/useDocumentEvents';
+import { fetchGeometry, geometryText } from './utils/geometry';
 
 import testPdf from '../../data/test_pid.pdf';
 
+const apiBaseUrl = import.meta.env.VITE_API_BASE_URL || 'http://localhost:8000';
+const documentId = 1;
+
 pdfjs.GlobalWorkerOptions.workerSrc = `//unpkg.com/pdfjs-dist@${pdfjs.version}/build/pdf.worker.min.mjs`;
 
 interface Annotation {
@@ -30,6 +35,8 @@ function App() {
   // Pan state is managed internally by PDFFrame
   const [isPanning, setIsPanning] = useState<boolean>(false);
   const [pdfScale, setPdfScale] = useState<number>(1);
+  // Bumped when the server reports that the rows of this page changed.
+  const [revision, setRevision] = useState<number>(0);
 
   const canvasRef = useRef<HTMLCanvasElement>(null);
   const mainContainerRef = useRef<HTMLDivElement>(null);
@@ -74,47 +81,52 @@ function App() {
       });
 
       try {
-        const apiBaseUrl = import.meta.env.VITE_API_BASE_URL || 'http://localhost:8000';
-        const response = await fetch(`${apiBaseUrl}/doc/1`);
-        if (!response.ok) {
-          throw new Error(`Network response was not ok: ${response.statusText}`);
+        // Only this page's line numbers, as packed float32 boxes.
+        const geometry = await fetchGeometry(`${apiBaseUrl}/documents/${documentId}/pages/${pageNumber}/lines`);
+        const pageAnnotations: Annotation[] = [];
+        for (let i = 0; i < geometry.count; i++) {
+          pageAnnotations.push({
+            id: geometry.ids[i],
+            page: geometry.pages[i],
+            text: geometryText(geometry, i) ?? '',
+            x_coord: geometry.boxes[4 * i],
+            y_coord: geometry.boxes[4 * i + 1],
+            width: geometry.boxes[4 * i + 2],
+            height: geometry.boxes[4 * i + 3],
+          });
         }
-        const data = await response.json();
 
         const scale = 2; // Scale adjusted based on user feedback.
 
-        if (data.line_numbers) {
-          const pageAnnotations = data.line_numbers.filter((ann: Annotation) => ann.page === pageNumber);
-          setAnnotations(pageAnnotations);
-
-          pageAnnotations.forEach((line: Annotation) => {
-            const baseStrokeWidth = 1.5;
-            const padding = baseStrokeWidth; // Expand outwards to prevent clipping text
-
-            // Apply PDF scale and current zoom to coordinates
-            const adjustedLeft = ((line.x_coord / scale) * pdfScale - padding);
-            const adjustedTop = ((line.y_coord / scale) * pdfScale - padding);
-            const adjustedWidth = ((line.width / scale) * pdfScale + (padding * 2));
-            const adjustedHeight = ((line.height / scale) * pdfScale + (padding * 2));
-
-            const rect = new fabric.Rect({
-              left: adjustedLeft,
-              top: adjustedTop,
-              width: adjustedWidth,
-              height: adjustedHeight,
-              fill: 'rgba(0, 123, 255, 0.15)', // More transparent fill
-              stroke: '#007bff',               // Less vibrant blue stroke
-              strokeWidth: baseStrokeWidth,    // Thinner stroke
-              selectable: true,
-              lockMovementX: true,  // Prevent horizontal movement
-              lockMovementY: true,  // Prevent vertical movement
-              hasControls: false,   // Hide scaling/rotation controls
-              data: { id: line.id, text: line.text }
-            });
-            canvas.add(rect);
+        setAnnotations(pageAnnotations);
+
+        pageAnnotations.forEach((line: Annotation) => {
+          const baseStrokeWidth = 1.5;
+          const padding = baseStrokeWidth; // Expand outwards to prevent clipping text
+
+          // Apply PDF scale and current zoom to coordinates
+          const adjustedLeft = ((line.x_coord / scale) * pdfScale - padding);
+          const adjustedTop = ((line.y_coord / scale) * pdfScale - padding);
+          const adjustedWidth = ((line.width / scale) * pdfScale + (padding * 2));
+          const adjustedHeight = ((line.height / scale) * pdfScale + (padding * 2));
+
+          const rect = new fabric.Rect({
+            left: adjustedLeft,
+            top: adjustedTop,
+            width: adjustedWidth,
+            height: adjustedHeight,
+            fill: 'rgba(0, 123, 255, 0.15)', // More transparent fill
+            stroke: '#007bff',               // Less vibrant blue stroke
+            strokeWidth: baseStrokeWidth,    // Thinner stroke
+            selectable: true,
+            lockMovementX: true,  // Prevent horizontal movement
+            lockMovementY: true,  // Prevent vertical movement
+            hasControls: false,   // Hide scaling/rotation controls
+            data: { id: line.id, text: line.text }
           });
-          canvas.renderAll();
-        }
+          canvas.add(rect);
+        });
+        canvas.renderAll();
       } catch (error) {
         console.error('Failed to fetch or draw annotations:', error);
       }
@@ -124,7 +136,30 @@ function App() {
     const timer = setTimeout(loadAndDrawAnnotations, 100);
 
     return () => clearTimeout(timer);
-  }, [pageNumber, currentZoom, pdfScale]); // Re-run when page number, zoom, or PDF scale changes
+  }, [pageNumber, currentZoom, pdfScale, revision]); // Re-run when page number, zoom, PDF scale, or rows change
+
+  // Corrections made elsewhere arrive as the changed rows: patch them in
+  // place. Imports report whole pages: reload the page if it is this one.
+  useDocumentEvents(apiBaseUrl, documentId, {
+    onRows: ({ table, rows }) => {
+      if (table !== 'line_numbers') return;
+      const texts = new Map(rows.map(row => [row.id, row.text]));
+      setAnnotations(current => current.map(line =>
+        texts.has(line.id) ? { ...line, text: texts.get(line.id)! } : line
+      ));
+      fabricCanvasRef.current?.getObjects().forEach(obj => {
+        if (obj.data && texts.has(obj.data.id)) {
+          obj.data.text = texts.get(obj.data.id);
+        }
+      });
+    },
+    onPage: ({ table, page }) => {
+      if (table === 'line_numbers' && (page === null || page === pageNumber)) {
+        setRevision(current => current + 1);
+      }
+    },
+    onReset: () => setRevision(current => current + 1),
+  });
 
   // Handle Highlighting and Selection styling
   useEffect(() => {
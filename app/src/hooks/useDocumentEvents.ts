@@ -0,0 +1,58 @@
+import { useEffect, useRef } from 'react';
+
+// Payloads of the events of GET /documents/{id}/events.
+export interface RowsEvent {
+  table: 'line_numbers' | 'ocr_results';
+  rows: { id: number; page: number; text: string; status: string }[];
+}
+
+export interface PageEvent {
+  table: 'line_numbers' | 'ocr_results';
+  page: number | null; // null: any page
+  inserted: number;
+  updated: number;
+  deleted: number;
+}
+
+export interface JobEvent {
+  id: number;
+  status: 'queued' | 'running' | 'succeeded' | 'failed';
+  pages_done: number;
+  rows_inserted: number;
+  rows_updated: number;
+  rows_deleted: number;
+  error: string | null;
+}
+
+interface DocumentEventHandlers {
+  onRows?: (event: RowsEvent) => void;
+  onPage?: (event: PageEvent) => void;
+  onJob?: (event: JobEvent) => void;
+  // The missed events are gone: reload everything shown.
+  onReset?: () => void;
+}
+
+/**
+ * Subscribes to the changes of a document over Server-Sent Events.
+ *
+ * EventSource reconnects by itself and sends the id of the last event it
+ * got, so the server replays what was missed in between.
+ */
+export const useDocumentEvents = (apiBaseUrl: string, documentId: number, handlers: DocumentEventHandlers) => {
+  // The latest handlers, without reopening the stream when they change.
+  const handlersRef = useRef(handlers);
+  handlersRef.current = handlers;
+
+  useEffect(() => {
+    const source = new EventSource(`${apiBaseUrl}/documents/${documentId}/events`);
+    const listen = <T>(kind: string, handle: (data: T) => void) => {
+      source.addEventListener(kind, event => handle(JSON.parse((event as MessageEvent).data)));
+    };
+    listen<RowsEvent>('rows', data => handlersRef.current.onRows?.(data));
+    listen<PageEvent>('page', data => handlersRef.current.onPage?.(data));
+    listen<JobEvent>('job', data => handlersRef.current.onJob?.(data));
+    listen<object>('reset', () => handlersRef.current.onReset?.());
+
+    return () => source.close();
+  }, [apiBaseUrl, documentId]);
+};
@@ -119,4 +119,50 @@ export interface UniversalPDFFrameProps {
   
   /** Child components (PDF content) */
   children?: React.ReactNode;
-} 
\ No newline at end of file
+} 
+/**
+ * Aggregated box returned by the level-of-detail endpoint
+ * (`GET /documents/{id}/pages/{page}/lod`)
+ */
+export interface LodCluster {
+  x_coord: number;
+  y_coord: number;
+  width: number;
+  height: number;
+  /** Number of boxes merged into this cluster */
+  count: number;
+  /** Text of the box, only set when the cluster holds a single box */
+  text: string | null;
+}
+
+/**
+ * Level-of-detail response for one page
+ */
+export interface PageLod {
+  document_id: number;
+  page: number;
+  kind: 'ocr_results' | 'line_numbers';
+  level: number;
+  cell_size: number;
+  total: number;
+  clusters: LodCluster[];
+}
+
+/**
+ * Boxes decoded from the binary geometry format
+ * (`Accept: application/vnd.pid-visualizer.geometry`). The arrays are views
+ * of the response buffer; box `i` is `boxes[4 * i]` to `boxes[4 * i + 3]`
+ * (x, y, width, height).
+ */
+export interface OverlayGeometry {
+  documentId: number;
+  count: number;
+  ids: Uint32Array;
+  pages: Uint32Array;
+  boxes: Float32Array;
+  /** Index into `strings` per box, `NO_STRING` when the text is null */
+  textIndex: Uint32Array;
+  statusIndex: Uint32Array;
+  /** Deduplicated texts and statuses */
+  strings: string[];
+}
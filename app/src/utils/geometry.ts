@@ -0,0 +1,80 @@
+import type { OverlayGeometry } from '../types/overlay';
+
+/**
+ * Media type of the binary geometry format; the layout is documented in
+ * `backend/services/geometry.py`.
+ */
+export const GEOMETRY_MEDIA_TYPE = 'application/vnd.pid-visualizer.geometry';
+
+/** String index of a null text */
+export const NO_STRING = 0xffffffff;
+
+const MAGIC = 'PIDG';
+const VERSION = 1;
+const HEADER_BYTES = 24;
+
+// Typed arrays use the platform byte order and the format is little-endian.
+const LITTLE_ENDIAN = new Uint8Array(new Uint16Array([1]).buffer)[0] === 1;
+
+/**
+ * Decode a geometry payload. Numeric sections become typed-array views of
+ * `buffer` without copying; only the string table is decoded.
+ */
+export function decodeGeometry(buffer: ArrayBuffer): OverlayGeometry {
+  if (!LITTLE_ENDIAN) {
+    throw new Error('Binary geometry needs a little-endian platform; request JSON instead');
+  }
+  const header = new DataView(buffer, 0, HEADER_BYTES);
+  const magic = String.fromCharCode(...new Uint8Array(buffer, 0, 4));
+  if (magic !== MAGIC || header.getUint16(4, true) !== VERSION) {
+    throw new Error('Not a version 1 geometry payload');
+  }
+  const count = header.getUint32(8, true);
+  const stringCount = header.getUint32(12, true);
+  const stringBytes = header.getUint32(16, true);
+  const documentId = header.getUint32(20, true);
+
+  let offset = HEADER_BYTES;
+  const uint32 = (length: number) => {
+    const view = new Uint32Array(buffer, offset, length);
+    offset += view.byteLength;
+    return view;
+  };
+  const ids = uint32(count);
+  const pages = uint32(count);
+  const boxes = new Float32Array(buffer, offset, 4 * count);
+  offset += boxes.byteLength;
+  const textIndex = uint32(count);
+  const statusIndex = uint32(count);
+  const stringOffsets = uint32(stringCount + 1);
+  const data = new Uint8Array(buffer, offset, stringBytes);
+
+  const decoder = new TextDecoder();
+  const strings = new Array<string>(stringCount);
+  for (let i = 0; i < stringCount; i++) {
+    strings[i] = decoder.decode(data.subarray(stringOffsets[i], stringOffsets[i + 1]));
+  }
+
+  return { documentId, count, ids, pages, boxes, textIndex, statusIndex, strings };
+}
+
+/**
+ * Fetch overlay geometry in the binary format.
+ */
+export async function fetchGeometry(url: string, init?: RequestInit): Promise<OverlayGeometry> {
+  const headers = new Headers(init?.headers);
+  headers.set('Accept', GEOMETRY_MEDIA_TYPE);
+  const response = await fetch(url, { ...init, headers });
+  if (!response.ok) {
+    throw new Error(`Network response was not ok: ${response.statusText}`);
+  }
+  return decodeGeometry(await response.arrayBuffer());
+}
+
+/**
+ * Text of box `i`, or `null`.
+ */
+export function geometryText(geometry: OverlayGeometry, i: number): string | null {
+  const index = geometry.textIndex[i];
+  return index === NO_STRING ? null : geometry.strings[index];
+}
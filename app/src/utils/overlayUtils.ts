@@ -3,7 +3,8 @@ import type {
   DisplayMode, 
   DisplayModeConfig, 
   RenderConfig,
-  OverlayCoordinates 
+  OverlayCoordinates,
+  PageLod
 } from '../types/overlay';
 
 /**
@@ -136,6 +137,32 @@ export function convertLegacyAnnotations(
   return annotations.map(ann => convertLegacyAnnotation(ann, type));
 }
 
+/**
+ * Convert level-of-detail clusters to OverlayItems.
+ * Multi-box clusters are named after their box count.
+ */
+export function convertLodClusters(
+  lod: PageLod,
+  type: 'line' | 'ocr_text' = 'ocr_text'
+): OverlayItem[] {
+  return lod.clusters.map((cluster, index) => ({
+    id: `lod-${lod.page}-${lod.level}-${index}`,
+    name: cluster.text ?? `${cluster.count} items`,
+    coordinates: {
+      x: cluster.x_coord,
+      y: cluster.y_coord,
+      width: cluster.width,
+      height: cluster.height,
+    },
+    type,
+    page: lod.page,
+    metadata: {
+      count: cluster.count,
+      level: lod.level,
+    },
+  }));
+}
+
 /**
  * Generate colors for corrosion loops grouping
  */
@@ -0,0 +1,4 @@
+"""Standalone benchmarks for the ingestion pipeline.
+
+Each module is runnable with ``python -m backend.benchmarks.<name>``.
+"""
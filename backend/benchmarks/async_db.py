@@ -0,0 +1,137 @@
+"""Compare request throughput on sync sessions and on an AsyncSession.
+
+Usage::
+
+    python -m backend.benchmarks.async_db --rows 20000 --requests 400 --concurrency 100
+
+A temporary SQLite database is filled with OCR results of one page. The
+viewport endpoint is then called ``--requests`` times, ``--concurrency`` at a
+time, each with a different bounding box so the payload store never answers.
+``sync`` runs the database work in the threadpool, limited to ``--threads``
+threads; ``async`` runs it through aiosqlite on the event loop. Latency is
+measured per request from the client side, including time spent queued.
+"""
+
+import argparse
+import asyncio
+import os
+import random
+import statistics
+import tempfile
+import time
+
+import anyio
+import httpx
+from fastapi import FastAPI
+from fastapi.concurrency import contextmanager_in_threadpool
+from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.orm import Session
+
+from backend import crud, models, schemas
+from backend.database import async_database_url
+from backend.routers import ocr
+from backend.services.dependencies import get_db
+
+
+def fill(url: str, rows: int) -> int:
+    engine = create_engine(url)
+    models.Base.metadata.create_all(engine)
+    rng = random.Random(1)
+    records = (
+        {
+            "page": 1,
+            "text": f"FH-A{i % 9}-{i:05d}",
+            "x_coord": rng.uniform(0, 7000),
+            "y_coord": rng.uniform(0, 5000),
+            "width": 40,
+            "height": 8,
+        }
+        for i in range(rows)
+    )
+    with Session(engine) as db:
+        doc = crud.create_document(db, schemas.DocumentCreate(file_name="bench.pdf", pages=1))
+        crud.bulk_create_ocr_results(db, records, doc.id)
+        document_id = doc.id
+    engine.dispose()
+    return document_id
+
+
+def sync_sessions(url: str):
+    engine = create_engine(url, connect_args={"check_same_thread": False})
+
+    async def sessions():
+        async with contextmanager_in_threadpool(Session(engine)) as db:
+            yield db
+
+    return sessions, engine.dispose
+
+
+def async_sessions(url: str):
+    engine = create_async_engine(async_database_url(url))
+
+    async def sessions():
+        async with AsyncSession(engine, autoflush=False) as db:
+            yield db
+
+    return sessions, engine.dispose
+
+
+async def run(app: FastAPI, document_id: int, requests: int, concurrency: int, threads: int) -> tuple:
+    anyio.to_thread.current_default_thread_limiter().total_tokens = threads
+    rng = random.Random(2)
+    boxes = []
+    for _ in range(requests):
+        x0, y0 = rng.uniform(0, 6000), rng.uniform(0, 4000)
+        boxes.append(f"{x0:.3f},{y0:.3f},{x0 + 1000:.3f},{y0 + 1000:.3f}")
+    gate = asyncio.Semaphore(concurrency)
+    latencies = []
+
+    async def call(client, bbox):
+        async with gate:
+            started = time.perf_counter()
+            response = await client.get(f"/documents/{document_id}/pages/1/ocr", params={"bbox": bbox})
+            response.raise_for_status()
+            latencies.append(time.perf_counter() - started)
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        started = time.perf_counter()
+        await asyncio.gather(*(call(client, bbox) for bbox in boxes))
+        elapsed = time.perf_counter() - started
+    latencies.sort()
+    return requests / elapsed, statistics.median(latencies), latencies[int(len(latencies) * 0.95)]
+
+
+def main() -> None:
+    arg_parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    arg_parser.add_argument("--rows", type=int, default=20000)
+    arg_parser.add_argument("--requests", type=int, default=400)
+    arg_parser.add_argument("--concurrency", type=int, default=100)
+    arg_parser.add_argument("--threads", type=int, default=40, help="threadpool size, Starlette's default is 40")
+    args = arg_parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        url = "sqlite:///" + os.path.join(tmp, "bench.db")
+        document_id = fill(url, args.rows)
+        print(f"{'mode':<8}{'req/s':>10}{'p50 ms':>10}{'p95 ms':>10}")
+        for label, make_sessions in (("sync", sync_sessions), ("async", async_sessions)):
+            sessions, dispose = make_sessions(url)
+            app = FastAPI()
+            app.include_router(ocr.router)
+            app.dependency_overrides[get_db] = sessions
+
+            async def measure():
+                try:
+                    return await run(app, document_id, args.requests, args.concurrency, args.threads)
+                finally:
+                    result = dispose()
+                    if asyncio.iscoroutine(result):
+                        await result
+
+            rate, p50, p95 = asyncio.run(measure())
+            print(f"{label:<8}{rate:>10.1f}{p50 * 1000:>10.1f}{p95 * 1000:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+"""Compare per-line bounding box extraction with :class:`OcrRecordBatch`.
+
+Usage::
+
+    python -m backend.benchmarks.bbox_batch --repeat 20
+
+``per-line`` is the original implementation: Python min/max over each line's
+vertices followed by an ``OcrResultCreate`` per row. ``batch`` builds one
+columnar batch per page and produces plain rows for the bulk insert helpers.
+"""
+
+import argparse
+import json
+import os
+import time
+
+from backend import schemas
+from backend.ocr.records import OcrRecordBatch
+
+DEFAULT_SOURCE = os.path.join(
+    os.path.dirname(__file__), "..", "..", "data", "test_pid.pdf_processed.json"
+)
+
+
+def per_line_records(text: str, page: dict) -> list:
+    page_width = page["dimension"]["width"]
+    page_height = page["dimension"]["height"]
+    records = []
+    for line in page.get("lines", []):
+        segment = line.get("layout", {}).get("textAnchor", {}).get("textSegments", [{}])[0]
+        start_index = int(segment.get("startIndex", 0))
+        end_index = int(segment.get("endIndex", 0))
+        line_text = text[start_index:end_index].strip().replace("\n", " ")
+        vertices = line.get("layout", {}).get("boundingPoly", {}).get("normalizedVertices", [])
+        if not vertices or not line_text:
+            continue
+        x_coords = [v.get("x", 0) * page_width for v in vertices]
+        y_coords = [v.get("y", 0) * page_height for v in vertices]
+        min_x, max_x = min(x_coords), max(x_coords)
+        min_y, max_y = min(y_coords), max(y_coords)
+        records.append(
+            schemas.OcrResultCreate(
+                page=page.get("pageNumber", 1),
+                text=line_text,
+                x_coord=min_x,
+                y_coord=min_y,
+                width=max_x - min_x,
+                height=max_y - min_y,
+            ).model_dump()
+        )
+    return records
+
+
+def batch_records(text: str, page: dict) -> list:
+    return list(OcrRecordBatch.from_document_ai_page(page, text).iter_dicts())
+
+
+def main() -> None:
+    arg_parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    arg_parser.add_argument("--source", default=DEFAULT_SOURCE)
+    arg_parser.add_argument("--repeat", type=int, default=20)
+    args = arg_parser.parse_args()
+
+    with open(args.source, "r", encoding="utf-8") as f:
+        data = json.load(f)
+    text, page = data["text"], data["pages"][0]
+
+    baseline = [{k: v for k, v in row.items() if k != "status"} for row in per_line_records(text, page)]
+    assert batch_records(text, page) == baseline, "batch output differs from per-line output"
+
+    print(f"{len(page['lines'])} lines per page, {args.repeat} repetitions")
+    print(f"{'method':<12}{'ms/page':>10}")
+    for label, func in (("per-line", per_line_records), ("batch", batch_records)):
+        started = time.process_time()
+        for _ in range(args.repeat):
+            func(text, page)
+        elapsed = (time.process_time() - started) / args.repeat
+        print(f"{label:<12}{elapsed * 1000:>10.2f}")
+
+
+if __name__ == "__main__":
+    main()
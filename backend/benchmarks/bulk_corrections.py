@@ -0,0 +1,83 @@
+"""Time saving a reviewed sheet line by line against one batch request.
+
+Usage::
+
+    python -m backend.benchmarks.bulk_corrections --lines 500
+
+A temporary SQLite database holds one sheet of ``--lines`` line numbers.
+``per line`` sends ``PATCH /line/{line_id}`` for each of them; ``batch``
+sends the same corrections in a single ``PATCH /lines``. Half of the
+corrections change their line, the other half confirm it as stored.
+"""
+
+import argparse
+import os
+import tempfile
+import time
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy.orm import Session
+
+from backend import crud, models, schemas
+from backend.config import Settings
+from backend.database import build_engine
+from backend.routers import lines
+from backend.services.dependencies import get_db
+
+
+def fill(engine, count: int) -> list:
+    models.Base.metadata.create_all(engine)
+    with Session(engine) as db:
+        doc = crud.create_document(db, schemas.DocumentCreate(file_name="sheet.pdf", pages=1))
+        records = [
+            {"page": 1, "text": f"FH-A2-{i:04d}", "x_coord": i, "y_coord": 0, "width": 40, "height": 8}
+            for i in range(count)
+        ]
+        crud.bulk_create_line_numbers(db, records, doc.id)
+        return [row.id for row in db.query(models.LineNumber).order_by(models.LineNumber.id)]
+
+
+def corrections(ids: list, round_: int) -> list:
+    return [
+        {"id": id_, "text": f"FH-A2-{i:04d}" + (f"-R{round_}" if i % 2 else ""), "status": "corrected"}
+        for i, id_ in enumerate(ids)
+    ]
+
+
+def main() -> None:
+    arg_parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    arg_parser.add_argument("--lines", type=int, default=500)
+    args = arg_parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = build_engine("sqlite:///" + os.path.join(tmp, "bench.db"), Settings())
+        ids = fill(engine, args.lines)
+
+        def sessions():
+            with Session(engine) as db:
+                yield db
+
+        app = FastAPI()
+        app.include_router(lines.router)
+        app.dependency_overrides[get_db] = sessions
+        client = TestClient(app)
+
+        started = time.perf_counter()
+        for correction in corrections(ids, 1):
+            client.patch(f"/line/{correction.pop('id')}", params=correction).raise_for_status()
+        per_line = time.perf_counter() - started
+
+        started = time.perf_counter()
+        response = client.patch("/lines", json=corrections(ids, 2))
+        response.raise_for_status()
+        batch = time.perf_counter() - started
+
+        print(f"{args.lines} corrections, {len(response.json())} changed")
+        print(f"{'per line':<12}{per_line * 1000:>10.1f} ms  ({args.lines} requests)")
+        print(f"{'batch':<12}{batch * 1000:>10.1f} ms  (1 request)")
+        engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
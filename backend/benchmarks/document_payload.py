@@ -0,0 +1,132 @@
+"""Compare ways of serving a document with its OCR results and line numbers.
+
+Usage::
+
+    python -m backend.benchmarks.document_payload --ocr-rows 5000 --lines 100
+    python -m backend.benchmarks.document_payload --ocr-rows 200000 --skip-joinedload
+
+A temporary SQLite database is filled with one document. Each variant builds
+the complete response body the way the endpoint does:
+
+* ``joinedload`` - the former ``/doc/{id}`` query joining both collections,
+  which fetches ``ocr rows x lines`` rows (skip it for large documents);
+* ``selectinload`` - ``/doc/{id}`` now, one query per collection;
+* ``split json`` - ``/documents/{id}`` plus both collection endpoints;
+* ``ndjson`` - both collection endpoints with ``format=ndjson``.
+
+``first byte`` is the time until the first chunk of the body is ready and
+``peak`` the largest Python heap growth seen by ``tracemalloc``.
+"""
+
+import argparse
+import os
+import tempfile
+import time
+import tracemalloc
+from typing import List
+
+from pydantic import TypeAdapter
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session, joinedload
+
+from backend import crud, models, schemas
+from backend.services import DocumentService
+
+
+def seed(db: Session, ocr_rows: int, lines: int) -> int:
+    doc = crud.create_document(db, schemas.DocumentCreate(file_name="bench.pdf", pages=10))
+    crud.bulk_create_ocr_results(
+        db,
+        (
+            {"page": 1 + i % 10, "text": f'6"-FH-A1-{i:05d}', "x_coord": i % 2000, "y_coord": i % 1500,
+             "width": 40.0, "height": 8.0}
+            for i in range(ocr_rows)
+        ),
+        doc.id,
+    )
+    crud.bulk_create_line_numbers(
+        db,
+        (
+            {"page": 1 + i % 10, "text": f'6"-FH-A1-{i:05d}', "x_coord": i % 2000, "y_coord": i % 1500,
+             "width": 40.0, "height": 8.0}
+            for i in range(lines)
+        ),
+        doc.id,
+    )
+    return doc.id
+
+
+def joinedload_body(db: Session, document_id: int) -> List[bytes]:
+    document = db.query(models.Document).options(
+        joinedload(models.Document.line_numbers),
+        joinedload(models.Document.ocr_results)
+    ).filter(models.Document.id == document_id).first()
+    return [schemas.Document.model_validate(document).model_dump_json().encode()]
+
+
+def selectinload_body(db: Session, document_id: int) -> List[bytes]:
+    document = DocumentService(db).get_document(document_id)
+    return [schemas.Document.model_validate(document).model_dump_json().encode()]
+
+
+def split_json_body(db: Session, document_id: int) -> List[bytes]:
+    service = DocumentService(db)
+    summary = schemas.DocumentSummary.model_validate(service.get_summary(document_id))
+    body = [summary.model_dump_json().encode()]
+    for kind, schema in (("ocr_results", schemas.OcrResult), ("line_numbers", schemas.LineNumber)):
+        body.append(TypeAdapter(List[schema]).dump_json(service.get_rows(document_id, kind)))
+    return body
+
+
+def ndjson_body(db: Session, document_id: int):
+    service = DocumentService(db)
+    for kind in ("ocr_results", "line_numbers"):
+        yield from service.stream_rows(document_id, kind)
+
+
+def consume(engine, document_id: int, build):
+    started = time.perf_counter()
+    first_byte = None
+    size = 0
+    with Session(engine) as db:
+        for chunk in build(db, document_id):
+            if first_byte is None:
+                first_byte = time.perf_counter() - started
+            size += len(chunk)
+    return first_byte, time.perf_counter() - started, size
+
+
+def measure(label: str, engine, document_id: int, build) -> None:
+    first_byte, elapsed, size = consume(engine, document_id, build)
+    # Timed and traced separately: tracemalloc slows allocation-heavy code down.
+    tracemalloc.start()
+    consume(engine, document_id, build)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f"{label:<14}{first_byte:>12.3f}{elapsed:>10.3f}{peak / 1e6:>10.1f}{size / 1e6:>10.1f}")
+
+
+def main() -> None:
+    arg_parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    arg_parser.add_argument("--ocr-rows", type=int, default=5000)
+    arg_parser.add_argument("--lines", type=int, default=100)
+    arg_parser.add_argument("--skip-joinedload", action="store_true")
+    args = arg_parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = create_engine("sqlite:///" + os.path.join(tmp, "bench.db"))
+        models.Base.metadata.create_all(engine)
+        with Session(engine) as db:
+            document_id = seed(db, args.ocr_rows, args.lines)
+
+        print(f"{'variant':<14}{'first byte s':>12}{'total s':>10}{'peak MB':>10}{'body MB':>10}")
+        if not args.skip_joinedload:
+            measure("joinedload", engine, document_id, joinedload_body)
+        measure("selectinload", engine, document_id, selectinload_body)
+        measure("split json", engine, document_id, split_json_body)
+        measure("ndjson", engine, document_id, ndjson_body)
+        engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
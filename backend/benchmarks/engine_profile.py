@@ -0,0 +1,98 @@
+"""Measure read and write throughput of concurrent sessions under each engine profile.
+
+Usage::
+
+    python -m backend.benchmarks.engine_profile --writers 8 --readers 8 --seconds 5
+
+A temporary SQLite database is filled with one page of OCR results. Writer
+threads then correct single rows (``crud.update_ocr_result``, one transaction
+each) while reader threads load the page (``crud.get_page_rows``), for
+``--seconds`` seconds. ``legacy`` is the engine as it was created before the
+profile existed: rollback journal, the driver's 5 s lock timeout. ``wal``
+applies the pragmas of the default profile; ``wal + queue`` also sets
+``SQLITE_WRITE_QUEUE``. Writes that fail with "database is locked" are
+counted as errors.
+"""
+
+import argparse
+import os
+import tempfile
+import threading
+import time
+
+from sqlalchemy import create_engine
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import Session
+
+from backend import crud, models, schemas
+from backend.config import Settings
+from backend.database import build_engine
+
+
+def fill(engine, rows: int) -> tuple:
+    models.Base.metadata.create_all(engine)
+    with Session(engine) as db:
+        doc = crud.create_document(db, schemas.DocumentCreate(file_name="bench.pdf", pages=1))
+        records = [
+            {"page": 1, "text": f"FH-A2-{i:05d}", "x_coord": i % 700, "y_coord": i // 700, "width": 40, "height": 8}
+            for i in range(rows)
+        ]
+        crud.bulk_create_ocr_results(db, records, doc.id)
+        return doc.id, [row.id for row in crud.get_ocr_results(db, doc.id)]
+
+
+def run(engine, document_id: int, ids: list, writers: int, readers: int, seconds: float) -> tuple:
+    reads, writes, errors = [], [], []
+    stop = time.perf_counter() + seconds
+
+    def write(offset):
+        i = 0
+        while time.perf_counter() < stop:
+            try:
+                with Session(engine) as db:
+                    crud.update_ocr_result(db, ids[(offset * 7919 + i) % len(ids)], f"W{offset}-{i}", "corrected")
+                writes.append(1)
+            except OperationalError:
+                errors.append(1)
+            i += 1
+
+    def read():
+        while time.perf_counter() < stop:
+            with Session(engine) as db:
+                crud.get_page_rows(db, models.OcrResult, document_id, 1)
+            reads.append(1)
+
+    threads = [threading.Thread(target=write, args=(n,)) for n in range(writers)]
+    threads += [threading.Thread(target=read) for _ in range(readers)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return len(reads) / seconds, len(writes) / seconds, len(errors)
+
+
+def main() -> None:
+    arg_parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    arg_parser.add_argument("--rows", type=int, default=2000)
+    arg_parser.add_argument("--writers", type=int, default=8)
+    arg_parser.add_argument("--readers", type=int, default=8)
+    arg_parser.add_argument("--seconds", type=float, default=5)
+    args = arg_parser.parse_args()
+
+    profiles = {
+        "legacy": lambda url: create_engine(url, connect_args={"check_same_thread": False}),
+        "wal": lambda url: build_engine(url, Settings()),
+        "wal + queue": lambda url: build_engine(url, Settings(sqlite_write_queue=True)),
+    }
+    print(f"{'profile':<14}{'reads/s':>10}{'writes/s':>10}{'locked':>8}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for number, (label, make_engine) in enumerate(profiles.items()):
+            engine = make_engine("sqlite:///" + os.path.join(tmp, f"bench{number}.db"))
+            document_id, ids = fill(engine, args.rows)
+            reads, writes, errors = run(engine, document_id, ids, args.writers, args.readers, args.seconds)
+            print(f"{label:<14}{reads:>10.1f}{writes:>10.1f}{errors:>8}")
+            engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,121 @@
+"""Measure how fast document events reach many subscribers, and what idle ones cost.
+
+Usage::
+
+    python -m backend.benchmarks.events --subscribers 1000 --documents 10 --updates 50
+
+``--subscribers`` event streams (:func:`backend.services.events.open_stream`)
+are opened in one event loop on ``--documents`` documents of a temporary
+SQLite database and read by one task each. ``--updates`` line corrections
+are then committed one at a time in the threadpool, as ``PATCH /line/{id}``
+does, and the time from each commit to its event reaching the last
+subscriber of the document is reported, with and without
+:meth:`EventBroker.notify`; without it, the event waits for the next poll.
+``idle`` reports the Python heap held per subscriber (``tracemalloc``) and
+the CPU time of the process while every stream sits idle for ``--idle``
+seconds.
+"""
+
+import argparse
+import asyncio
+import os
+import statistics
+import tempfile
+import time
+import tracemalloc
+
+
+async def run(directory: str, subscribers: int, documents: int, updates: int, idle: float) -> dict:
+    from fastapi.concurrency import run_in_threadpool
+    from sqlalchemy.orm import sessionmaker
+
+    from backend import crud, models, schemas
+    from backend.config import Settings
+    from backend.database import build_engine
+    from backend.services.events import EventBroker, open_stream
+
+    engine = build_engine("sqlite:///" + os.path.join(directory, "events.db"), Settings())
+    models.Base.metadata.create_all(engine)
+    Session = sessionmaker(bind=engine)
+    line_ids = {}
+    with Session() as db:
+        for i in range(documents):
+            doc = crud.create_document(db, schemas.DocumentCreate(file_name=f"events-{i}.pdf", pages=1))
+            crud.bulk_create_line_numbers(
+                db, [{"page": 1, "text": "FH-A2-0001", "x_coord": 0, "y_coord": 0, "width": 1, "height": 1}], doc.id
+            )
+            line_ids[doc.id] = db.query(models.LineNumber.id).filter_by(document_id=doc.id).scalar()
+
+    broker = EventBroker(Session)
+    received = {doc_id: asyncio.Queue() for doc_id in line_ids}
+
+    async def subscriber(doc_id: int, stream) -> None:
+        async for frame in stream:
+            if frame.startswith("id: "):
+                received[doc_id].put_nowait(time.perf_counter())
+
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    doc_ids = list(line_ids)
+    tasks = []
+    for i in range(subscribers):
+        doc_id = doc_ids[i % documents]
+        tasks.append(asyncio.ensure_future(subscriber(doc_id, await open_stream(broker, doc_id, None))))
+    await asyncio.sleep(0.1)
+    per_subscriber = (tracemalloc.get_traced_memory()[0] - before) / subscribers
+    tracemalloc.stop()
+
+    await asyncio.sleep(1)  # every subscriber is waiting for its first event
+    cpu = time.process_time()
+    await asyncio.sleep(idle)
+    idle_cpu = (time.process_time() - cpu) / idle
+
+    def correct(line_id: int, text: str) -> float:
+        with Session() as db:
+            crud.update_line_number(db, line_id, text, "corrected")
+        return time.perf_counter()
+
+    latencies = {True: [], False: []}
+    for n in range(updates):
+        for notify in (True, False):
+            doc_id = doc_ids[n % documents]
+            committed = await run_in_threadpool(correct, line_ids[doc_id], f"FH-A2-{n:04d}{int(notify)}")
+            if notify:
+                broker.notify()
+            count = sum(1 for i in range(subscribers) if doc_ids[i % documents] == doc_id)
+            last = 0.0
+            for _ in range(count):
+                last = max(last, await received[doc_id].get())
+            latencies[notify].append(last - committed)
+
+    for task in tasks:
+        task.cancel()
+    await asyncio.gather(*tasks, return_exceptions=True)
+    engine.dispose()
+    return {"memory": per_subscriber, "idle_cpu": idle_cpu, "latencies": latencies}
+
+
+def main() -> None:
+    arg_parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    arg_parser.add_argument("--subscribers", type=int, default=1000)
+    arg_parser.add_argument("--documents", type=int, default=10)
+    arg_parser.add_argument("--updates", type=int, default=50)
+    arg_parser.add_argument("--idle", type=float, default=5.0)
+    args = arg_parser.parse_args()
+
+    os.environ["LOG_LEVEL"] = "WARNING"
+    with tempfile.TemporaryDirectory() as tmp:
+        result = asyncio.run(run(tmp, args.subscribers, args.documents, args.updates, args.idle))
+    print(f"{args.subscribers} subscribers on {args.documents} documents")
+    print(f"idle: {result['memory'] / 1024:.1f} KiB per subscriber, {result['idle_cpu'] * 100:.1f}% of a CPU")
+    print(f"{'delivery':<10}{'p50':>10}{'p95':>10}{'max':>10}")
+    for notify, label in ((True, "notify"), (False, "poll")):
+        values = sorted(result["latencies"][notify])
+        print(
+            f"{label:<10}{statistics.median(values) * 1000:>8.1f}ms"
+            f"{values[int(len(values) * 0.95)] * 1000:>8.1f}ms{values[-1] * 1000:>8.1f}ms"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+"""Compare the JSON and binary geometry payloads of a dense sheet.
+
+Usage::
+
+    python -m backend.benchmarks.geometry_format --rows 20000 --out /tmp/geometry
+
+Rows are synthetic OCR results of one page. Sizes are reported raw and
+gzip-compressed; decode times are for ``json.loads`` and
+:func:`backend.services.geometry.decode_geometry`. With ``--out`` both
+payloads are written to that directory (``rows.json`` and ``rows.bin``) to
+time a client-side decoder against.
+"""
+
+import argparse
+import datetime
+import gzip
+import json
+import os
+import random
+import statistics
+import time
+
+from backend.services.geometry import decode_geometry, encode_geometry
+
+
+def make_rows(count: int, seed: int = 1):
+    rng = random.Random(seed)
+    updated_at = datetime.datetime(2026, 1, 1).isoformat()
+    rows = []
+    for i in range(count):
+        rows.append({
+            "text": f'{rng.choice([2, 3, 4, 6, 8])}"-{rng.choice(["FH", "PW", "CW"])}-A1-{rng.randint(0, 999):03d}',
+            "page": 1,
+            "x_coord": rng.uniform(0, 7000),
+            "y_coord": rng.uniform(0, 5000),
+            "width": rng.uniform(20, 80),
+            "height": rng.uniform(6, 12),
+            "status": "auto",
+            "id": i + 1,
+            "document_id": 1,
+            "updated_at": updated_at,
+        })
+    return rows
+
+
+def median_time(func, runs: int = 7) -> float:
+    timings = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - started)
+    return statistics.median(timings)
+
+
+def main() -> None:
+    arg_parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    arg_parser.add_argument("--rows", type=int, default=20000)
+    arg_parser.add_argument("--out", default=None)
+    args = arg_parser.parse_args()
+
+    rows = make_rows(args.rows)
+    as_json = json.dumps(rows, ensure_ascii=False, separators=(",", ":")).encode()
+    columns = [
+        (r["id"], r["page"], r["x_coord"], r["y_coord"], r["width"], r["height"], r["text"], r["status"])
+        for r in rows
+    ]
+    as_binary = encode_geometry(columns, document_id=1)
+
+    print(f"{'format':<8}{'bytes':>12}{'gzip':>12}{'decode ms':>12}")
+    for label, payload, decode in (
+        ("json", as_json, json.loads),
+        ("binary", as_binary, decode_geometry),
+    ):
+        compressed = len(gzip.compress(payload, 6))
+        decode_ms = median_time(lambda: decode(payload)) * 1000
+        print(f"{label:<8}{len(payload):>12,}{compressed:>12,}{decode_ms:>12.2f}")
+    encode_ms = median_time(lambda: encode_geometry(columns, document_id=1)) * 1000
+    print(f"binary encode {encode_ms:.2f} ms")
+
+    if args.out:
+        os.makedirs(args.out, exist_ok=True)
+        with open(os.path.join(args.out, "rows.json"), "wb") as f:
+            f.write(as_json)
+        with open(os.path.join(args.out, "rows.bin"), "wb") as f:
+            f.write(as_binary)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+"""Time document reads that render, hit the payload store, or revalidate.
+
+Usage::
+
+    python -m backend.benchmarks.http_cache --rows 20000
+
+A temporary SQLite database holds one document with ``--rows`` OCR results,
+served through ``TestClient``. ``render`` empties the payload store before
+every request, so the rows are loaded, serialized and (for gzip) compressed
+each time. ``store`` repeats the request with the body already stored for the
+current version. ``304`` sends the ETag back with ``If-None-Match``.
+"""
+
+import argparse
+import os
+import random
+import statistics
+import tempfile
+import time
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session, sessionmaker
+
+from backend import crud, schemas
+from backend.database import Base
+from backend.routers import documents
+from backend.services.dependencies import get_db
+from backend.services.http_cache import payload_store
+
+
+def records(count: int, seed: int = 1):
+    rng = random.Random(seed)
+    for i in range(count):
+        yield {
+            "page": 1 + i % 4,
+            "text": f"{rng.choice([2, 3, 4, 6])}\"-FH-A1-{i:05d}",
+            "x_coord": rng.uniform(0, 7000),
+            "y_coord": rng.uniform(0, 5000),
+            "width": rng.uniform(20, 80),
+            "height": rng.uniform(6, 12),
+        }
+
+
+def median_ms(func, runs: int) -> float:
+    timings = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - started)
+    return statistics.median(timings) * 1000
+
+
+def main() -> None:
+    arg_parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    arg_parser.add_argument("--rows", type=int, default=20000)
+    arg_parser.add_argument("--runs", type=int, default=7)
+    args = arg_parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        engine = create_engine(f"sqlite:///{os.path.join(directory, 'bench.db')}")
+        Base.metadata.create_all(engine)
+        with Session(engine) as db:
+            doc = crud.create_document(db, schemas.DocumentCreate(file_name="bench.pdf", pages=4))
+            crud.bulk_create_ocr_results(db, records(args.rows), doc.id)
+            doc_id = doc.id
+
+        make_session = sessionmaker(bind=engine)
+
+        def session():
+            db = make_session()
+            try:
+                yield db
+            finally:
+                db.close()
+
+        app = FastAPI()
+        app.include_router(documents.router)
+        app.dependency_overrides[get_db] = session
+        client = TestClient(app)
+        url = f"/documents/{doc_id}/ocr_results"
+
+        print(f"{'encoding':<10}{'bytes':>12}{'render ms':>12}{'store ms':>12}{'304 ms':>10}")
+        for encoding in ("identity", "gzip", "zstd"):
+            headers = {"Accept-Encoding": encoding}
+            response = client.get(url, headers=headers)
+            if response.headers.get("content-encoding", "identity") != encoding:
+                continue  # zstd needs the zstandard package
+            size = int(response.headers["content-length"])
+
+            def render():
+                payload_store.clear()
+                client.get(url, headers=headers)
+
+            render_ms = median_ms(render, args.runs)
+            client.get(url, headers=headers)
+            store_ms = median_ms(lambda: client.get(url, headers=headers), args.runs)
+            etag = {**headers, "If-None-Match": response.headers["etag"]}
+            not_modified_ms = median_ms(lambda: client.get(url, headers=etag), args.runs)
+            print(f"{encoding:<10}{size:>12,}{render_ms:>12.1f}{store_ms:>12.1f}{not_modified_ms:>10.1f}")
+        engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
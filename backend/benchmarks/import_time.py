@@ -0,0 +1,68 @@
+"""Measure cold import time of the OCR package and the CLI scripts.
+
+Usage::
+
+    python -m backend.benchmarks.import_time --runs 15
+
+Every sample imports the module in a fresh interpreter, so no module is
+cached between runs; the median of ``--runs`` samples is reported. The
+``load_parser`` row times resolving and instantiating the configured parser
+in a process that has already imported :mod:`backend.ocr`.
+"""
+
+import argparse
+import statistics
+import subprocess
+import sys
+
+MODULES = [
+    "backend.ocr",
+    "backend.populate_line_numbers",
+    "backend.reimport_lines",
+    "backend.universal_parser",
+    "backend.run_all_migrations",
+]
+
+IMPORT_SNIPPET = """
+import time
+started = time.perf_counter()
+import {module}
+print(time.perf_counter() - started)
+"""
+
+LOAD_SNIPPET = """
+import time
+from backend.config import get_settings
+from backend.ocr import load_parser
+name = get_settings().ocr_parser
+started = time.perf_counter()
+load_parser(name)
+first = time.perf_counter() - started
+started = time.perf_counter()
+load_parser(name)
+print(first, time.perf_counter() - started)
+"""
+
+
+def sample(snippet: str) -> list:
+    out = subprocess.run([sys.executable, "-c", snippet], check=True, capture_output=True, text=True)
+    return [float(value) for value in out.stdout.split()]
+
+
+def main() -> None:
+    arg_parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    arg_parser.add_argument("--runs", type=int, default=15)
+    args = arg_parser.parse_args()
+
+    for module in MODULES:
+        samples = [sample(IMPORT_SNIPPET.format(module=module))[0] for _ in range(args.runs)]
+        print(f"{module:<34}{statistics.median(samples) * 1000:>8.1f} ms")
+
+    samples = [sample(LOAD_SNIPPET) for _ in range(args.runs)]
+    first = statistics.median(s[0] for s in samples) * 1000
+    again = statistics.median(s[1] for s in samples) * 1000
+    print(f"{'load_parser (first / cached)':<34}{first:>8.1f} ms / {again:.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,153 @@
+"""Compare importing OCR files inside the request with queuing them as ingest jobs.
+
+Usage::
+
+    python -m backend.benchmarks.jobs --files 4 --pages 40 --workers 2
+
+The sample Document AI result is replicated ``--pages`` times (see
+:mod:`backend.benchmarks.parser_memory`) and posted ``--files`` times at
+once, one document each, against a temporary SQLite database. ``upload``
+posts the files to ``POST /documents/{doc_id}/upload``, which parses them in
+the threadpool of the web process; ``jobs`` posts them to
+``POST /documents/{doc_id}/jobs`` and polls ``GET /jobs/{id}`` until
+``--workers`` worker processes have imported them. Meanwhile a client reads
+``GET /documents/{doc_id}`` in a loop: its latency is what the parsing costs
+the other requests of the web process. Files whose import failed, e.g. on
+SQLite's busy timeout, are counted.
+"""
+
+import argparse
+import asyncio
+import os
+import statistics
+import tempfile
+import time
+
+from backend.benchmarks.parser_memory import DEFAULT_SOURCE, build_package
+
+
+async def run_mode(mode: str, directory: str, package: str, files: int, workers: int) -> dict:
+    import httpx
+    from fastapi import FastAPI
+    from sqlalchemy.orm import Session
+
+    from backend import crud, models, schemas
+    from backend.config import Settings
+    from backend.database import build_engine
+    from backend.routers import documents, jobs, ocr
+    from backend.services.dependencies import get_db
+    from backend.worker import WorkerPool
+
+    url = "sqlite:///" + os.path.join(directory, f"{mode}.db")
+    engine = build_engine(url, Settings())
+    models.Base.metadata.create_all(engine)
+    with Session(engine) as db:
+        doc_ids = [
+            crud.create_document(db, schemas.DocumentCreate(file_name=f"{mode}-{i}.pdf", pages=1)).id
+            for i in range(files)
+        ]
+
+    def sessions():
+        with Session(engine) as db:
+            yield db
+
+    app = FastAPI()
+    for module in (documents, jobs, ocr):
+        app.include_router(module.router)
+    app.dependency_overrides[get_db] = sessions
+
+    pool = None
+    if mode == "jobs":
+        # Spawned workers read their settings from the environment.
+        os.environ["DATABASE_URL"] = url
+        pool = WorkerPool(workers)
+        pool.start()
+
+    async def chunks():
+        with open(package, "rb") as f:
+            for chunk in iter(lambda: f.read(1 << 16), b""):
+                yield chunk
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=None) as client:
+        done = asyncio.Event()
+        latencies = []
+
+        async def read():
+            while not done.is_set():
+                started = time.perf_counter()
+                (await client.get(f"/documents/{doc_ids[0]}")).raise_for_status()
+                latencies.append(time.perf_counter() - started)
+                await asyncio.sleep(0.01)
+
+        async def post(doc_id):
+            try:
+                response = await client.post(f"/documents/{doc_id}/{mode}", content=chunks())
+            except Exception:  # the app raised, e.g. "database is locked"
+                return {"status": "failed"}
+            if response.is_error:
+                return {"status": "failed"}
+            return response.json() if mode == "jobs" else {"status": "succeeded"}
+
+        async def wait(job):
+            while job["status"] not in ("succeeded", "failed"):
+                await asyncio.sleep(0.1)
+                job = (await client.get(f"/jobs/{job['id']}")).json()
+            return job
+
+        reader = asyncio.ensure_future(read())
+        started = time.perf_counter()
+        responses = await asyncio.gather(*(post(doc_id) for doc_id in doc_ids))
+        posted = time.perf_counter() - started
+        if mode == "jobs":
+            responses = await asyncio.gather(*(wait(job) for job in responses))
+        imported = time.perf_counter() - started
+        done.set()
+        await reader
+
+    if pool is not None:
+        pool.stop()
+    with Session(engine) as db:
+        records = db.query(models.OcrResult).count()
+    engine.dispose()
+    latencies.sort()
+    return {
+        "records": records,
+        "failed": sum(response["status"] == "failed" for response in responses),
+        "posted": posted,
+        "imported": imported,
+        "p50": statistics.median(latencies),
+        "p95": latencies[int(len(latencies) * 0.95)],
+    }
+
+
+def main() -> None:
+    arg_parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    arg_parser.add_argument("--files", type=int, default=4)
+    arg_parser.add_argument("--pages", type=int, default=40)
+    arg_parser.add_argument("--workers", type=int, default=2)
+    arg_parser.add_argument("--source", default=DEFAULT_SOURCE)
+    args = arg_parser.parse_args()
+
+    from backend.config import get_settings
+
+    os.environ["JOB_POLL_INTERVAL"] = "0.1"
+    os.environ["LOG_LEVEL"] = "WARNING"
+    os.environ["OCR_PARSER"] = get_settings().ocr_parser = "document_ai_stream"
+    with tempfile.TemporaryDirectory() as tmp:
+        package = os.path.join(tmp, "package.json")
+        build_package(args.source, args.pages, package)
+        get_settings().job_dir = get_settings().upload_dir = os.path.join(tmp, "spool")
+        size_mb = os.path.getsize(package) / (1024 * 1024)
+        print(f"{args.files} files of {args.pages} pages, {size_mb:.1f} MB each; {args.workers} workers")
+        print(f"{'mode':<8}{'failed':>8}{'records':>10}{'answered s':>12}{'imported s':>12}{'read p50':>10}{'read p95':>10}")
+        for mode in ("upload", "jobs"):
+            result = asyncio.run(run_mode(mode, tmp, package, args.files, args.workers))
+            print(
+                f"{mode:<8}{result['failed']:>8}{result['records']:>10}{result['posted']:>12.2f}{result['imported']:>12.2f}"
+                f"{result['p50'] * 1000:>8.0f}ms{result['p95'] * 1000:>8.0f}ms"
+            )
+
+
+if __name__ == "__main__":
+    main()
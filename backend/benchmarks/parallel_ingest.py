@@ -0,0 +1,80 @@
+"""Time page-sharded ingestion for different worker counts.
+
+Usage::
+
+    python -m backend.benchmarks.parallel_ingest --pages 40 --workers 1 2 4
+
+A synthetic package is built as in :mod:`backend.benchmarks.parser_memory`
+and ingested into a fresh SQLite file once per worker count. The record
+output of every run is checked against the serial run. ``main CPU`` is the
+CPU time spent in the parent process (splitting pages and writing rows),
+i.e. the part of the work that does not scale with workers.
+"""
+
+import argparse
+import os
+import tempfile
+import time
+
+from sqlalchemy import create_engine, select
+from sqlalchemy.orm import sessionmaker
+
+from backend import crud, models, schemas
+from backend.benchmarks.parser_memory import DEFAULT_SOURCE, build_package
+from backend.ocr import load_parser
+
+
+def ingest(path: str, parser_name: str, workers: int, db_path: str):
+    engine = create_engine("sqlite:///" + db_path)
+    models.Base.metadata.create_all(engine)
+    db = sessionmaker(bind=engine)()
+    try:
+        document = crud.create_document(db, schemas.DocumentCreate(file_name="bench.pdf"))
+        parser = load_parser(parser_name)
+        started = time.perf_counter()
+        cpu_started = time.process_time()
+        created = parser.create_ocr_results(db, parser.parse(path), document.id, workers=workers)
+        main_cpu = time.process_time() - cpu_started
+        elapsed = time.perf_counter() - started
+        columns = (
+            models.OcrResult.page,
+            models.OcrResult.text,
+            models.OcrResult.x_coord,
+            models.OcrResult.y_coord,
+            models.OcrResult.width,
+            models.OcrResult.height,
+        )
+        rows = db.execute(select(*columns).order_by(models.OcrResult.id)).all()
+        return created, elapsed, main_cpu, rows
+    finally:
+        db.close()
+        engine.dispose()
+
+
+def main() -> None:
+    arg_parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    arg_parser.add_argument("--pages", type=int, default=40)
+    arg_parser.add_argument("--source", default=DEFAULT_SOURCE)
+    arg_parser.add_argument("--parser", default="document_ai_stream")
+    arg_parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4])
+    args = arg_parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "package.json")
+        build_package(args.source, args.pages, path)
+        print(f"{args.pages} pages, parser {args.parser}, {os.cpu_count()} CPUs")
+        print(f"{'workers':>8}{'records':>10}{'seconds':>10}{'main CPU':>10}{'pages/s':>10}  identical")
+        serial_rows = None
+        for workers in args.workers:
+            db_path = os.path.join(tmp, f"bench-{workers}.db")
+            created, elapsed, main_cpu, rows = ingest(path, args.parser, workers, db_path)
+            if serial_rows is None:
+                serial_rows = rows
+            print(
+                f"{workers:>8}{created:>10}{elapsed:>10.2f}{main_cpu:>10.2f}{args.pages / elapsed:>10.1f}"
+                f"  {rows == serial_rows}"
+            )
+
+
+if __name__ == "__main__":
+    main()
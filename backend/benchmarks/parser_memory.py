@@ -0,0 +1,99 @@
+"""Compare peak RSS of the OCR parsers on a synthetic multi-page package.
+
+Usage::
+
+    python -m backend.benchmarks.parser_memory --pages 50
+
+The sample Document AI result is replicated ``--pages`` times into a temporary
+file. Every parser is then run in a fresh subprocess that walks all OCR
+records without touching the database, and the peak RSS of that process is
+reported.
+"""
+
+import argparse
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+DEFAULT_SOURCE = os.path.join(
+    os.path.dirname(__file__), "..", "..", "data", "test_pid.pdf_processed.json"
+)
+DEFAULT_PARSERS = ["document_ai", "document_ai_stream"]
+
+
+def build_package(source: str, pages: int, target: str) -> None:
+    """Write a Document AI JSON with the first page of ``source`` repeated."""
+    with open(source, "r", encoding="utf-8") as f:
+        data = json.load(f)
+    page = data["pages"][0]
+    with open(target, "w", encoding="utf-8") as out:
+        out.write('{"text": ')
+        json.dump(data["text"], out)
+        out.write(', "pages": [')
+        for number in range(1, pages + 1):
+            if number > 1:
+                out.write(", ")
+            json.dump(dict(page, pageNumber=number), out)
+        out.write("]}")
+
+
+def peak_rss_mb() -> float:
+    # ru_maxrss is reported in kilobytes on Linux and in bytes on macOS.
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return rss / (1024 * 1024) if sys.platform == "darwin" else rss / 1024
+
+
+def run_child(parser_name: str, path: str) -> None:
+    from backend.ocr import load_parser
+
+    parser = load_parser(parser_name)
+    baseline = peak_rss_mb()
+    started = time.perf_counter()
+    records = sum(1 for _ in parser.iter_ocr_results(parser.parse(path)))
+    elapsed = time.perf_counter() - started
+    print(json.dumps({
+        "records": records,
+        "seconds": elapsed,
+        "baseline_mb": baseline,
+        "peak_mb": peak_rss_mb(),
+    }))
+
+
+def main() -> None:
+    arg_parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    arg_parser.add_argument("--pages", type=int, default=20)
+    arg_parser.add_argument("--source", default=DEFAULT_SOURCE)
+    arg_parser.add_argument("--parsers", nargs="+", default=DEFAULT_PARSERS)
+    arg_parser.add_argument("--child", nargs=2, metavar=("PARSER", "PATH"), help=argparse.SUPPRESS)
+    args = arg_parser.parse_args()
+
+    if args.child:
+        run_child(*args.child)
+        return
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "package.json")
+        build_package(args.source, args.pages, path)
+        size_mb = os.path.getsize(path) / (1024 * 1024)
+        print(f"Synthetic package: {args.pages} pages, {size_mb:.1f} MB")
+        print(f"{'parser':<22}{'records':>10}{'seconds':>10}{'baseline MB':>14}{'peak MB':>10}")
+        for name in args.parsers:
+            output = subprocess.run(
+                [sys.executable, "-m", "backend.benchmarks.parser_memory", "--child", name, path],
+                check=True,
+                capture_output=True,
+                text=True,
+            ).stdout
+            result = json.loads(output.strip().splitlines()[-1])
+            print(
+                f"{name:<22}{result['records']:>10}{result['seconds']:>10.2f}"
+                f"{result['baseline_mb']:>14.1f}{result['peak_mb']:>10.1f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
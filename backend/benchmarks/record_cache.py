@@ -0,0 +1,54 @@
+"""Time record extraction with a cold and a warm on-disk record cache.
+
+Usage::
+
+    python -m backend.benchmarks.record_cache --pages 50
+
+A synthetic package is built as in :mod:`backend.benchmarks.parser_memory`.
+``cold`` parses the JSON and writes the cache entry, ``warm`` hashes the file
+and reads the entry back; both runs must produce the same records.
+"""
+
+import argparse
+import os
+import tempfile
+import time
+
+from backend.benchmarks.parser_memory import DEFAULT_SOURCE, build_package
+from backend.config import get_settings
+from backend.ocr import load_parser
+
+
+def extract(parser, path: str) -> list:
+    return [row for batch in parser.iter_batches(path) for row in batch.iter_dicts()]
+
+
+def main() -> None:
+    arg_parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    arg_parser.add_argument("--source", default=DEFAULT_SOURCE)
+    arg_parser.add_argument("--pages", type=int, default=50)
+    arg_parser.add_argument("--parser", default="document_ai")
+    args = arg_parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "package.json")
+        build_package(args.source, args.pages, path)
+        settings = get_settings()
+        settings.ocr_cache_dir = os.path.join(tmp, "cache")
+        parser = load_parser(args.parser)
+
+        results = {}
+        for label in ("cold", "warm"):
+            started = time.perf_counter()
+            results[label] = extract(parser, path)
+            elapsed = time.perf_counter() - started
+            print(f"{label:<6}{elapsed:>8.3f} s  {len(results[label])} records")
+        assert results["warm"] == results["cold"], "cached records differ from parsed records"
+
+        entry = next(os.scandir(settings.ocr_cache_dir))
+        source_mb = os.path.getsize(path) / 1e6
+        print(f"source {source_mb:.1f} MB, cache entry {entry.stat().st_size / 1e6:.1f} MB")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,108 @@
+"""Time substring searches through the trigram index against a LIKE scan.
+
+Usage::
+
+    python -m backend.benchmarks.text_search --documents 300 --rows 1000
+
+A temporary SQLite database is filled with ``--documents`` documents of
+``--rows`` synthetic tags each. Queries are partial tags (``FH-A2-0``, a
+four-digit number) searched across all documents. ``fts5`` is the query of
+``crud.search_text``; ``like scan`` runs it through the fallback of
+:func:`backend.text_search.search_query`. Both return the first 50 hits of
+the reported number of matches. The insert rows compare bulk insert time with
+and without the index triggers.
+"""
+
+import argparse
+import os
+import random
+import statistics
+import tempfile
+import time
+
+from sqlalchemy import create_engine, select, text
+from sqlalchemy.orm import Session
+
+from backend import crud, models, schemas, text_search
+
+LINE_CODES = ("FH", "PW", "CW", "SW", "IA", "N2", "ST", "CD")
+
+
+def tag(rng: random.Random) -> str:
+    return (
+        f'{rng.choice([2, 3, 4, 6, 8])}"-{rng.choice(LINE_CODES)}-'
+        f"{rng.choice('ABC')}{rng.randint(1, 9)}-{rng.randint(0, 9999):04d}"
+    )
+
+
+def fill(engine, documents: int, rows: int) -> float:
+    rng = random.Random(1)
+    elapsed = 0.0
+    with Session(engine) as db:
+        for number in range(documents):
+            doc = crud.create_document(db, schemas.DocumentCreate(file_name=f"P&ID-{number:04d}.pdf", pages=1))
+            records = [
+                {"page": 1, "text": tag(rng), "x_coord": i, "y_coord": 0, "width": 40, "height": 8}
+                for i in range(rows)
+            ]
+            started = time.perf_counter()
+            crud.bulk_create_ocr_results(db, records, doc.id)
+            elapsed += time.perf_counter() - started
+    return elapsed
+
+
+def time_queries(db: Session, dialect: str, queries, limit: int = 50) -> float:
+    model = models.OcrResult
+    timings = []
+    for value in queries:
+        query = select(model, models.Document.file_name).join(models.Document, models.Document.id == model.document_id)
+        started = time.perf_counter()
+        db.execute(text_search.search_query(query, model, dialect, value).limit(limit)).all()
+        timings.append(time.perf_counter() - started)
+    return statistics.median(timings)
+
+
+def main() -> None:
+    arg_parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    arg_parser.add_argument("--documents", type=int, default=300)
+    arg_parser.add_argument("--rows", type=int, default=1000)
+    arg_parser.add_argument("--queries", type=int, default=30)
+    args = arg_parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = create_engine("sqlite:///" + os.path.join(tmp, "bench.db"))
+        models.Base.metadata.create_all(engine)
+        indexed_insert = fill(engine, args.documents, args.rows)
+
+        plain = create_engine("sqlite:///" + os.path.join(tmp, "plain.db"))
+        models.Base.metadata.create_all(plain)
+        with plain.begin() as connection:
+            for statement in text_search.sqlite_drop("ocr_results"):
+                connection.execute(text(statement))
+        plain_insert = fill(plain, args.documents, args.rows)
+
+        rng = random.Random(2)
+        queries = [
+            f"{rng.choice(LINE_CODES)}-{rng.choice('ABC')}{rng.randint(1, 9)}-0{rng.randint(0, 9)}"
+            if i % 2 else f"{rng.randint(0, 9999):04d}"
+            for i in range(args.queries)
+        ]
+        model = models.OcrResult
+        with Session(engine) as db:
+            hits = statistics.mean(
+                len(db.execute(text_search.search_query(select(model.id), model, "sqlite", value)).all())
+                for value in queries
+            )
+            fts = time_queries(db, "sqlite", queries)
+            scan = time_queries(db, "other", queries)
+        print(f"{args.documents * args.rows} rows in {args.documents} documents, ~{hits:.0f} hits per query")
+        print(f"{'fts5':<22}{fts * 1000:>10.2f} ms/query")
+        print(f"{'like scan':<22}{scan * 1000:>10.2f} ms/query")
+        print(f"{'insert with index':<22}{indexed_insert:>10.2f} s")
+        print(f"{'insert without index':<22}{plain_insert:>10.2f} s")
+        engine.dispose()
+        plain.dispose()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,115 @@
+"""Compare peak RSS of ingesting a raw OCR file through parse-json and through the upload endpoint.
+
+Usage::
+
+    python -m backend.benchmarks.upload --pages 200
+
+The sample Document AI result is replicated ``--pages`` times into a temporary
+file (see :mod:`backend.benchmarks.parser_memory`), and a gzip copy is made.
+Each mode then runs in a fresh subprocess against a temporary SQLite
+database, sending the file from disk in 64 KiB chunks: ``parse-json`` posts
+it as the JSON body of ``POST /documents/{doc_id}/parse-json``, ``upload``
+and ``upload gzip`` stream it to ``POST /documents/{doc_id}/upload``.
+"""
+
+import argparse
+import asyncio
+import gzip
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+from backend.benchmarks.parser_memory import DEFAULT_SOURCE, build_package, peak_rss_mb
+
+MODES = {
+    "parse-json": ("package.json", "parse-json", {"Content-Type": "application/json"}),
+    "upload": ("package.json", "upload", {"Content-Type": "application/json"}),
+    "upload gzip": ("package.json.gz", "upload", {"Content-Type": "application/json", "Content-Encoding": "gzip"}),
+}
+
+
+def run_child(mode: str, directory: str) -> None:
+    import httpx
+    from sqlalchemy.orm import Session
+
+    from backend import crud, models, schemas
+    from backend.config import Settings, get_settings
+    from backend.database import build_engine
+    from backend.main import create_app
+    from backend.services.dependencies import get_db
+
+    file_name, endpoint, headers = MODES[mode]
+    get_settings().ocr_parser = "document_ai_stream"
+    engine = build_engine("sqlite:///" + os.path.join(directory, f"{endpoint}.db"), Settings())
+    models.Base.metadata.create_all(engine)
+    with Session(engine) as db:
+        doc_id = crud.create_document(db, schemas.DocumentCreate(file_name="bench.pdf", pages=1)).id
+
+    def sessions():
+        with Session(engine) as db:
+            yield db
+
+    app = create_app()
+    app.dependency_overrides[get_db] = sessions
+
+    async def chunks():
+        with open(os.path.join(directory, file_name), "rb") as f:
+            for chunk in iter(lambda: f.read(1 << 16), b""):
+                yield chunk
+
+    async def post():
+        # Unlike TestClient, the ASGI transport streams the request body.
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=None) as client:
+            response = await client.post(f"/documents/{doc_id}/{endpoint}", content=chunks(), headers=headers)
+            response.raise_for_status()
+
+    baseline = peak_rss_mb()
+    started = time.perf_counter()
+    asyncio.run(post())
+    elapsed = time.perf_counter() - started
+    with Session(engine) as db:
+        records = db.query(models.OcrResult).filter_by(document_id=doc_id).count()
+    print(json.dumps({"records": records, "seconds": elapsed, "baseline_mb": baseline, "peak_mb": peak_rss_mb()}))
+
+
+def main() -> None:
+    arg_parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    arg_parser.add_argument("--pages", type=int, default=200)
+    arg_parser.add_argument("--source", default=DEFAULT_SOURCE)
+    arg_parser.add_argument("--child", nargs=2, metavar=("MODE", "DIRECTORY"), help=argparse.SUPPRESS)
+    args = arg_parser.parse_args()
+
+    if args.child:
+        run_child(*args.child)
+        return
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "package.json")
+        build_package(args.source, args.pages, path)
+        with open(path, "rb") as source, gzip.open(path + ".gz", "wb") as target:
+            shutil.copyfileobj(source, target)
+        size_mb = os.path.getsize(path) / (1024 * 1024)
+        gzip_mb = os.path.getsize(path + ".gz") / (1024 * 1024)
+        print(f"Synthetic package: {args.pages} pages, {size_mb:.1f} MB ({gzip_mb:.1f} MB gzip)")
+        print(f"{'mode':<14}{'records':>10}{'seconds':>10}{'baseline MB':>14}{'peak MB':>10}")
+        for mode in MODES:
+            output = subprocess.run(
+                [sys.executable, "-m", "backend.benchmarks.upload", "--child", mode, tmp],
+                check=True,
+                capture_output=True,
+                text=True,
+            ).stdout
+            result = json.loads(output.strip().splitlines()[-1])
+            print(
+                f"{mode:<14}{result['records']:>10}{result['seconds']:>10.2f}"
+                f"{result['baseline_mb']:>14.1f}{result['peak_mb']:>10.1f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
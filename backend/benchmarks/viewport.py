@@ -0,0 +1,107 @@
+"""Time viewport queries with the spatial index against a page scan.
+
+Usage::
+
+    python -m backend.benchmarks.viewport --rows 100000 --pages 2
+
+A temporary SQLite database is filled with uniformly spread boxes. Every
+viewport covers ``--viewport`` of the page width and height. ``rtree`` is
+``crud.get_viewport_rows``; ``range scan`` runs the same intersection test
+without the index, over every box of the page. The insert rows compare bulk
+insert time with and without the index triggers.
+"""
+
+import argparse
+import os
+import random
+import statistics
+import tempfile
+import time
+
+from sqlalchemy import create_engine, select, text
+from sqlalchemy.orm import Session
+
+from backend import crud, models, schemas, spatial
+
+PAGE_WIDTH = 7000.0
+PAGE_HEIGHT = 5000.0
+
+
+def records(count: int, pages: int, seed: int = 1):
+    rng = random.Random(seed)
+    for i in range(count):
+        yield {
+            "page": 1 + i % pages,
+            "text": f"L-{i:06d}",
+            "x_coord": rng.uniform(0, PAGE_WIDTH),
+            "y_coord": rng.uniform(0, PAGE_HEIGHT),
+            "width": rng.uniform(20, 80),
+            "height": rng.uniform(6, 12),
+        }
+
+
+def fill(engine, rows: int, pages: int) -> tuple:
+    with Session(engine) as db:
+        doc = crud.create_document(db, schemas.DocumentCreate(file_name="bench.pdf", pages=pages))
+        started = time.perf_counter()
+        crud.bulk_create_ocr_results(db, records(rows, pages), doc.id)
+        return doc.id, time.perf_counter() - started
+
+
+def time_queries(db: Session, query_for, viewports) -> tuple:
+    timings, visible = [], 0
+    for bbox in viewports:
+        started = time.perf_counter()
+        visible += len(db.scalars(query_for(bbox)).all())
+        timings.append(time.perf_counter() - started)
+    return statistics.median(timings), visible / len(viewports)
+
+
+def main() -> None:
+    arg_parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    arg_parser.add_argument("--rows", type=int, default=100000)
+    arg_parser.add_argument("--pages", type=int, default=2)
+    arg_parser.add_argument("--viewport", type=float, default=0.1, help="fraction of the page per axis")
+    arg_parser.add_argument("--queries", type=int, default=50)
+    args = arg_parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = create_engine("sqlite:///" + os.path.join(tmp, "bench.db"))
+        models.Base.metadata.create_all(engine)
+        document_id, indexed_insert = fill(engine, args.rows, args.pages)
+
+        plain = create_engine("sqlite:///" + os.path.join(tmp, "plain.db"))
+        models.Base.metadata.create_all(plain)
+        with plain.begin() as connection:
+            for statement in spatial.sqlite_drop("ocr_results"):
+                connection.execute(text(statement))
+        _, plain_insert = fill(plain, args.rows, args.pages)
+
+        rng = random.Random(2)
+        width, height = PAGE_WIDTH * args.viewport, PAGE_HEIGHT * args.viewport
+        viewports = []
+        for _ in range(args.queries):
+            x0, y0 = rng.uniform(0, PAGE_WIDTH - width), rng.uniform(0, PAGE_HEIGHT - height)
+            viewports.append((x0, y0, x0 + width, y0 + height))
+
+        model = models.OcrResult
+        with Session(engine) as db:
+            rtree, visible = time_queries(
+                db, lambda bbox: spatial.viewport_query(select(model), model, "sqlite", document_id, 1, bbox),
+                viewports,
+            )
+            scan, _ = time_queries(
+                db, lambda bbox: spatial.viewport_query(select(model), model, "generic", document_id, 1, bbox),
+                viewports,
+            )
+        print(f"{args.rows} boxes on {args.pages} pages, ~{visible:.0f} visible per viewport")
+        print(f"{'rtree':<22}{rtree * 1000:>10.2f} ms/query")
+        print(f"{'range scan':<22}{scan * 1000:>10.2f} ms/query")
+        print(f"{'insert with index':<22}{indexed_insert:>10.2f} s")
+        print(f"{'insert without index':<22}{plain_insert:>10.2f} s")
+        engine.dispose()
+        plain.dispose()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,15 +1,77 @@
 from functools import lru_cache
+from typing import Dict, List
 from pydantic_settings import BaseSettings
 import os
 
 
 class Settings(BaseSettings):
     database_url: str = "sqlite:///./pid_visualizer.db"
+    # Serve requests from an AsyncSession on the asyncio driver of
+    # ``database_url`` (aiosqlite, asyncpg) instead of the threadpool.
+    database_async: bool = False
+    # Connection pool of the engine; in-memory SQLite is not pooled.
+    database_pool_size: int = 5
+    database_max_overflow: int = 10
+    database_pool_timeout: float = 30
+    # Test each connection on checkout and replace those the server dropped.
+    database_pool_pre_ping: bool = True
+    # SQLite connections: journal mode, fsync level, memory-mapped I/O and how
+    # long a writer waits for another connection's write lock.
+    sqlite_journal_mode: str = "wal"
+    sqlite_synchronous: str = "normal"
+    sqlite_mmap_size_mb: int = 256
+    sqlite_busy_timeout_ms: int = 5000
+    # Queue the SQLite write transactions of this process one after another
+    # instead of having them contend for the database lock; a writer waits up
+    # to ``database_pool_timeout`` for its turn.
+    sqlite_write_queue: bool = False
     api_base_url: str = "http://localhost:8000"
     data_dir: str = "./data"
     debug: bool = False
     log_level: str = "INFO"
     ocr_parser: str = "document_ai"
+    # Rows written per transaction by the bulk insert helpers in ``crud``.
+    bulk_chunk_size: int = 5000
+    # Worker processes used to extract OCR records; 0 means one per CPU.
+    ingest_workers: int = 1
+    # Pages whose level-of-detail aggregates are kept in memory.
+    lod_cache_size: int = 256
+    # Directory of the on-disk cache of extracted OCR records, keyed by the
+    # SHA-256 of the source JSON; empty disables the cache.
+    ocr_cache_dir: str = ""
+    # Size budget of that directory; least recently used entries are evicted.
+    ocr_cache_size_mb: int = 512
+    # Search scopes (a document or the whole project) whose fuzzy-match
+    # BK-tree is kept in memory.
+    fuzzy_index_cache_size: int = 32
+    # Directory where uploaded OCR files are spooled while they are parsed;
+    # empty uses the system temporary directory.
+    upload_dir: str = ""
+    # Ingest jobs (see backend.worker): directory of the files waiting for
+    # import, worker processes each web process starts (by default none:
+    # run ``python -m backend.worker``), queued jobs beyond which new ones
+    # are refused with 503, and how often an idle worker looks for work.
+    job_dir: str = "./.jobs"
+    job_workers: int = 0
+    job_queue_limit: int = 100
+    job_poll_interval: float = 1.0
+    # A running job without a progress report for this long lost its worker
+    # and is claimed again, up to ``job_max_attempts`` times in all.
+    job_stale_seconds: int = 600
+    job_max_attempts: int = 3
+    # Document event streams (see backend.services.events): how often a web
+    # process reads the events written elsewhere, e.g. by ingest workers; how
+    # often every stream gets a keepalive comment; and how long events are
+    # kept for subscribers that reconnect.
+    events_poll_interval: float = 0.25
+    events_keepalive_seconds: float = 15
+    events_retention_seconds: int = 3600
+    # Memory budget of the rendered (and compressed) document read bodies,
+    # kept until the document's version changes.
+    payload_cache_size_mb: int = 128
+    # Line-number grammars for discovery mode as a JSON list of
+    # {"name", "pattern", "format"} objects; empty uses the built-in grammars.
+    line_number_grammars: List[Dict[str, str]] = []
     
     # Дополнительные переменные окружения
     google_application_credentials: str = ""
@@ -1,14 +1,45 @@
-from sqlalchemy.orm import Session, joinedload
-from backend import models, schemas
+import csv
+import io
+import json
+from collections import Counter
+from datetime import datetime, timezone
+from itertools import islice
+from typing import Any, Collection, Dict, Iterable, Iterator, List, Optional
+
+from sqlalchemy import bindparam, case, delete, func, insert, select, update
+from sqlalchemy.orm import Session, selectinload
+from backend import models, schemas, spatial, text_search
+from backend.config import get_settings
+from backend.matching.fuzzy import canonical_key
 
 # --- Document CRUD ---
 
 def get_document(db: Session, document_id: int):
+    # One query per collection; joining both would return lines x OCR rows.
     return db.query(models.Document).options(
-        joinedload(models.Document.line_numbers),
-        joinedload(models.Document.ocr_results)
+        selectinload(models.Document.line_numbers),
+        selectinload(models.Document.ocr_results)
     ).filter(models.Document.id == document_id).first()
 
+def get_document_summary(db: Session, document_id: int):
+    """Return the document row only; its collections are not loaded."""
+    return db.get(models.Document, document_id)
+
+def document_exists(db: Session, document_id: int) -> bool:
+    """Check for a document without loading its collections."""
+    return db.query(models.Document.id).filter(models.Document.id == document_id).first() is not None
+
+def get_document_version(db: Session, document_id: int) -> Optional[int]:
+    return db.scalar(select(models.Document.version).where(models.Document.id == document_id))
+
+def touch_document(db: Session, document_id: int) -> None:
+    """Bump the version of a document; call inside the transaction of the write."""
+    db.execute(
+        update(models.Document)
+        .where(models.Document.id == document_id)
+        .values(version=models.Document.version + 1)
+    )
+
 def get_document_by_filename(db: Session, filename: str):
     return db.query(models.Document).filter(models.Document.file_name == filename).first()
 
@@ -35,11 +66,139 @@ def get_ocr_result_by_text(db: Session, text: str, document_id: int):
         models.OcrResult.text == text
     ).first()
 
+def get_by_text_keys(db: Session, model, keys: Collection[str], document_id: Optional[int] = None):
+    """Return ``model`` rows whose canonical ``text_key`` is one of ``keys``.
+
+    Uses the ``text_key`` index; ``document_id=None`` searches all documents.
+    Keys are sent in chunks to stay below the bound-parameter limit.
+    """
+    results = []
+    for chunk in _chunks(sorted(set(keys)), 500):
+        query = db.query(model).filter(model.text_key.in_(chunk))
+        if document_id is not None:
+            query = query.filter(model.document_id == document_id)
+        results.extend(query)
+    return sorted(results, key=lambda result: result.id)
+
+def search_text(db: Session, model, text: str, document_id: Optional[int] = None, limit: int = 50):
+    """Return ``(row, file_name, score)`` for ``model`` rows whose text contains ``text``.
+
+    Goes through the trigram index of :mod:`backend.text_search`, best hits
+    first; ``document_id=None`` searches all documents.
+    """
+    query = select(model, models.Document.file_name).join(models.Document, models.Document.id == model.document_id)
+    if document_id is not None:
+        query = query.where(model.document_id == document_id)
+    query = text_search.search_query(query, model, db.get_bind().dialect.name, text)
+    return db.execute(query.limit(limit)).all()
+
+def iter_text_keys(db: Session, model, document_id: Optional[int] = None) -> Iterator[str]:
+    """Stream the distinct non-empty ``text_key`` values of ``model``."""
+    query = select(model.text_key).where(model.text_key.is_not(None), model.text_key != "").distinct()
+    if document_id is not None:
+        query = query.where(model.document_id == document_id)
+    yield from db.scalars(query)
+
 def delete_ocr_results_by_document(db: Session, document_id: int):
     """Deletes all OcrResult records associated with a given document_id."""
-    db.query(models.OcrResult).filter(models.OcrResult.document_id == document_id).delete()
+    deleted = db.query(models.OcrResult).filter(models.OcrResult.document_id == document_id).delete()
+    # Without rows the fingerprints would make the next incremental import skip every page.
+    db.query(models.PageFingerprint).filter(models.PageFingerprint.document_id == document_id).delete()
+    touch_document(db, document_id)
+    if deleted:
+        _add_page_event(db, models.OcrResult, document_id, None, deleted=deleted)
     db.commit()
 
+def iter_ocr_rows(db: Session, document_id: int, batch_size: int = 5000):
+    """Stream ``(page, text, x_coord, y_coord, width, height)`` rows of a document.
+
+    Rows are fetched ``batch_size`` at a time instead of loading ORM objects
+    for the whole document.
+    """
+    query = (
+        select(
+            models.OcrResult.page,
+            models.OcrResult.text,
+            models.OcrResult.x_coord,
+            models.OcrResult.y_coord,
+            models.OcrResult.width,
+            models.OcrResult.height,
+        )
+        .where(models.OcrResult.document_id == document_id)
+        .order_by(models.OcrResult.id)
+        .execution_options(yield_per=batch_size)
+    )
+    yield from db.execute(query)
+
+def _document_rows_query(model, document_id: int, page: Optional[int], skip: int, limit: Optional[int]):
+    query = select(model).where(model.document_id == document_id)
+    if page is not None:
+        query = query.where(model.page == page)
+    return query.order_by(model.id).offset(skip).limit(limit)
+
+def _fetch(db: Session, query, model, columns: Optional[List[str]]):
+    if columns is None:
+        return db.scalars(query).all()
+    return db.execute(query.with_only_columns(*(getattr(model, name) for name in columns))).all()
+
+def get_document_rows(
+    db: Session,
+    model,
+    document_id: int,
+    page: Optional[int] = None,
+    skip: int = 0,
+    limit: Optional[int] = None,
+    columns: Optional[List[str]] = None,
+):
+    """Return ``model`` rows of a document, optionally of one page, in id order.
+
+    With ``columns`` plain tuples of those columns are returned instead of
+    ORM objects.
+    """
+    return _fetch(db, _document_rows_query(model, document_id, page, skip, limit), model, columns)
+
+def iter_document_rows(
+    db: Session,
+    model,
+    columns: List[str],
+    document_id: int,
+    page: Optional[int] = None,
+    skip: int = 0,
+    limit: Optional[int] = None,
+    batch_size: int = 1000,
+) -> Iterator[List[dict]]:
+    """Stream ``columns`` of a document's ``model`` rows as lists of dicts.
+
+    Each list is one ``batch_size`` fetch from the cursor, so callers can
+    write rows out before the rest of the result has been read.
+    """
+    query = (
+        _document_rows_query(model, document_id, page, skip, limit)
+        .with_only_columns(*(getattr(model, name) for name in columns))
+        .execution_options(yield_per=batch_size)
+    )
+    for partition in db.execute(query).mappings().partitions():
+        yield [dict(row) for row in partition]
+
+def get_viewport_rows(
+    db: Session,
+    model,
+    document_id: int,
+    page: int,
+    bbox: Optional[spatial.BBox],
+    limit: Optional[int] = None,
+    columns: Optional[List[str]] = None,
+):
+    """Return the ``model`` rows of a page whose boxes intersect ``bbox``, in id order.
+
+    The spatial index narrows the rows down first, so the cost follows the
+    number of visible boxes rather than the size of the page. ``columns``
+    works as in :func:`get_document_rows`.
+    """
+    dialect = db.get_bind().dialect.name
+    query = spatial.viewport_query(select(model), model, dialect, document_id, page, bbox)
+    return _fetch(db, query.order_by(model.id).limit(limit), model, columns)
+
 def get_all_ocr_results_for_document(db: Session, document_id: int):
     """
     Retrieves all OCR results for a given document ID.
@@ -60,6 +219,8 @@ def create_ocr_result(db: Session, ocr_result: schemas.OcrResultCreate, document
         status='auto'
     )
     db.add(db_ocr_result)
+    touch_document(db, document_id)
+    _add_page_event(db, models.OcrResult, document_id, ocr_result.page, inserted=1)
     db.commit()
     db.refresh(db_ocr_result)
     return db_ocr_result
@@ -69,6 +230,8 @@ def update_ocr_result(db: Session, ocr_result_id: int, text: str, status: str):
     if db_ocr_result:
         db_ocr_result.text = text
         db_ocr_result.status = status
+        touch_document(db, db_ocr_result.document_id)
+        add_document_event(db, db_ocr_result.document_id, "rows", _rows_payload(models.OcrResult, [db_ocr_result]))
         db.commit()
         db.refresh(db_ocr_result)
     return db_ocr_result
@@ -87,6 +250,8 @@ def create_line_number(db: Session, line_number: schemas.LineNumberCreate, docum
         status='pending'
     )
     db.add(db_line_number)
+    touch_document(db, document_id)
+    _add_page_event(db, models.LineNumber, document_id, line_number.page, inserted=1)
     db.commit()
     db.refresh(db_line_number)
     return db_line_number
@@ -96,10 +261,393 @@ def update_line_number(db: Session, line_number_id: int, text: str, status: str)
     if db_line_number:
         db_line_number.text = text
         db_line_number.status = status
+        touch_document(db, db_line_number.document_id)
+        add_document_event(db, db_line_number.document_id, "rows", _rows_payload(models.LineNumber, [db_line_number]))
         db.commit()
         db.refresh(db_line_number)
     return db_line_number
 
 def delete_line_numbers_by_document(db: Session, document_id: int):
-    db.query(models.LineNumber).filter(models.LineNumber.document_id == document_id).delete()
-    db.commit() 
\ No newline at end of file
+    deleted = db.query(models.LineNumber).filter(models.LineNumber.document_id == document_id).delete()
+    touch_document(db, document_id)
+    if deleted:
+        _add_page_event(db, models.LineNumber, document_id, None, deleted=deleted)
+    db.commit()
+
+# --- Bulk writes ---
+
+def _chunks(rows: Iterable[Any], size: int) -> Iterator[List[Any]]:
+    iterator = iter(rows)
+    while True:
+        chunk = list(islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
+
+def _as_row(record: Any, document_id: int, status: str) -> dict:
+    data = record if isinstance(record, dict) else record.model_dump()
+    return {
+        "document_id": document_id,
+        "page": data.get("page", 1),
+        "text": data.get("text"),
+        "text_key": canonical_key(data.get("text")),
+        "x_coord": data["x_coord"],
+        "y_coord": data["y_coord"],
+        "width": data["width"],
+        "height": data["height"],
+        "status": status,
+    }
+
+def _copy_rows(db: Session, table, rows: List[dict]) -> None:
+    """Write ``rows`` with PostgreSQL ``COPY ... FROM STDIN`` (psycopg2 only)."""
+    columns = list(rows[0])
+    buffer = io.StringIO()
+    # QUOTE_NONNUMERIC keeps empty strings distinct from NULL in CSV mode.
+    writer = csv.writer(buffer, quoting=csv.QUOTE_NONNUMERIC)
+    writer.writerows([row[column] for column in columns] for row in rows)
+    buffer.seek(0)
+    cursor = db.connection().connection.cursor()
+    try:
+        cursor.copy_expert(
+            f"COPY {table.name} ({', '.join(columns)}) FROM STDIN WITH (FORMAT csv)",
+            buffer,
+        )
+    finally:
+        cursor.close()
+
+def _bulk_insert(db: Session, model, rows: Iterable[dict], chunk_size: Optional[int]) -> int:
+    """Insert ``rows`` in chunks, committing one transaction per chunk.
+
+    Uses ``COPY`` on psycopg2 and an executemany ``INSERT`` elsewhere.
+    Each chunk records a ``page`` event per page it added rows to.
+    Returns the number of inserted rows.
+    """
+    chunk_size = chunk_size or get_settings().bulk_chunk_size
+    use_copy = db.get_bind().dialect.driver == "psycopg2"
+    inserted = 0
+    for chunk in _chunks(rows, chunk_size):
+        if use_copy:
+            _copy_rows(db, model.__table__, chunk)
+        else:
+            db.execute(insert(model), chunk)
+        for document_id in {row["document_id"] for row in chunk}:
+            touch_document(db, document_id)
+        for (document_id, page), count in Counter((row["document_id"], row["page"]) for row in chunk).items():
+            _add_page_event(db, model, document_id, page, inserted=count)
+        db.commit()
+        inserted += len(chunk)
+    return inserted
+
+def bulk_create_ocr_results(
+    db: Session,
+    ocr_results: Iterable[Any],
+    document_id: int,
+    chunk_size: Optional[int] = None,
+) -> int:
+    """Insert ``OcrResultCreate`` schemas or plain dicts in batches.
+
+    ``ocr_results`` is consumed lazily, so generators are never materialized
+    beyond one chunk.
+    """
+    rows = (_as_row(record, document_id, "auto") for record in ocr_results)
+    return _bulk_insert(db, models.OcrResult, rows, chunk_size)
+
+def bulk_create_line_numbers(
+    db: Session,
+    line_numbers: Iterable[Any],
+    document_id: int,
+    chunk_size: Optional[int] = None,
+) -> int:
+    """Insert ``LineNumberCreate`` schemas or plain dicts in batches."""
+    rows = (_as_row(record, document_id, "pending") for record in line_numbers)
+    return _bulk_insert(db, models.LineNumber, rows, chunk_size)
+
+def get_missing_ids(db: Session, model, ids: Collection[int]) -> List[int]:
+    """Return the ids of ``ids`` that have no row in ``model``'s table."""
+    found = set()
+    for chunk in _chunks(set(ids), 500):
+        found.update(db.scalars(select(model.id).where(model.id.in_(chunk))))
+    return sorted(set(ids) - found)
+
+def bulk_update_rows(db: Session, model, corrections: Iterable[Dict[str, Any]]) -> list:
+    """Set ``text`` and ``status`` of many rows in one transaction; return the rows that changed.
+
+    ``corrections`` are ``{"id", "text", "status"}`` mappings; a later one for
+    the same id wins. Each chunk of ids is a single UPDATE whose CASE
+    expressions carry the new values, restricted to the rows where they differ
+    from the stored ones: unchanged rows are neither written nor returned, and
+    only documents with changes get a new version.
+    """
+    values = {correction["id"]: (correction["text"], correction["status"]) for correction in corrections}
+    table = model.__table__
+    returning = db.get_bind().dialect.update_returning
+    changed = []
+    for chunk in _chunks(values.items(), 500):
+        chunk = dict(chunk)
+        new_text = case({id_: text for id_, (text, _) in chunk.items()}, value=table.c.id)
+        new_status = case({id_: status for id_, (_, status) in chunk.items()}, value=table.c.id)
+        where = table.c.id.in_(chunk) & (
+            table.c.text.is_distinct_from(new_text) | table.c.status.is_distinct_from(new_status)
+        )
+        statement = update(table).values(
+            text=new_text,
+            text_key=case({id_: canonical_key(text) for id_, (text, _) in chunk.items()}, value=table.c.id),
+            status=new_status,
+        )
+        if returning:
+            changed += db.execute(statement.where(where).returning(table.c.id, table.c.document_id, table.c.page)).all()
+        else:
+            rows = db.execute(select(table.c.id, table.c.document_id, table.c.page).where(where)).all()
+            db.execute(statement.where(table.c.id.in_([row.id for row in rows])))
+            changed += rows
+    for document_id in {row.document_id for row in changed}:
+        touch_document(db, document_id)
+        rows = [
+            {"id": row.id, "page": row.page, "text": values[row.id][0], "status": values[row.id][1]}
+            for row in sorted(changed) if row.document_id == document_id
+        ]
+        add_document_event(db, document_id, "rows", {"table": table.name, "rows": rows})
+    db.commit()
+    rows = []
+    for chunk in _chunks(sorted(row.id for row in changed), 500):
+        rows += db.query(model).filter(model.id.in_(chunk)).order_by(model.id).all()
+    return rows
+
+# --- Incremental imports ---
+
+def get_page_fingerprints(db: Session, document_id: int) -> Dict[int, str]:
+    query = select(models.PageFingerprint.page, models.PageFingerprint.fingerprint).where(
+        models.PageFingerprint.document_id == document_id
+    )
+    return dict(db.execute(query).all())
+
+def get_pages(db: Session, model, document_id: int) -> List[int]:
+    """Distinct pages that have ``model`` rows for a document."""
+    query = select(model.page).where(model.document_id == document_id).distinct()
+    return sorted(db.scalars(query))
+
+def get_page_rows(db: Session, model, document_id: int, page: Optional[int]):
+    """Return ``(id, page, text, x_coord, y_coord, width, height, status)`` rows of one page.
+
+    ``page=None`` returns the rows of the whole document.
+    """
+    query = select(
+        model.id, model.page, model.text, model.x_coord, model.y_coord, model.width, model.height, model.status
+    ).where(model.document_id == document_id)
+    if page is not None:
+        query = query.where(model.page == page)
+    return db.execute(query.order_by(model.id)).all()
+
+def apply_row_diff(
+    db: Session,
+    model,
+    document_id: int,
+    diff,
+    status: str,
+    page: Optional[int] = None,
+    fingerprint: Optional[str] = None,
+) -> None:
+    """Write a :class:`~backend.ocr.incremental.RowDiff` in one transaction.
+
+    When ``fingerprint`` is given it is stored for ``page`` in the same
+    transaction, so an interrupted import never marks a page as done.
+    Subscribers get a ``page`` event for ``page``; None stands for any page.
+    """
+    if diff.inserts:
+        db.execute(insert(model.__table__), [_as_row(record, document_id, status) for record in diff.inserts])
+    if diff.updates:
+        # Bind names must differ from the column names, which are reserved for SET.
+        columns = ("text", "text_key", "x_coord", "y_coord", "width", "height")
+        table = model.__table__
+        statement = (
+            update(table)
+            .where(table.c.id == bindparam("b_id"))
+            .values({column: bindparam(f"b_{column}") for column in columns})
+        )
+        params = []
+        for row in diff.updates:
+            values = {**row, "text_key": canonical_key(row["text"])}
+            params.append({f"b_{name}": value for name, value in values.items()})
+        db.execute(statement, params)
+    for chunk in _chunks(diff.deletes, 500):
+        db.execute(delete(model).where(model.id.in_(chunk)))
+    if diff.inserts or diff.updates or diff.deletes:
+        touch_document(db, document_id)
+        _add_page_event(
+            db, model, document_id, page,
+            inserted=len(diff.inserts), updated=len(diff.updates), deleted=len(diff.deletes),
+        )
+    if fingerprint is not None:
+        stored = db.query(models.PageFingerprint).filter(
+            models.PageFingerprint.document_id == document_id,
+            models.PageFingerprint.page == page,
+        ).first()
+        if stored is None:
+            db.add(models.PageFingerprint(document_id=document_id, page=page, fingerprint=fingerprint))
+        else:
+            stored.fingerprint = fingerprint
+    db.commit()
+
+def delete_page_fingerprint(db: Session, document_id: int, page: int) -> None:
+    db.query(models.PageFingerprint).filter(
+        models.PageFingerprint.document_id == document_id,
+        models.PageFingerprint.page == page,
+    ).delete()
+    db.commit()
+
+# --- Ingest jobs ---
+
+def create_job(db: Session, document_id: int, parser: str, source_path: str) -> models.IngestJob:
+    job = models.IngestJob(document_id=document_id, parser=parser, source_path=source_path)
+    db.add(job)
+    db.commit()
+    db.refresh(job)
+    return job
+
+def get_job(db: Session, job_id: int) -> Optional[models.IngestJob]:
+    return db.get(models.IngestJob, job_id)
+
+def count_jobs(db: Session, status: str) -> int:
+    return db.scalar(select(func.count()).select_from(models.IngestJob).where(models.IngestJob.status == status))
+
+def claim_job(db: Session, worker: str, stale_before: datetime, max_attempts: int) -> Optional[int]:
+    """Mark the oldest runnable job as run by ``worker``; return its id, or None.
+
+    Runnable jobs are the queued ones and the running ones whose heartbeat is
+    older than ``stale_before``, i.e. whose worker died; those are failed
+    instead once they have been attempted ``max_attempts`` times. The
+    candidate row is locked ``FOR UPDATE SKIP LOCKED`` where the database
+    supports it, so concurrent workers claim different jobs instead of
+    waiting for each other. The status check of the UPDATE keeps the claim
+    exclusive where it does not: on SQLite a worker that lost the race
+    updates nothing and gets None.
+    """
+    Job = models.IngestJob
+    now = datetime.now(timezone.utc)
+    stale = (Job.status == "running") & (Job.heartbeat_at < stale_before)
+    db.execute(
+        update(Job)
+        .where(stale, Job.attempts >= max_attempts)
+        .values(status="failed", error="The worker running the job stopped responding", finished_at=now)
+    )
+    runnable = (Job.status == "queued") | stale
+    job_id = db.scalar(select(Job.id).where(runnable).order_by(Job.id).limit(1).with_for_update(skip_locked=True))
+    claimed = job_id is not None and db.execute(
+        update(Job)
+        .where(Job.id == job_id, runnable)
+        .values(status="running", worker=worker, attempts=Job.attempts + 1, started_at=now, heartbeat_at=now)
+    ).rowcount == 1
+    db.commit()
+    return job_id if claimed else None
+
+def update_job_progress(db: Session, job_id: int, worker: str, stats) -> bool:
+    """Store the :class:`~backend.ocr.incremental.ImportStats` of a running job.
+
+    Also renews its heartbeat. Returns False when the job is no longer run
+    by ``worker``, which was then presumed dead and replaced.
+    """
+    Job = models.IngestJob
+    result = db.execute(
+        update(Job)
+        .where(Job.id == job_id, Job.worker == worker, Job.status == "running")
+        .values(
+            pages_done=stats.pages_skipped + stats.pages_changed + stats.pages_removed,
+            rows_inserted=stats.inserted,
+            rows_updated=stats.updated,
+            rows_deleted=stats.deleted,
+            heartbeat_at=datetime.now(timezone.utc),
+        )
+    )
+    if result.rowcount == 1:
+        _add_job_event(db, job_id)
+    db.commit()
+    return result.rowcount == 1
+
+def release_job(db: Session, job_id: int, worker: str) -> bool:
+    """Put a job that ``worker`` stopped before its end back in the queue.
+
+    The attempt is not counted; pages it imported are skipped next time.
+    """
+    Job = models.IngestJob
+    result = db.execute(
+        update(Job)
+        .where(Job.id == job_id, Job.worker == worker, Job.status == "running")
+        .values(status="queued", worker=None, attempts=Job.attempts - 1)
+    )
+    db.commit()
+    return result.rowcount == 1
+
+def finish_job(db: Session, job_id: int, worker: str, error: Optional[str] = None) -> bool:
+    """Mark a job run by ``worker`` as succeeded, or failed with ``error``."""
+    Job = models.IngestJob
+    result = db.execute(
+        update(Job)
+        .where(Job.id == job_id, Job.worker == worker, Job.status == "running")
+        .values(
+            status="failed" if error else "succeeded",
+            error=error,
+            finished_at=datetime.now(timezone.utc),
+        )
+    )
+    if result.rowcount == 1:
+        _add_job_event(db, job_id)
+    db.commit()
+    return result.rowcount == 1
+
+def _add_job_event(db: Session, job_id: int) -> None:
+    Job = models.IngestJob
+    columns = (Job.id, Job.status, Job.pages_done, Job.rows_inserted, Job.rows_updated, Job.rows_deleted, Job.error)
+    job = db.execute(select(Job.document_id, *columns).where(Job.id == job_id)).one()
+    add_document_event(db, job.document_id, "job", {column.key: getattr(job, column.key) for column in columns})
+
+# --- Document events ---
+
+def _rows_payload(model, rows) -> dict:
+    return {
+        "table": model.__tablename__,
+        "rows": [{"id": row.id, "page": row.page, "text": row.text, "status": row.status} for row in rows],
+    }
+
+def _add_page_event(
+    db: Session, model, document_id: int, page: Optional[int], inserted: int = 0, updated: int = 0, deleted: int = 0
+) -> None:
+    # Rows of ``page`` changed, or of any page when it is None: subscribers reload them.
+    add_document_event(db, document_id, "page", {
+        "table": model.__tablename__,
+        "page": page,
+        "inserted": inserted,
+        "updated": updated,
+        "deleted": deleted,
+    })
+
+def add_document_event(db: Session, document_id: int, kind: str, payload: dict) -> None:
+    """Record an event for the subscribers of a document, in the caller's transaction."""
+    db.execute(insert(models.DocumentEvent).values(document_id=document_id, kind=kind, payload=json.dumps(payload)))
+
+def get_last_event_id(db: Session) -> int:
+    return db.scalar(select(func.max(models.DocumentEvent.id))) or 0
+
+def get_first_event_id(db: Session) -> Optional[int]:
+    return db.scalar(select(func.min(models.DocumentEvent.id)))
+
+def get_events(db: Session, after_id: int, document_id: Optional[int] = None, limit: int = 1000):
+    """Return ``(id, document_id, kind, payload)`` of the events after ``after_id``, oldest first."""
+    Event = models.DocumentEvent
+    query = select(Event.id, Event.document_id, Event.kind, Event.payload).where(Event.id > after_id)
+    if document_id is not None:
+        query = query.where(Event.document_id == document_id)
+    return db.execute(query.order_by(Event.id).limit(limit)).all()
+
+def get_events_by_id(db: Session, ids: Collection[int]):
+    """Return ``(id, document_id, kind, payload)`` of the events with these ids, oldest first."""
+    if not ids:
+        return []
+    Event = models.DocumentEvent
+    query = select(Event.id, Event.document_id, Event.kind, Event.payload).where(Event.id.in_(list(ids)))
+    return db.execute(query.order_by(Event.id)).all()
+
+def prune_events(db: Session, before: datetime) -> int:
+    """Delete the events recorded before ``before``; return how many."""
+    result = db.execute(delete(models.DocumentEvent).where(models.DocumentEvent.created_at < before))
+    db.commit()
+    return result.rowcount
@@ -1,21 +1,139 @@
-from sqlalchemy import create_engine
+import threading
+from functools import lru_cache
+from typing import List
+
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import Engine
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 
-from .config import get_settings
+from .config import Settings, get_settings
+
+SQLITE_JOURNAL_MODES = {"delete", "truncate", "persist", "memory", "wal", "off"}
+SQLITE_SYNCHRONOUS = {"off", "normal", "full", "extra"}
+WRITE_STATEMENTS = ("INSERT", "UPDATE", "DELETE", "REPLACE")
+
+
+def _in_memory(url: str) -> bool:
+    return url.split("?", 1)[0] in ("sqlite://", "sqlite:///:memory:") or "mode=memory" in url
+
+
+def engine_options(url: str, settings: Settings) -> dict:
+    """Keyword arguments of ``create_engine`` for ``url`` under the engine profile of ``settings``."""
+    options = {"pool_pre_ping": settings.database_pool_pre_ping}
+    if url.startswith("sqlite"):
+        options["connect_args"] = {"check_same_thread": False}
+        if _in_memory(url):
+            # Each connection is its own database; the pool is not sized.
+            return options
+    options.update(
+        pool_size=settings.database_pool_size,
+        max_overflow=settings.database_max_overflow,
+        pool_timeout=settings.database_pool_timeout,
+    )
+    return options
+
+
+def sqlite_pragmas(settings: Settings) -> List[str]:
+    """PRAGMA statements run on every new SQLite connection."""
+    journal_mode = settings.sqlite_journal_mode.lower()
+    synchronous = settings.sqlite_synchronous.lower()
+    if journal_mode not in SQLITE_JOURNAL_MODES:
+        raise ValueError(f"Unknown SQLite journal mode: {settings.sqlite_journal_mode}")
+    if synchronous not in SQLITE_SYNCHRONOUS:
+        raise ValueError(f"Unknown SQLite synchronous level: {settings.sqlite_synchronous}")
+    return [
+        f"PRAGMA journal_mode={journal_mode}",
+        f"PRAGMA synchronous={synchronous}",
+        f"PRAGMA mmap_size={int(settings.sqlite_mmap_size_mb) * 1024 * 1024}",
+        f"PRAGMA busy_timeout={int(settings.sqlite_busy_timeout_ms)}",
+    ]
+
+
+def configure_sqlite(engine: Engine, settings: Settings) -> None:
+    """Run :func:`sqlite_pragmas` on each connection ``engine`` opens."""
+    pragmas = sqlite_pragmas(settings)
+
+    @event.listens_for(engine, "connect")
+    def set_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        for pragma in pragmas:
+            cursor.execute(pragma)
+        cursor.close()
+
+
+class SQLiteWriteQueue:
+    """Serializes the write transactions of a SQLite engine within this process.
+
+    A connection takes the queue at its first INSERT, UPDATE or DELETE, where
+    the driver begins the transaction and SQLite takes its write lock, and
+    gives it back when the transaction ends. Writers wait here for their turn
+    instead of polling the database lock until ``busy_timeout`` expires;
+    reads never wait, since WAL lets them run alongside the writer. Writers in
+    other processes are still only kept apart by ``busy_timeout``.
+
+    Only for engines on a blocking driver: with aiosqlite the wait would
+    block the event loop.
+    """
+
+    def __init__(self, timeout: float):
+        self.timeout = timeout
+        self._lock = threading.Lock()
+
+    def attach(self, engine: Engine) -> None:
+        event.listen(engine, "before_cursor_execute", self._before_execute)
+        # Released as the COMMIT or ROLLBACK is sent; the next writer's
+        # busy_timeout covers the instant until SQLite has finished it.
+        event.listen(engine, "commit", self._release_connection)
+        event.listen(engine, "rollback", self._release_connection)
+        # Connections returned to the pool without ending their transaction.
+        event.listen(engine, "reset", lambda dbapi_connection, record, state: self._release(record.info))
+
+    def _before_execute(self, connection, cursor, statement, parameters, context, executemany):
+        info = connection.info
+        if info.get("sqlite_write_queue") or not statement.lstrip().upper().startswith(WRITE_STATEMENTS):
+            return
+        # Past the timeout the statement goes ahead and SQLite's own busy
+        # handling decides, as without the queue.
+        info["sqlite_write_queue"] = self._lock.acquire(timeout=self.timeout)
+
+    def _release_connection(self, connection):
+        self._release(connection.info)
+
+    def _release(self, info):
+        if info.pop("sqlite_write_queue", False):
+            self._lock.release()
+
+
+def build_engine(url: str, settings: Settings) -> Engine:
+    """Engine for ``url`` with the pool, pragmas and write queue of ``settings``."""
+    engine = create_engine(url, **engine_options(url, settings))
+    if engine.dialect.name == "sqlite":
+        configure_sqlite(engine, settings)
+        if settings.sqlite_write_queue:
+            SQLiteWriteQueue(settings.database_pool_timeout).attach(engine)
+    return engine
+
 
 settings = get_settings()
 SQLALCHEMY_DATABASE_URL = settings.database_url
-connect_args = (
-    {"check_same_thread": False} if SQLALCHEMY_DATABASE_URL.startswith("sqlite") else {}
-)
 
-engine = create_engine(SQLALCHEMY_DATABASE_URL, connect_args=connect_args)
+engine = build_engine(SQLALCHEMY_DATABASE_URL, settings)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
 Base = declarative_base()
 
-from contextlib import contextmanager
+from contextlib import asynccontextmanager, contextmanager
+
+# asyncio drivers used for ``DATABASE_ASYNC``, by URL scheme.
+ASYNC_DRIVERS = {"sqlite": "sqlite+aiosqlite", "postgresql": "postgresql+asyncpg"}
+
+
+def async_database_url(url: str) -> str:
+    """``url`` with its driver replaced by the asyncio driver of its database."""
+    scheme, separator, rest = url.partition("://")
+    return ASYNC_DRIVERS.get(scheme.split("+", 1)[0], scheme) + separator + rest
 
 
 @contextmanager
@@ -27,3 +145,23 @@ def get_session():
     finally:
         db.close()
 
+
+@lru_cache()
+def get_async_engine() -> AsyncEngine:
+    """Engine of ``DATABASE_URL`` on its asyncio driver (aiosqlite, asyncpg).
+
+    Created on first use, so sync deployments need neither driver. It takes
+    the pool and pragmas of the engine profile but not the write queue.
+    """
+    url = async_database_url(SQLALCHEMY_DATABASE_URL)
+    async_engine = create_async_engine(url, **engine_options(url, settings))
+    if async_engine.dialect.name == "sqlite":
+        configure_sqlite(async_engine.sync_engine, settings)
+    return async_engine
+
+
+@asynccontextmanager
+async def get_async_session():
+    """Async counterpart of :func:`get_session`."""
+    async with AsyncSession(get_async_engine(), autoflush=False) as db:
+        yield db
@@ -0,0 +1,193 @@
+"""Import a directory of drawings: every PDF with its Document AI JSON.
+
+Usage::
+
+    python -m backend.ingest data/ --workers 8
+
+Each ``<name>.pdf`` with a ``<name>.pdf_processed.json`` next to it, the
+naming of the file watcher, is a drawing. Its ``Document`` is found by the
+path of the PDF relative to the directory, or created. Worker processes read
+and parse the JSON files, the CPU-bound part, and send the records of each
+drawing back to this process, the only writer: SQLite takes one write at a
+time and writers in several processes would mostly wait for each other's
+locks. The records are written with the incremental import, so a second run
+skips the pages that did not change and keeps hand-corrected rows, and each
+page goes to the database as a single multi-row INSERT. The command ends
+with the throughput and the drawings that failed.
+"""
+
+import argparse
+import os
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import dataclass, field, fields
+from typing import Callable, Dict, List, Optional, Tuple
+
+from backend import crud, models, schemas
+from backend.config import get_settings
+from backend.database import engine, get_session
+from backend.ocr import load_parser
+from backend.ocr.incremental import ImportStats
+from backend.ocr.parallel import resolve_workers
+from backend.ocr.records import OcrRecordBatch
+
+JSON_SUFFIX = "_processed.json"
+
+
+@dataclass
+class IngestSummary:
+    documents: int = 0
+    records: int = 0
+    seconds: float = 0.0
+    stats: ImportStats = field(default_factory=ImportStats)
+    # (drawing, error) of the drawings that could not be imported.
+    failures: List[Tuple[str, str]] = field(default_factory=list)
+    # PDFs without an OCR JSON next to them.
+    missing: List[str] = field(default_factory=list)
+
+    def add(self, stats: ImportStats) -> None:
+        for counter in fields(ImportStats):
+            setattr(self.stats, counter.name, getattr(self.stats, counter.name) + getattr(stats, counter.name))
+
+    def report(self) -> str:
+        seconds = max(self.seconds, 1e-9)
+        stats = self.stats
+        lines = [
+            f"{self.documents} documents, {self.records} records in {self.seconds:.1f} s: "
+            f"{self.documents / seconds:.2f} docs/s, {self.records / seconds:.0f} rows/s",
+            f"Pages: {stats.pages_changed} changed, {stats.pages_skipped} unchanged, {stats.pages_removed} removed; "
+            f"rows: {stats.inserted} added, {stats.updated} updated, {stats.deleted} deleted, "
+            f"{stats.kept} corrected rows kept",
+            f"Failures: {len(self.failures)}",
+        ]
+        lines += [f"  {name}: {error}" for name, error in self.failures]
+        if self.missing:
+            lines.append(f"PDFs without OCR JSON: {len(self.missing)}")
+        return "\n".join(lines)
+
+
+def find_drawings(directory: str) -> Tuple[Dict[str, str], List[str]]:
+    """Return ``{document name: JSON path}`` of the drawings under ``directory`` and the PDFs without JSON.
+
+    Names are the paths of the PDFs relative to ``directory``, with ``/``.
+    """
+    drawings, missing = {}, []
+    for root, dirs, files in os.walk(directory):
+        dirs.sort()
+        for file_name in sorted(files):
+            if not file_name.lower().endswith(".pdf"):
+                continue
+            name = os.path.relpath(os.path.join(root, file_name), directory).replace(os.sep, "/")
+            json_path = os.path.join(root, file_name + JSON_SUFFIX)
+            if os.path.exists(json_path):
+                drawings[name] = json_path
+            else:
+                missing.append(name)
+    return drawings, missing
+
+
+def _extract(parser_name: str, json_path: str) -> List[OcrRecordBatch]:
+    return list(load_parser(parser_name).iter_batches(json_path, workers=1))
+
+
+def _describe(exc: Exception) -> str:
+    # Database errors go on with the statement and its parameters.
+    return f"{type(exc).__name__}: {str(exc).partition(chr(10))[0]}"
+
+
+def _document_id(db, name: str, batches: List[OcrRecordBatch]) -> int:
+    document = crud.get_document_by_filename(db, name)
+    if document is None:
+        pages = max((int(batch.page[0]) for batch in batches), default=1)
+        document = crud.create_document(db, schemas.DocumentCreate(file_name=name, pages=pages))
+    return document.id
+
+
+def ingest_directory(
+    directory: str,
+    workers: int = 0,
+    parser_name: Optional[str] = None,
+    sessions: Callable = get_session,
+    echo: Callable[[str], None] = lambda line: None,
+) -> IngestSummary:
+    """Import every drawing under ``directory`` with ``workers`` parsing processes (0: one per CPU).
+
+    ``parser_name`` defaults to the ``ocr_parser`` setting. ``echo`` is
+    given a line per drawing. A parsing process that dies takes the pool
+    with it: the drawings it had not parsed yet are recorded as failures.
+    """
+    parser_name = parser_name or get_settings().ocr_parser
+    parser = load_parser(parser_name)
+    workers = resolve_workers(workers)
+    drawings, missing = find_drawings(directory)
+    summary = IngestSummary(missing=missing)
+    started = time.perf_counter()
+    queue = list(drawings.items())
+    pending: Dict[Future, str] = {}
+
+    def fail(name: str, error: str) -> None:
+        summary.failures.append((name, error))
+        echo(f"FAILED {name}: {error}")
+
+    broken: Optional[BrokenProcessPool] = None
+    with sessions() as db, ProcessPoolExecutor(max_workers=workers) as executor:
+        while queue or pending:
+            if broken is None:
+                # At most two drawings per worker are parsed ahead of the writer.
+                try:
+                    while queue and len(pending) < 2 * workers:
+                        name, json_path = queue[0]
+                        pending[executor.submit(_extract, parser_name, json_path)] = name
+                        queue.pop(0)
+                except BrokenProcessPool as exc:
+                    broken = exc
+            if broken is not None:
+                # A parsing process died and took the pool with it.
+                for name, _ in queue:
+                    fail(name, _describe(broken))
+                queue.clear()
+                if not pending:
+                    break
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                name = pending.pop(future)
+                try:
+                    batches = future.result()
+                    stats = parser.sync_batches(db, batches, _document_id(db, name, batches))
+                except Exception as exc:
+                    if isinstance(exc, BrokenProcessPool):
+                        broken = exc
+                    db.rollback()
+                    fail(name, _describe(exc))
+                    continue
+                records = sum(len(batch) for batch in batches)
+                summary.documents += 1
+                summary.records += records
+                summary.add(stats)
+                echo(
+                    f"[{summary.documents + len(summary.failures)}/{len(drawings)}] {name}: {records} records, "
+                    f"{stats.pages_changed} pages changed, {stats.pages_skipped} unchanged"
+                )
+    summary.seconds = time.perf_counter() - started
+    return summary
+
+
+def main() -> None:
+    arg_parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    arg_parser.add_argument("directory")
+    arg_parser.add_argument("--workers", type=int, default=0, help="parsing processes; 0 means one per CPU")
+    arg_parser.add_argument("--parser", help="OCR parser; the OCR_PARSER setting if omitted")
+    args = arg_parser.parse_args()
+
+    if not os.path.isdir(args.directory):
+        arg_parser.error(f"not a directory: {args.directory}")
+    models.Base.metadata.create_all(bind=engine, checkfirst=True)
+    summary = ingest_directory(args.directory, args.workers, args.parser, echo=print)
+    print(summary.report())
+    sys.exit(1 if summary.failures else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,18 +1,41 @@
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
 from backend import models
+from backend.config import get_settings
 from backend.database import engine
+from backend.ocr.parallel import shutdown_executor
+from backend.worker import WorkerPool
 
 from backend.routers import include_all_routers
 
 
 
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Run the ``job_workers`` ingest workers while the application serves.
+
+    On shutdown, also stop the OCR extraction pool shared by the requests.
+    """
+    workers = get_settings().job_workers
+    pool = WorkerPool(workers) if workers > 0 else None
+    if pool is not None:
+        pool.start()
+    try:
+        yield
+    finally:
+        if pool is not None:
+            pool.stop()
+        shutdown_executor()
+
+
 def create_app() -> FastAPI:
     """Application factory."""
     models.Base.metadata.create_all(bind=engine, checkfirst=True)
 
-    app = FastAPI()
+    app = FastAPI(lifespan=lifespan)
 
     origins = [
         "http://localhost:5173",
@@ -0,0 +1,17 @@
+"""Text matching utilities used to locate line numbers in OCR output."""
+
+from .aho_corasick import AhoCorasick, Match
+from .fuzzy import BKTree, canonical_key, levenshtein
+from .grammar import DEFAULT_GRAMMARS, Grammar, GrammarMatch, GrammarMatcher
+
+__all__ = [
+    "AhoCorasick",
+    "BKTree",
+    "DEFAULT_GRAMMARS",
+    "Grammar",
+    "GrammarMatch",
+    "GrammarMatcher",
+    "Match",
+    "canonical_key",
+    "levenshtein",
+]
@@ -0,0 +1,120 @@
+"""OCR-tolerant text keys and edit-distance lookup."""
+
+import unicodedata
+from typing import Dict, Generic, Iterable, Iterator, List, Optional, Tuple, TypeVar
+
+T = TypeVar("T")
+
+# Cyrillic and Greek capitals that OCR engines confuse with Latin letters.
+# Lowercase forms are covered by upper-casing before translation.
+_LOOKALIKES = str.maketrans({
+    "А": "A", "В": "B", "Е": "E", "З": "3", "К": "K", "М": "M", "Н": "H",
+    "О": "O", "Р": "P", "С": "C", "Т": "T", "У": "Y", "Х": "X", "Я": "R",
+    "І": "I", "Ј": "J", "Ѕ": "S", "Ь": "B",
+    "Α": "A", "Β": "B", "Ε": "E", "Ζ": "Z", "Η": "H", "Ι": "I", "Κ": "K",
+    "Μ": "M", "Ν": "N", "Ο": "O", "Ρ": "P", "Τ": "T", "Υ": "Y", "Χ": "X",
+})
+
+
+def canonical_key(text: Optional[str]) -> Optional[str]:
+    """Return the OCR-tolerant lookup key of ``text``.
+
+    The key is upper-cased, maps Cyrillic/Greek lookalikes to Latin letters
+    and drops everything but letters and digits, so quote variants, dashes and
+    spacing do not matter: ``6″-FH-A1-06``, ``6-FH-A1-06`` and
+    ``6" - FH-A1-06`` all map to ``6FHA106``.
+    """
+    if text is None:
+        return None
+    normalized = unicodedata.normalize("NFKC", text).upper().translate(_LOOKALIKES)
+    return "".join(char for char in normalized if char.isalnum())
+
+
+def levenshtein(a: str, b: str) -> int:
+    """Edit distance between ``a`` and ``b`` (insertions, deletions, substitutions).
+
+    Uses Myers' bit-parallel algorithm: one column of the DP matrix is kept as
+    bit vectors in Python integers, so each character of ``a`` costs a few
+    integer operations instead of an inner loop over ``b``.
+    """
+    if a == b:
+        return 0
+    if len(a) < len(b):
+        a, b = b, a
+    if not b:
+        return len(a)
+    peq: Dict[str, int] = {}
+    for i, char in enumerate(b):
+        peq[char] = peq.get(char, 0) | (1 << i)
+    full = (1 << len(b)) - 1
+    last = 1 << (len(b) - 1)
+    pv, mv, score = full, 0, len(b)
+    for char in a:
+        eq = peq.get(char, 0)
+        xv = eq | mv
+        xh = (((eq & pv) + pv) ^ pv) | eq
+        ph = mv | ~(xh | pv)
+        mh = pv & xh
+        if ph & last:
+            score += 1
+        elif mh & last:
+            score -= 1
+        ph = (ph << 1) | 1
+        mh <<= 1
+        pv = (mh | ~(xv | ph)) & full
+        mv = ph & xv & full
+    return score
+
+
+class BKTree(Generic[T]):
+    """Burkhard-Keller tree over string keys for edit-distance queries.
+
+    Each key can carry any number of values. A query with radius ``k`` only
+    descends into children whose edge distance lies within ``k`` of the
+    query distance, so it visits a small fraction of the keys.
+    """
+
+    def __init__(self, items: Iterable[Tuple[str, T]] = ()):
+        self._root: Optional[str] = None
+        self._children: Dict[str, Dict[int, str]] = {}
+        self._values: Dict[str, List[T]] = {}
+        for key, value in items:
+            self.add(key, value)
+
+    def __len__(self) -> int:
+        return len(self._values)
+
+    def add(self, key: str, value: T) -> None:
+        if key in self._values:
+            self._values[key].append(value)
+            return
+        self._values[key] = [value]
+        self._children[key] = {}
+        if self._root is None:
+            self._root = key
+            return
+        node = self._root
+        while True:
+            distance = levenshtein(key, node)
+            child = self._children[node].get(distance)
+            if child is None:
+                self._children[node][distance] = key
+                return
+            node = child
+
+    def search(self, key: str, max_distance: int) -> List[Tuple[int, str, List[T]]]:
+        """Return ``(distance, key, values)`` for keys within ``max_distance``, closest first."""
+        return sorted(self._iter_search(key, max_distance), key=lambda hit: (hit[0], hit[1]))
+
+    def _iter_search(self, key: str, max_distance: int) -> Iterator[Tuple[int, str, List[T]]]:
+        if self._root is None:
+            return
+        stack = [self._root]
+        while stack:
+            node = stack.pop()
+            distance = levenshtein(key, node)
+            if distance <= max_distance:
+                yield distance, node, self._values[node]
+            for edge, child in self._children[node].items():
+                if distance - max_distance <= edge <= distance + max_distance:
+                    stack.append(child)
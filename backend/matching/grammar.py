@@ -0,0 +1,111 @@
+"""Regular-expression grammars for discovering line numbers in OCR text."""
+
+import re
+from string import Formatter
+from typing import Any, Dict, Iterable, Iterator, List, NamedTuple, Optional
+
+
+class Grammar(NamedTuple):
+    """A named line-number pattern.
+
+    Named groups in ``pattern`` are exposed as match fields. ``format``, if
+    given, is a ``str.format`` template over those fields used to build the
+    normalized line number (e.g. to restore a missing inch mark). Fields of
+    optional groups that did not match are left out, with the text between
+    them and the previous field.
+    """
+
+    name: str
+    pattern: str
+    format: Optional[str] = None
+
+
+class GrammarMatch(NamedTuple):
+    grammar: str
+    text: str
+    start: int
+    end: int
+    fields: Dict[str, str]
+
+
+DEFAULT_GRAMMARS = [
+    # size"-service-spec-seq, e.g. 10"-FH-A2-07, 6-FH-A1-06 or 2"-OL-A1-160
+    Grammar(
+        name="size_service_spec_seq",
+        pattern=(
+            r'(?<![\w."])(?P<size>\d+(?:\.\d+)?(?:/\d+)?)\s*(?:"|″|”|\'\')?\s*-\s*'
+            r"(?P<service>[A-Z]{1,4})\s*-\s*(?P<spec>[A-Z]\d{1,2}[A-Z]?)\s*-\s*"
+            r"(?P<seq>\d{2,4}[A-Z]?)(?!\w)"
+        ),
+        format='{size}"-{service}-{spec}-{seq}',
+    ),
+]
+
+_FORMATTER = Formatter()
+_GROUP_DEFINITION = re.compile(r"\(\?P<(\w+)>")
+_GROUP_REFERENCE = re.compile(r"\(\?P=(\w+)\)")
+
+
+def _render(template: str, fields: Dict[str, str]) -> str:
+    """``template.format(**fields)``, skipping empty fields and the text that joins them."""
+    parts = []
+    for index, (literal, name, spec, conversion) in enumerate(_FORMATTER.parse(template)):
+        if name is None:
+            if parts:
+                parts.append(literal)
+            continue
+        value = fields.get(name)
+        if not value:
+            continue
+        if parts or index == 0:
+            parts.append(literal)
+        if conversion:
+            value = _FORMATTER.convert_field(value, conversion)
+        parts.append(_FORMATTER.format_field(value, spec or ""))
+    return "".join(parts)
+
+
+def _as_grammar(grammar: Any) -> Grammar:
+    if isinstance(grammar, Grammar):
+        return grammar
+    if isinstance(grammar, dict):
+        return Grammar(**grammar)
+    return Grammar(*grammar)
+
+
+class GrammarMatcher:
+    """All grammars compiled into a single alternation.
+
+    Each grammar is wrapped in its own group and its named groups are
+    prefixed, so one ``finditer`` call scans a string for every grammar at
+    once.
+    """
+
+    def __init__(self, grammars: Optional[Iterable[Any]] = None):
+        self.grammars: List[Grammar] = [
+            _as_grammar(g) for g in (DEFAULT_GRAMMARS if grammars is None else grammars)
+        ]
+        if not self.grammars:
+            raise ValueError("At least one line-number grammar is required")
+        alternatives = []
+        for index, grammar in enumerate(self.grammars):
+            prefix = f"g{index}_"
+            pattern = _GROUP_DEFINITION.sub(lambda m: f"(?P<{prefix}{m.group(1)}>", grammar.pattern)
+            pattern = _GROUP_REFERENCE.sub(lambda m: f"(?P={prefix}{m.group(1)})", pattern)
+            alternatives.append(f"(?P<g{index}>{pattern})")
+        self.regex = re.compile("|".join(alternatives))
+
+    def iter_matches(self, text: str) -> Iterator[GrammarMatch]:
+        """Yield non-overlapping matches of any grammar, left to right."""
+        for match in self.regex.finditer(text):
+            # The wrapper group closes last, so it is reported as ``lastgroup``.
+            index = int(match.lastgroup[1:])
+            grammar = self.grammars[index]
+            prefix = f"g{index}_"
+            fields = {
+                name[len(prefix):]: value
+                for name, value in match.groupdict().items()
+                if value is not None and name.startswith(prefix)
+            }
+            line_text = _render(grammar.format, fields) if grammar.format else match.group()
+            yield GrammarMatch(grammar.name, line_text, match.start(), match.end(), fields)
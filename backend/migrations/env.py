@@ -0,0 +1,77 @@
+from logging.config import fileConfig
+
+from alembic import context
+from sqlalchemy import engine_from_config, pool
+
+from backend import models, spatial, text_search
+from backend.config import get_settings
+
+config = context.config
+if config.config_file_name is not None:
+    fileConfig(config.config_file_name)
+
+if not config.get_main_option("sqlalchemy.url"):
+    config.set_main_option("sqlalchemy.url", get_settings().database_url)
+
+target_metadata = models.Base.metadata
+
+# Spatial and text indexes are managed by hand (``backend.spatial``, revision
+# 0004; ``backend.text_search``, revision 0006); keep autogenerate from
+# proposing to drop them.
+MANUAL_INDEXES = (
+    {spatial.rtree_name(name) for name in spatial.SPATIAL_TABLES}
+    | {f"ix_{name}_box" for name in spatial.SPATIAL_TABLES}
+    | {text_search.fts_name(name) for name in text_search.SEARCH_TABLES}
+    | {f"ix_{name}_text_trgm" for name in text_search.SEARCH_TABLES}
+)
+
+
+def include_name(name, type_, parent_names) -> bool:
+    if type_ in ("table", "index") and name:
+        return not any(name == index or name.startswith(index + "_") for index in MANUAL_INDEXES)
+    return True
+
+
+def run_migrations_offline() -> None:
+    context.configure(
+        url=config.get_main_option("sqlalchemy.url"),
+        target_metadata=target_metadata,
+        include_name=include_name,
+        literal_binds=True,
+        dialect_opts={"paramstyle": "named"},
+        render_as_batch=True,
+    )
+    with context.begin_transaction():
+        context.run_migrations()
+
+
+def run_migrations_online() -> None:
+    connectable = config.attributes.get("connection")
+    if connectable is None:
+        connectable = engine_from_config(
+            config.get_section(config.config_ini_section, {}),
+            prefix="sqlalchemy.",
+            poolclass=pool.NullPool,
+        )
+        with connectable.connect() as connection:
+            _run(connection)
+    else:
+        _run(connectable)
+
+
+def _run(connection) -> None:
+    # Batch mode lets ALTER-style operations work on SQLite.
+    context.configure(
+        connection=connection,
+        target_metadata=target_metadata,
+        include_name=include_name,
+        render_as_batch=True,
+    )
+    with context.begin_transaction():
+        context.run_migrations()
+
+
+if context.is_offline_mode():
+    run_migrations_offline()
+else:
+    run_migrations_online()
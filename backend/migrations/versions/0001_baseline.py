@@ -0,0 +1,65 @@
+"""Baseline schema: documents, ocr_results, line_numbers
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-17
+
+Databases created earlier with ``create_all`` already have these tables;
+mark them with ``alembic -c backend/alembic.ini stamp 0001`` before upgrading.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0001"
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "documents",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("file_name", sa.Text()),
+        sa.Column("pages", sa.Integer()),
+        sa.Column("imported_at", sa.DateTime(timezone=True), server_default=sa.func.now()),
+    )
+    op.create_index("ix_documents_id", "documents", ["id"])
+
+    op.create_table(
+        "ocr_results",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("document_id", sa.Integer(), sa.ForeignKey("documents.id")),
+        sa.Column("page", sa.Integer()),
+        sa.Column("text", sa.Text()),
+        sa.Column("x_coord", sa.Float()),
+        sa.Column("y_coord", sa.Float()),
+        sa.Column("width", sa.Float()),
+        sa.Column("height", sa.Float()),
+        sa.Column("status", sa.String()),
+        sa.Column("updated_at", sa.DateTime(timezone=True), server_default=sa.func.now()),
+    )
+    op.create_index("ix_ocr_results_id", "ocr_results", ["id"])
+    op.create_index("ix_ocr_results_text", "ocr_results", ["text"])
+
+    op.create_table(
+        "line_numbers",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("document_id", sa.Integer(), sa.ForeignKey("documents.id")),
+        sa.Column("page", sa.Integer()),
+        sa.Column("text", sa.Text()),
+        sa.Column("x_coord", sa.Float()),
+        sa.Column("y_coord", sa.Float()),
+        sa.Column("width", sa.Float()),
+        sa.Column("height", sa.Float()),
+        sa.Column("status", sa.String()),
+    )
+    op.create_index("ix_line_numbers_id", "line_numbers", ["id"])
+    op.create_index("ix_line_numbers_text", "line_numbers", ["text"])
+
+
+def downgrade() -> None:
+    op.drop_table("line_numbers")
+    op.drop_table("ocr_results")
+    op.drop_table("documents")
@@ -0,0 +1,56 @@
+"""Add indexed canonical text_key to ocr_results and line_numbers
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-17
+"""
+from alembic import op
+import sqlalchemy as sa
+
+from backend.matching.fuzzy import canonical_key
+
+
+revision = "0002"
+down_revision = "0001"
+branch_labels = None
+depends_on = None
+
+TABLES = ("ocr_results", "line_numbers")
+BACKFILL_CHUNK = 5000
+
+
+def upgrade() -> None:
+    for table_name in TABLES:
+        with op.batch_alter_table(table_name) as batch:
+            batch.add_column(sa.Column("text_key", sa.Text()))
+            batch.create_index(f"ix_{table_name}_text_key", ["text_key"])
+        _backfill(table_name)
+
+
+def _backfill(table_name: str) -> None:
+    connection = op.get_bind()
+    table = sa.table(table_name, sa.column("id", sa.Integer), sa.column("text", sa.Text), sa.column("text_key", sa.Text))
+    update = (
+        sa.update(table)
+        .where(table.c.id == sa.bindparam("row_id"))
+        .values(text_key=sa.bindparam("key"))
+    )
+    last_id = 0
+    while True:
+        rows = connection.execute(
+            sa.select(table.c.id, table.c.text)
+            .where(table.c.id > last_id)
+            .order_by(table.c.id)
+            .limit(BACKFILL_CHUNK)
+        ).all()
+        if not rows:
+            return
+        connection.execute(update, [{"row_id": row_id, "key": canonical_key(text)} for row_id, text in rows])
+        last_id = rows[-1][0]
+
+
+def downgrade() -> None:
+    for table_name in TABLES:
+        with op.batch_alter_table(table_name) as batch:
+            batch.drop_index(f"ix_{table_name}_text_key")
+            batch.drop_column("text_key")
@@ -0,0 +1,31 @@
+"""Add page_fingerprints for incremental re-imports
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-17
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0003"
+down_revision = "0002"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "page_fingerprints",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("document_id", sa.Integer(), sa.ForeignKey("documents.id"), nullable=False),
+        sa.Column("page", sa.Integer(), nullable=False),
+        sa.Column("fingerprint", sa.String(64), nullable=False),
+        sa.Column("imported_at", sa.DateTime(timezone=True), server_default=sa.func.now()),
+        sa.UniqueConstraint("document_id", "page"),
+    )
+    op.create_index("ix_page_fingerprints_id", "page_fingerprints", ["id"])
+
+
+def downgrade() -> None:
+    op.drop_table("page_fingerprints")
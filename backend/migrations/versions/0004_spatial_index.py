@@ -0,0 +1,38 @@
+"""Add spatial indexes for viewport queries
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-17
+"""
+from alembic import op
+
+from backend import spatial
+
+
+revision = "0004"
+down_revision = "0003"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    dialect = op.get_bind().dialect.name
+    for table_name in spatial.SPATIAL_TABLES:
+        if dialect == "sqlite":
+            for statement in spatial.sqlite_ddl(table_name):
+                op.execute(statement)
+            op.execute(spatial.sqlite_backfill(table_name))
+        elif dialect == "postgresql":
+            for statement in spatial.postgresql_ddl(table_name):
+                op.execute(statement)
+
+
+def downgrade() -> None:
+    dialect = op.get_bind().dialect.name
+    for table_name in spatial.SPATIAL_TABLES:
+        if dialect == "sqlite":
+            for statement in spatial.sqlite_drop(table_name):
+                op.execute(statement)
+        elif dialect == "postgresql":
+            for statement in spatial.postgresql_drop(table_name):
+                op.execute(statement)
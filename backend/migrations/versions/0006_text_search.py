@@ -0,0 +1,38 @@
+"""Add trigram text indexes for substring search
+
+Revision ID: 0006
+Revises: 0005
+Create Date: 2026-10-17
+"""
+from alembic import op
+
+from backend import text_search
+
+
+revision = "0006"
+down_revision = "0005"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    dialect = op.get_bind().dialect.name
+    for table_name in text_search.SEARCH_TABLES:
+        if dialect == "sqlite":
+            for statement in text_search.sqlite_ddl(table_name):
+                op.execute(statement)
+            op.execute(text_search.sqlite_backfill(table_name))
+        elif dialect == "postgresql":
+            for statement in text_search.postgresql_ddl(table_name):
+                op.execute(statement)
+
+
+def downgrade() -> None:
+    dialect = op.get_bind().dialect.name
+    for table_name in text_search.SEARCH_TABLES:
+        if dialect == "sqlite":
+            for statement in text_search.sqlite_drop(table_name):
+                op.execute(statement)
+        elif dialect == "postgresql":
+            for statement in text_search.postgresql_drop(table_name):
+                op.execute(statement)
@@ -0,0 +1,31 @@
+"""Add composite indexes for per-document queries
+
+Revision ID: 0007
+Revises: 0006
+Create Date: 2026-10-17
+"""
+from alembic import op
+
+
+revision = "0007"
+down_revision = "0006"
+branch_labels = None
+depends_on = None
+
+ROW_TABLES = ("ocr_results", "line_numbers")
+# Each index is (document_id, column).
+SECOND_COLUMNS = ("page", "text", "status")
+
+
+def upgrade() -> None:
+    op.create_index("ix_documents_file_name", "documents", ["file_name"])
+    for table_name in ROW_TABLES:
+        for column in SECOND_COLUMNS:
+            op.create_index(f"ix_{table_name}_document_{column}", table_name, ["document_id", column])
+
+
+def downgrade() -> None:
+    for table_name in ROW_TABLES:
+        for column in SECOND_COLUMNS:
+            op.drop_index(f"ix_{table_name}_document_{column}", table_name=table_name)
+    op.drop_index("ix_documents_file_name", table_name="documents")
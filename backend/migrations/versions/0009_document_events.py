@@ -0,0 +1,33 @@
+"""Add the document_events table of the event streams
+
+Revision ID: 0009
+Revises: 0008
+Create Date: 2026-10-17
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0009"
+down_revision = "0008"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "document_events",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("document_id", sa.Integer(), sa.ForeignKey("documents.id"), nullable=False),
+        sa.Column("kind", sa.String(), nullable=False),
+        sa.Column("payload", sa.Text(), nullable=False),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now()),
+        sqlite_autoincrement=True,
+    )
+    op.create_index("ix_document_events_id", "document_events", ["id"])
+    op.create_index("ix_document_events_created_at", "document_events", ["created_at"])
+    op.create_index("ix_document_events_document_id_id", "document_events", ["document_id", "id"])
+
+
+def downgrade() -> None:
+    op.drop_table("document_events")
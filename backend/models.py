@@ -1,7 +1,8 @@
-from sqlalchemy import Column, Integer, String, Text, DateTime, Float, ForeignKey
+from sqlalchemy import Column, Integer, String, Text, DateTime, Float, ForeignKey, Index, UniqueConstraint, event
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
-from backend import database
+from backend import database, spatial, text_search
+from backend.matching.fuzzy import canonical_key
 
 Base = database.Base
 
@@ -9,20 +10,30 @@ class Document(Base):
     __tablename__ = "documents"
 
     id = Column(Integer, primary_key=True, index=True)
-    file_name = Column(Text)
+    file_name = Column(Text, index=True)
     pages = Column(Integer)
     imported_at = Column(DateTime(timezone=True), server_default=func.now())
+    # Bumped by every write to the document's rows; used as the HTTP ETag.
+    version = Column(Integer, nullable=False, default=1, server_default="1")
     
-    line_numbers = relationship("LineNumber", back_populates="document")
-    ocr_results = relationship("OcrResult", back_populates="document")
+    # Explicit order: without it rows come back in whatever index order the plan uses.
+    line_numbers = relationship("LineNumber", back_populates="document", order_by="LineNumber.id")
+    ocr_results = relationship("OcrResult", back_populates="document", order_by="OcrResult.id")
 
 class OcrResult(Base):
     __tablename__ = "ocr_results"
+    # Per-document reads filter on document_id first.
+    __table_args__ = (
+        Index("ix_ocr_results_document_page", "document_id", "page"),
+        Index("ix_ocr_results_document_text", "document_id", "text"),
+        Index("ix_ocr_results_document_status", "document_id", "status"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     document_id = Column(Integer, ForeignKey("documents.id"))
     page = Column(Integer)
     text = Column(Text, index=True)
+    text_key = Column(Text, index=True)
     x_coord = Column(Float)
     y_coord = Column(Float)
     width = Column(Float)
@@ -34,15 +45,89 @@ class OcrResult(Base):
 
 class LineNumber(Base):
     __tablename__ = "line_numbers"
+    # Per-document reads filter on document_id first.
+    __table_args__ = (
+        Index("ix_line_numbers_document_page", "document_id", "page"),
+        Index("ix_line_numbers_document_text", "document_id", "text"),
+        Index("ix_line_numbers_document_status", "document_id", "status"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     document_id = Column(Integer, ForeignKey("documents.id"))
     page = Column(Integer)
     text = Column(Text, index=True)
+    text_key = Column(Text, index=True)
     x_coord = Column(Float)
     y_coord = Column(Float)
     width = Column(Float)
     height = Column(Float)
     status = Column(String, default="pending")
     
-    document = relationship("Document", back_populates="line_numbers") 
\ No newline at end of file
+    document = relationship("Document", back_populates="line_numbers")
+
+class PageFingerprint(Base):
+    __tablename__ = "page_fingerprints"
+    __table_args__ = (UniqueConstraint("document_id", "page"),)
+
+    id = Column(Integer, primary_key=True, index=True)
+    document_id = Column(Integer, ForeignKey("documents.id"), nullable=False)
+    page = Column(Integer, nullable=False)
+    fingerprint = Column(String(64), nullable=False)
+    imported_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+
+class IngestJob(Base):
+    """An OCR file waiting for, or going through, import by a worker (see ``backend.worker``)."""
+    __tablename__ = "jobs"
+    # Workers look up the oldest job by status.
+    __table_args__ = (Index("ix_jobs_status_id", "status", "id"),)
+
+    id = Column(Integer, primary_key=True, index=True)
+    document_id = Column(Integer, ForeignKey("documents.id"), nullable=False, index=True)
+    parser = Column(String, nullable=False)
+    source_path = Column(Text, nullable=False)
+    # queued -> running -> succeeded | failed
+    status = Column(String, nullable=False, default="queued", server_default="queued")
+    worker = Column(String)
+    attempts = Column(Integer, nullable=False, default=0, server_default="0")
+    pages_done = Column(Integer, nullable=False, default=0, server_default="0")
+    rows_inserted = Column(Integer, nullable=False, default=0, server_default="0")
+    rows_updated = Column(Integer, nullable=False, default=0, server_default="0")
+    rows_deleted = Column(Integer, nullable=False, default=0, server_default="0")
+    error = Column(Text)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    started_at = Column(DateTime(timezone=True))
+    # Set by the worker after every page; a running job whose heartbeat
+    # stops lost its worker and is claimed again.
+    heartbeat_at = Column(DateTime(timezone=True))
+    finished_at = Column(DateTime(timezone=True))
+
+class DocumentEvent(Base):
+    """A change of a document, pushed to its subscribers (see ``backend.services.events``)."""
+    __tablename__ = "document_events"
+    __table_args__ = (
+        Index("ix_document_events_document_id_id", "document_id", "id"),
+        # Subscribers resume after the last id they saw: ids must not be
+        # reused once old events are pruned.
+        {"sqlite_autoincrement": True},
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    document_id = Column(Integer, ForeignKey("documents.id"), nullable=False)
+    # rows | page | job; ``payload`` is the JSON sent to subscribers.
+    kind = Column(String, nullable=False)
+    payload = Column(Text, nullable=False)
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), index=True)
+
+# Viewport queries go through an R*Tree (SQLite) or GiST index (PostgreSQL).
+spatial.register(OcrResult.__table__)
+spatial.register(LineNumber.__table__)
+text_search.register(OcrResult.__table__)
+
+@event.listens_for(OcrResult.text, "set")
+@event.listens_for(LineNumber.text, "set")
+def _sync_text_key(target, value, oldvalue, initiator):
+    """Keep ``text_key`` in step with ``text`` for ORM writes.
+
+    Core inserts (``crud._bulk_insert``) compute the key themselves.
+    """
+    target.text_key = canonical_key(value)
@@ -1,10 +1,31 @@
 """Base classes for OCR parsers."""
 
-from typing import Any
+from itertools import groupby
+from typing import TYPE_CHECKING, Any, Callable, Iterable, Iterator, Optional
+
+from backend.config import get_settings
+from .cache import get_record_cache
+from .incremental import ImportStats, diff_rows, page_fingerprint
+from .records import OcrRecordBatch
+
+if TYPE_CHECKING:
+    from sqlalchemy.orm import Session
+
+    from backend import schemas
 
 
 class BaseOcrParser:
-    """Abstract OCR parser."""
+    """Abstract OCR parser.
+
+    Plugins implement :meth:`iter_records`; batching, the record cache and
+    the bulk and incremental database writes are built on top of it.
+    Parsers that can produce whole pages more efficiently may override
+    :meth:`_extract_batches` instead.
+    """
+
+    # Bump when the records a parser produces change, to invalidate entries
+    # of the on-disk record cache.
+    cache_version = 1
 
     def parse(self, file_or_data: Any):
         """Parse a file path or already loaded data.
@@ -13,3 +34,148 @@ class BaseOcrParser:
         subsequent processing steps can use.
         """
         raise NotImplementedError
+
+    def iter_records(self, file_or_data: Any) -> Iterator[dict]:
+        """Yield normalized OCR records lazily.
+
+        Each record is a dict with ``page``, ``text``, ``x_coord``,
+        ``y_coord``, ``width`` and ``height``, the shape accepted by
+        :func:`backend.crud.bulk_create_ocr_results`. Records of a page must
+        be yielded together, pages in document order. ``file_or_data`` is a
+        file path or whatever :meth:`parse` returned; implementations should
+        read paths incrementally so memory stays bounded.
+        """
+        raise NotImplementedError
+
+    def iter_batches(self, file_or_data: Any, workers: Optional[int] = None) -> Iterator[OcrRecordBatch]:
+        """Yield one :class:`OcrRecordBatch` per page with at least one record.
+
+        When ``file_or_data`` is a file and the record cache is enabled (see
+        :mod:`backend.ocr.cache`), a file seen before is not parsed at all.
+        """
+        path = self._source_path(file_or_data)
+        cache = get_record_cache() if path is not None else None
+        if cache is None:
+            yield from self._extract_batches(file_or_data, workers)
+            return
+        key = cache.key(path, self)
+        cached = cache.get(key)
+        if cached is not None:
+            yield from cached
+            return
+        with cache.writer(key) as entry:
+            for batch in self._extract_batches(file_or_data, workers):
+                entry.add(batch)
+                yield batch
+
+    def _extract_batches(self, file_or_data: Any, workers: Optional[int]) -> Iterator[OcrRecordBatch]:
+        records = self.iter_records(file_or_data)
+        for _, page_records in groupby(records, key=lambda record: record.get("page", 1)):
+            batch = OcrRecordBatch.from_records(page_records)
+            if len(batch):
+                yield batch
+
+    @staticmethod
+    def _source_path(file_or_data: Any) -> Optional[str]:
+        """File behind ``file_or_data``, if it was not loaded into memory yet."""
+        if isinstance(file_or_data, str):
+            return file_or_data
+        return getattr(file_or_data, "path", None)
+
+    def iter_ocr_results(self, file_or_data: Any) -> Iterator["schemas.OcrResultCreate"]:
+        """Yield an ``OcrResultCreate`` for every record, page by page."""
+        from backend import schemas
+
+        for batch in self.iter_batches(file_or_data):
+            for row in batch.iter_dicts():
+                yield schemas.OcrResultCreate(**row)
+
+    def create_ocr_results(
+        self,
+        db: "Session",
+        file_or_data: Any,
+        document_id: int,
+        workers: Optional[int] = None,
+    ) -> int:
+        """Parse OCR output and create ``OcrResult`` records.
+
+        ``file_or_data`` may be a loaded dictionary, a file path or whatever
+        :meth:`parse` returned. ``workers`` defaults to the ``ingest_workers``
+        setting. Returns the number of created records.
+        """
+        if workers is None:
+            workers = get_settings().ingest_workers
+        return self.create_batches(db, self.iter_batches(file_or_data, workers=workers), document_id)
+
+    def create_batches(self, db: "Session", batches: Iterable[OcrRecordBatch], document_id: int) -> int:
+        """:meth:`create_ocr_results` for batches extracted elsewhere, e.g. off the event loop."""
+        # The database layer is imported on use: loading a parser stays cheap.
+        from backend import crud
+
+        rows = (row for batch in batches for row in batch.iter_dicts())
+        return crud.bulk_create_ocr_results(db, rows, document_id=document_id)
+
+    def sync_ocr_results(
+        self,
+        db: "Session",
+        file_or_data: Any,
+        document_id: int,
+        workers: Optional[int] = None,
+        progress: Optional[Callable[[ImportStats], None]] = None,
+    ) -> ImportStats:
+        """Bring the document's ``OcrResult`` rows in line with ``file_or_data``.
+
+        Pages whose fingerprint matches the previous import are skipped.
+        Changed pages are diffed record by record (see
+        :func:`~backend.ocr.incremental.diff_rows`) and only the differences
+        are written, one transaction per page. Rows whose status is no longer
+        ``auto`` were corrected by hand and are never modified or deleted.
+        ``progress`` is called with the running stats after every page.
+        """
+        if workers is None:
+            workers = get_settings().ingest_workers
+        return self.sync_batches(db, self.iter_batches(file_or_data, workers=workers), document_id, progress)
+
+    def sync_batches(
+        self,
+        db: "Session",
+        batches: Iterable[OcrRecordBatch],
+        document_id: int,
+        progress: Optional[Callable[[ImportStats], None]] = None,
+    ) -> ImportStats:
+        """:meth:`sync_ocr_results` for batches extracted beforehand, e.g. in another process."""
+        from backend import crud, models
+
+        stored = crud.get_page_fingerprints(db, document_id)
+        stats = ImportStats()
+        seen = set()
+        for batch in batches:
+            page = int(batch.page[0])
+            seen.add(page)
+            fingerprint = page_fingerprint(batch)
+            if stored.get(page) == fingerprint:
+                stats.pages_skipped += 1
+            else:
+                existing = crud.get_page_rows(db, models.OcrResult, document_id, page)
+                diff = diff_rows(existing, list(batch.iter_dicts()), _is_corrected_ocr_result)
+                crud.apply_row_diff(db, models.OcrResult, document_id, diff, "auto", page=page, fingerprint=fingerprint)
+                stats.pages_changed += 1
+                stats.add(diff)
+            if progress is not None:
+                progress(stats)
+
+        # Pages that are gone from the document or no longer yield any records.
+        for page in sorted((set(stored) | set(crud.get_pages(db, models.OcrResult, document_id))) - seen):
+            existing = crud.get_page_rows(db, models.OcrResult, document_id, page)
+            diff = diff_rows(existing, [], _is_corrected_ocr_result)
+            crud.apply_row_diff(db, models.OcrResult, document_id, diff, "auto", page=page)
+            crud.delete_page_fingerprint(db, document_id, page)
+            stats.pages_removed += 1
+            stats.add(diff)
+            if progress is not None:
+                progress(stats)
+        return stats
+
+
+def _is_corrected_ocr_result(row: Any) -> bool:
+    return row.status != "auto"
@@ -0,0 +1,180 @@
+"""Content-addressed on-disk cache of extracted OCR records.
+
+Entries are keyed by the SHA-256 of the source file together with the parser
+class and its ``cache_version``, so an edited file or a parser whose output
+changed never hits a stale entry. Each entry is an uncompressed ``.npz`` with
+the :class:`OcrRecordBatch` columns and a string table (UTF-8 blob plus byte
+offsets). Entries are written page by page (see :class:`CacheEntryWriter`),
+so caching a large document does not hold its records in memory. The
+directory is kept under a size budget by evicting the least recently used
+entries; reads refresh an entry's modification time.
+"""
+
+import hashlib
+import os
+import shutil
+import tempfile
+import zipfile
+from typing import IO, Any, Dict, Iterable, List, Optional
+
+import numpy as np
+from numpy.lib import format as npy_format
+
+from backend.config import get_settings
+from .records import OcrRecordBatch
+
+_COLUMNS = ("page", "x", "y", "width", "height", "text_start", "text_end")
+_DTYPES = {name: getattr(OcrRecordBatch(), name).dtype for name in _COLUMNS}
+_READ_SIZE = 1 << 20
+
+
+def file_digest(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(_READ_SIZE), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+class OcrRecordCache:
+    """Directory of cached record batches with an LRU size limit."""
+
+    def __init__(self, directory: str, max_bytes: int):
+        self.directory = directory
+        self.max_bytes = max_bytes
+
+    def key(self, path: str, parser: Any) -> str:
+        parser_id = f"{type(parser).__module__}.{type(parser).__qualname__}:{parser.cache_version}"
+        return hashlib.sha256(f"{file_digest(path)}:{parser_id}".encode("utf-8")).hexdigest()
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, f"{key}.npz")
+
+    def get(self, key: str) -> Optional[List[OcrRecordBatch]]:
+        """Return the cached per-page batches, or ``None`` on a miss."""
+        path = self._path(key)
+        try:
+            with np.load(path, allow_pickle=False) as data:
+                columns = {name: data[name] for name in _COLUMNS}
+                offsets = data["text_offsets"]
+                blob = data["text_blob"].tobytes()
+        except (OSError, KeyError, ValueError):
+            return None
+        os.utime(path)
+        texts = [blob[start:end].decode("utf-8") for start, end in zip(offsets[:-1].tolist(), offsets[1:].tolist())]
+        boundaries = (np.flatnonzero(np.diff(columns["page"])) + 1).tolist()
+        starts = [0, *boundaries]
+        ends = [*boundaries, len(texts)]
+        return [
+            OcrRecordBatch(**{name: column[start:end] for name, column in columns.items()}, texts=texts[start:end])
+            for start, end in zip(starts, ends)
+            if end > start
+        ]
+
+    def put(self, key: str, batches: Iterable[OcrRecordBatch]) -> None:
+        with self.writer(key) as entry:
+            for batch in batches:
+                entry.add(batch)
+
+    def writer(self, key: str) -> "CacheEntryWriter":
+        """Writer of the entry ``key``, stored when its ``with`` block exits cleanly."""
+        os.makedirs(self.directory, exist_ok=True)
+        return CacheEntryWriter(self, key)
+
+    def evict(self) -> None:
+        """Delete least recently used entries until the directory fits ``max_bytes``."""
+        entries = []
+        for entry in os.scandir(self.directory):
+            if entry.name.endswith(".npz"):
+                stat = entry.stat()
+                entries.append((stat.st_mtime_ns, stat.st_size, entry.path))
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            try:
+                os.unlink(path)
+            except FileNotFoundError:
+                pass
+            total -= size
+
+    def clear(self) -> None:
+        if os.path.isdir(self.directory):
+            for entry in os.scandir(self.directory):
+                if entry.name.endswith(".npz"):
+                    os.unlink(entry.path)
+
+
+class CacheEntryWriter:
+    """Builds a cache entry from batches added one page at a time.
+
+    Every column is appended to its own anonymous spill file, so only the
+    current batch is in memory. On a clean exit the spill files are copied
+    into a temporary ``.npz`` that is renamed into place, so readers never
+    see a partial entry; on an exception nothing is stored.
+    """
+
+    def __init__(self, cache: OcrRecordCache, key: str):
+        self.cache = cache
+        self.key = key
+        self.count = 0
+        self.text_bytes = 0
+        self.spills: Dict[str, IO[bytes]] = {}
+
+    def __enter__(self) -> "CacheEntryWriter":
+        for name in (*_COLUMNS, "text_offsets", "text_blob"):
+            self.spills[name] = tempfile.TemporaryFile(dir=self.cache.directory)
+        self.spills["text_offsets"].write(np.zeros(1, dtype=np.int64).tobytes())
+        return self
+
+    def add(self, batch: OcrRecordBatch) -> None:
+        for name in _COLUMNS:
+            self.spills[name].write(np.asarray(getattr(batch, name), dtype=_DTYPES[name]).tobytes())
+        encoded = [text.encode("utf-8") for text in batch.texts]
+        lengths = [len(text) for text in encoded]
+        self.spills["text_offsets"].write((self.text_bytes + np.cumsum(lengths, dtype=np.int64)).tobytes())
+        self.spills["text_blob"].write(b"".join(encoded))
+        self.count += len(batch)
+        self.text_bytes += sum(lengths)
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        try:
+            if exc_type is None:
+                self._store()
+        finally:
+            for spill in self.spills.values():
+                spill.close()
+        if exc_type is None:
+            self.cache.evict()
+
+    def _store(self) -> None:
+        shapes = {name: (self.count,) for name in _COLUMNS}
+        shapes["text_offsets"] = (self.count + 1,)
+        shapes["text_blob"] = (self.text_bytes,)
+        dtypes = {**_DTYPES, "text_offsets": np.dtype(np.int64), "text_blob": np.dtype(np.uint8)}
+        fd, tmp_path = tempfile.mkstemp(dir=self.cache.directory, suffix=".tmp")
+        try:
+            # The same layout as ``np.savez``: one uncompressed ``.npy`` member per array.
+            with os.fdopen(fd, "wb") as f, zipfile.ZipFile(f, "w", zipfile.ZIP_STORED, allowZip64=True) as archive:
+                for name, spill in self.spills.items():
+                    header = {
+                        "descr": npy_format.dtype_to_descr(dtypes[name]),
+                        "fortran_order": False,
+                        "shape": shapes[name],
+                    }
+                    with archive.open(f"{name}.npy", "w", force_zip64=True) as member:
+                        npy_format.write_array_header_1_0(member, header)
+                        spill.seek(0)
+                        shutil.copyfileobj(spill, member, _READ_SIZE)
+            os.replace(tmp_path, self.cache._path(self.key))
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+
+
+def get_record_cache() -> Optional[OcrRecordCache]:
+    """Cache configured by the ``ocr_cache_dir``/``ocr_cache_size_mb`` settings, if enabled."""
+    settings = get_settings()
+    if not settings.ocr_cache_dir:
+        return None
+    return OcrRecordCache(settings.ocr_cache_dir, settings.ocr_cache_size_mb * 1024 * 1024)
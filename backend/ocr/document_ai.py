@@ -1,11 +1,17 @@
 """Parser for Google Document AI JSON output."""
 
 import json
-from typing import Iterable, Any
-from sqlalchemy.orm import Session
+from typing import TYPE_CHECKING, Any, Iterable, Iterator, Optional, Tuple
 
 from .base import BaseOcrParser
-from backend import crud, schemas
+from .incremental import ImportStats, diff_rows
+from .parallel import iter_batches_parallel, resolve_workers
+from .records import OcrRecordBatch
+from backend.config import get_settings
+from backend.matching import AhoCorasick, BKTree, GrammarMatcher, canonical_key
+
+if TYPE_CHECKING:
+    from sqlalchemy.orm import Session
 
 
 class DocumentAiParser(BaseOcrParser):
@@ -18,78 +24,196 @@ class DocumentAiParser(BaseOcrParser):
                 return json.load(f)
         return file_or_data
 
-    def create_ocr_results(self, db: Session, doc_ai_data: dict, document_id: int) -> int:
-        """Parse Document AI JSON and create ``OcrResult`` records.
+    def iter_pages(self, doc_ai_data: Any) -> Iterator[Tuple[str, dict]]:
+        """Yield ``(text, page)`` pairs for every page of ``doc_ai_data``."""
+        from .streaming import StreamedDocument
 
-        Returns the number of created records.
-        """
-        created = 0
+        if isinstance(doc_ai_data, StreamedDocument):
+            yield from doc_ai_data.iter_pages()
+            return
+        if isinstance(doc_ai_data, str):
+            doc_ai_data = self.parse(doc_ai_data)
+        text = doc_ai_data.get("text", "")
         for page in doc_ai_data.get("pages", []):
-            page_width = page.get("dimension", {}).get("width")
-            page_height = page.get("dimension", {}).get("height")
-            if not page_width or not page_height:
-                continue
-
-            for line in page.get("lines", []):
-                try:
-                    text_anchor = line.get("layout", {}).get("textAnchor", {})
-                    text_segments = text_anchor.get("textSegments", [{}])
-                    start_index = int(text_segments[0].get("startIndex", 0))
-                    end_index = int(text_segments[0].get("endIndex", 0))
-                    text = (
-                        doc_ai_data["text"][start_index:end_index]
-                        .strip()
-                        .replace("\n", " ")
-                    )
-                    vertices = (
-                        line.get("layout", {})
-                        .get("boundingPoly", {})
-                        .get("normalizedVertices", [])
-                    )
-                    if not vertices or not text:
-                        continue
-                    x_coords = [v.get("x", 0) * page_width for v in vertices]
-                    y_coords = [v.get("y", 0) * page_height for v in vertices]
-                    min_x, max_x = min(x_coords), max(x_coords)
-                    min_y, max_y = min(y_coords), max(y_coords)
-                    schema = schemas.OcrResultCreate(
-                        page=page.get("pageNumber", 1),
-                        text=text,
-                        x_coord=min_x,
-                        y_coord=min_y,
-                        width=max_x - min_x,
-                        height=max_y - min_y,
-                    )
-                    crud.create_ocr_result(db=db, ocr_result=schema, document_id=document_id)
-                    created += 1
-                except (KeyError, IndexError, TypeError):
-                    continue
-        return created
+            yield text, page
+
+    def iter_records(self, doc_ai_data: Any) -> Iterator[dict]:
+        for batch in self.iter_batches(doc_ai_data):
+            yield from batch.iter_dicts()
+
+    def _extract_batches(self, doc_ai_data: Any, workers: Optional[int]) -> Iterator[OcrRecordBatch]:
+        """Compute batches page by page, on the ``workers`` process pool if more than one.
+
+        See :mod:`backend.ocr.parallel`; the output is the same either way.
+        """
+        workers = resolve_workers(workers)
+        if workers > 1:
+            batches = iter_batches_parallel(self._iter_shards(doc_ai_data), workers)
+        else:
+            batches = (
+                OcrRecordBatch.from_document_ai_page(page, text)
+                for text, page in self.iter_pages(doc_ai_data)
+            )
+        for batch in batches:
+            if len(batch):
+                yield batch
+
+    def _iter_shards(self, doc_ai_data: Any) -> Iterator[Tuple[str, Any]]:
+        """Pages for the process pool; files are split into raw page JSON."""
+        # Imported here because the streaming module subclasses this parser.
+        from .streaming import StreamedDocument
+
+        if isinstance(doc_ai_data, str):
+            doc_ai_data = StreamedDocument(doc_ai_data)
+        if isinstance(doc_ai_data, StreamedDocument):
+            return doc_ai_data.iter_pages(raw=True)
+        return self.iter_pages(doc_ai_data)
+
+    def match_line_numbers(
+        self,
+        db: "Session",
+        ground_truth_lines: Iterable[str],
+        document_id: int,
+        substring: bool = False,
+        max_distance: int = 0,
+    ) -> Iterator[dict]:
+        """Yield a line-number record for every OCR result matching ``ground_truth_lines``.
+
+        By default an OCR result matches a ground truth line when their
+        canonical keys (see :func:`~backend.matching.canonical_key`) are equal,
+        so quote variants, lookalike letters and spacing are ignored. With
+        ``max_distance`` keys within that edit distance also match, each OCR
+        result going to its closest line. With ``substring`` every line found
+        verbatim inside an OCR result is recorded. Records carry the ground
+        truth text and the bounding box of the OCR result.
+        """
+        from backend import crud, models
+
+        targets = sorted({line.strip() for line in ground_truth_lines if line.strip()})
+        if not targets:
+            return
+        if substring:
+            yield from self._match_substrings(db, targets, document_id)
+            return
+
+        # OCR key -> (distance, ground truth line) of its closest line.
+        best = {}
+        target_keys = [(canonical_key(target), target) for target in targets]
+        target_keys = [(key, target) for key, target in target_keys if key]
+        if max_distance > 0:
+            index = BKTree((key, None) for key in crud.iter_text_keys(db, models.OcrResult, document_id))
+            for target_key, target in target_keys:
+                for distance, key, _ in index.search(target_key, max_distance):
+                    if key not in best or (distance, target) < best[key]:
+                        best[key] = (distance, target)
+        else:
+            for target_key, target in target_keys:
+                best.setdefault(target_key, (0, target))
+
+        for result in crud.get_by_text_keys(db, models.OcrResult, best, document_id=document_id):
+            yield _line_record(result, best[result.text_key][1])
+
+    def _match_substrings(self, db: "Session", targets: Iterable[str], document_id: int) -> Iterator[dict]:
+        from backend import crud
+
+        matcher = AhoCorasick(targets)
+        for result in crud.get_ocr_results(db=db, document_id=document_id):
+            found = set()
+            for match in matcher.iter_matches(result.text or ""):
+                if match.pattern not in found:
+                    found.add(match.pattern)
+                    yield _line_record(result, match.pattern)
 
     def create_line_numbers(
         self,
-        db: Session,
+        db: "Session",
         ground_truth_lines: Iterable[str],
         document_id: int,
+        substring: bool = False,
+        max_distance: int = 0,
     ) -> int:
-        """Create ``LineNumber`` records for ``ground_truth_lines`` using existing OCR results."""
-        target_set = {line.strip() for line in ground_truth_lines if line.strip()}
-        if not target_set:
-            return 0
-
-        ocr_results = crud.get_ocr_results(db=db, document_id=document_id)
-        created = 0
-        for result in ocr_results:
-            if result.text in target_set:
-                line_schema = schemas.LineNumberCreate(
-                    page=result.page,
-                    text=result.text,
-                    x_coord=result.x_coord,
-                    y_coord=result.y_coord,
-                    width=result.width,
-                    height=result.height,
-                )
-                crud.create_line_number(db=db, line_number=line_schema, document_id=document_id)
-                created += 1
-        return created
+        """Create ``LineNumber`` records for ``ground_truth_lines`` using existing OCR results.
+
+        See :meth:`match_line_numbers` for the matching options. Returns the
+        number of created records.
+        """
+        from backend import crud
+
+        matched = list(self.match_line_numbers(db, ground_truth_lines, document_id, substring, max_distance))
+        return crud.bulk_create_line_numbers(db, matched, document_id=document_id)
+
+    def sync_line_numbers(
+        self,
+        db: "Session",
+        ground_truth_lines: Iterable[str],
+        document_id: int,
+        substring: bool = False,
+        max_distance: int = 0,
+    ) -> ImportStats:
+        """Like :meth:`create_line_numbers`, but diff against the stored line numbers.
+
+        Matches that already exist are left alone, so their ids survive, and
+        rows whose status is no longer ``pending`` are never modified or
+        deleted.
+        """
+        from backend import crud, models
+
+        matched = list(self.match_line_numbers(db, ground_truth_lines, document_id, substring, max_distance))
+        existing = crud.get_page_rows(db, models.LineNumber, document_id, page=None)
+        diff = diff_rows(existing, matched, _is_reviewed_line_number)
+        crud.apply_row_diff(db, models.LineNumber, document_id, diff, "pending")
+        stats = ImportStats()
+        stats.add(diff)
+        return stats
+
+    def discover_line_numbers(
+        self,
+        db: "Session",
+        document_id: int,
+        grammars: Optional[Iterable[Any]] = None,
+    ) -> int:
+        """Create ``LineNumber`` records for every grammar match in the OCR results.
+
+        No ground truth file is needed: each OCR string is scanned once by a
+        :class:`~backend.matching.GrammarMatcher` built from ``grammars``
+        (default: the ``line_number_grammars`` setting, or the built-in
+        grammars when that is empty).
+        """
+        from backend import crud
+
+        if grammars is None:
+            grammars = get_settings().line_number_grammars or None
+        matcher = GrammarMatcher(grammars)
+        found = []
+        for page, text, x_coord, y_coord, width, height in crud.iter_ocr_rows(db, document_id):
+            seen = set()
+            for match in matcher.iter_matches(text or ""):
+                if match.text in seen:
+                    continue
+                seen.add(match.text)
+                found.append({
+                    "page": page,
+                    "text": match.text,
+                    "x_coord": x_coord,
+                    "y_coord": y_coord,
+                    "width": width,
+                    "height": height,
+                })
+        # Matches are collected first: committing a chunk would invalidate the
+        # streaming cursor above.
+        return crud.bulk_create_line_numbers(db, found, document_id=document_id)
+
+
+def _line_record(result: Any, text: str) -> dict:
+    return {
+        "page": result.page,
+        "text": text,
+        "x_coord": result.x_coord,
+        "y_coord": result.y_coord,
+        "width": result.width,
+        "height": result.height,
+    }
+
 
+def _is_reviewed_line_number(row: Any) -> bool:
+    return row.status != "pending"
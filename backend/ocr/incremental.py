@@ -0,0 +1,129 @@
+"""Page fingerprints and record-level diffs for incremental re-imports."""
+
+import hashlib
+from collections import defaultdict
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Sequence
+
+import numpy as np
+
+from .records import OcrRecordBatch
+
+GEOMETRY = ("x_coord", "y_coord", "width", "height")
+
+
+def page_fingerprint(batch: OcrRecordBatch) -> str:
+    """SHA-256 of the records extracted from one page.
+
+    Hashing the extracted records rather than the raw page JSON ignores
+    changes that do not reach the database, such as shifted text offsets
+    when an earlier page of the document changes.
+    """
+    digest = hashlib.sha256()
+    for column in (batch.x, batch.y, batch.width, batch.height):
+        digest.update(np.ascontiguousarray(column, dtype=np.float64).tobytes())
+    digest.update("\x00".join(batch.texts).encode("utf-8"))
+    return digest.hexdigest()
+
+
+def _box(row: Any) -> tuple:
+    return (_get(row, "page"), *(round(_get(row, name), 6) for name in GEOMETRY))
+
+
+def _get(row: Any, name: str) -> Any:
+    return row[name] if isinstance(row, dict) else getattr(row, name)
+
+
+@dataclass
+class RowDiff:
+    """Changes needed to turn the stored rows of a page into the imported ones.
+
+    ``inserts`` are incoming record dicts, ``updates`` are dicts with the
+    ``id`` of the stored row and its new ``text`` and geometry, ``deletes``
+    are ids.
+    ``kept`` counts protected rows left as they are although the import
+    disagrees with them.
+    """
+
+    inserts: List[dict] = field(default_factory=list)
+    updates: List[dict] = field(default_factory=list)
+    deletes: List[int] = field(default_factory=list)
+    unchanged: int = 0
+    kept: int = 0
+
+    def __bool__(self) -> bool:
+        return bool(self.inserts or self.updates or self.deletes)
+
+
+def diff_rows(
+    existing: Sequence[Any],
+    incoming: Sequence[dict],
+    is_protected: Callable[[Any], bool],
+) -> RowDiff:
+    """Match ``incoming`` records against the ``existing`` rows of a page.
+
+    Records are paired in three passes, always within the same page: same
+    text and box (unchanged), same box (text changed) and same text (box
+    changed). Unpaired incoming records
+    are inserted and unpaired stored rows deleted. Rows for which
+    ``is_protected`` is true, e.g. ones a human corrected, are never updated
+    or deleted; an incoming record paired with one is dropped.
+    """
+    diff = RowDiff()
+    remaining: Dict[int, Any] = {row.id: row for row in existing}
+    unmatched = list(incoming)
+
+    passes = (
+        lambda row: (_get(row, "text"), _box(row)),
+        _box,
+        lambda row: (_get(row, "page"), _get(row, "text")),
+    )
+    for pass_number, key_of in enumerate(passes):
+        candidates: Dict[Any, List[int]] = defaultdict(list)
+        for row_id, row in remaining.items():
+            candidates[key_of(row)].append(row_id)
+        still_unmatched = []
+        for record in unmatched:
+            ids = candidates.get(key_of(record))
+            if not ids:
+                still_unmatched.append(record)
+                continue
+            row = remaining.pop(ids.pop(0))
+            if pass_number == 0:
+                diff.unchanged += 1
+            elif is_protected(row):
+                diff.kept += 1
+            else:
+                update = {name: record[name] for name in GEOMETRY}
+                diff.updates.append({"id": row.id, "text": record["text"], **update})
+        unmatched = still_unmatched
+
+    diff.inserts = unmatched
+    for row in remaining.values():
+        if is_protected(row):
+            diff.kept += 1
+        else:
+            diff.deletes.append(row.id)
+    return diff
+
+
+@dataclass
+class ImportStats:
+    """Counters reported by the incremental import methods."""
+
+    pages_skipped: int = 0
+    pages_changed: int = 0
+    pages_removed: int = 0
+    inserted: int = 0
+    updated: int = 0
+    deleted: int = 0
+    unchanged: int = 0
+    kept: int = 0
+
+    def add(self, diff: RowDiff) -> None:
+        self.inserted += len(diff.inserts)
+        self.updated += len(diff.updates)
+        self.deleted += len(diff.deletes)
+        self.unchanged += diff.unchanged
+        self.kept += diff.kept
+
@@ -0,0 +1,131 @@
+"""Page-sharded OCR record extraction on a process pool.
+
+Pages are handed to worker processes one at a time and the resulting
+:class:`OcrRecordBatch` objects are yielded back in page order, so a single
+consumer (usually the bulk DB writer) sees exactly the serial output. Pages
+may be passed as undecoded JSON text, in which case the workers also take
+over the JSON decoding, the most expensive step of ingestion.
+
+A pool is created on first use for each worker count and shared by all the
+imports of the process, so a request does not pay for starting processes;
+the application shuts them down with :func:`shutdown_executor`.
+
+The document text, which every page refers to, is written once per document
+to a temporary file. Each worker reads it the first time it gets a page of
+that document, so it is not pickled with every page.
+"""
+
+import json
+import os
+import tempfile
+import threading
+import uuid
+from collections import OrderedDict, deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Deque, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from .records import OcrRecordBatch
+
+_executors: Dict[int, ProcessPoolExecutor] = {}
+_executors_lock = threading.Lock()
+
+# Document texts a worker has read, by file, most recent last.
+_worker_texts: "OrderedDict[str, str]" = OrderedDict()
+WORKER_TEXTS_KEPT = 2
+
+
+def get_executor(workers: int) -> ProcessPoolExecutor:
+    """Return the shared pool of ``workers`` processes, started on first use."""
+    with _executors_lock:
+        executor = _executors.get(workers)
+        if executor is None:
+            executor = _executors[workers] = ProcessPoolExecutor(max_workers=workers)
+        return executor
+
+
+def shutdown_executor(executor: Optional[ProcessPoolExecutor] = None) -> None:
+    """Shut every shared pool down, waiting for them; with ``executor``, drop only that one."""
+    with _executors_lock:
+        if executor is None:
+            pools = list(_executors.values())
+            _executors.clear()
+        else:
+            pools = [pool for pool in _executors.values() if pool is executor]
+            for workers in [workers for workers, pool in _executors.items() if pool is executor]:
+                del _executors[workers]
+    for pool in pools:
+        pool.shutdown(wait=executor is None)
+
+
+def _document_text(path: str) -> str:
+    text = _worker_texts.get(path)
+    if text is None:
+        with open(path, encoding="utf-8") as fp:
+            text = fp.read()
+        _worker_texts[path] = text
+        while len(_worker_texts) > WORKER_TEXTS_KEPT:
+            _worker_texts.popitem(last=False)
+    return text
+
+
+def _page_batch(text_path: str, page: Any) -> OcrRecordBatch:
+    if isinstance(page, str):
+        page = json.loads(page)
+    return OcrRecordBatch.from_document_ai_page(page, _document_text(text_path))
+
+
+def _write_text(text: str) -> str:
+    # The random name is never reused, so a worker's cached copy cannot go stale.
+    fd, path = tempfile.mkstemp(prefix=f"ocr-text-{uuid.uuid4().hex}-", suffix=".txt")
+    with os.fdopen(fd, "w", encoding="utf-8") as fp:
+        fp.write(text)
+    return path
+
+
+def resolve_workers(workers: Optional[int]) -> int:
+    """Return the effective worker count; ``0`` or less means one per CPU."""
+    if workers is None:
+        return 1
+    if workers <= 0:
+        return os.cpu_count() or 1
+    return workers
+
+
+def iter_batches_parallel(
+    pages: Iterable[Tuple[str, Any]],
+    workers: int,
+    max_pending: Optional[int] = None,
+) -> Iterator[OcrRecordBatch]:
+    """Compute a batch per ``(text, page)`` pair on ``workers`` processes.
+
+    ``page`` is a Document AI page dictionary or its JSON text.
+
+    At most ``max_pending`` pages (default ``2 * workers``) are in flight, so
+    a lazily read document is never materialized as a whole. Batches are
+    yielded in input order.
+    """
+    max_pending = max_pending or 2 * workers
+    executor = get_executor(workers)
+    pending: Deque[Future] = deque()
+    text_files: List[str] = []
+    current: Optional[str] = None
+    try:
+        for text, page in pages:
+            if current is None or (text is not current and text != current):
+                current = text
+                text_files.append(_write_text(text))
+            pending.append(executor.submit(_page_batch, text_files[-1], page))
+            if len(pending) >= max_pending:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+    except BrokenProcessPool:
+        # A worker died: the next import starts a new pool.
+        shutdown_executor(executor)
+        raise
+    finally:
+        for future in pending:
+            future.cancel()
+        for path in text_files:
+            os.remove(path)
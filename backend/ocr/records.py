@@ -0,0 +1,157 @@
+"""Columnar containers for OCR records."""
+
+from dataclasses import dataclass, field
+from typing import Callable, Iterable, Iterator, List, Optional
+
+import numpy as np
+
+
+def clean_line_text(text: str) -> str:
+    """Default normalization applied to Document AI line text."""
+    return text.strip().replace("\n", " ")
+
+
+@dataclass
+class OcrRecordBatch:
+    """OCR records of one or more pages stored as parallel NumPy arrays.
+
+    ``text_start``/``text_end`` are the offsets of each record in the source
+    document text and ``texts`` holds the normalized strings.
+    """
+
+    page: np.ndarray = field(default_factory=lambda: np.empty(0, dtype=np.int32))
+    x: np.ndarray = field(default_factory=lambda: np.empty(0, dtype=np.float64))
+    y: np.ndarray = field(default_factory=lambda: np.empty(0, dtype=np.float64))
+    width: np.ndarray = field(default_factory=lambda: np.empty(0, dtype=np.float64))
+    height: np.ndarray = field(default_factory=lambda: np.empty(0, dtype=np.float64))
+    text_start: np.ndarray = field(default_factory=lambda: np.empty(0, dtype=np.int64))
+    text_end: np.ndarray = field(default_factory=lambda: np.empty(0, dtype=np.int64))
+    texts: List[str] = field(default_factory=list)
+
+    def __len__(self) -> int:
+        return len(self.texts)
+
+    @classmethod
+    def from_document_ai_page(
+        cls,
+        page: dict,
+        text: str,
+        page_number: Optional[int] = None,
+        clean: Callable[[str], str] = clean_line_text,
+    ) -> "OcrRecordBatch":
+        """Build a batch from the ``lines`` of a Document AI page.
+
+        Text anchors and vertices of all lines are collected in a single pass;
+        scaling by the page dimension and the bounding box reductions are then
+        done on whole arrays. Lines without vertices or text are skipped, as
+        are malformed ones.
+        """
+        page_width = page.get("dimension", {}).get("width")
+        page_height = page.get("dimension", {}).get("height")
+        if not page_width or not page_height:
+            return cls()
+        if page_number is None:
+            page_number = page.get("pageNumber", 1)
+
+        starts: List[int] = []
+        ends: List[int] = []
+        texts: List[str] = []
+        counts: List[int] = []
+        xs: List[float] = []
+        ys: List[float] = []
+        for line in page.get("lines", []):
+            try:
+                layout = line.get("layout", {})
+                segment = layout.get("textAnchor", {}).get("textSegments", [{}])[0]
+                start_index = int(segment.get("startIndex", 0))
+                end_index = int(segment.get("endIndex", 0))
+                line_text = clean(text[start_index:end_index])
+                vertices = layout.get("boundingPoly", {}).get("normalizedVertices", [])
+                if not vertices or not line_text:
+                    continue
+                line_xs = [float(v.get("x", 0)) for v in vertices]
+                line_ys = [float(v.get("y", 0)) for v in vertices]
+            except (KeyError, IndexError, TypeError, ValueError, AttributeError):
+                continue
+            starts.append(start_index)
+            ends.append(end_index)
+            texts.append(line_text)
+            counts.append(len(line_xs))
+            xs.extend(line_xs)
+            ys.extend(line_ys)
+
+        if not texts:
+            return cls()
+        offsets = np.zeros(len(counts), dtype=np.int64)
+        np.cumsum(counts[:-1], out=offsets[1:])
+        x_values = np.asarray(xs, dtype=np.float64) * page_width
+        y_values = np.asarray(ys, dtype=np.float64) * page_height
+        min_x = np.minimum.reduceat(x_values, offsets)
+        min_y = np.minimum.reduceat(y_values, offsets)
+        return cls(
+            page=np.full(len(texts), page_number, dtype=np.int32),
+            x=min_x,
+            y=min_y,
+            width=np.maximum.reduceat(x_values, offsets) - min_x,
+            height=np.maximum.reduceat(y_values, offsets) - min_y,
+            text_start=np.asarray(starts, dtype=np.int64),
+            text_end=np.asarray(ends, dtype=np.int64),
+            texts=texts,
+        )
+
+    @classmethod
+    def from_records(cls, records: Iterable[dict]) -> "OcrRecordBatch":
+        """Build a batch from normalized record dicts (see :meth:`iter_dicts`).
+
+        Records carry no source offsets, so ``text_start``/``text_end`` are -1.
+        """
+        records = [record for record in records if record.get("text")]
+        if not records:
+            return cls()
+        n = len(records)
+        return cls(
+            page=np.fromiter((record.get("page", 1) for record in records), dtype=np.int32, count=n),
+            x=np.fromiter((record["x_coord"] for record in records), dtype=np.float64, count=n),
+            y=np.fromiter((record["y_coord"] for record in records), dtype=np.float64, count=n),
+            width=np.fromiter((record["width"] for record in records), dtype=np.float64, count=n),
+            height=np.fromiter((record["height"] for record in records), dtype=np.float64, count=n),
+            text_start=np.full(n, -1, dtype=np.int64),
+            text_end=np.full(n, -1, dtype=np.int64),
+            texts=[record["text"] for record in records],
+        )
+
+    @classmethod
+    def concat(cls, batches: Iterable["OcrRecordBatch"]) -> "OcrRecordBatch":
+        batches = [batch for batch in batches if len(batch)]
+        if not batches:
+            return cls()
+        return cls(
+            page=np.concatenate([b.page for b in batches]),
+            x=np.concatenate([b.x for b in batches]),
+            y=np.concatenate([b.y for b in batches]),
+            width=np.concatenate([b.width for b in batches]),
+            height=np.concatenate([b.height for b in batches]),
+            text_start=np.concatenate([b.text_start for b in batches]),
+            text_end=np.concatenate([b.text_end for b in batches]),
+            texts=[text for b in batches for text in b.texts],
+        )
+
+    def iter_dicts(self) -> Iterator[dict]:
+        """Yield one plain ``dict`` per record, ready for the bulk insert helpers."""
+        columns = zip(
+            self.page.tolist(),
+            self.texts,
+            self.x.tolist(),
+            self.y.tolist(),
+            self.width.tolist(),
+            self.height.tolist(),
+        )
+        for page, text, x, y, width, height in columns:
+            yield {
+                "page": page,
+                "text": text,
+                "x_coord": x,
+                "y_coord": y,
+                "width": width,
+                "height": height,
+            }
@@ -0,0 +1,119 @@
+"""Lazy registry of OCR parser plugins.
+
+Parser names are resolved against the ``pid_visualizer.ocr_parsers`` entry
+point group, then :data:`BUILTIN_PARSERS`, then as a ``module:Class`` path.
+Entry points are scanned once per process and resolved classes are cached;
+no parser module is imported before a parser is actually requested, so
+importing :mod:`backend.ocr` stays cheap for CLI tools and app workers.
+"""
+
+import importlib
+import threading
+from importlib import metadata
+from typing import TYPE_CHECKING, Dict, List, Optional, Type
+
+if TYPE_CHECKING:
+    from .base import BaseOcrParser
+
+ENTRY_POINT_GROUP = "pid_visualizer.ocr_parsers"
+
+# Parsers shipped with the backend, available without installing entry points.
+BUILTIN_PARSERS = {
+    "document_ai": "backend.ocr.document_ai:DocumentAiParser",
+    "document_ai_stream": "backend.ocr.streaming:StreamingDocumentAiParser",
+    "vision": "backend.ocr.vision:VisionParser",
+}
+
+
+class ParserNotFoundError(LookupError):
+    """Raised when a parser name matches no entry point, built-in or module path."""
+
+
+class ParserRegistry:
+    def __init__(self, group: str = ENTRY_POINT_GROUP, builtins: Optional[Dict[str, str]] = None):
+        self.group = group
+        self.builtins = dict(BUILTIN_PARSERS if builtins is None else builtins)
+        self._entry_points: Optional[Dict[str, metadata.EntryPoint]] = None
+        self._classes: Dict[str, type] = {}
+        self._lock = threading.RLock()
+
+    def _discover(self) -> Dict[str, metadata.EntryPoint]:
+        if self._entry_points is None:
+            eps = metadata.entry_points()
+            if hasattr(eps, "select"):
+                candidates = eps.select(group=self.group)
+            else:  # backward compatibility
+                candidates = eps.get(self.group, [])
+            self._entry_points = {ep.name: ep for ep in candidates}
+        return self._entry_points
+
+    def names(self) -> List[str]:
+        """Names available without a module path: entry points and built-ins."""
+        with self._lock:
+            return sorted(set(self._discover()) | set(self.builtins))
+
+    def get_class(self, name: str) -> Type["BaseOcrParser"]:
+        """Resolve ``name`` to a parser class, importing its module on first use."""
+        with self._lock:
+            parser_cls = self._classes.get(name)
+            if parser_cls is None:
+                parser_cls = self._resolve(name)
+                self._classes[name] = parser_cls
+            return parser_cls
+
+    def _resolve(self, name: str) -> type:
+        from .base import BaseOcrParser
+
+        entry_point = self._discover().get(name)
+        if entry_point is not None:
+            try:
+                parser_cls = entry_point.load()
+            except Exception as exc:
+                raise ImportError(
+                    f"Could not load OCR parser '{name}' from entry point '{entry_point.value}': {exc}"
+                ) from exc
+            if not isinstance(parser_cls, type) or not issubclass(parser_cls, BaseOcrParser):
+                raise TypeError(f"Entry point '{name}' does not provide a BaseOcrParser")
+            return parser_cls
+
+        path = self.builtins.get(name, name)
+        module_path, _, class_name = path.partition(":")
+        try:
+            mod = importlib.import_module(module_path)
+        except ModuleNotFoundError as exc:
+            # Only a missing module named by ``name`` itself means an unknown
+            # parser; a parser module failing on its own imports is re-raised.
+            if exc.name is None or not (module_path == exc.name or module_path.startswith(exc.name + ".")):
+                raise
+            raise ParserNotFoundError(
+                f"Unknown OCR parser '{name}'; available: {', '.join(self.names())}"
+            ) from exc
+        parser_cls = getattr(mod, class_name or "Parser", None)
+        if parser_cls is None:
+            raise ParserNotFoundError(f"Module '{module_path}' has no parser class '{class_name or 'Parser'}'")
+        if not isinstance(parser_cls, type) or not issubclass(parser_cls, BaseOcrParser):
+            raise TypeError(f"{parser_cls} is not a BaseOcrParser")
+        return parser_cls
+
+    def create(self, name: str) -> "BaseOcrParser":
+        return self.get_class(name)()
+
+    def clear(self) -> None:
+        """Forget discovered entry points and resolved classes."""
+        with self._lock:
+            self._entry_points = None
+            self._classes.clear()
+
+
+registry = ParserRegistry()
+
+
+def load_parser(name: str) -> "BaseOcrParser":
+    """Return a new instance of the OCR parser registered as ``name``.
+
+    The loader first tries to resolve the parser from entry points using the
+    ``pid_visualizer.ocr_parsers`` group, then from :data:`BUILTIN_PARSERS`.
+    If nothing is found, ``name`` is treated as a module path in
+    ``module:Class`` format. Classes are resolved once and cached.
+    """
+    return registry.create(name)
@@ -0,0 +1,105 @@
+"""Disk spool for OCR files that are parsed while they are still arriving.
+
+An upload is appended to a :class:`SpoolFile` as it is received, and a parser
+in another thread reads it through :meth:`SpoolFile.open`, which waits for
+more bytes instead of reporting the end of the file until the writer has
+finished. Memory holds only the chunks in flight, whatever the size of the
+upload.
+"""
+
+import codecs
+import io
+import os
+import tempfile
+import threading
+from typing import IO, Optional
+
+
+class SpoolFile:
+    """Temporary file written by one thread and read, concurrently, by another."""
+
+    def __init__(self, directory: Optional[str] = None):
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        fd, self.path = tempfile.mkstemp(prefix="upload-", suffix=".json", dir=directory or None)
+        self._file = os.fdopen(fd, "wb")
+        self._changed = threading.Condition()
+        self.size = 0
+        self.finished = False
+        self.error: Optional[BaseException] = None
+
+    def write(self, data: bytes) -> None:
+        if not data:
+            return
+        self._file.write(data)
+        self._file.flush()
+        with self._changed:
+            self.size += len(data)
+            self._changed.notify_all()
+
+    def finish(self) -> None:
+        """Mark the end of the file; readers get EOF once they have read it all."""
+        self._file.close()
+        with self._changed:
+            self.finished = True
+            self._changed.notify_all()
+
+    def fail(self, error: BaseException) -> None:
+        """Abort the upload; readers raise ``error`` instead of waiting for more."""
+        self._file.close()
+        with self._changed:
+            self.error = error
+            self._changed.notify_all()
+
+    def wait(self, position: int) -> int:
+        """Block until bytes past ``position`` exist or the file is complete; return the size."""
+        with self._changed:
+            while self.size <= position and not self.finished and self.error is None:
+                self._changed.wait()
+            if self.error is not None:
+                raise self.error
+            return self.size
+
+    def open(self, encoding: str = "utf-8") -> IO[str]:
+        """Text reader over the spooled bytes, including those still to come."""
+        return _SpoolReader(self, encoding)
+
+    def discard(self) -> None:
+        self._file.close()
+        try:
+            os.unlink(self.path)
+        except FileNotFoundError:
+            pass
+
+
+class _SpoolReader(io.TextIOBase):
+    """Reads return what has arrived so far, waiting only when nothing has.
+
+    ``io.TextIOWrapper`` would wait until the whole requested size arrived,
+    holding the parser back by up to a read size behind the upload.
+    """
+
+    def __init__(self, spool: SpoolFile, encoding: str):
+        self.spool = spool
+        self._file = open(spool.path, "rb")
+        self._decoder = codecs.getincrementaldecoder(encoding)()
+        self._position = 0
+
+    def readable(self) -> bool:
+        return True
+
+    def read(self, size: Optional[int] = -1) -> str:
+        if size is None or size < 0:
+            return "".join(iter(lambda: self.read(1 << 16), ""))
+        while True:
+            available = min(self.spool.wait(self._position) - self._position, size)
+            data = self._file.read(available) if available > 0 else b""
+            self._position += len(data)
+            text = self._decoder.decode(data, final=not data)
+            # A chunk can end inside a multi-byte character.
+            if text or not data:
+                return text
+
+    def close(self) -> None:
+        self._file.close()
+        super().close()
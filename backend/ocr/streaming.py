@@ -0,0 +1,267 @@
+"""Incremental parser for Google Document AI JSON output.
+
+Document AI results keep the full document text in a top-level ``text`` field
+and the layout in a ``pages`` array. :func:`iter_document_ai` walks the file
+member by member and yields the elements of ``pages`` one at a time, so only a
+single page (plus ``text``) has to be held in memory. :func:`iter_members` does
+the same for any top-level array, e.g. the ``responses`` of Vision output.
+"""
+
+import json
+from typing import IO, Any, Callable, Iterator, List, Optional, Tuple
+
+import numpy as np
+
+from .document_ai import DocumentAiParser
+
+DEFAULT_CHUNK_SIZE = 1 << 16
+
+_DECODER = json.JSONDecoder()
+_WHITESPACE = " \t\n\r"
+
+
+def _container_end(buf: str, start: int) -> int:
+    """Return the offset just past the object or array opening at ``buf[start]``.
+
+    Only quotes, backslashes and brackets matter for finding the end, so they
+    are located with vectorized NumPy operations and the string state and
+    nesting depth are computed over those positions alone. Returns ``-1`` if
+    the container is not closed within ``buf``.
+    """
+    window = buf[start:]
+    if window.isascii():
+        codes = np.frombuffer(window.encode("ascii"), dtype=np.uint8)
+    else:
+        codes = np.frombuffer(window.encode("utf-32-le"), dtype=np.uint32)
+    # ``[ \\ ]`` and ``{ | }`` differ only in bit 0x20; ``|`` is ignored below.
+    folded = codes | codes.dtype.type(0x20)
+    folded -= codes.dtype.type(0x7B)
+    special = folded <= 2
+    special |= codes == 34
+    positions = np.flatnonzero(special)
+    kinds = codes[positions]
+
+    # A character is escaped when it directly follows an odd run of backslashes.
+    escaped = np.zeros(len(positions), dtype=bool)
+    backslashes = np.flatnonzero(kinds == 92)
+    if len(backslashes):
+        breaks = np.diff(positions[backslashes]) != 1
+        run_first = backslashes[np.r_[True, breaks]]
+        run_last = backslashes[np.r_[breaks, True]]
+        after = run_last[(positions[run_last] - positions[run_first]) % 2 == 0] + 1
+        after = after[after < len(positions)]
+        escaped[after[positions[after] == positions[after - 1] + 1]] = True
+
+    quotes = (kinds == 34) & ~escaped
+    outside = np.bitwise_xor.accumulate(quotes.view(np.uint8)) == 0
+    opens = ((kinds == 123) | (kinds == 91)) & outside
+    closes = ((kinds == 125) | (kinds == 93)) & outside
+    depth = np.cumsum(opens.astype(np.int32) - closes)
+    closed = np.flatnonzero(depth == 0)
+    if not len(closed):
+        return -1
+    return start + int(positions[closed[0]]) + 1
+
+
+class _StreamBuffer:
+    """Sliding text window over a file object used by the streaming reader."""
+
+    def __init__(self, fp: IO[str], chunk_size: int):
+        self.fp = fp
+        self.chunk_size = chunk_size
+        self.buf = ""
+        self.pos = 0
+        self.eof = False
+        # Length of the last decoded value; consecutive pages are similar in size.
+        self.hint = 0
+
+    def _fill(self, size: int) -> bool:
+        """Drop consumed data and append up to ``size`` more characters."""
+        if self.pos:
+            self.buf = self.buf[self.pos:]
+            self.pos = 0
+        chunk = self.fp.read(size)
+        if not chunk:
+            self.eof = True
+            return False
+        self.buf += chunk
+        return True
+
+    def peek(self) -> str:
+        """Return the next non-whitespace character without consuming it."""
+        while True:
+            while self.pos < len(self.buf) and self.buf[self.pos] in _WHITESPACE:
+                self.pos += 1
+            if self.pos < len(self.buf):
+                return self.buf[self.pos]
+            if not self._fill(self.chunk_size):
+                return ""
+
+    def expect(self, char: str) -> None:
+        found = self.peek()
+        if found != char:
+            raise ValueError(f"Expected {char!r} in Document AI JSON, got {found!r}")
+        self.pos += 1
+
+    def decode(self) -> Any:
+        """Decode the next complete JSON value, reading more input as needed.
+
+        The read size doubles after every incomplete attempt so that decoding
+        a large value costs amortized linear time.
+        """
+        self.peek()
+        if len(self.buf) - self.pos < self.hint and not self.eof:
+            self._fill(self.hint)
+        size = self.chunk_size
+        while True:
+            try:
+                value, end = _DECODER.raw_decode(self.buf, self.pos)
+            except json.JSONDecodeError:
+                if self.eof:
+                    raise
+                self._fill(size)
+                size *= 2
+                continue
+            # A number ending exactly at the buffer boundary may be truncated.
+            if end == len(self.buf) and not self.eof:
+                self._fill(size)
+                continue
+            self.hint = end - self.pos
+            self.pos = end
+            return value
+
+    def raw(self) -> str:
+        """Return the source text of the next value without decoding it."""
+        if self.peek() not in "{[":
+            return json.dumps(self.decode())
+        if len(self.buf) - self.pos < self.hint and not self.eof:
+            self._fill(self.hint)
+        size = self.chunk_size
+        while True:
+            end = _container_end(self.buf, self.pos)
+            if end < 0:
+                if self.eof:
+                    raise ValueError("Unterminated value in Document AI JSON")
+                self._fill(size)
+                size *= 2
+                continue
+            value = self.buf[self.pos:end]
+            self.hint = end - self.pos
+            self.pos = end
+            return value
+
+
+def iter_members(
+    fp: IO[str],
+    array_key: str,
+    item_event: str,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    raw_items: bool = False,
+) -> Iterator[Tuple[str, Any]]:
+    """Yield ``(key, value)`` events for the top-level members of ``fp``.
+
+    Elements of the ``array_key`` array are yielded individually as
+    ``(item_event, item)`` events instead of a single ``(array_key, [...])``
+    event. With ``raw_items`` the item is yielded as undecoded JSON text, which
+    lets the caller hand the decoding to another process.
+    """
+    stream = _StreamBuffer(fp, chunk_size)
+    stream.expect("{")
+    if stream.peek() == "}":
+        return
+    while True:
+        key = stream.decode()
+        stream.expect(":")
+        if key == array_key and stream.peek() == "[":
+            stream.expect("[")
+            if stream.peek() == "]":
+                stream.pos += 1
+            else:
+                while True:
+                    yield item_event, stream.raw() if raw_items else stream.decode()
+                    if stream.peek() == "]":
+                        stream.pos += 1
+                        break
+                    stream.expect(",")
+        else:
+            yield key, stream.decode()
+        if stream.peek() == "}":
+            return
+        stream.expect(",")
+
+
+def iter_document_ai(
+    fp: IO[str], chunk_size: int = DEFAULT_CHUNK_SIZE, raw_pages: bool = False
+) -> Iterator[Tuple[str, Any]]:
+    """Yield the members of a Document AI file with ``pages`` split into ``("page", page)`` events.
+
+    See :func:`iter_members`.
+    """
+    return iter_members(fp, "pages", "page", chunk_size, raw_pages)
+
+
+class StreamedDocument:
+    """Lazy handle over a Document AI JSON file on disk.
+
+    ``opener`` replaces opening ``path``, e.g. to read an upload that is still
+    being received (see :mod:`backend.ocr.spool`). Such a document should
+    have no ``path``: the record cache keys files by their complete content.
+    """
+
+    def __init__(
+        self,
+        path: Optional[str],
+        chunk_size: int = DEFAULT_CHUNK_SIZE,
+        opener: Optional[Callable[[], IO[str]]] = None,
+    ):
+        self.path = path
+        self.chunk_size = chunk_size
+        self.opener = opener
+
+    def open(self) -> IO[str]:
+        if self.opener is not None:
+            return self.opener()
+        return open(self.path, "r", encoding="utf-8")
+
+    def iter_pages(self, raw: bool = False) -> Iterator[Tuple[str, Any]]:
+        """Yield ``(text, page)`` pairs while reading the file incrementally.
+
+        Pages are dictionaries, or JSON strings when ``raw`` is true.
+        Document AI writes ``text`` before ``pages``. If a file has them the
+        other way round, pages are held back until ``text`` has been read.
+        """
+        text: Optional[str] = None
+        pending: List[Any] = []
+        with self.open() as fp:
+            for key, value in iter_document_ai(fp, self.chunk_size, raw_pages=raw):
+                if key == "text":
+                    text = value
+                    for page in pending:
+                        yield text, page
+                    pending = []
+                elif key == "page":
+                    if text is None:
+                        pending.append(value)
+                    else:
+                        yield text, value
+        for page in pending:
+            yield "", page
+
+
+class StreamingDocumentAiParser(DocumentAiParser):
+    """Document AI parser that reads files page by page instead of all at once."""
+
+    chunk_size = DEFAULT_CHUNK_SIZE
+
+    def parse(self, file_or_data: Any):
+        """Return a :class:`StreamedDocument` for paths, or ``file_or_data`` as is."""
+        if isinstance(file_or_data, str):
+            return StreamedDocument(file_or_data, self.chunk_size)
+        return file_or_data
+
+    def iter_pages(self, doc_ai_data: Any) -> Iterator[Tuple[str, dict]]:
+        if isinstance(doc_ai_data, str):
+            doc_ai_data = self.parse(doc_ai_data)
+        if isinstance(doc_ai_data, StreamedDocument):
+            return doc_ai_data.iter_pages()
+        return super().iter_pages(doc_ai_data)
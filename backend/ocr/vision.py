@@ -0,0 +1,69 @@
+"""Parser for Google Cloud Vision text detection output."""
+
+import json
+from typing import Any, Iterator, Tuple
+
+from .base import BaseOcrParser
+from .streaming import DEFAULT_CHUNK_SIZE, StreamedDocument, iter_members
+
+
+class VisionParser(BaseOcrParser):
+    """Parse ``images:annotate``/``files:annotate`` responses of the Vision API.
+
+    Every element of ``responses`` is one page; ``files:annotate`` output,
+    which nests the page responses of each file, is flattened. Records are
+    the word-level ``textAnnotations`` of a page (the first annotation, the
+    full page text, is skipped) with boxes in the pixel coordinates of the
+    annotation's vertices.
+    """
+
+    chunk_size = DEFAULT_CHUNK_SIZE
+
+    def parse(self, file_or_data: Any) -> dict:
+        """Return Vision data as a dictionary."""
+        if isinstance(file_or_data, str):
+            with open(file_or_data, "r", encoding="utf-8") as f:
+                return json.load(f)
+        return file_or_data
+
+    def iter_responses(self, file_or_data: Any) -> Iterator[Tuple[int, dict]]:
+        """Yield ``(page, response)`` pairs; files are read one response at a time."""
+        if isinstance(file_or_data, str):
+            file_or_data = StreamedDocument(file_or_data, self.chunk_size)
+        if isinstance(file_or_data, StreamedDocument):
+            with file_or_data.open() as fp:
+                responses = (
+                    value for key, value in iter_members(fp, "responses", "response", self.chunk_size)
+                    if key == "response"
+                )
+                yield from self._number_pages(responses)
+        else:
+            yield from self._number_pages(file_or_data.get("responses", []))
+
+    @staticmethod
+    def _number_pages(responses) -> Iterator[Tuple[int, dict]]:
+        index = 0
+        for response in responses:
+            for page_response in response.get("responses", [response]):
+                index += 1
+                page = page_response.get("context", {}).get("pageNumber", index)
+                yield page, page_response
+
+    def iter_records(self, file_or_data: Any) -> Iterator[dict]:
+        for page, response in self.iter_responses(file_or_data):
+            for annotation in response.get("textAnnotations", [])[1:]:
+                vertices = annotation.get("boundingPoly", {}).get("vertices", [])
+                text = annotation.get("description", "").strip()
+                if len(vertices) < 4 or not text:
+                    continue
+                # Vision omits coordinates that are 0.
+                x_coords = [vertex.get("x", 0) for vertex in vertices]
+                y_coords = [vertex.get("y", 0) for vertex in vertices]
+                yield {
+                    "page": page,
+                    "text": text,
+                    "x_coord": min(x_coords),
+                    "y_coord": min(y_coords),
+                    "width": max(x_coords) - min(x_coords),
+                    "height": max(y_coords) - min(y_coords),
+                }
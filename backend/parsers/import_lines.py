@@ -1,8 +1,9 @@
-import json
 import requests
 import os
 
 from backend.config import get_settings
+from backend.matching import AhoCorasick
+from backend.ocr.document_ai import DocumentAiParser
 
 settings = get_settings()
 
@@ -23,77 +24,35 @@ def parse_and_import():
         target_lines = {line.strip() for line in f.readlines()[4:] if line.strip()}
     print(f"Found {len(target_lines)} target lines.")
 
-    # --- 2. Load the Document AI JSON ---
-    print(f"Loading Document AI JSON from {json_path}...")
-    with open(json_path, "r", encoding="utf-8") as f:
-        doc_ai_data = json.load(f)
-    print("JSON loaded successfully.")
-
-    # --- 3. Build a map of all text segments and their coordinates ---
-    print("Building a map of all text segments from the document...")
+    # --- 2. Build a map of all text segments and their coordinates ---
+    # Records come from the parser's on-disk cache when the file was seen before.
+    print(f"Building a map of all text segments from {json_path}...")
     text_map = {}
-    for page_index, page in enumerate(doc_ai_data.get("pages", [])):
-        page_width = page.get("dimension", {}).get("width")
-        page_height = page.get("dimension", {}).get("height")
-        if not page_width or not page_height:
-            continue
-        for line in page.get("lines", []):
-            try:
-                start_index = int(
-                    line.get("layout", {})
-                    .get("textAnchor", {})
-                    .get("textSegments", [{}])[0]
-                    .get("startIndex", 0)
-                )
-                end_index = int(
-                    line.get("layout", {})
-                    .get("textAnchor", {})
-                    .get("textSegments", [{}])[0]
-                    .get("endIndex", 0)
-                )
-                line_text_content = doc_ai_data["text"][start_index:end_index].strip()
-            except (KeyError, IndexError, TypeError):
-                continue
-            normalized_text = line_text_content.replace('\\"', '"')
-            vertices = (
-                line.get("layout", {})
-                .get("boundingPoly", {})
-                .get("normalizedVertices", [])
-            )
-            if not vertices or not normalized_text:
-                continue
-            x_coords = [v.get("x", 0) * page_width for v in vertices]
-            y_coords = [v.get("y", 0) * page_height for v in vertices]
-            min_x, max_x = min(x_coords), max(x_coords)
-            min_y, max_y = min(y_coords), max(y_coords)
-            text_map[normalized_text] = {
-                "page": page_index + 1,
-                "x_coord": min_x,
-                "y_coord": min_y,
-                "width": max_x - min_x,
-                "height": max_y - min_y,
-            }
+    for batch in DocumentAiParser().iter_batches(json_path):
+        for row in batch.iter_dicts():
+            text_map[row.pop("text").replace('\\"', '"')] = row
     print(f"Mapped {len(text_map)} unique text segments.")
 
-    # --- 4. Find coordinates for target lines using the map ---
+    # --- 3. Find coordinates for target lines using the map ---
     print("Matching target lines against the text map...")
+    matcher = AhoCorasick(target_lines)
     found_lines_data = []
     unmatched_targets = set(target_lines)
     for text_key, coords in text_map.items():
-        for target in list(unmatched_targets):
-            if target in text_key:
-                line_data = {
-                    "text": target,
-                    "page": coords["page"],
-                    "x_coord": coords["x_coord"],
-                    "y_coord": coords["y_coord"],
-                    "width": coords["width"],
-                    "height": coords["height"],
-                }
-                found_lines_data.append(line_data)
-                print(f"  - Matched '{target}' within '{text_key}'")
-                unmatched_targets.remove(target)
-                break
+        for match in matcher.iter_matches(text_key):
+            if match.pattern not in unmatched_targets:
+                continue
+            line_data = {
+                "text": match.pattern,
+                "page": coords["page"],
+                "x_coord": coords["x_coord"],
+                "y_coord": coords["y_coord"],
+                "width": coords["width"],
+                "height": coords["height"],
+            }
+            found_lines_data.append(line_data)
+            print(f"  - Matched '{match.pattern}' within '{text_key}' at [{match.start}:{match.end}]")
+            unmatched_targets.remove(match.pattern)
     print(f"Successfully extracted data for {len(found_lines_data)} lines.")
     if unmatched_targets:
         print("Warning: The following targets could not be matched:")
@@ -103,7 +62,7 @@ def parse_and_import():
         print("No line data was extracted. Aborting API call.")
         return
 
-    # --- 5. Send data to the backend ---
+    # --- 4. Send data to the backend ---
     print(f"Sending {len(found_lines_data)} records to the API at {api_url}...")
     payload = {"line_numbers": found_lines_data}
     try:
@@ -1,3 +1,4 @@
+import argparse
 import os
 
 from sqlalchemy.orm import Session
@@ -7,13 +8,17 @@ from backend.database import get_session
 from backend.ocr import load_parser
 from backend.config import get_settings
 
-parser = load_parser(get_settings().ocr_parser)
-
 def get_db():
     with get_session() as db:
         yield db
 
-def populate_line_numbers_from_file(db: Session, document_id: int, ground_truth_file: str, ocr_results_file: str):
+def populate_line_numbers_from_file(
+    db: Session,
+    document_id: int,
+    ground_truth_file: str,
+    ocr_results_file: str,
+    max_distance: int = 0,
+):
     """
     Populates the line_numbers table by matching text from a ground truth file
     with coordinates from the ocr_results table.
@@ -31,23 +36,52 @@ def populate_line_numbers_from_file(db: Session, document_id: int, ground_truth_
         return
 
     # 2. Create line number entries from existing OCR results
-    lines_created_count = parser.create_line_numbers(db, true_lines, document_id)
+    parser = load_parser(get_settings().ocr_parser)
+    lines_created_count = parser.create_line_numbers(db, true_lines, document_id, max_distance=max_distance)
     print(f"Successfully created {lines_created_count} new entries in the line_numbers table.")
 
 
+def populate_line_numbers_by_discovery(db: Session, document_id: int):
+    """
+    Populates the line_numbers table by scanning all OCR results of the document
+    against the configured line-number grammars. No ground truth file is needed.
+    """
+    print("Starting line number discovery...")
+    parser = load_parser(get_settings().ocr_parser)
+    lines_created_count = parser.discover_line_numbers(db, document_id)
+    print(f"Discovered {lines_created_count} line numbers in the line_numbers table.")
+
+
 if __name__ == "__main__":
+    arg_parser = argparse.ArgumentParser(description="Populate the line_numbers table.")
+    # Assuming document with ID=1 exists from running populate_db.py
+    arg_parser.add_argument("--document-id", type=int, default=1)
+    arg_parser.add_argument(
+        "--discover",
+        action="store_true",
+        help="find line numbers with the configured grammars instead of a ground truth file",
+    )
+    arg_parser.add_argument(
+        "--max-distance",
+        type=int,
+        default=0,
+        help="also accept OCR text within this many edits of a ground truth line",
+    )
+    args = arg_parser.parse_args()
+
     with get_session() as db_session:
-        # Assuming document with ID=1 exists from running populate_db.py
-        doc_id = 1
-
-        # Define paths relative to the project root
-        truth_file = os.path.join('output', 'extracted_piping_lines.txt')
-        ocr_file = os.path.join('data', 'test_pid.pdf_processed.json')  # Used for populating ocr_results
-
-        populate_line_numbers_from_file(
-            db=db_session,
-            document_id=doc_id,
-            ground_truth_file=truth_file,
-            ocr_results_file=ocr_file,
-        )
+        if args.discover:
+            populate_line_numbers_by_discovery(db=db_session, document_id=args.document_id)
+        else:
+            # Define paths relative to the project root
+            truth_file = os.path.join('output', 'extracted_piping_lines.txt')
+            ocr_file = os.path.join('data', 'test_pid.pdf_processed.json')  # Used for populating ocr_results
+
+            populate_line_numbers_from_file(
+                db=db_session,
+                document_id=args.document_id,
+                ground_truth_file=truth_file,
+                ocr_results_file=ocr_file,
+                max_distance=args.max_distance,
+            )
 
@@ -1,11 +1,8 @@
 import os
 from backend.database import get_session
-from backend import crud
 from backend.ocr import load_parser
 from backend.config import get_settings
 
-parser = load_parser(get_settings().ocr_parser)
-
 # The ID of the document we are processing.
 DOCUMENT_ID = 1
 # Path to the text file containing the target line numbers.
@@ -15,19 +12,15 @@ TARGET_LINES_PATH = os.path.join(os.path.dirname(__file__), '..', 'data', 'extra
 
 def reimport_lines_from_db():
     """
-    Deletes all existing line numbers for a document and repopulates them
-    by filtering the existing OCR results from the database.
+    Re-matches the target line numbers against the existing OCR results of a
+    document and updates its line numbers incrementally. Line numbers whose
+    status is no longer 'pending' (reviewed by a human) are kept as they are.
     """
     with get_session() as db:
         print(f"Starting line number import from DB for document ID: {DOCUMENT_ID}")
     
         try:
-            # 1. Delete existing line numbers for the document
-            print(f"Deleting existing line numbers for document ID: {DOCUMENT_ID}...")
-            crud.delete_line_numbers_by_document(db=db, document_id=DOCUMENT_ID)
-            print("Existing line numbers deleted.")
-    
-            # 2. Read the target line numbers from the text file
+            # 1. Read the target line numbers from the text file
             print(f"Reading target line numbers from: {TARGET_LINES_PATH}")
             try:
                 with open(TARGET_LINES_PATH, 'r', encoding='utf-8') as f:
@@ -40,14 +33,19 @@ def reimport_lines_from_db():
                 print("No target line numbers found in the file.")
                 return
     
-            # 3. Create line numbers from existing OCR results
-            created = parser.create_line_numbers(db, target_texts, DOCUMENT_ID)
-            print(f"Successfully created {created} new line number entries.")
+            # 2. Diff the matches against the stored line numbers
+            parser = load_parser(get_settings().ocr_parser)
+            stats = parser.sync_line_numbers(db, target_texts, DOCUMENT_ID)
+            print(
+                f"Line numbers: {stats.inserted} added, {stats.updated} updated, {stats.deleted} deleted, "
+                f"{stats.unchanged} unchanged, {stats.kept} reviewed rows kept."
+            )
     
         except Exception as e:
             print(f"An error occurred during re-import: {e}")
         finally:
             print("Database session closed.")
-    
-    if __name__ == "__main__":
-        reimport_lines_from_db() 
+
+
+if __name__ == "__main__":
+    reimport_lines_from_db()
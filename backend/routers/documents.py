@@ -1,20 +1,107 @@
-from fastapi import APIRouter, Depends
+from typing import List, Optional
+
+from fastapi import APIRouter, Depends, Query, Request
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
 from backend import schemas
 from backend.services import DocumentService
-from backend.services.dependencies import get_db
+from backend.services.documents import NDJSON_MEDIA_TYPE, dump_rows
+from backend.services.geometry import GEOMETRY_COLUMNS, GEOMETRY_MEDIA_TYPE, accepts_geometry, encode_geometry
+from backend.services.dependencies import Database, get_db, iterate_db, run_cpu, run_db
+from backend.services.http_cache import cached_response
 
 router = APIRouter()
 
+def _dump_document(document) -> bytes:
+    return schemas.Document.model_validate(document).model_dump_json().encode()
+
+def _dump_summary(document) -> bytes:
+    return schemas.DocumentSummary.model_validate(document).model_dump_json().encode()
+
 @router.post("/documents/", response_model=schemas.Document)
-def create_document(document: schemas.DocumentCreate, db: Session = Depends(get_db)):
-    service = DocumentService(db)
-    return service.create_document(document)
+async def create_document(document: schemas.DocumentCreate, db: Database = Depends(get_db)):
+    def create(session: Session):
+        service = DocumentService(session)
+        return schemas.Document.model_validate(service.create_document(document))
+    return await run_db(db, create)
 
 @router.get("/doc/{doc_id}", response_model=schemas.Document)
-def read_document(doc_id: int, db: Session = Depends(get_db)):
-    service = DocumentService(db)
-    return service.get_document(doc_id)
+async def read_document(doc_id: int, request: Request, db: Database = Depends(get_db)):
+    def read(session: Session):
+        service = DocumentService(session)
+        version = service.get_version(doc_id)
+        return cached_response(
+            request, doc_id, version, "application/json",
+            lambda: run_cpu(_dump_document, service.get_document(doc_id)),
+        )
+    return await run_db(db, read)
+
+@router.get("/documents/{doc_id}", response_model=schemas.DocumentSummary)
+async def read_document_summary(doc_id: int, request: Request, db: Database = Depends(get_db)):
+    def read(session: Session):
+        service = DocumentService(session)
+        version = service.get_version(doc_id)
+        return cached_response(
+            request, doc_id, version, "application/json",
+            lambda: run_cpu(_dump_summary, service.get_summary(doc_id)),
+        )
+    return await run_db(db, read)
+
+
+async def _read_collection(
+    kind: str,
+    doc_id: int,
+    request: Request,
+    page: Optional[int],
+    skip: int,
+    limit: Optional[int],
+    format: Optional[str],
+    db: Database,
+):
+    accept = request.headers.get("accept", "")
+    if format == "ndjson" or (format is None and NDJSON_MEDIA_TYPE in accept):
+        chunks = await run_db(
+            db, lambda session: DocumentService(session).stream_rows(doc_id, kind, page=page, skip=skip, limit=limit)
+        )
+        return StreamingResponse(iterate_db(db, chunks), media_type=NDJSON_MEDIA_TYPE)
+
+    def read(session: Session):
+        service = DocumentService(session)
+        version = service.get_version(doc_id)
+        if format is None and accepts_geometry(accept):
+            def render():
+                rows = service.get_rows(doc_id, kind, page=page, skip=skip, limit=limit, columns=GEOMETRY_COLUMNS)
+                return run_cpu(encode_geometry, rows, doc_id)
+            return cached_response(request, doc_id, version, GEOMETRY_MEDIA_TYPE, render)
+        return cached_response(
+            request, doc_id, version, "application/json",
+            lambda: run_cpu(dump_rows, kind, service.get_rows(doc_id, kind, page=page, skip=skip, limit=limit)),
+        )
+    return await run_db(db, read)
+
+@router.get("/documents/{doc_id}/ocr_results", response_model=List[schemas.OcrResult])
+async def read_ocr_results(
+    doc_id: int,
+    request: Request,
+    page: Optional[int] = None,
+    skip: int = Query(0, ge=0),
+    limit: Optional[int] = Query(None, gt=0),
+    format: Optional[str] = Query(None, pattern="^(json|ndjson)$", description="ndjson streams one row per line"),
+    db: Database = Depends(get_db),
+):
+    return await _read_collection("ocr_results", doc_id, request, page, skip, limit, format, db)
+
+@router.get("/documents/{doc_id}/line_numbers", response_model=List[schemas.LineNumber])
+async def read_line_numbers(
+    doc_id: int,
+    request: Request,
+    page: Optional[int] = None,
+    skip: int = Query(0, ge=0),
+    limit: Optional[int] = Query(None, gt=0),
+    format: Optional[str] = Query(None, pattern="^(json|ndjson)$", description="ndjson streams one row per line"),
+    db: Database = Depends(get_db),
+):
+    return await _read_collection("line_numbers", doc_id, request, page, skip, limit, format, db)
 
 
 @router.get("/")
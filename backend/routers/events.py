@@ -0,0 +1,29 @@
+from typing import Optional
+
+from fastapi import APIRouter, Depends, Header, Query
+from fastapi.responses import StreamingResponse
+
+from backend.services.events import EventBroker, get_broker, open_stream
+
+router = APIRouter()
+
+@router.get("/documents/{doc_id}/events")
+async def stream_document_events(
+    doc_id: int,
+    last_event_id: Optional[int] = Query(None, description="Replay the events after this id"),
+    last_event_id_header: Optional[int] = Header(None, alias="Last-Event-ID"),
+    broker: EventBroker = Depends(get_broker),
+):
+    """Server-Sent Events of the document's changes: ``rows``, ``page``, ``job`` and ``reset``.
+
+    ``EventSource`` sends ``Last-Event-ID`` when it reconnects.
+    """
+    if last_event_id_header is not None:
+        last_event_id = last_event_id_header
+    body = await open_stream(broker, doc_id, last_event_id)
+    return StreamingResponse(
+        body,
+        media_type="text/event-stream",
+        # Proxies must pass each event on as it comes.
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
@@ -0,0 +1,34 @@
+from typing import Optional
+
+from fastapi import APIRouter, Depends, Query, Request, Response
+
+from backend import schemas
+from backend.config import get_settings
+from backend.services import JobService
+from backend.services.dependencies import Database, get_db, run_db
+from backend.services.uploads import spool_upload
+
+router = APIRouter()
+
+@router.post("/documents/{doc_id}/jobs", response_model=schemas.Job, status_code=202)
+async def enqueue_ocr_file(
+    doc_id: int,
+    request: Request,
+    response: Response,
+    parser: Optional[str] = Query(None, description="OCR parser; the OCR_PARSER setting if omitted"),
+    db: Database = Depends(get_db),
+):
+    """Queue a raw OCR file for import by a worker; poll ``GET /jobs/{id}`` for its progress."""
+    parser = await run_db(db, lambda session: JobService(session).check_enqueue(doc_id, parser))
+    spool = await spool_upload(request, get_settings().job_dir)
+    try:
+        job = await run_db(db, lambda session: JobService(session).enqueue(doc_id, parser, spool.path))
+    except BaseException:
+        spool.discard()
+        raise
+    response.headers["Location"] = f"/jobs/{job.id}"
+    return job
+
+@router.get("/jobs/{job_id}", response_model=schemas.Job)
+async def read_job(job_id: int, db: Database = Depends(get_db)):
+    return await run_db(db, lambda session: JobService(session).get_job(job_id))
@@ -1,12 +1,66 @@
-from fastapi import APIRouter, Depends
+from typing import List, Optional
+
+from fastapi import APIRouter, Depends, Query, Request
 from sqlalchemy.orm import Session
 from backend import schemas
-from backend.services import LineService
-from backend.services.dependencies import get_db
+from backend.services import DocumentService, LineService, ViewportService
+from backend.services.dependencies import Database, get_db, run_cpu, run_db
+from backend.services.documents import dump_rows
+from backend.services.events import EventBroker, get_broker
+from backend.services.geometry import GEOMETRY_COLUMNS, GEOMETRY_MEDIA_TYPE, accepts_geometry, encode_geometry
+from backend.services.http_cache import cached_response
 
 router = APIRouter()
 
 @router.patch("/line/{line_id}", response_model=schemas.LineNumber)
-def update_line(line_id: int, text: str, status: str, db: Session = Depends(get_db)):
-    service = LineService(db)
-    return service.update_line(line_id, text, status)
+async def update_line(
+    line_id: int,
+    text: str,
+    status: str,
+    db: Database = Depends(get_db),
+    broker: EventBroker = Depends(get_broker),
+):
+    def update(session: Session):
+        service = LineService(session)
+        return schemas.LineNumber.model_validate(service.update_line(line_id, text, status))
+    line = await run_db(db, update)
+    broker.notify()
+    return line
+
+@router.patch("/lines", response_model=List[schemas.LineNumber])
+async def update_lines(
+    corrections: List[schemas.RowCorrection],
+    db: Database = Depends(get_db),
+    broker: EventBroker = Depends(get_broker),
+):
+    def update(session: Session):
+        return [schemas.LineNumber.model_validate(row) for row in LineService(session).update_lines(corrections)]
+    lines = await run_db(db, update)
+    broker.notify()
+    return lines
+
+@router.get("/documents/{doc_id}/pages/{page}/lines", response_model=List[schemas.LineNumber])
+async def read_page_line_numbers(
+    doc_id: int,
+    page: int,
+    request: Request,
+    bbox: Optional[str] = Query(None, description="Viewport x0,y0,x1,y1 in page units; whole page if omitted"),
+    limit: Optional[int] = Query(None, gt=0),
+    db: Database = Depends(get_db),
+):
+    def read(session: Session):
+        service = ViewportService(session)
+        version = DocumentService(session).get_version(doc_id)
+        # Every viewport is a different body: only whole pages are worth keeping.
+        store = bbox is None
+        if accepts_geometry(request.headers.get("accept")):
+            def render():
+                rows = service.get_boxes(doc_id, page, bbox=bbox, kind="line_numbers", limit=limit, columns=GEOMETRY_COLUMNS)
+                return run_cpu(encode_geometry, rows, doc_id)
+            return cached_response(request, doc_id, version, GEOMETRY_MEDIA_TYPE, render, store=store)
+        return cached_response(
+            request, doc_id, version, "application/json",
+            lambda: run_cpu(dump_rows, "line_numbers", service.get_boxes(doc_id, page, bbox=bbox, kind="line_numbers", limit=limit)),
+            store=store,
+        )
+    return await run_db(db, read)
@@ -1,12 +1,114 @@
-from fastapi import APIRouter, Depends
+from typing import List, Optional
+
+from fastapi import APIRouter, Depends, Query, Request
 from sqlalchemy.orm import Session
 
-from backend.services import OcrService
-from backend.services.dependencies import get_db
+from backend import schemas
+from backend.services import DocumentService, FuzzyService, LodService, OcrService, SearchService, ViewportService
+from backend.services.dependencies import Database, get_db, run_cpu, run_db
+from backend.services.documents import dump_rows
+from backend.services.events import EventBroker, get_broker
+from backend.services.geometry import GEOMETRY_COLUMNS, GEOMETRY_MEDIA_TYPE, accepts_geometry, encode_geometry
+from backend.services.http_cache import cached_response
+from backend.services.uploads import ingest_upload
 
 router = APIRouter()
 
 @router.post("/documents/{doc_id}/parse-json")
-def parse_json_for_document(doc_id: int, data: dict, db: Session = Depends(get_db)):
-    service = OcrService(db)
-    return service.parse_json(doc_id, data)
+async def parse_json_for_document(
+    doc_id: int, data: dict, db: Database = Depends(get_db), broker: EventBroker = Depends(get_broker)
+):
+    result = await run_db(db, lambda session: OcrService(session).parse_json(doc_id, data))
+    broker.notify()
+    return result
+
+@router.post("/documents/{doc_id}/upload")
+async def upload_ocr_file(
+    doc_id: int,
+    request: Request,
+    parser: Optional[str] = Query(None, description="OCR parser; the OCR_PARSER setting if omitted"),
+    db: Database = Depends(get_db),
+    broker: EventBroker = Depends(get_broker),
+):
+    await run_db(db, lambda session: DocumentService(session).get_version(doc_id))
+    result = await ingest_upload(
+        request, lambda spool: run_db(db, lambda session: OcrService(session).parse_upload(doc_id, spool, parser)),
+    )
+    broker.notify()
+    return result
+
+@router.patch("/ocr_results", response_model=List[schemas.OcrResult])
+async def update_ocr_results(
+    corrections: List[schemas.RowCorrection],
+    db: Database = Depends(get_db),
+    broker: EventBroker = Depends(get_broker),
+):
+    def update(session: Session):
+        return [schemas.OcrResult.model_validate(row) for row in OcrService(session).update_results(corrections)]
+    results = await run_db(db, update)
+    broker.notify()
+    return results
+
+@router.get("/documents/{doc_id}/pages/{page}/lod", response_model=schemas.PageLod)
+async def read_page_lod(
+    doc_id: int,
+    page: int,
+    zoom: float = Query(..., gt=0, description="Screen pixels per page unit"),
+    kind: str = "ocr_results",
+    cell_px: int = Query(32, gt=0, description="Target cell size in screen pixels"),
+    db: Database = Depends(get_db),
+):
+    return await run_db(
+        db, lambda session: LodService(session).get_clusters(doc_id, page, zoom, kind=kind, cell_px=cell_px)
+    )
+
+@router.get("/documents/{doc_id}/pages/{page}/ocr", response_model=List[schemas.OcrResult])
+async def read_page_ocr_results(
+    doc_id: int,
+    page: int,
+    request: Request,
+    bbox: Optional[str] = Query(None, description="Viewport x0,y0,x1,y1 in page units; whole page if omitted"),
+    limit: Optional[int] = Query(None, gt=0),
+    db: Database = Depends(get_db),
+):
+    def read(session: Session):
+        service = ViewportService(session)
+        version = DocumentService(session).get_version(doc_id)
+        # Every viewport is a different body: only whole pages are worth keeping.
+        store = bbox is None
+        if accepts_geometry(request.headers.get("accept")):
+            def render():
+                rows = service.get_boxes(doc_id, page, bbox=bbox, kind="ocr_results", limit=limit, columns=GEOMETRY_COLUMNS)
+                return run_cpu(encode_geometry, rows, doc_id)
+            return cached_response(request, doc_id, version, GEOMETRY_MEDIA_TYPE, render, store=store)
+        return cached_response(
+            request, doc_id, version, "application/json",
+            lambda: run_cpu(dump_rows, "ocr_results", service.get_boxes(doc_id, page, bbox=bbox, kind="ocr_results", limit=limit)),
+            store=store,
+        )
+    return await run_db(db, read)
+
+@router.get("/search/fuzzy", response_model=List[schemas.FuzzyMatch])
+async def fuzzy_search(
+    text: str,
+    max_distance: int = Query(1, ge=0, le=3, description="Maximum edit distance between canonical keys"),
+    document_id: Optional[int] = None,
+    kind: str = "ocr_results",
+    limit: int = Query(50, gt=0, le=1000),
+    db: Database = Depends(get_db),
+):
+    return await run_db(
+        db,
+        lambda session: FuzzyService(session).search(
+            text, max_distance=max_distance, document_id=document_id, kind=kind, limit=limit
+        ),
+    )
+
+@router.get("/search/text", response_model=List[schemas.TextSearchHit])
+async def text_search(
+    text: str = Query(..., description="Part of the text to find, at least 3 characters"),
+    document_id: Optional[int] = None,
+    limit: int = Query(50, gt=0, le=1000),
+    db: Database = Depends(get_db),
+):
+    return await run_db(db, lambda session: SearchService(session).search(text, document_id=document_id, limit=limit))
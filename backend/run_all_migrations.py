@@ -1,4 +1,3 @@
-import json
 import os
 
 from backend import crud, schemas
@@ -6,8 +5,6 @@ from backend.database import get_session
 from backend.ocr import load_parser
 from backend.config import get_settings
 
-parser = load_parser(get_settings().ocr_parser)
-
 def parse_and_populate_all():
     """
     Parses the complex Google Document AI JSON and populates the database.
@@ -31,36 +28,34 @@ def parse_and_populate_all():
             else:
                 print(f"Using existing document with ID: {DOCUMENT_ID}")
             
-            # --- Step 2: Clear Existing Data for a Clean Slate ---
-            print(f"Deleting existing ocr_results for document ID: {DOCUMENT_ID}...")
-            crud.delete_ocr_results_by_document(db=db, document_id=DOCUMENT_ID)
-            print(f"Deleting existing line_numbers for document ID: {DOCUMENT_ID}...")
-            crud.delete_line_numbers_by_document(db=db, document_id=DOCUMENT_ID)
-            print("Existing data cleared.")
-    
-            # --- Step 3: Load the Document AI JSON and populate OCR results ---
-            print(f"Loading Document AI JSON from {json_path}...")
-            try:
-                doc_ai_data = parser.parse(json_path)
-            except FileNotFoundError:
+            # --- Step 2: Load the Document AI JSON and populate OCR results ---
+            # The path is handed to the parser as is: with the record cache
+            # enabled, a file imported before is not parsed again.
+            print(f"Reading Document AI JSON from {json_path}...")
+            if not os.path.exists(json_path):
                 print(f"FATAL: JSON file not found at {json_path}")
                 return
-            except json.JSONDecodeError as e:
-                print(f"FATAL: Invalid JSON format: {e}")
-                return
-            print("JSON loaded successfully.")
     
-            created_count = parser.create_ocr_results(db, doc_ai_data, DOCUMENT_ID)
-            print(f"Populated ocr_results table with {created_count} entries.")
+            # Unchanged pages are skipped and hand-corrected rows are kept.
+            parser = load_parser(get_settings().ocr_parser)
+            stats = parser.sync_ocr_results(db, json_path, DOCUMENT_ID)
+            print(
+                f"ocr_results: {stats.pages_changed} pages changed, {stats.pages_skipped} unchanged; "
+                f"{stats.inserted} added, {stats.updated} updated, {stats.deleted} deleted, "
+                f"{stats.kept} corrected rows kept."
+            )
     
-            # --- Step 5: Populate line_numbers from ground truth ---
+            # --- Step 3: Populate line_numbers from ground truth ---
             print("\nPopulating line_numbers table from ground truth file...")
             truth_file_path = os.path.join('output', 'extracted_piping_lines.txt')
             with open(truth_file_path, 'r') as f:
                 target_lines = [line.strip() for line in f.readlines()[4:] if line.strip()]
     
-            lines_created_count = parser.create_line_numbers(db, target_lines, DOCUMENT_ID)
-            print(f"Successfully created {lines_created_count} entries in line_numbers table.")
+            stats = parser.sync_line_numbers(db, target_lines, DOCUMENT_ID)
+            print(
+                f"line_numbers: {stats.inserted} added, {stats.updated} updated, {stats.deleted} deleted, "
+                f"{stats.kept} reviewed rows kept."
+            )
     
             print("\n--- Import Complete ---")
     
@@ -72,4 +67,5 @@ def parse_and_populate_all():
             print("Database session closed.")
     
 if __name__ == "__main__":
-parse_and_populate_all() 
+    parse_and_populate_all()
+
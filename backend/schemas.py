@@ -43,6 +43,12 @@ class LineNumber(LineNumberBase):
     class Config:
         from_attributes = True
 
+class RowCorrection(BaseModel):
+    """One reviewed row of a batch correction of line numbers or OCR results."""
+    id: int
+    text: str
+    status: str
+
 # --- Document Schemas ---
 class DocumentBase(BaseModel):
     file_name: str
@@ -53,11 +59,78 @@ class DocumentBase(BaseModel):
 class DocumentCreate(DocumentBase):
     pass
 
-class Document(DocumentBase):
+class DocumentSummary(DocumentBase):
     id: int
     imported_at: datetime
+    version: int = 1
+
+    class Config:
+        from_attributes = True
+
+class Document(DocumentSummary):
     line_numbers: List[LineNumber] = []
     ocr_results: List[OcrResult] = []
 
+# --- Level-of-detail Schemas ---
+class LodCluster(BaseModel):
+    x_coord: float
+    y_coord: float
+    width: float
+    height: float
+    count: int
+    text: Optional[str] = None
+
+class PageLod(BaseModel):
+    document_id: int
+    page: int
+    kind: str
+    level: int
+    cell_size: float
+    total: int
+    clusters: List[LodCluster] = []
+
+# --- Fuzzy search Schemas ---
+class FuzzyMatch(BaseModel):
+    id: int
+    document_id: int
+    page: int
+    text: Optional[str] = None
+    text_key: Optional[str] = None
+    distance: int
+    x_coord: float
+    y_coord: float
+    width: float
+    height: float
+
+# --- Text search Schemas ---
+class TextSearchHit(BaseModel):
+    id: int
+    document_id: int
+    file_name: Optional[str] = None
+    page: Optional[int] = None
+    text: Optional[str] = None
+    score: float
+    x_coord: Optional[float] = None
+    y_coord: Optional[float] = None
+    width: Optional[float] = None
+    height: Optional[float] = None
+
+# --- Ingest job Schemas ---
+class Job(BaseModel):
+    """An OCR file import run by a worker; the counters grow page by page."""
+    id: int
+    document_id: int
+    parser: str
+    status: str
+    attempts: int
+    pages_done: int
+    rows_inserted: int
+    rows_updated: int
+    rows_deleted: int
+    error: Optional[str] = None
+    created_at: Optional[datetime] = None
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+
     class Config:
-        from_attributes = True 
\ No newline at end of file
+        from_attributes = True
@@ -1,9 +1,19 @@
 from .documents import DocumentService
+from .fuzzy import FuzzyService
+from .jobs import JobService
 from .lines import LineService
+from .lod import LodService
 from .ocr import OcrService
+from .search import SearchService
+from .viewport import ViewportService
 
 __all__ = [
     "DocumentService",
+    "FuzzyService",
+    "JobService",
     "LineService",
+    "LodService",
     "OcrService",
+    "SearchService",
+    "ViewportService",
 ]
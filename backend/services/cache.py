@@ -0,0 +1,57 @@
+"""In-memory caches for derived data that must follow database writes."""
+
+import threading
+from collections import OrderedDict
+from typing import Any, Hashable, Optional, Tuple
+
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+
+from backend import crud, models
+from backend.config import get_settings
+
+
+def documents_signature(db: Session, document_id: Optional[int] = None) -> Optional[Any]:
+    """Fingerprint of the rows of a document, or of all documents, that every write changes.
+
+    Writes bump ``Document.version`` in their transaction (see
+    :func:`backend.crud.touch_document`). Documents are never deleted, so
+    the sum of the versions grows with every write too. Returns ``None``
+    for an unknown document.
+    """
+    if document_id is not None:
+        return crud.get_document_version(db, document_id)
+    return tuple(db.execute(select(func.count(models.Document.id), func.sum(models.Document.version))).one())
+
+
+class SignatureCache:
+    """Thread-safe LRU whose entries are only valid for a matching signature.
+
+    The signature is a cheap fingerprint of the source rows (e.g. the
+    document's version); a lookup with a different signature misses.
+    The capacity is read from the ``size_setting`` field of the settings.
+    """
+
+    def __init__(self, size_setting: str):
+        self.size_setting = size_setting
+        self._entries: "OrderedDict[Hashable, Tuple[Any, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable, signature: Any) -> Optional[Any]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] != signature:
+                return None
+            self._entries.move_to_end(key)
+            return entry[1]
+
+    def put(self, key: Hashable, signature: Any, value: Any) -> None:
+        with self._lock:
+            self._entries[key] = (signature, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > getattr(get_settings(), self.size_setting):
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
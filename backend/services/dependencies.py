@@ -1,5 +1,98 @@
-from backend.database import get_session
+"""Database sessions for request handlers.
 
-def get_db():
-    with get_session() as db:
-        yield db
+Handlers are ``async def`` and pass their database work to :func:`run_db` as
+a function of a sync ``Session``, so services and ``crud`` exist once. With
+``DATABASE_ASYNC`` unset, the function runs in the threadpool, as sync
+handlers did. With it set, the request gets an ``AsyncSession`` and the
+function runs on the event loop through ``AsyncSession.run_sync``: every
+statement awaits the asyncio driver, so a waiting request holds no thread and
+concurrency is bounded by the connection pool instead of the threadpool.
+CPU-bound steps of that function (rendering, compression, parsing) go
+through :func:`run_cpu` or :func:`iterate_cpu`, which leave the event loop
+for the threadpool while they run.
+"""
+
+from typing import Callable, Iterable, Iterator, TypeVar, Union
+
+from fastapi.concurrency import contextmanager_in_threadpool, run_in_threadpool
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+from sqlalchemy.util.concurrency import await_only, greenlet_spawn, in_greenlet
+
+from backend.config import get_settings
+from backend.database import get_async_session, get_session
+
+Database = Union[Session, AsyncSession]
+
+T = TypeVar("T")
+
+
+async def get_db():
+    if get_settings().database_async:
+        async with get_async_session() as db:
+            yield db
+    else:
+        # As FastAPI runs sync dependencies: the close must not wait for a
+        # threadpool slot, which requests waiting on the pool may all hold.
+        async with contextmanager_in_threadpool(get_session()) as db:
+            yield db
+
+
+async def run_db(db: Database, function: Callable[[Session], T]) -> T:
+    """Call ``function`` with the sync session behind ``db``.
+
+    The result must not lazy-load anything afterwards: on an ``AsyncSession``
+    that only works inside ``function``. Return schemas or loaded rows.
+    """
+    if isinstance(db, AsyncSession):
+        return await db.run_sync(function)
+    return await run_in_threadpool(function, db)
+
+
+def run_cpu(function: Callable[..., T], *args) -> T:
+    """Call ``function(*args)`` without holding up the event loop.
+
+    For CPU-bound work inside a function given to :func:`run_db`. On an
+    ``AsyncSession`` that function runs on the event loop, so ``function``
+    is sent to the threadpool and awaited there; elsewhere it is already on
+    a thread and is called directly. ``function`` must not use the session.
+    """
+    if in_greenlet():
+        return await_only(run_in_threadpool(function, *args))
+    return function(*args)
+
+
+def iterate_cpu(items: Iterable[T]) -> Iterator[T]:
+    """Iterate ``items`` with each step taken through :func:`run_cpu`."""
+    items = iter(items)
+    done = object()
+    try:
+        while (item := run_cpu(next, items, done)) is not done:
+            yield item
+    finally:
+        close = getattr(items, "close", None)
+        if close is not None:
+            close()
+
+
+def iterate_db(db: Database, chunks: Iterator[T]):
+    """Adapt a body iterator that reads from the database for a streamed response.
+
+    Sync sessions leave the iterator to Starlette's threadpool. For an
+    ``AsyncSession`` each step, and the final close, runs where the asyncio
+    driver can be awaited.
+    """
+    if not isinstance(db, AsyncSession):
+        return chunks
+    return _aiterate(chunks)
+
+
+async def _aiterate(chunks: Iterator[T]):
+    done = object()
+    try:
+        while (chunk := await greenlet_spawn(next, chunks, done)) is not done:
+            yield chunk
+    finally:
+        close = getattr(chunks, "close", None)
+        if close is not None:
+            await greenlet_spawn(close)
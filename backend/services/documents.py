@@ -1,6 +1,33 @@
-from sqlalchemy.orm import Session
+import json
+from typing import Iterator, List, Optional
+
 from fastapi import HTTPException
-from backend import crud, schemas
+from pydantic import TypeAdapter
+from pydantic_core import to_jsonable_python
+from sqlalchemy.orm import Session
+
+from backend import crud, models, schemas
+
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+
+# Per-document collections served by their own endpoints.
+DOCUMENT_COLLECTIONS = {
+    "ocr_results": (models.OcrResult, schemas.OcrResult),
+    "line_numbers": (models.LineNumber, schemas.LineNumber),
+}
+
+# Renders a collection's rows as its endpoint's response model would.
+ROW_ADAPTERS = {kind: TypeAdapter(List[schema]) for kind, (_, schema) in DOCUMENT_COLLECTIONS.items()}
+
+def dump_rows(kind: str, rows) -> bytes:
+    adapter = ROW_ADAPTERS[kind]
+    return adapter.dump_json(adapter.validate_python(rows, from_attributes=True))
+
+def _ndjson_line(row: dict) -> str:
+    # Same encoding as FastAPI's JSONResponse; datetimes as pydantic dumps them.
+    return json.dumps(
+        row, default=to_jsonable_python, ensure_ascii=False, allow_nan=False, separators=(",", ":")
+    ) + "\n"
 
 class DocumentService:
     def __init__(self, db: Session):
@@ -15,3 +42,55 @@ class DocumentService:
             raise HTTPException(status_code=404, detail="Document not found")
         return document
 
+    def get_summary(self, document_id: int):
+        document = crud.get_document_summary(self.db, document_id)
+        if document is None:
+            raise HTTPException(status_code=404, detail="Document not found")
+        return document
+
+    def get_version(self, document_id: int) -> int:
+        version = crud.get_document_version(self.db, document_id)
+        if version is None:
+            raise HTTPException(status_code=404, detail="Document not found")
+        return version
+
+    def _collection(self, document_id: int, kind: str):
+        if kind not in DOCUMENT_COLLECTIONS:
+            raise HTTPException(status_code=422, detail=f"Unknown kind '{kind}'")
+        if not crud.document_exists(self.db, document_id):
+            raise HTTPException(status_code=404, detail="Document not found")
+        return DOCUMENT_COLLECTIONS[kind]
+
+    def get_rows(
+        self,
+        document_id: int,
+        kind: str,
+        page: Optional[int] = None,
+        skip: int = 0,
+        limit: Optional[int] = None,
+        columns: Optional[List[str]] = None,
+    ):
+        model, _ = self._collection(document_id, kind)
+        return crud.get_document_rows(
+            self.db, model, document_id, page=page, skip=skip, limit=limit, columns=columns
+        )
+
+    def stream_rows(
+        self, document_id: int, kind: str, page: Optional[int] = None, skip: int = 0, limit: Optional[int] = None
+    ) -> Iterator[bytes]:
+        """Return the rows as NDJSON chunks, one chunk per cursor fetch.
+
+        The document is checked here, so a 404 is raised before the stream
+        starts. Lines carry the fields of the collection's response schema.
+        """
+        model, schema = self._collection(document_id, kind)
+        return self._iter_ndjson(model, list(schema.model_fields), document_id, page, skip, limit)
+
+    def _iter_ndjson(self, model, columns, document_id, page, skip, limit) -> Iterator[bytes]:
+        # The request's session is closed once the endpoint returns, before
+        # the body is sent, so the stream reads through a session of its own.
+        with Session(bind=self.db.get_bind()) as db:
+            for rows in crud.iter_document_rows(
+                db, model, columns, document_id, page=page, skip=skip, limit=limit
+            ):
+                yield "".join(_ndjson_line(row) for row in rows).encode()
@@ -0,0 +1,255 @@
+"""Per-document event streams (``GET /documents/{doc_id}/events``).
+
+Writes record what they changed in ``document_events``, in their own
+transaction (:func:`backend.crud.add_document_event`). One
+:class:`EventBroker` per web process reads the new rows with a single query
+for all documents and puts each event, formatted once, on the asyncio
+queues of its document's subscribers. An idle subscriber costs a queue and a
+suspended coroutine: no thread, connection, timer or query of its own. The
+broker reads as soon as a request of its process wrote an event
+(:meth:`EventBroker.notify`) and every ``events_poll_interval`` otherwise,
+for the writes of ingest workers and other processes.
+
+Event ids are taken when a transaction inserts its event, but become visible
+when it commits. On PostgreSQL a transaction can take an id and commit after
+a later id was already read. The broker therefore remembers the ids it skipped
+and looks them up again on every read for ``GAP_SECONDS``. Ids that never
+appear belong to transactions that rolled back.
+
+A failed read (a locked or unreachable database) is logged and retried after
+a growing delay; streams keep receiving keepalives meanwhile.
+"""
+
+import asyncio
+import logging
+import time
+from collections import defaultdict
+from datetime import datetime, timedelta, timezone
+from typing import AsyncIterator, Callable, Dict, List, Optional, Set, Tuple
+
+from fastapi import HTTPException
+from fastapi.concurrency import run_in_threadpool
+
+from backend import crud
+from backend.config import get_settings
+from backend.database import get_session
+
+logger = logging.getLogger(__name__)
+
+# Events a subscriber may fall behind by before its stream is closed; the
+# client reconnects and catches up from the table.
+MAX_QUEUED = 1000
+# Put on a subscriber's queue when it fell too far behind.
+OVERFLOW = None
+# Put on every queue each ``events_keepalive_seconds``, so that proxies and
+# clients see that idle streams are alive.
+KEEPALIVE = ": keepalive\n\n"
+# Seconds between two prunes of expired events.
+PRUNE_INTERVAL = 60
+# Events read per query.
+READ_LIMIT = 1000
+# Seconds a skipped event id is looked for before it is given up on, and how
+# many skipped ids are kept at most.
+GAP_SECONDS = 300
+MAX_GAPS = 10000
+# Most seconds between two reads after consecutive failures; below the
+# keepalive interval, so streams still get their keepalives on time.
+MAX_RETRY_DELAY = 10
+
+Frame = Tuple[int, str]
+
+
+def format_event(event_id: int, kind: str, payload: str) -> str:
+    return f"id: {event_id}\nevent: {kind}\ndata: {payload}\n\n"
+
+
+class EventBroker:
+    """Fans the rows of ``document_events`` out to the subscribers of this process."""
+
+    def __init__(self, sessions: Callable = get_session):
+        self.sessions = sessions
+        self.last_id = 0
+        # Skipped ids below ``last_id``, with the time they are given up at.
+        self._gaps: Dict[int, float] = {}
+        self._subscribers: Dict[int, Set[asyncio.Queue]] = defaultdict(set)
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._wake: Optional[asyncio.Event] = None
+        self._task: Optional[asyncio.Task] = None
+        self._lock: Optional[asyncio.Lock] = None
+        self._pruned = 0.0
+        self._keepalive_at = 0.0
+
+    async def subscribe(self, document_id: int) -> Tuple[asyncio.Queue, int]:
+        """Return a queue of the ``(id, frame)`` pairs of the document's next events.
+
+        Also returns the id of the last event before them.
+        """
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            self._loop, self._wake, self._lock, self._task = loop, asyncio.Event(), asyncio.Lock(), None
+        async with self._lock:
+            if self._task is None or self._task.done():
+                self.last_id = await run_in_threadpool(self._read_last_id)
+                self._task = loop.create_task(self._run())
+        queue: asyncio.Queue = asyncio.Queue()
+        self._subscribers[document_id].add(queue)
+        return queue, self.last_id
+
+    def unsubscribe(self, document_id: int, queue: asyncio.Queue) -> None:
+        queues = self._subscribers.get(document_id)
+        if queues is not None:
+            queues.discard(queue)
+            if not queues:
+                del self._subscribers[document_id]
+
+    def notify(self) -> None:
+        """Read new events now rather than at the next poll; callable from any thread."""
+        loop, wake = self._loop, self._wake
+        if loop is not None and wake is not None and not loop.is_closed():
+            loop.call_soon_threadsafe(wake.set)
+
+    def _read_last_id(self) -> int:
+        with self.sessions() as db:
+            return crud.get_last_event_id(db)
+
+    def _read(self, after_id: int, gaps: List[int]) -> Tuple[List[tuple], List[tuple]]:
+        """Events of ``gaps`` that committed since, and the events after ``after_id``."""
+        with self.sessions() as db:
+            settings = get_settings()
+            if time.monotonic() - self._pruned > PRUNE_INTERVAL:
+                self._pruned = time.monotonic()
+                crud.prune_events(db, datetime.now(timezone.utc) - timedelta(seconds=settings.events_retention_seconds))
+            return crud.get_events_by_id(db, gaps), crud.get_events(db, after_id, limit=READ_LIMIT)
+
+    def _track(self, event_id: int) -> bool:
+        """Move the cursor past ``event_id``; False if it was delivered already."""
+        now = time.monotonic()
+        if event_id in self._gaps:
+            del self._gaps[event_id]
+            return True
+        if event_id <= self.last_id:
+            return False
+        for skipped in range(max(self.last_id + 1, event_id - MAX_GAPS), event_id):
+            self._gaps[skipped] = now + GAP_SECONDS
+        self.last_id = event_id
+        return True
+
+    def _expire_gaps(self) -> None:
+        now = time.monotonic()
+        live = sorted(event_id for event_id, expires in self._gaps.items() if expires > now)[-MAX_GAPS:]
+        self._gaps = {event_id: self._gaps[event_id] for event_id in live}
+
+    async def _run(self) -> None:
+        failures = 0
+        while self._subscribers:
+            poll_interval = get_settings().events_poll_interval
+            try:
+                if failures:
+                    # Back off; a notify() would only retry at once.
+                    await asyncio.sleep(min(MAX_RETRY_DELAY, poll_interval * 2 ** failures))
+                else:
+                    await asyncio.wait_for(self._wake.wait(), poll_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wake.clear()
+            self._expire_gaps()
+            try:
+                late, new = await run_in_threadpool(self._read, self.last_id, list(self._gaps))
+            except Exception:
+                failures += 1
+                logger.exception("Could not read document events (%d failures in a row)", failures)
+                late, new = [], []
+            else:
+                failures = 0
+            for event in late + new:
+                if not self._track(event.id):
+                    continue
+                queues = self._subscribers.get(event.document_id)
+                if not queues:
+                    continue
+                frame = (event.id, format_event(event.id, event.kind, event.payload))
+                for queue in list(queues):
+                    if queue.qsize() >= MAX_QUEUED:
+                        self.unsubscribe(event.document_id, queue)
+                        queue.put_nowait(OVERFLOW)
+                    else:
+                        queue.put_nowait(frame)
+            if len(new) == READ_LIMIT:
+                self._wake.set()  # there may be more already
+            if time.monotonic() >= self._keepalive_at:
+                self._keepalive_at = time.monotonic() + get_settings().events_keepalive_seconds
+                for queues in self._subscribers.values():
+                    for queue in queues:
+                        queue.put_nowait(KEEPALIVE)
+
+
+broker = EventBroker()
+
+
+def get_broker() -> EventBroker:
+    return broker
+
+
+def _replay(broker: EventBroker, document_id: int, after_id: int) -> Optional[List[Frame]]:
+    """Events of the document after ``after_id``; None if some of them were pruned."""
+    with broker.sessions() as db:
+        first = crud.get_first_event_id(db)
+        if first is None or first > after_id + 1:
+            return None
+        frames = []
+        while True:
+            events = crud.get_events(db, after_id, document_id, limit=READ_LIMIT)
+            frames += [(event.id, format_event(event.id, event.kind, event.payload)) for event in events]
+            if len(events) < READ_LIMIT:
+                return frames
+            after_id = events[-1].id
+
+
+def _check_document(broker: EventBroker, document_id: int) -> None:
+    with broker.sessions() as db:
+        if not crud.document_exists(db, document_id):
+            raise HTTPException(status_code=404, detail="Document not found")
+
+
+async def open_stream(broker: EventBroker, document_id: int, last_event_id: Optional[int]) -> AsyncIterator[str]:
+    """Check the document, subscribe, and return the text/event-stream body.
+
+    With ``last_event_id``, as sent by a reconnecting ``EventSource``, the
+    events missed since are sent first; a ``reset`` event tells the client
+    to reload the document when they are no longer all kept.
+    """
+    await run_in_threadpool(_check_document, broker, document_id)
+    queue, since = await broker.subscribe(document_id)
+    return _stream(broker, document_id, queue, since, last_event_id)
+
+
+async def _stream(
+    broker: EventBroker, document_id: int, queue: asyncio.Queue, since: int, last_event_id: Optional[int]
+) -> AsyncIterator[str]:
+    # Ids of the replayed events: the queue may repeat them. Late commits
+    # arrive with ids below ones already sent, so ids are not compared.
+    replayed: Set[int] = set()
+    try:
+        yield "retry: 1000\n\n"
+        if last_event_id is not None and last_event_id < since:
+            frames = await run_in_threadpool(_replay, broker, document_id, last_event_id)
+            if frames is None:
+                yield format_event(since, "reset", "{}")
+            else:
+                for event_id, frame in frames:
+                    yield frame
+                    replayed.add(event_id)
+        while True:
+            item = await queue.get()
+            if item is OVERFLOW:
+                return
+            if item is KEEPALIVE:
+                yield item
+                continue
+            event_id, frame = item
+            if event_id in replayed:
+                replayed.discard(event_id)
+                continue
+            yield frame
+    finally:
+        broker.unsubscribe(document_id, queue)
@@ -0,0 +1,78 @@
+"""Edit-distance search over the canonical text keys of a project."""
+
+from typing import List, Optional
+
+from fastapi import HTTPException
+from sqlalchemy.orm import Session
+
+from backend import crud, models, schemas
+from backend.matching import BKTree, canonical_key
+from .cache import SignatureCache, documents_signature
+from .dependencies import run_cpu
+
+FUZZY_MODELS = {
+    "ocr_results": models.OcrResult,
+    "line_numbers": models.LineNumber,
+}
+
+fuzzy_index_cache = SignatureCache("fuzzy_index_cache_size")
+
+
+class FuzzyService:
+    """Find rows whose text is within a few edits of a query.
+
+    A BK-tree over the distinct ``text_key`` values of the search scope (one
+    document or all of them) narrows a query down to the matching keys; the
+    rows are then fetched through the ``text_key`` index. Trees are cached
+    until the version of a document of the scope changes.
+    """
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    def get_index(self, kind: str, document_id: Optional[int] = None) -> BKTree:
+        model = FUZZY_MODELS[kind]
+        key = (kind, document_id)
+        signature = documents_signature(self.db, document_id)
+        index = fuzzy_index_cache.get(key, signature) if signature is not None else None
+        if index is None:
+            text_keys = list(crud.iter_text_keys(self.db, model, document_id))
+            index = run_cpu(BKTree, [(text_key, None) for text_key in text_keys])
+            if signature is not None:
+                fuzzy_index_cache.put(key, signature, index)
+        return index
+
+    def search(
+        self,
+        text: str,
+        max_distance: int = 1,
+        document_id: Optional[int] = None,
+        kind: str = "ocr_results",
+        limit: int = 50,
+    ) -> List[schemas.FuzzyMatch]:
+        if kind not in FUZZY_MODELS:
+            raise HTTPException(status_code=422, detail=f"Unknown overlay kind '{kind}'")
+        if document_id is not None and not crud.document_exists(self.db, document_id):
+            raise HTTPException(status_code=404, detail="Document not found")
+        query_key = canonical_key(text)
+        if not query_key:
+            return []
+        hits = run_cpu(self.get_index(kind, document_id).search, query_key, max_distance)
+        distances = {key: distance for distance, key, _ in hits}
+        rows = crud.get_by_text_keys(self.db, FUZZY_MODELS[kind], distances, document_id=document_id)
+        rows.sort(key=lambda row: (distances[row.text_key], row.id))
+        return [
+            schemas.FuzzyMatch(
+                id=row.id,
+                document_id=row.document_id,
+                page=row.page,
+                text=row.text,
+                text_key=row.text_key,
+                distance=distances[row.text_key],
+                x_coord=row.x_coord,
+                y_coord=row.y_coord,
+                width=row.width,
+                height=row.height,
+            )
+            for row in rows[:limit]
+        ]
@@ -0,0 +1,117 @@
+"""Binary wire format for overlay geometry.
+
+Requested with ``Accept: application/vnd.pid-visualizer.geometry`` on the
+collection and viewport endpoints. All integers are little-endian and every
+section starts on a 4-byte boundary, so a client can view each one as a
+typed array of the response buffer without copying or parsing::
+
+    offset  type          content
+    0       char[4]       magic "PIDG"
+    4       uint16        format version (1)
+    6       uint16        reserved, 0
+    8       uint32        n, number of boxes
+    12      uint32        s, number of strings
+    16      uint32        b, length of the UTF-8 string data
+    20      uint32        document id
+    24      uint32[n]     row ids
+            uint32[n]     pages, 0 for null
+            float32[4n]   x, y, width, height of every box, interleaved
+            uint32[n]     text: index into the string table, NO_STRING for null
+            uint32[n]     status: index into the string table
+            uint32[s+1]   byte offsets of the strings in the string data
+            uint8[b]      UTF-8 string data, zero-padded to 4 bytes
+
+Texts and statuses share one deduplicated string table.
+"""
+
+import struct
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+
+GEOMETRY_MEDIA_TYPE = "application/vnd.pid-visualizer.geometry"
+GEOMETRY_COLUMNS = ["id", "page", "x_coord", "y_coord", "width", "height", "text", "status"]
+
+MAGIC = b"PIDG"
+VERSION = 1
+NO_STRING = 0xFFFFFFFF
+
+_HEADER = struct.Struct("<4sHHIIII")
+
+
+def accepts_geometry(accept: Optional[str]) -> bool:
+    return bool(accept) and GEOMETRY_MEDIA_TYPE in accept
+
+
+def _string_indices(values: Sequence[Optional[str]], table: Dict[str, int]) -> np.ndarray:
+    return np.fromiter(
+        (NO_STRING if value is None else table.setdefault(value, len(table)) for value in values),
+        dtype="<u4",
+        count=len(values),
+    )
+
+
+def encode_geometry(rows: Sequence[Sequence], document_id: int) -> bytes:
+    """Pack rows of :data:`GEOMETRY_COLUMNS` values into the wire format."""
+    n = len(rows)
+    ids, pages, x, y, width, height, texts, statuses = zip(*rows) if n else ([],) * 8
+    table: Dict[str, int] = {}
+    text_index = _string_indices(texts, table)
+    status_index = _string_indices(statuses, table)
+
+    encoded = [value.encode("utf-8") for value in table]
+    offsets = np.zeros(len(encoded) + 1, dtype="<u4")
+    np.cumsum([len(value) for value in encoded], out=offsets[1:])
+    data = b"".join(encoded)
+
+    boxes = np.empty((n, 4), dtype="<f4")
+    for column, values in enumerate((x, y, width, height)):
+        boxes[:, column] = np.array(values, dtype=np.float64)  # None becomes NaN
+    parts = [
+        _HEADER.pack(MAGIC, VERSION, 0, n, len(encoded), len(data), document_id),
+        np.asarray(ids, dtype="<u4").tobytes(),
+        np.fromiter((page or 0 for page in pages), dtype="<u4", count=n).tobytes(),
+        boxes.tobytes(),
+        text_index.tobytes(),
+        status_index.tobytes(),
+        offsets.tobytes(),
+        data,
+        b"\0" * (-len(data) % 4),
+    ]
+    return b"".join(parts)
+
+
+def decode_geometry(payload: bytes) -> dict:
+    """Inverse of :func:`encode_geometry`, for tests and Python clients."""
+    magic, version, _, n, strings, data_length, document_id = _HEADER.unpack_from(payload)
+    if magic != MAGIC or version != VERSION:
+        raise ValueError("Not a version 1 geometry payload")
+    offset = _HEADER.size
+
+    def take(dtype: str, count: int) -> np.ndarray:
+        nonlocal offset
+        array = np.frombuffer(payload, dtype=dtype, count=count, offset=offset)
+        offset += array.nbytes
+        return array
+
+    ids = take("<u4", n)
+    pages = take("<u4", n)
+    boxes = take("<f4", 4 * n).reshape(n, 4)
+    text_index = take("<u4", n)
+    status_index = take("<u4", n)
+    offsets = take("<u4", strings + 1)
+    data = payload[offset:offset + data_length]
+    table: List[str] = [data[offsets[i]:offsets[i + 1]].decode("utf-8") for i in range(strings)]
+
+    def lookup(index: int) -> Optional[str]:
+        return None if index == NO_STRING else table[index]
+
+    return {
+        "document_id": document_id,
+        "ids": ids,
+        "pages": pages,
+        "boxes": boxes,
+        "texts": [lookup(index) for index in text_index],
+        "statuses": [lookup(index) for index in status_index],
+        "strings": table,
+    }
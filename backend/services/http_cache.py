@@ -0,0 +1,197 @@
+"""Conditional requests and precompressed bodies for document reads.
+
+Every document has a ``version`` that each write to its rows bumps
+(:func:`backend.crud.touch_document`). Responses derived from a document carry
+an ETag built from that version and the media type, since JSON and binary
+geometry share URLs. A request whose ``If-None-Match`` still holds
+the current ETag gets ``304 Not Modified`` after a single-row lookup. Rendered
+bodies are kept in :data:`payload_store`, identity and compressed, until the
+version changes.
+
+zstd is offered only when the optional ``zstandard`` package is installed.
+"""
+
+import gzip
+import threading
+from collections import OrderedDict
+from typing import Callable, Dict, Hashable, Optional, Tuple
+
+from fastapi import Request, Response
+
+from backend.config import get_settings
+from backend.services.dependencies import run_cpu
+from backend.services.geometry import GEOMETRY_MEDIA_TYPE
+
+try:  # optional dependency
+    import zstandard
+except ImportError:  # pragma: no cover - depends on the environment
+    zstandard = None
+
+GZIP_LEVEL = 6
+ZSTD_LEVEL = 3
+
+
+def _compress_gzip(body: bytes) -> bytes:
+    # mtime=0: the same body always compresses to the same bytes.
+    return gzip.compress(body, GZIP_LEVEL, mtime=0)
+
+
+def _compress_zstd(body: bytes) -> bytes:
+    return zstandard.ZstdCompressor(level=ZSTD_LEVEL).compress(body)
+
+
+COMPRESSORS: Dict[str, Callable[[bytes], bytes]] = {"gzip": _compress_gzip}
+if zstandard is not None:
+    COMPRESSORS = {"zstd": _compress_zstd, **COMPRESSORS}
+
+
+# ETag suffix of every representation other than JSON.
+MEDIA_TYPE_TAGS = {GEOMETRY_MEDIA_TYPE: "geom"}
+
+
+def document_etag(
+    document_id: int,
+    version: int,
+    encoding: str = "identity",
+    media_type: str = "application/json",
+) -> str:
+    tags = [MEDIA_TYPE_TAGS.get(media_type), None if encoding == "identity" else encoding]
+    suffix = "".join(f"-{tag}" for tag in tags if tag)
+    return f'"d{document_id}v{version}{suffix}"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Weak comparison: ``W/`` prefixes and content-coding suffixes are ignored."""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    base = _base_tag(etag)
+    return any(_base_tag(candidate) == base for candidate in if_none_match.split(","))
+
+
+def _base_tag(tag: str) -> str:
+    tag = tag.strip()
+    if tag.startswith("W/"):
+        tag = tag[2:]
+    tag = tag.strip('"')
+    for encoding in ("gzip", "zstd"):
+        tag = tag.removesuffix(f"-{encoding}")
+    return tag
+
+
+def choose_encoding(accept_encoding: Optional[str]) -> str:
+    """Best supported content coding for an ``Accept-Encoding`` header."""
+    accepted: Dict[str, float] = {}
+    for part in (accept_encoding or "").split(","):
+        name, _, params = part.strip().partition(";")
+        quality = 1.0
+        for param in params.split(";"):
+            key, _, value = param.strip().partition("=")
+            if key == "q":
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        if name:
+            accepted[name.lower()] = quality
+    for encoding in COMPRESSORS:  # in order of preference
+        if accepted.get(encoding, accepted.get("*", 0.0)) > 0:
+            return encoding
+    return "identity"
+
+
+class PayloadStore:
+    """Thread-safe LRU of rendered bodies, bounded in bytes.
+
+    Entries hold the identity body plus the encodings requested so far and
+    are only valid for the document version they were rendered at. The
+    budget is read from the ``size_setting`` field (megabytes) of the
+    settings.
+    """
+
+    def __init__(self, size_setting: str):
+        self.size_setting = size_setting
+        self._entries: "OrderedDict[Hashable, Tuple[int, Dict[str, bytes]]]" = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable, version: int) -> Optional[Dict[str, bytes]]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] != version:
+                return None
+            self._entries.move_to_end(key)
+            return entry[1]
+
+    def put(self, key: Hashable, version: int, bodies: Dict[str, bytes]) -> None:
+        size = sum(len(body) for body in bodies.values())
+        with self._lock:
+            self._discard(key)
+            if size > getattr(get_settings(), self.size_setting) * 1024 * 1024:
+                return
+            self._entries[key] = (version, bodies)
+            self._size += size
+            self._evict()
+
+    def _discard(self, key: Hashable) -> None:
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self._size -= sum(len(body) for body in entry[1].values())
+
+    def _evict(self) -> None:
+        budget = getattr(get_settings(), self.size_setting) * 1024 * 1024
+        while self._size > budget and self._entries:
+            self._discard(next(iter(self._entries)))
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._size = 0
+
+
+payload_store = PayloadStore("payload_cache_size_mb")
+
+
+def cached_response(
+    request: Request,
+    document_id: int,
+    version: int,
+    media_type: str,
+    render: Callable[[], bytes],
+    store: bool = True,
+) -> Response:
+    """Answer a document read with ETag handling and a precompressed body.
+
+    ``version`` must be read before ``render`` runs: a write in between then
+    yields a body newer than its ETag, which the next request replaces,
+    rather than an old body under a new ETag. ``store=False`` skips the
+    payload store for one-off variants such as viewport queries. ``render``
+    reads through the session; it should encode with
+    :func:`~backend.services.dependencies.run_cpu`, as compression does here.
+    """
+    encoding = choose_encoding(request.headers.get("accept-encoding"))
+    etag = document_etag(document_id, version, encoding, media_type)
+    headers = {
+        "ETag": etag,
+        "Vary": "Accept, Accept-Encoding",
+        # Clients may keep the body but must revalidate it on every use.
+        "Cache-Control": "no-cache",
+    }
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers=headers)
+
+    key = (request.url.path, tuple(sorted(request.query_params.multi_items())), media_type)
+    bodies = payload_store.get(key, version) if store else None
+    if bodies is None or encoding not in bodies:
+        bodies = dict(bodies or {"identity": render()})
+        if encoding not in bodies:
+            bodies[encoding] = run_cpu(COMPRESSORS[encoding], bodies["identity"])
+        if store:
+            payload_store.put(key, version, bodies)
+    if encoding != "identity":
+        headers["Content-Encoding"] = encoding
+    return Response(content=bodies[encoding], media_type=media_type, headers=headers)
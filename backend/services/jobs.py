@@ -0,0 +1,47 @@
+from typing import Optional
+
+from fastapi import HTTPException
+from sqlalchemy.orm import Session
+
+from backend import crud, schemas
+from backend.config import get_settings
+from backend.ocr import ParserNotFoundError, load_parser
+
+# Seconds a client refused for a full queue is asked to wait.
+RETRY_AFTER = 10
+
+
+class JobService:
+    def __init__(self, db: Session):
+        self.db = db
+
+    def check_enqueue(self, doc_id: int, parser_name: Optional[str] = None) -> str:
+        """Check that a job can be queued before its file is received; return the parser name.
+
+        Raises 503 while ``job_queue_limit`` jobs are waiting, so clients back
+        off instead of filling the disk faster than the workers import.
+        """
+        if not crud.document_exists(self.db, doc_id):
+            raise HTTPException(status_code=404, detail="Document not found")
+        settings = get_settings()
+        parser_name = parser_name or settings.ocr_parser
+        try:
+            load_parser(parser_name)
+        except ParserNotFoundError as exc:
+            raise HTTPException(status_code=422, detail=str(exc))
+        if crud.count_jobs(self.db, "queued") >= settings.job_queue_limit:
+            raise HTTPException(
+                status_code=503,
+                detail="Too many ingest jobs are waiting",
+                headers={"Retry-After": str(RETRY_AFTER)},
+            )
+        return parser_name
+
+    def enqueue(self, doc_id: int, parser_name: str, source_path: str) -> schemas.Job:
+        return schemas.Job.model_validate(crud.create_job(self.db, doc_id, parser_name, source_path))
+
+    def get_job(self, job_id: int) -> schemas.Job:
+        job = crud.get_job(self.db, job_id)
+        if job is None:
+            raise HTTPException(status_code=404, detail="Job not found")
+        return schemas.Job.model_validate(job)
@@ -1,6 +1,8 @@
+from typing import List
+
 from sqlalchemy.orm import Session
 from fastapi import HTTPException
-from backend import crud
+from backend import crud, models, schemas
 
 class LineService:
     def __init__(self, db: Session):
@@ -11,3 +13,10 @@ class LineService:
         if line is None:
             raise HTTPException(status_code=404, detail="LineNumber not found")
         return line
+
+    def update_lines(self, corrections: List[schemas.RowCorrection]):
+        """Apply a batch of corrections at once; return the lines that changed."""
+        missing = crud.get_missing_ids(self.db, models.LineNumber, [c.id for c in corrections])
+        if missing:
+            raise HTTPException(status_code=404, detail=f"LineNumber not found: {missing}")
+        return crud.bulk_update_rows(self.db, models.LineNumber, [c.model_dump() for c in corrections])
@@ -0,0 +1,135 @@
+"""Level-of-detail aggregation of page overlays for zoomed-out views."""
+
+import math
+from typing import Dict, List, Tuple
+
+import numpy as np
+from fastapi import HTTPException
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from backend import crud, models, schemas
+from .cache import SignatureCache, documents_signature
+from .dependencies import run_cpu
+
+LOD_MODELS = {
+    "ocr_results": models.OcrResult,
+    "line_numbers": models.LineNumber,
+}
+
+
+class PageGeometry:
+    """Boxes of one page kept as arrays, with aggregates computed per level.
+
+    Level ``k`` groups boxes by the centre of their bounding box into square
+    cells of ``2 ** k`` page units and reports the union box of every
+    non-empty cell.
+    """
+
+    def __init__(self, rows: List[Tuple[str, float, float, float, float]]):
+        self.texts = [row[0] for row in rows]
+        geometry = np.array([row[1:] for row in rows], dtype=np.float64).reshape(-1, 4)
+        self.x0 = geometry[:, 0]
+        self.y0 = geometry[:, 1]
+        self.x1 = self.x0 + geometry[:, 2]
+        self.y1 = self.y0 + geometry[:, 3]
+        self.levels: Dict[int, List[schemas.LodCluster]] = {}
+
+    def __len__(self) -> int:
+        return len(self.texts)
+
+    def clusters(self, level: int) -> List[schemas.LodCluster]:
+        if level not in self.levels:
+            self.levels[level] = self._aggregate(float(2 ** level))
+        return self.levels[level]
+
+    def _aggregate(self, cell_size: float) -> List[schemas.LodCluster]:
+        if not len(self):
+            return []
+        cells_x = np.floor((self.x0 + self.x1) / 2 / cell_size).astype(np.int64)
+        cells_y = np.floor((self.y0 + self.y1) / 2 / cell_size).astype(np.int64)
+        keys = np.stack([cells_x, cells_y], axis=1)
+        _, first, inverse, counts = np.unique(
+            keys, axis=0, return_index=True, return_inverse=True, return_counts=True
+        )
+        inverse = inverse.reshape(-1)
+        groups = len(counts)
+        x0 = np.full(groups, np.inf)
+        y0 = np.full(groups, np.inf)
+        x1 = np.full(groups, -np.inf)
+        y1 = np.full(groups, -np.inf)
+        np.minimum.at(x0, inverse, self.x0)
+        np.minimum.at(y0, inverse, self.y0)
+        np.maximum.at(x1, inverse, self.x1)
+        np.maximum.at(y1, inverse, self.y1)
+        return [
+            schemas.LodCluster(
+                x_coord=x0[i],
+                y_coord=y0[i],
+                width=x1[i] - x0[i],
+                height=y1[i] - y0[i],
+                count=int(counts[i]),
+                text=self.texts[first[i]] if counts[i] == 1 else None,
+            )
+            for i in range(groups)
+        ]
+
+
+lod_cache = SignatureCache("lod_cache_size")
+
+
+# Cells of 2 ** 32 page units hold any page whole; coarser levels add nothing.
+MAX_LEVEL = 32
+
+
+def zoom_to_level(zoom: float, cell_px: int) -> int:
+    """Smallest level whose cells are at least ``cell_px`` screen pixels wide."""
+    if zoom <= cell_px / 2 ** MAX_LEVEL:
+        return MAX_LEVEL
+    return max(0, math.ceil(math.log2(cell_px / zoom)))
+
+
+class LodService:
+    def __init__(self, db: Session):
+        self.db = db
+
+    def get_page_lod(self, document_id: int, page: int, kind: str) -> PageGeometry:
+        """Geometry of a page, cached until the document's version changes."""
+        model = LOD_MODELS[kind]
+        key = (document_id, page, kind)
+        signature = documents_signature(self.db, document_id)
+        page_lod = lod_cache.get(key, signature) if signature is not None else None
+        if page_lod is None:
+            rows = self.db.execute(
+                select(model.text, model.x_coord, model.y_coord, model.width, model.height)
+                .where(model.document_id == document_id, model.page == page)
+                .order_by(model.id)
+            ).all()
+            page_lod = run_cpu(PageGeometry, [tuple(row) for row in rows])
+            if signature is not None:
+                lod_cache.put(key, signature, page_lod)
+        return page_lod
+
+    def get_clusters(
+        self,
+        document_id: int,
+        page: int,
+        zoom: float,
+        kind: str = "ocr_results",
+        cell_px: int = 32,
+    ) -> schemas.PageLod:
+        if kind not in LOD_MODELS:
+            raise HTTPException(status_code=422, detail=f"Unknown overlay kind '{kind}'")
+        if not crud.document_exists(self.db, document_id):
+            raise HTTPException(status_code=404, detail="Document not found")
+        level = zoom_to_level(zoom, cell_px)
+        page_lod = self.get_page_lod(document_id, page, kind)
+        return schemas.PageLod(
+            document_id=document_id,
+            page=page,
+            kind=kind,
+            level=level,
+            cell_size=float(2 ** level),
+            total=len(page_lod),
+            clusters=run_cpu(page_lod.clusters, level),
+        )
@@ -1,7 +1,26 @@
+from typing import List, Optional
+
 from sqlalchemy.orm import Session
 from fastapi import HTTPException
 
-from backend import crud, schemas
+from backend import crud, models, schemas
+from backend.config import get_settings
+from backend.ocr import ParserNotFoundError, load_parser
+from backend.ocr.spool import SpoolFile
+from backend.services.dependencies import iterate_cpu, run_cpu
+
+def _json_records(data: dict) -> List[schemas.OcrResultCreate]:
+    return [
+        schemas.OcrResultCreate(
+            page=ocr_data.get("page", 1),
+            text=ocr_data["text"],
+            x_coord=ocr_data["x_coord"],
+            y_coord=ocr_data["y_coord"],
+            width=ocr_data["width"],
+            height=ocr_data["height"],
+        )
+        for ocr_data in data.get("line_numbers", [])
+    ]
 
 class OcrService:
     def __init__(self, db: Session):
@@ -12,14 +31,44 @@ class OcrService:
         if document is None:
             raise HTTPException(status_code=404, detail="Document not found")
 
-        for ocr_data in data.get("line_numbers", []):
-            ocr_result = schemas.OcrResultCreate(
-                page=ocr_data.get("page", 1),
-                text=ocr_data["text"],
-                x_coord=ocr_data["x_coord"],
-                y_coord=ocr_data["y_coord"],
-                width=ocr_data["width"],
-                height=ocr_data["height"],
-            )
-            crud.create_ocr_result(self.db, ocr_result, document_id=doc_id)
+        if "pages" in data or "responses" in data:
+            # Raw Document AI or Vision output: extract records page by page,
+            # optionally on the ``ingest_workers`` process pool.
+            parser_name = get_settings().ocr_parser if "pages" in data else "vision"
+            parser = load_parser(parser_name)
+            batches = parser.iter_batches(data, workers=get_settings().ingest_workers)
+            parser.create_batches(self.db, iterate_cpu(batches), document_id=doc_id)
+            return {"message": "JSON processed and OCR results created successfully"}
+
+        crud.bulk_create_ocr_results(self.db, run_cpu(_json_records, data), document_id=doc_id)
         return {"message": "JSON processed and OCR results created successfully"}
+
+    def parse_upload(self, doc_id: int, spool: SpoolFile, parser_name: Optional[str] = None):
+        """Create OCR results from a raw OCR file while it is spooled.
+
+        ``parser_name`` defaults to the ``ocr_parser`` setting; built-in
+        parsers read the spool page by page as it grows.
+        """
+        if not crud.document_exists(self.db, doc_id):
+            raise HTTPException(status_code=404, detail="Document not found")
+        try:
+            parser = load_parser(parser_name or get_settings().ocr_parser)
+        except ParserNotFoundError as exc:
+            raise HTTPException(status_code=422, detail=str(exc))
+        # Imported here: parser modules load on first use (see backend.ocr.registry).
+        from backend.ocr.streaming import StreamedDocument
+
+        source = StreamedDocument(None, opener=spool.open)
+        batches = parser.iter_batches(source, workers=get_settings().ingest_workers)
+        try:
+            created = parser.create_batches(self.db, iterate_cpu(batches), document_id=doc_id)
+        except ValueError as exc:
+            raise HTTPException(status_code=422, detail=f"Invalid OCR file: {exc}")
+        return {"message": "File processed and OCR results created successfully", "created": created}
+
+    def update_results(self, corrections: List[schemas.RowCorrection]):
+        """Apply a batch of corrections at once; return the OCR results that changed."""
+        missing = crud.get_missing_ids(self.db, models.OcrResult, [c.id for c in corrections])
+        if missing:
+            raise HTTPException(status_code=404, detail=f"OcrResult not found: {missing}")
+        return crud.bulk_update_rows(self.db, models.OcrResult, [c.model_dump() for c in corrections])
@@ -0,0 +1,48 @@
+"""Substring search over the OCR text of all documents."""
+
+from typing import List, Optional
+
+from fastapi import HTTPException
+from sqlalchemy.orm import Session
+
+from backend import crud, models, schemas
+from backend.text_search import MIN_QUERY_LENGTH
+
+
+class SearchService:
+    """Find OCR results whose text contains a partial tag such as ``FH-A2``.
+
+    Matching is case-insensitive and goes through the trigram index of
+    :mod:`backend.text_search`, so its cost follows the number of hits rather
+    than the number of rows.
+    """
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    def search(
+        self, text: str, document_id: Optional[int] = None, limit: int = 50
+    ) -> List[schemas.TextSearchHit]:
+        text = text.strip()
+        if len(text) < MIN_QUERY_LENGTH:
+            raise HTTPException(
+                status_code=422, detail=f"Search text needs at least {MIN_QUERY_LENGTH} characters"
+            )
+        if document_id is not None and not crud.document_exists(self.db, document_id):
+            raise HTTPException(status_code=404, detail="Document not found")
+        hits = crud.search_text(self.db, models.OcrResult, text, document_id=document_id, limit=limit)
+        return [
+            schemas.TextSearchHit(
+                id=row.id,
+                document_id=row.document_id,
+                file_name=file_name,
+                page=row.page,
+                text=row.text,
+                score=score,
+                x_coord=row.x_coord,
+                y_coord=row.y_coord,
+                width=row.width,
+                height=row.height,
+            )
+            for row, file_name, score in hits
+        ]
@@ -0,0 +1,196 @@
+"""Streaming uploads of raw OCR output files.
+
+The request body is decoded as it arrives: the file part of a
+``multipart/form-data`` body, or the whole body, is gunzipped when it is gzip
+data (whether or not ``Content-Encoding`` says so) and appended to a
+:class:`~backend.ocr.spool.SpoolFile`. The parser reads the spool page by
+page in the threadpool meanwhile, so the JSON is decoded once, by the
+streaming parser, and neither the body nor the document is ever held in
+memory as a whole. Ingest jobs keep the decoded file for a worker instead
+(:func:`spool_upload`).
+"""
+
+import asyncio
+import zlib
+from typing import Awaitable, Callable, List, Optional
+
+from fastapi import HTTPException, Request
+from python_multipart.multipart import MultipartParser, parse_options_header
+
+from backend.config import get_settings
+from backend.ocr.spool import SpoolFile
+
+GZIP_MAGIC = b"\x1f\x8b"
+
+
+class UploadError(ValueError):
+    """The request body is not a readable upload."""
+
+
+class Gunzip:
+    """Decompress gzip data fed in chunks; data without the gzip magic passes through."""
+
+    def __init__(self):
+        self._head = b""
+        self._decompressor = None
+        self._plain = False
+
+    def feed(self, data: bytes) -> bytes:
+        if self._plain:
+            return data
+        if self._decompressor is None:
+            self._head += data
+            if len(self._head) < len(GZIP_MAGIC):
+                return b""
+            data, self._head = self._head, b""
+            if not data.startswith(GZIP_MAGIC):
+                self._plain = True
+                return data
+            self._decompressor = zlib.decompressobj(zlib.MAX_WBITS | 16)
+        output = []
+        try:
+            while data:
+                output.append(self._decompressor.decompress(data))
+                # Concatenated gzip members, as written by ``cat a.gz b.gz``.
+                data = self._decompressor.unused_data if self._decompressor.eof else b""
+                if data:
+                    self._decompressor = zlib.decompressobj(zlib.MAX_WBITS | 16)
+        except zlib.error as exc:
+            raise UploadError(f"Invalid gzip data: {exc}") from exc
+        return b"".join(output)
+
+    def close(self) -> bytes:
+        if self._decompressor is None:
+            return self._head
+        if not self._decompressor.eof:
+            raise UploadError("Truncated gzip data")
+        return b""
+
+
+class FilePart:
+    """Extract the first file of a ``multipart/form-data`` body fed in chunks."""
+
+    def __init__(self, boundary: bytes):
+        self._chunks: List[bytes] = []
+        self._headers = {}
+        self._field = b""
+        self._value = b""
+        self._state = "before"  # before the file part, in it, or after it
+        self._parser = MultipartParser(boundary, {
+            "on_part_begin": self._part_begin,
+            "on_header_field": self._header_field,
+            "on_header_value": self._header_value,
+            "on_header_end": self._header_end,
+            "on_headers_finished": self._headers_finished,
+            "on_part_data": self._part_data,
+            "on_part_end": self._part_end,
+        })
+
+    def _part_begin(self):
+        self._headers = {}
+
+    def _header_field(self, data, start, end):
+        self._field += data[start:end]
+
+    def _header_value(self, data, start, end):
+        self._value += data[start:end]
+
+    def _header_end(self):
+        self._headers[self._field.lower()] = self._value
+        self._field, self._value = b"", b""
+
+    def _headers_finished(self):
+        _, options = parse_options_header(self._headers.get(b"content-disposition", b""))
+        if self._state == "before" and b"filename" in options:
+            self._state = "in"
+
+    def _part_data(self, data, start, end):
+        if self._state == "in":
+            self._chunks.append(data[start:end])
+
+    def _part_end(self):
+        if self._state == "in":
+            self._state = "after"
+
+    def feed(self, data: bytes) -> bytes:
+        self._parser.write(data)
+        chunks, self._chunks = self._chunks, []
+        return b"".join(chunks)
+
+    def close(self) -> bytes:
+        self._parser.finalize()
+        if self._state == "before":
+            raise UploadError("No file in the multipart body")
+        return b"".join(self._chunks)
+
+
+def body_decoders(content_type: str) -> list:
+    """Decoders for a request body of ``content_type``, applied in order."""
+    media_type, options = parse_options_header(content_type)
+    if media_type == b"multipart/form-data":
+        if b"boundary" not in options:
+            raise UploadError("Multipart body without a boundary")
+        return [FilePart(options[b"boundary"]), Gunzip()]
+    return [Gunzip()]
+
+
+async def receive(request: Request, spool: SpoolFile, parsing: Optional[asyncio.Future] = None) -> None:
+    """Decode the body of ``request`` into ``spool`` as it arrives.
+
+    Stops early once ``parsing`` has finished, e.g. because the parser failed.
+    """
+    decoders = body_decoders(request.headers.get("content-type", ""))
+    async for chunk in request.stream():
+        for decoder in decoders:
+            chunk = decoder.feed(chunk)
+        spool.write(chunk)
+        if parsing is not None and parsing.done():
+            return
+    for index, decoder in enumerate(decoders):
+        chunk = decoder.close()
+        for later in decoders[index + 1:]:
+            chunk = later.feed(chunk)
+        spool.write(chunk)
+    spool.finish()
+
+
+async def ingest_upload(request: Request, parse: Callable[[SpoolFile], Awaitable[dict]]) -> dict:
+    """Spool the body of ``request`` and run ``parse`` over it, overlapping both.
+
+    ``parse`` is given the spool and runs the parser through ``run_db``; the
+    parser waits for the rest of the body on a thread, also on an
+    ``AsyncSession`` (see :func:`~backend.services.dependencies.iterate_cpu`).
+    """
+    spool = SpoolFile(get_settings().upload_dir)
+    try:
+        parsing = asyncio.ensure_future(parse(spool))
+        try:
+            await _receive_or_400(request, spool, parsing)
+        except BaseException:
+            await asyncio.gather(parsing, return_exceptions=True)
+            raise
+        return await parsing
+    finally:
+        spool.discard()
+
+
+async def spool_upload(request: Request, directory: str) -> SpoolFile:
+    """Receive the whole body of ``request`` into a spool file in ``directory``."""
+    spool = SpoolFile(directory)
+    try:
+        await _receive_or_400(request, spool)
+    except BaseException:
+        spool.discard()
+        raise
+    return spool
+
+
+async def _receive_or_400(request: Request, spool: SpoolFile, parsing: Optional[asyncio.Future] = None) -> None:
+    try:
+        await receive(request, spool, parsing)
+    except UploadError as exc:
+        spool.fail(exc)
+        raise HTTPException(status_code=400, detail=str(exc))
+    except BaseException as exc:
+        spool.fail(exc)
+        raise
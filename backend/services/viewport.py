@@ -0,0 +1,50 @@
+"""Boxes of a page that intersect the visible viewport."""
+
+from typing import List, Optional
+
+from fastapi import HTTPException
+from sqlalchemy.orm import Session
+
+from backend import crud, models
+from backend.spatial import BBox
+
+VIEWPORT_MODELS = {
+    "ocr_results": models.OcrResult,
+    "line_numbers": models.LineNumber,
+}
+
+
+def parse_bbox(value: Optional[str]) -> Optional[BBox]:
+    """Parse ``"x0,y0,x1,y1"`` in page units; ``None`` selects the whole page."""
+    if value is None:
+        return None
+    try:
+        x0, y0, x1, y1 = (float(part) for part in value.split(","))
+    except ValueError:
+        raise HTTPException(status_code=422, detail="bbox must be four numbers: x0,y0,x1,y1")
+    if x1 < x0 or y1 < y0:
+        raise HTTPException(status_code=422, detail="bbox must satisfy x0 <= x1 and y0 <= y1")
+    return x0, y0, x1, y1
+
+
+class ViewportService:
+    def __init__(self, db: Session):
+        self.db = db
+
+    def get_boxes(
+        self,
+        document_id: int,
+        page: int,
+        bbox: Optional[str] = None,
+        kind: str = "ocr_results",
+        limit: Optional[int] = None,
+        columns: Optional[List[str]] = None,
+    ):
+        if kind not in VIEWPORT_MODELS:
+            raise HTTPException(status_code=422, detail=f"Unknown overlay kind '{kind}'")
+        viewport = parse_bbox(bbox)
+        if not crud.document_exists(self.db, document_id):
+            raise HTTPException(status_code=404, detail="Document not found")
+        return crud.get_viewport_rows(
+            self.db, VIEWPORT_MODELS[kind], document_id, page, viewport, limit=limit, columns=columns
+        )
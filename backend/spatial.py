@@ -0,0 +1,140 @@
+"""Spatial indexes over the boxes of ``ocr_results`` and ``line_numbers``.
+
+On SQLite every indexed table gets an R*Tree companion ``<table>_rtree``
+with the dimensions ``(document_id, page, x, y)``. Triggers keep it in sync
+with inserts, updates and deletes, whether they come from the ORM, Core bulk
+writes or plain SQL. On PostgreSQL a GiST index covers the box expression.
+Other databases fall back to range filters on the coordinate columns.
+
+The DDL runs when the tables are created through the metadata (tests,
+``create_all`` on a new database) and in Alembic revision ``0004``.
+"""
+
+from typing import List, Optional, Tuple
+
+from sqlalchemy import DDL, and_, case, column, event, func, literal, table
+from sqlalchemy.sql import ColumnElement
+
+SPATIAL_TABLES = ("ocr_results", "line_numbers")
+
+BBox = Tuple[float, float, float, float]
+
+_RTREE_COLUMNS = ("id", "min_doc", "max_doc", "min_page", "max_page", "min_x", "max_x", "min_y", "max_y")
+
+# Rows without a complete box cannot intersect a viewport and stay out of the index.
+_HAS_BOX = (
+    "new.document_id IS NOT NULL AND new.page IS NOT NULL AND new.x_coord IS NOT NULL "
+    "AND new.y_coord IS NOT NULL AND new.width IS NOT NULL AND new.height IS NOT NULL"
+)
+
+# Document and page are padded to intervals of width 0.5: the R*Tree picks a
+# child by the growth of its volume, and a dimension of zero extent makes every
+# volume 0, which degrades the tree to a scan when a database holds one document.
+_RTREE_VALUES = (
+    "new.id, new.document_id - 0.25, new.document_id + 0.25, new.page - 0.25, new.page + 0.25, "
+    "min(new.x_coord, new.x_coord + new.width), max(new.x_coord, new.x_coord + new.width), "
+    "min(new.y_coord, new.y_coord + new.height), max(new.y_coord, new.y_coord + new.height)"
+)
+
+
+def rtree_name(table_name: str) -> str:
+    return f"{table_name}_rtree"
+
+
+def sqlite_ddl(table_name: str) -> List[str]:
+    """Statements creating the R*Tree of ``table_name`` and its triggers."""
+    rtree = rtree_name(table_name)
+    return [
+        f"CREATE VIRTUAL TABLE IF NOT EXISTS {rtree} USING rtree({', '.join(_RTREE_COLUMNS)})",
+        f"CREATE TRIGGER IF NOT EXISTS {rtree}_insert AFTER INSERT ON {table_name} "
+        f"WHEN {_HAS_BOX} BEGIN INSERT INTO {rtree} VALUES ({_RTREE_VALUES}); END",
+        f"CREATE TRIGGER IF NOT EXISTS {rtree}_update "
+        f"AFTER UPDATE OF id, document_id, page, x_coord, y_coord, width, height ON {table_name} BEGIN "
+        f"DELETE FROM {rtree} WHERE id = old.id; "
+        f"INSERT INTO {rtree} SELECT {_RTREE_VALUES} WHERE {_HAS_BOX}; END",
+        f"CREATE TRIGGER IF NOT EXISTS {rtree}_delete AFTER DELETE ON {table_name} "
+        f"BEGIN DELETE FROM {rtree} WHERE id = old.id; END",
+    ]
+
+
+def sqlite_backfill(table_name: str) -> str:
+    """Statement indexing the rows that existed before the triggers."""
+    values = _RTREE_VALUES.replace("new.", "")
+    condition = _HAS_BOX.replace("new.", "")
+    return f"INSERT INTO {rtree_name(table_name)} SELECT {values} FROM {table_name} WHERE {condition}"
+
+
+def sqlite_drop(table_name: str) -> List[str]:
+    rtree = rtree_name(table_name)
+    return [f"DROP TRIGGER IF EXISTS {rtree}_{action}" for action in ("insert", "update", "delete")] + [
+        f"DROP TABLE IF EXISTS {rtree}"
+    ]
+
+
+def postgresql_ddl(table_name: str) -> List[str]:
+    return [
+        f"CREATE INDEX IF NOT EXISTS ix_{table_name}_box ON {table_name} USING gist "
+        f"(box(point(x_coord, y_coord), point(x_coord + width, y_coord + height)))"
+    ]
+
+
+def postgresql_drop(table_name: str) -> List[str]:
+    return [f"DROP INDEX IF EXISTS ix_{table_name}_box"]
+
+
+def register(sa_table) -> None:
+    """Create the spatial index whenever ``sa_table`` is created from metadata."""
+    for statement in sqlite_ddl(sa_table.name):
+        event.listen(sa_table, "after_create", DDL(statement).execute_if(dialect="sqlite"))
+    for statement in postgresql_ddl(sa_table.name):
+        event.listen(sa_table, "after_create", DDL(statement).execute_if(dialect="postgresql"))
+
+
+def _rtree_table(table_name: str):
+    return table(rtree_name(table_name), *(column(name) for name in _RTREE_COLUMNS))
+
+
+def viewport_query(query, model, dialect: str, document_id: int, page: int, bbox: Optional[BBox]):
+    """Restrict ``query`` over ``model`` to boxes of a page intersecting ``bbox``.
+
+    Boxes touching the viewport's edge count as visible. ``bbox=None`` means
+    the whole page.
+    """
+    query = query.where(model.document_id == document_id, model.page == page)
+    if bbox is None:
+        return query
+    x0, y0, x1, y1 = bbox
+    if dialect == "sqlite":
+        # The R*Tree stores 32-bit floats rounded outwards, so it returns a
+        # superset; the exact test below removes the few extra rows.
+        rtree = _rtree_table(model.__tablename__)
+        query = query.join(rtree, rtree.c.id == model.id).where(
+            rtree.c.min_doc <= document_id,
+            rtree.c.max_doc >= document_id,
+            rtree.c.min_page <= page,
+            rtree.c.max_page >= page,
+            rtree.c.max_x >= x0,
+            rtree.c.min_x <= x1,
+            rtree.c.max_y >= y0,
+            rtree.c.min_y <= y1,
+        )
+    elif dialect == "postgresql":
+        box = func.box(
+            func.point(model.x_coord, model.y_coord),
+            func.point(model.x_coord + model.width, model.y_coord + model.height),
+        )
+        viewport = func.box(func.point(literal(x0), literal(y0)), func.point(literal(x1), literal(y1)))
+        query = query.where(box.op("&&")(viewport))
+    return query.where(_intersects(model, bbox))
+
+
+def _extent(start, size) -> Tuple[ColumnElement, ColumnElement]:
+    end = start + size
+    return case((size < 0, end), else_=start), case((size < 0, start), else_=end)
+
+
+def _intersects(model, bbox: BBox) -> ColumnElement:
+    x0, y0, x1, y1 = bbox
+    min_x, max_x = _extent(model.x_coord, model.width)
+    min_y, max_y = _extent(model.y_coord, model.height)
+    return and_(min_x <= x1, max_x >= x0, min_y <= y1, max_y >= y0)
@@ -0,0 +1,34 @@
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from backend.database import Base
+
+
+def static_engine():
+    """In-memory database on one shared connection, dropped when exhausted.
+
+    TestClient requests and streamed responses run in other threads, so every
+    thread has to see the same connection.
+    """
+    engine = create_engine(
+        'sqlite://', connect_args={'check_same_thread': False}, poolclass=StaticPool
+    )
+    Base.metadata.create_all(engine)
+    yield engine
+    Base.metadata.drop_all(engine)
+    engine.dispose()
+
+
+@pytest.fixture(scope='module')
+def db_engine():
+    # Modules that need another database define their own ``db_engine``.
+    yield from static_engine()
+
+@pytest.fixture(scope='function')
+def db_session(db_engine):
+    Session = sessionmaker(bind=db_engine)
+    session = Session()
+    yield session
+    session.close()
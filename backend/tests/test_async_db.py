@@ -0,0 +1,179 @@
+import asyncio
+import json
+import threading
+import time
+
+import anyio
+import httpx
+import pytest
+from fastapi import FastAPI
+from fastapi.concurrency import run_in_threadpool
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.orm import Session
+
+from backend import crud, database, schemas
+from backend.database import Base, async_database_url
+from backend.routers import documents, lines, ocr
+from backend.services import dependencies
+from backend.services.dependencies import get_db
+from backend.services import http_cache
+from backend.services.http_cache import payload_store
+from backend.tests.test_ocr_streaming import SAMPLE
+
+
+@pytest.fixture
+def async_engine(tmp_path):
+    url = f"sqlite:///{tmp_path / 'async.db'}"
+    sync_engine = create_engine(url)
+    Base.metadata.create_all(sync_engine)
+    sync_engine.dispose()
+    engine = create_async_engine(async_database_url(url))
+    yield engine
+    asyncio.run(engine.dispose())
+
+@pytest.fixture
+def app(async_engine):
+    async def get_async_db():
+        async with AsyncSession(async_engine, autoflush=False) as db:
+            yield db
+
+    app = FastAPI()
+    for module in (documents, lines, ocr):
+        app.include_router(module.router)
+    app.dependency_overrides[get_db] = get_async_db
+    payload_store.clear()
+    return app
+
+
+def _fill(client):
+    doc = client.post("/documents/", json={"file_name": "async.pdf", "pages": 1}).json()
+    assert doc["line_numbers"] == [] and doc["ocr_results"] == []
+    records = [
+        {"page": 1, "text": f"FH-A2-{i:04d}", "x_coord": i, "y_coord": 0, "width": 1, "height": 1} for i in range(5)
+    ]
+    assert client.post(f"/documents/{doc['id']}/parse-json", json={"line_numbers": records}).status_code == 200
+    return doc["id"]
+
+
+def test_async_database_url():
+    assert async_database_url("sqlite:///./pid.db") == "sqlite+aiosqlite:///./pid.db"
+    assert async_database_url("postgresql+psycopg2://u:p@db/pid") == "postgresql+asyncpg://u:p@db/pid"
+    assert async_database_url("mysql://u@db/pid") == "mysql://u@db/pid"
+
+
+def test_endpoints_on_an_async_session(app, monkeypatch):
+    def no_session_in_threadpool(function, *args):
+        if any(isinstance(arg, Session) for arg in args):
+            raise AssertionError("database work went to the threadpool")
+        return run_in_threadpool(function, *args)
+
+    monkeypatch.setattr(dependencies, "run_in_threadpool", no_session_in_threadpool)
+    client = TestClient(app)
+    doc_id = _fill(client)
+
+    rows = client.get(f"/documents/{doc_id}/ocr_results").json()
+    assert [row["text"] for row in rows] == [f"FH-A2-{i:04d}" for i in range(5)]
+    streamed = client.get(f"/documents/{doc_id}/ocr_results", params={"format": "ndjson", "page": 1})
+    assert [json.loads(line) for line in streamed.text.splitlines()] == rows
+    assert len(client.get(f"/doc/{doc_id}").json()["ocr_results"]) == 5
+    assert len(client.get(f"/documents/{doc_id}/pages/1/ocr", params={"bbox": "0,0,1.5,1"}).json()) == 2
+    assert client.get(f"/documents/{doc_id}/pages/1/lod", params={"zoom": 0.01}).json()["total"] == 5
+    assert len(client.get("/search/text", params={"text": "a2-000"}).json()) == 5
+    assert client.get("/search/fuzzy", params={"text": "FH-A2-0001"}).json()[0]["text"] == "FH-A2-0001"
+    assert client.get("/doc/999").status_code == 404
+    uploaded = client.post(f"/documents/{doc_id}/upload", params={"parser": "document_ai_stream"}, content=json.dumps(SAMPLE))
+    assert uploaded.json()["created"] == 2
+
+
+def test_requests_do_not_wait_for_the_threadpool(app):
+    """With its only thread busy, an async-session app still serves requests that only query."""
+
+    async def scenario():
+        limiter = anyio.to_thread.current_default_thread_limiter()
+        saved_tokens = limiter.total_tokens
+        limiter.total_tokens = 1
+        release = threading.Event()
+        blocker = asyncio.ensure_future(anyio.to_thread.run_sync(release.wait))
+        await asyncio.sleep(0.05)
+        try:
+            transport = httpx.ASGITransport(app=app)
+            async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+                created = await client.post("/documents/", json={"file_name": "busy.pdf", "pages": 1})
+                doc_id = created.json()["id"]
+                responses = await asyncio.wait_for(
+                    asyncio.gather(*(
+                        client.get("/search/text", params={"text": f"busy-{i:02d}", "document_id": doc_id})
+                        for i in range(20)
+                    )),
+                    timeout=10,
+                )
+        finally:
+            release.set()
+            await blocker
+            limiter.total_tokens = saved_tokens
+        return [response.status_code for response in responses]
+
+    assert asyncio.run(scenario()) == [200] * 20
+
+
+def test_get_db_follows_the_setting(monkeypatch, tmp_path):
+    url = f"sqlite:///{tmp_path / 'settings.db'}"
+    monkeypatch.setattr(database, "SQLALCHEMY_DATABASE_URL", url)
+    monkeypatch.setattr(dependencies.get_settings(), "database_async", True)
+    database.get_async_engine.cache_clear()
+
+    async def session_type():
+        sessions = get_db()
+        db = await sessions.__anext__()
+        await sessions.aclose()
+        return type(db)
+
+    try:
+        assert asyncio.run(session_type()) is AsyncSession
+    finally:
+        asyncio.run(database.get_async_engine().dispose())
+        database.get_async_engine.cache_clear()
+
+
+def test_small_requests_are_served_during_a_large_render(app, async_engine, monkeypatch):
+    """Rendering and compressing a body leave the event loop to other requests."""
+    sync_engine = create_engine(async_engine.url.set(drivername="sqlite"))
+    with Session(sync_engine) as db:
+        doc = crud.create_document(db, schemas.DocumentCreate(file_name="large.pdf", pages=1))
+        records = [
+            {"page": 1, "text": f"FH-A2-{i:04d}", "x_coord": i, "y_coord": 0, "width": 1, "height": 1}
+            for i in range(2000)
+        ]
+        crud.bulk_create_ocr_results(db, records, doc.id)
+        doc_id = doc.id
+    sync_engine.dispose()
+
+    # Stand-ins for a document ten times larger; on the event loop they would stall it.
+    def slow(function):
+        def run(*args):
+            time.sleep(0.5)
+            return function(*args)
+        return run
+
+    monkeypatch.setattr(documents, "_dump_document", slow(documents._dump_document))
+    monkeypatch.setitem(http_cache.COMPRESSORS, "gzip", slow(http_cache.COMPRESSORS["gzip"]))
+
+    async def scenario():
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            summary = f"/documents/{doc_id}"
+            assert (await client.get(summary)).status_code == 200
+            large = asyncio.ensure_future(client.get(f"/doc/{doc_id}", headers={"Accept-Encoding": "gzip"}))
+            latencies = []
+            while not large.done():
+                started = time.perf_counter()
+                assert (await client.get(summary, headers={"Accept-Encoding": "identity"})).status_code == 200
+                latencies.append(time.perf_counter() - started)
+            assert len((await large).json()["ocr_results"]) == 2000
+        return latencies
+
+    latencies = asyncio.run(scenario())
+    assert len(latencies) >= 10
+    assert max(latencies) < 0.25
@@ -0,0 +1,95 @@
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import event
+
+from backend import crud, models, schemas
+from backend.routers import lines, ocr
+from backend.services.dependencies import get_db
+
+
+@pytest.fixture
+def client(db_session):
+    app = FastAPI()
+    app.include_router(lines.router)
+    app.include_router(ocr.router)
+    app.dependency_overrides[get_db] = lambda: db_session
+    return TestClient(app)
+
+
+def _document(db_session, name, rows=4):
+    doc = crud.create_document(db_session, schemas.DocumentCreate(file_name=name, pages=1))
+    records = [
+        {"page": 1, "text": f"FH-A2-{i:04d}", "x_coord": i, "y_coord": 0, "width": 1, "height": 1} for i in range(rows)
+    ]
+    crud.bulk_create_line_numbers(db_session, records, doc.id)
+    crud.bulk_create_ocr_results(db_session, records, doc.id)
+    line_ids = [row.id for row in db_session.query(models.LineNumber).filter_by(document_id=doc.id).order_by(models.LineNumber.id)]
+    ocr_ids = [row.id for row in crud.get_ocr_results(db_session, doc.id)]
+    return doc.id, line_ids, ocr_ids
+
+
+def test_only_changed_rows_are_written_and_returned(db_session):
+    doc_id, line_ids, _ = _document(db_session, "changed.pdf")
+    version = crud.get_document_version(db_session, doc_id)
+    corrections = [
+        {"id": line_ids[0], "text": "FH-A2-0000", "status": "pending"},  # as stored
+        {"id": line_ids[1], "text": "FH-A2-0001", "status": "corrected"},
+        {"id": line_ids[2], "text": "FH-A2-9999", "status": "corrected"},
+        {"id": line_ids[2], "text": "FH-A2-0002X", "status": "corrected"},  # a later entry wins
+    ]
+    changed = crud.bulk_update_rows(db_session, models.LineNumber, corrections)
+    assert [(row.id, row.text, row.status) for row in changed] == [
+        (line_ids[1], "FH-A2-0001", "corrected"),
+        (line_ids[2], "FH-A2-0002X", "corrected"),
+    ]
+    assert changed[1].text_key == "FHA20002X"
+    assert crud.get_document_version(db_session, doc_id) == version + 1
+
+    assert crud.bulk_update_rows(db_session, models.LineNumber, corrections) == []
+    assert crud.get_document_version(db_session, doc_id) == version + 1
+
+
+def test_one_update_statement_per_batch(db_session, db_engine):
+    doc_id, _, ocr_ids = _document(db_session, "set-based.pdf", rows=300)
+    updates = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith("UPDATE OCR_RESULTS"):
+            updates.append(statement)
+
+    event.listen(db_engine, "before_cursor_execute", record)
+    try:
+        changed = crud.bulk_update_rows(
+            db_session, models.OcrResult, [{"id": id_, "text": f"T-{id_}", "status": "corrected"} for id_ in ocr_ids],
+        )
+    finally:
+        event.remove(db_engine, "before_cursor_execute", record)
+    assert len(changed) == 300 and len(updates) == 1
+    assert crud.search_text(db_session, models.OcrResult, f"T-{ocr_ids[-1]}", document_id=doc_id)
+
+
+def test_batch_endpoints(client, db_session):
+    doc_id, line_ids, ocr_ids = _document(db_session, "endpoint.pdf")
+    response = client.patch("/lines", json=[
+        {"id": line_ids[0], "text": "L-1", "status": "corrected"},
+        {"id": line_ids[1], "text": "FH-A2-0001", "status": "pending"},
+    ])
+    assert response.status_code == 200
+    assert [(row["id"], row["text"]) for row in response.json()] == [(line_ids[0], "L-1")]
+
+    response = client.patch("/ocr_results", json=[{"id": ocr_ids[3], "text": "O-3", "status": "corrected"}])
+    assert response.status_code == 200
+    assert response.json()[0]["text"] == "O-3" and response.json()[0]["document_id"] == doc_id
+    assert client.patch("/ocr_results", json=[]).json() == []
+
+
+def test_unknown_ids_reject_the_whole_batch(client, db_session):
+    _, line_ids, _ = _document(db_session, "unknown.pdf")
+    response = client.patch("/lines", json=[
+        {"id": line_ids[0], "text": "L-1", "status": "corrected"},
+        {"id": 99999, "text": "L-2", "status": "corrected"},
+    ])
+    assert response.status_code == 404
+    assert "99999" in response.json()["detail"]
+    assert db_session.get(models.LineNumber, line_ids[0]).text == "FH-A2-0000"
@@ -50,3 +50,22 @@ def test_create_and_get_line_number(db_session):
     line = crud.create_line_number(db_session, line_data, doc.id)
     assert line is not None
     assert line.text == "LN-001"
+
+
+def test_bulk_create_ocr_results_and_line_numbers(db_session):
+    service = DocumentService(db_session)
+    doc = service.create_document(schemas.DocumentCreate(file_name="bulk.pdf", pages=1))
+    records = [
+        schemas.OcrResultCreate(page=1, text=f"T-{i}", x_coord=i, y_coord=i, width=1, height=1)
+        for i in range(5)
+    ]
+    created = crud.bulk_create_ocr_results(db_session, iter(records), doc.id, chunk_size=2)
+    assert created == 5
+    results = crud.get_ocr_results(db_session, doc.id)
+    assert sorted(r.text for r in results) == [f"T-{i}" for i in range(5)]
+    assert {r.status for r in results} == {"auto"}
+
+    lines = [{"page": 1, "text": "LN-1", "x_coord": 1, "y_coord": 2, "width": 3, "height": 4}]
+    assert crud.bulk_create_line_numbers(db_session, lines, doc.id) == 1
+    fetched = crud.get_document(db_session, doc.id)
+    assert [(l.text, l.status) for l in fetched.line_numbers] == [("LN-1", "pending")]
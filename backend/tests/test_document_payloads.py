@@ -0,0 +1,91 @@
+import json
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import event
+
+from backend import crud, schemas
+from backend.routers.documents import router
+from backend.services.dependencies import get_db
+from backend.services.http_cache import payload_store
+
+
+@pytest.fixture
+def client(db_session):
+    app = FastAPI()
+    app.include_router(router)
+    app.dependency_overrides[get_db] = lambda: db_session
+    # Every module's in-memory database starts again at document 1, version 1.
+    payload_store.clear()
+    return TestClient(app)
+
+
+def _document(db_session, ocr_count=6, line_count=3):
+    doc = crud.create_document(db_session, schemas.DocumentCreate(file_name="payload.pdf", pages=2))
+    crud.bulk_create_ocr_results(
+        db_session,
+        [
+            schemas.OcrResultCreate(page=1 + i % 2, text=f"Ö-{i}", x_coord=i, y_coord=0, width=1, height=1)
+            for i in range(ocr_count)
+        ],
+        doc.id,
+    )
+    crud.bulk_create_line_numbers(
+        db_session,
+        [
+            schemas.LineNumberCreate(page=1, text=f"L-{i}", x_coord=i, y_coord=0, width=1, height=1)
+            for i in range(line_count)
+        ],
+        doc.id,
+    )
+    return doc
+
+
+def test_get_document_does_not_join_both_collections(db_engine, db_session):
+    doc_id = _document(db_session).id
+    db_session.expire_all()
+    statements = []
+    listener = lambda conn, cursor, statement, *args: statements.append(statement)
+    event.listen(db_engine, "before_cursor_execute", listener)
+    try:
+        loaded = crud.get_document(db_session, doc_id)
+    finally:
+        event.remove(db_engine, "before_cursor_execute", listener)
+    assert (len(loaded.ocr_results), len(loaded.line_numbers)) == (6, 3)
+    assert len(statements) == 3
+    assert not any("JOIN" in statement.upper() for statement in statements)
+
+
+def test_collection_endpoints_match_full_document(client, db_session):
+    doc = _document(db_session)
+    full = client.get(f"/doc/{doc.id}").json()
+
+    summary = client.get(f"/documents/{doc.id}").json()
+    assert summary == {k: v for k, v in full.items() if k not in ("ocr_results", "line_numbers")}
+    assert client.get(f"/documents/{doc.id}/ocr_results").json() == full["ocr_results"]
+    assert client.get(f"/documents/{doc.id}/line_numbers").json() == full["line_numbers"]
+
+    page = client.get(f"/documents/{doc.id}/ocr_results", params={"page": 2, "skip": 1, "limit": 1}).json()
+    assert [row["text"] for row in page] == ["Ö-3"]
+
+
+def test_ndjson_stream_matches_json(client, db_session):
+    doc = _document(db_session, ocr_count=2500)
+    expected = client.get(f"/documents/{doc.id}/ocr_results").json()
+
+    response = client.get(f"/documents/{doc.id}/ocr_results", params={"format": "ndjson"})
+    assert response.headers["content-type"] == "application/x-ndjson"
+    assert [json.loads(line) for line in response.text.splitlines()] == expected
+
+    response = client.get(
+        f"/documents/{doc.id}/line_numbers", headers={"Accept": "application/x-ndjson"}
+    )
+    assert len(response.text.splitlines()) == 3
+
+
+def test_collection_errors(client, db_session):
+    assert client.get("/documents/999/ocr_results").status_code == 404
+    assert client.get("/documents/999/ocr_results", params={"format": "ndjson"}).status_code == 404
+    assert client.get("/documents/999").status_code == 404
+    assert client.get("/documents/1/ocr_results", params={"format": "xml"}).status_code == 422
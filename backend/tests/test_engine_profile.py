@@ -0,0 +1,143 @@
+import threading
+import time
+
+import pytest
+from sqlalchemy import text
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import Session
+
+from backend import crud, models, schemas
+from backend.config import Settings
+from backend.database import Base, build_engine, engine_options, sqlite_pragmas
+
+
+@pytest.fixture
+def settings():
+    # A busy timeout far shorter than the writes below hold the lock.
+    return Settings(sqlite_write_queue=True, sqlite_busy_timeout_ms=50)
+
+@pytest.fixture
+def file_engine(tmp_path, settings):
+    engine = build_engine(f"sqlite:///{tmp_path / 'profile.db'}", settings)
+    Base.metadata.create_all(engine)
+    yield engine
+    engine.dispose()
+
+@pytest.fixture
+def unqueued_engine(tmp_path, settings):
+    engine = build_engine(f"sqlite:///{tmp_path / 'unqueued.db'}", settings.model_copy(update={"sqlite_write_queue": False}))
+    Base.metadata.create_all(engine)
+    yield engine
+    engine.dispose()
+
+
+def _document(engine, rows=20):
+    with Session(engine) as db:
+        doc = crud.create_document(db, schemas.DocumentCreate(file_name="profile.pdf", pages=1))
+        records = [
+            {"page": 1, "text": f"FH-{i:04d}", "x_coord": i, "y_coord": 0, "width": 1, "height": 1} for i in range(rows)
+        ]
+        crud.bulk_create_ocr_results(db, records, doc.id)
+        return doc.id, [row.id for row in crud.get_ocr_results(db, doc.id)]
+
+
+def test_engine_options(settings):
+    assert engine_options("sqlite://", settings) == {
+        "pool_pre_ping": True, "connect_args": {"check_same_thread": False},
+    }
+    options = engine_options("postgresql://u@db/pid", Settings(database_pool_size=20, database_pool_pre_ping=False))
+    assert options == {"pool_pre_ping": False, "pool_size": 20, "max_overflow": 10, "pool_timeout": 30}
+
+
+def test_pragmas_are_applied(file_engine):
+    with file_engine.connect() as connection:
+        values = [connection.execute(text(f"PRAGMA {name}")).scalar() for name in (
+            "journal_mode", "synchronous", "busy_timeout", "mmap_size",
+        )]
+    assert values == ["wal", 1, 50, 256 * 1024 * 1024]
+
+
+def test_unknown_pragma_values_are_rejected():
+    with pytest.raises(ValueError):
+        sqlite_pragmas(Settings(sqlite_journal_mode="wal; DROP TABLE documents"))
+    with pytest.raises(ValueError):
+        sqlite_pragmas(Settings(sqlite_synchronous="sometimes"))
+
+
+def _write_behind_open_transaction(engine, hold):
+    """Hold a write transaction open for ``hold`` seconds while another thread
+    writes and a third reads; return what the other two saw, in order."""
+    doc_id, ids = _document(engine)
+    events = []
+    first = Session(engine)
+    first.execute(text("UPDATE ocr_results SET status = 'held' WHERE id = :id"), {"id": ids[0]})
+
+    def write():
+        try:
+            with Session(engine) as db:
+                crud.update_ocr_result(db, ids[1], "QUEUED", "corrected")
+            events.append("write")
+        except OperationalError:
+            events.append("locked")
+
+    def read():
+        with Session(engine) as db:
+            assert len(crud.get_page_rows(db, models.OcrResult, doc_id, 1)) == 20
+        events.append("read")
+
+    writer = threading.Thread(target=write)
+    reader = threading.Thread(target=read)
+    writer.start()
+    reader.start()
+    reader.join(timeout=5)
+    time.sleep(hold)
+    first.commit()
+    first.close()
+    writer.join(timeout=5)
+    return events
+
+
+def test_writers_wait_in_the_queue_while_reads_go_ahead(file_engine):
+    assert _write_behind_open_transaction(file_engine, hold=0.3) == ["read", "write"]
+
+
+def test_without_the_queue_writers_time_out(unqueued_engine):
+    assert sorted(_write_behind_open_transaction(unqueued_engine, hold=0.3)) == ["locked", "read"]
+
+
+def test_concurrent_reads_and_writes(file_engine):
+    doc_id, ids = _document(file_engine)
+    errors, reads, writes = [], [], []
+    stop = time.perf_counter() + 1.0
+
+    def writer(offset):
+        try:
+            i = 0
+            while time.perf_counter() < stop:
+                with Session(file_engine) as db:
+                    crud.update_ocr_result(db, ids[(offset + i) % len(ids)], f"W{offset}-{i}", "corrected")
+                writes.append(offset)
+                i += 1
+        except Exception as exc:
+            errors.append(exc)
+
+    def reader():
+        try:
+            while time.perf_counter() < stop:
+                with Session(file_engine) as db:
+                    crud.get_page_rows(db, models.OcrResult, doc_id, 1)
+                reads.append(1)
+        except Exception as exc:
+            errors.append(exc)
+
+    threads = [threading.Thread(target=writer, args=(n,)) for n in range(6)]
+    threads += [threading.Thread(target=reader) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert errors == []
+    assert writes and reads
+    with Session(file_engine) as db:
+        assert crud.get_document_version(db, doc_id) == len(writes) + 2
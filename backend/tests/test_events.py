@@ -0,0 +1,291 @@
+import asyncio
+import json
+import time
+from contextlib import contextmanager
+from datetime import datetime, timedelta, timezone
+
+import httpx
+import pytest
+from fastapi import FastAPI
+from fastapi.concurrency import run_in_threadpool
+from fastapi.testclient import TestClient
+from sqlalchemy import insert
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import sessionmaker
+
+from backend import crud, models, schemas
+from backend.config import get_settings
+from backend.ocr.incremental import ImportStats, RowDiff
+from backend.routers import events, lines, ocr
+from backend.services.dependencies import get_db
+from backend.services.events import EventBroker, get_broker, open_stream
+from backend.tests.conftest import static_engine
+
+
+@pytest.fixture
+def Session():
+    for engine in static_engine():
+        yield sessionmaker(bind=engine)
+
+@pytest.fixture
+def fast_poll():
+    settings = get_settings()
+    saved = settings.events_poll_interval, settings.events_keepalive_seconds
+    settings.events_poll_interval, settings.events_keepalive_seconds = 0.05, 0.2
+    yield
+    settings.events_poll_interval, settings.events_keepalive_seconds = saved
+
+@pytest.fixture
+def document(Session):
+    with Session() as db:
+        doc = crud.create_document(db, schemas.DocumentCreate(file_name="events.pdf", pages=2))
+        records = [{"page": 1, "text": f"FH-A2-{i:04d}", "x_coord": i, "y_coord": 0, "width": 1, "height": 1} for i in range(3)]
+        crud.bulk_create_line_numbers(db, records, doc.id)
+        line_ids = [row.id for row in db.query(models.LineNumber).order_by(models.LineNumber.id)]
+        return doc.id, line_ids
+
+
+async def _next_event(stream):
+    """``(id, kind, data)`` of the next event of a text/event-stream body, skipping comments."""
+    while True:
+        frame = await asyncio.wait_for(stream.__anext__(), 5)
+        fields = dict(line.split(": ", 1) for line in frame.strip().splitlines() if not line.startswith(":"))
+        if "event" in fields:
+            return int(fields["id"]), fields["event"], json.loads(fields["data"])
+
+
+def test_row_updates_are_pushed(Session, document, fast_poll):
+    doc_id, line_ids = document
+
+    def correct(line_id, text):
+        with Session() as db:
+            crud.update_line_number(db, line_id, text, "corrected")
+
+    async def scenario():
+        broker = EventBroker(Session)
+        stream = await open_stream(broker, doc_id, None)
+        other = await open_stream(broker, doc_id, None)
+        assert await stream.__anext__() == "retry: 1000\n\n"
+        await other.__anext__()
+
+        started = time.perf_counter()
+        await run_in_threadpool(correct, line_ids[0], "FH-A2-9000")
+        broker.notify()
+        event_id, kind, data = await _next_event(stream)
+        latency = time.perf_counter() - started
+        assert kind == "rows"
+        assert data == {"table": "line_numbers", "rows": [{"id": line_ids[0], "page": 1, "text": "FH-A2-9000", "status": "corrected"}]}
+        assert (await _next_event(other))[0] == event_id
+
+        # Without notify() the next poll finds it.
+        await run_in_threadpool(correct, line_ids[1], "FH-A2-9001")
+        second = await _next_event(stream)
+        assert second[0] > event_id and second[2]["rows"][0]["text"] == "FH-A2-9001"
+
+        # Idle streams send keepalive comments.
+        assert await asyncio.wait_for(stream.__anext__(), 1) == ": keepalive\n\n"
+        await stream.aclose()
+        await other.aclose()
+        assert not broker._subscribers
+        return latency
+
+    assert asyncio.run(scenario()) < 1
+
+
+def test_late_commits_are_pushed(Session, document, fast_poll):
+    doc_id, _ = document
+    with Session() as db:
+        base = crud.get_last_event_id(db)
+
+    def commit(event_id, text):
+        # As a writer that took ``event_id`` when it inserted its event.
+        with Session() as db:
+            db.execute(insert(models.DocumentEvent).values(
+                id=event_id, document_id=doc_id, kind="rows", payload=json.dumps({"text": text})
+            ))
+            db.commit()
+
+    async def scenario():
+        broker = EventBroker(Session)
+        stream = await open_stream(broker, doc_id, None)
+        await stream.__anext__()
+        # Two sessions took ids base + 1 and base + 2; the second commits first.
+        await run_in_threadpool(commit, base + 2, "second")
+        broker.notify()
+        pushed = [await _next_event(stream)]
+        await run_in_threadpool(commit, base + 1, "first")
+        broker.notify()
+        pushed.append(await _next_event(stream))
+        await stream.aclose()
+        return pushed, broker
+
+    pushed, broker = asyncio.run(scenario())
+    assert [(event_id, data["text"]) for event_id, _, data in pushed] == [(base + 2, "second"), (base + 1, "first")]
+    assert broker.last_id == base + 2 and not broker._gaps
+
+
+def test_failed_reads_are_retried(Session, document, fast_poll, caplog):
+    doc_id, line_ids = document
+    fail = []
+
+    @contextmanager
+    def sessions():
+        if fail:
+            fail.pop()
+            raise OperationalError("SELECT", {}, Exception("database is locked"))
+        with Session() as db:
+            yield db
+
+    def correct():
+        with Session() as db:
+            crud.update_line_number(db, line_ids[0], "FH-A2-9002", "corrected")
+
+    async def scenario():
+        broker = EventBroker(sessions)
+        stream = await open_stream(broker, doc_id, None)
+        await stream.__anext__()
+        fail.append(1)  # the next poll
+        await run_in_threadpool(correct)
+        broker.notify()
+        event = await _next_event(stream)
+        assert not broker._task.done()
+        await stream.aclose()
+        return event
+
+    _, kind, data = asyncio.run(scenario())
+    assert kind == "rows" and data["rows"][0]["text"] == "FH-A2-9002"
+    assert not fail and "Could not read document events" in caplog.text
+
+
+def test_reconnect_replays_missed_events(Session, document, fast_poll):
+    doc_id, line_ids = document
+    with Session() as db:
+        crud.bulk_update_rows(db, models.LineNumber, [{"id": line_ids[0], "text": "A", "status": "corrected"}])
+        missed_from = crud.get_last_event_id(db)
+        crud.bulk_update_rows(db, models.LineNumber, [
+            {"id": line_ids[1], "text": "B", "status": "corrected"},
+            {"id": line_ids[2], "text": "C", "status": "corrected"},
+        ])
+        crud.apply_row_diff(db, models.LineNumber, doc_id, RowDiff(deletes=[line_ids[2]]), "pending", page=1)
+        db.commit()
+
+    async def scenario():
+        broker = EventBroker(Session)
+        stream = await open_stream(broker, doc_id, missed_from)
+        rows = await _next_event(stream)
+        page = await _next_event(stream)
+        await stream.aclose()
+        return rows, page
+
+    (rows_id, kind, data), (page_id, page_kind, page_data) = asyncio.run(scenario())
+    assert (kind, [row["text"] for row in data["rows"]]) == ("rows", ["B", "C"])
+    assert rows_id > missed_from and page_id > rows_id
+    assert page_kind == "page"
+    assert page_data == {"table": "line_numbers", "page": 1, "inserted": 0, "updated": 0, "deleted": 1}
+
+
+def test_reconnect_after_pruning_resets(Session, document, fast_poll):
+    doc_id, line_ids = document
+    with Session() as db:
+        for text in ("A", "B"):
+            crud.update_line_number(db, line_ids[0], text, "corrected")
+        first = crud.get_first_event_id(db)
+        # The fixture's insert and the two corrections.
+        assert crud.prune_events(db, datetime.now(timezone.utc) + timedelta(seconds=5)) == 3
+        crud.update_line_number(db, line_ids[0], "C", "corrected")
+        last = crud.get_last_event_id(db)
+        # Ids are not reused after a prune.
+        assert last == first + 3
+
+    async def scenario():
+        stream = await open_stream(EventBroker(Session), doc_id, first)
+        event = await _next_event(stream)
+        await stream.aclose()
+        return event
+
+    assert asyncio.run(scenario()) == (last, "reset", {})
+
+
+def test_imports_are_pushed(Session, document, monkeypatch):
+    doc_id, _ = document
+    broker = EventBroker(Session)
+    # Only notify() can deliver the events in time.
+    monkeypatch.setattr(get_settings(), "events_poll_interval", 60)
+
+    def sessions():
+        with Session() as db:
+            yield db
+
+    app = FastAPI()
+    app.include_router(ocr.router)
+    app.dependency_overrides[get_db] = sessions
+    app.dependency_overrides[get_broker] = lambda: broker
+    records = [
+        {"page": page, "text": f"FH-A2-{i:04d}", "x_coord": i, "y_coord": 0, "width": 1, "height": 1}
+        for i, page in enumerate([1, 1, 2])
+    ]
+
+    async def scenario():
+        stream = await open_stream(broker, doc_id, None)
+        await stream.__anext__()
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            response = await client.post(f"/documents/{doc_id}/parse-json", json={"line_numbers": records})
+        assert response.status_code == 200
+        pushed = [await _next_event(stream), await _next_event(stream)]
+        await stream.aclose()
+        return pushed
+
+    pushed = asyncio.run(scenario())
+    assert [(kind, data) for _, kind, data in pushed] == [
+        ("page", {"table": "ocr_results", "page": 1, "inserted": 2, "updated": 0, "deleted": 0}),
+        ("page", {"table": "ocr_results", "page": 2, "inserted": 1, "updated": 0, "deleted": 0}),
+    ]
+
+    with Session() as db:
+        crud.delete_ocr_results_by_document(db, doc_id)
+        event = crud.get_events(db, pushed[-1][0], doc_id)[-1]
+    assert (event.kind, json.loads(event.payload)) == (
+        "page", {"table": "ocr_results", "page": None, "inserted": 0, "updated": 0, "deleted": 3}
+    )
+
+
+def test_job_progress_is_pushed(Session, document):
+    doc_id, _ = document
+    with Session() as db:
+        job = crud.create_job(db, doc_id, "document_ai_stream", "/tmp/ocr.json")
+        assert crud.claim_job(db, "w1", datetime.now(timezone.utc) - timedelta(hours=1), 3) == job.id
+        crud.update_job_progress(db, job.id, "w1", ImportStats(pages_changed=1, inserted=2))
+        crud.finish_job(db, job.id, "w1")
+        events = crud.get_events(db, 0, doc_id)
+    jobs = [json.loads(event.payload) for event in events if event.kind == "job"]
+    assert [(job["status"], job["rows_inserted"]) for job in jobs] == [("running", 2), ("succeeded", 2)]
+
+
+class RecordingBroker(EventBroker):
+    notified = 0
+
+    def notify(self):
+        self.notified += 1
+
+
+def test_routes(Session, document):
+    doc_id, line_ids = document
+    broker = RecordingBroker(Session)
+
+    def sessions():
+        with Session() as db:
+            yield db
+
+    app = FastAPI()
+    app.include_router(events.router)
+    app.include_router(lines.router)
+    app.dependency_overrides[get_db] = sessions
+    app.dependency_overrides[get_broker] = lambda: broker
+    client = TestClient(app)
+
+    assert client.get("/documents/999/events").status_code == 404
+    response = client.patch("/lines", json=[{"id": line_ids[0], "text": "X", "status": "corrected"}])
+    assert response.status_code == 200 and broker.notified == 1
+    response = client.patch(f"/line/{line_ids[1]}", params={"text": "Y", "status": "corrected"})
+    assert response.status_code == 200 and broker.notified == 2
@@ -0,0 +1,117 @@
+import math
+
+import numpy as np
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from backend import crud, schemas
+from backend.routers import documents, lines, ocr
+from backend.services.dependencies import get_db
+from backend.services.http_cache import payload_store
+from backend.services.geometry import (
+    GEOMETRY_MEDIA_TYPE,
+    NO_STRING,
+    decode_geometry,
+    encode_geometry,
+)
+
+
+@pytest.fixture
+def client(db_session):
+    app = FastAPI()
+    for module in (documents, lines, ocr):
+        app.include_router(module.router)
+    app.dependency_overrides[get_db] = lambda: db_session
+    # Ids and versions restart with every in-memory database.
+    payload_store.clear()
+    return TestClient(app)
+
+
+def test_round_trip_deduplicates_strings():
+    rows = [
+        (7, 1, 10.5, 20.25, 30.0, 4.0, '6"-FH-A1-06', "auto"),
+        (9, 2, 0.0, 0.0, 1.0, 1.0, "ÖЛ-01", "auto"),
+        (12, None, None, 1.0, 2.0, 3.0, None, "corrected"),
+        (13, 1, 5.0, 6.0, 7.0, 8.0, '6"-FH-A1-06', "auto"),
+    ]
+    payload = encode_geometry(rows, document_id=3)
+    assert len(payload) % 4 == 0
+
+    decoded = decode_geometry(payload)
+    assert decoded["document_id"] == 3
+    assert decoded["ids"].tolist() == [7, 9, 12, 13]
+    assert decoded["pages"].tolist() == [1, 2, 0, 1]
+    assert decoded["boxes"][0].tolist() == [10.5, 20.25, 30.0, 4.0]
+    assert math.isnan(decoded["boxes"][2][0])
+    assert decoded["texts"] == ['6"-FH-A1-06', "ÖЛ-01", None, '6"-FH-A1-06']
+    assert decoded["statuses"] == ["auto", "auto", "corrected", "auto"]
+    assert decoded["strings"] == ['6"-FH-A1-06', "ÖЛ-01", "auto", "corrected"]
+
+
+def test_sections_are_aligned_typed_arrays():
+    payload = encode_geometry([(1, 1, 1.0, 2.0, 3.0, 4.0, "abc", "auto")], document_id=1)
+    # Header, ids, pages, then the interleaved float32 boxes.
+    boxes = np.frombuffer(payload, dtype="<f4", count=4, offset=24 + 4 + 4)
+    assert boxes.tolist() == [1.0, 2.0, 3.0, 4.0]
+    assert np.frombuffer(payload, dtype="<u4", count=1, offset=24 + 8 + 16)[0] == 0
+
+
+def test_null_text_has_no_string_index():
+    payload = encode_geometry([(1, 1, 1.0, 2.0, 3.0, 4.0, None, "auto")], document_id=1)
+    assert np.frombuffer(payload, dtype="<u4", count=1, offset=24 + 8 + 16)[0] == NO_STRING
+
+
+def test_empty_payload():
+    decoded = decode_geometry(encode_geometry([], document_id=5))
+    assert (len(decoded["ids"]), decoded["strings"]) == (0, [])
+
+
+def test_endpoints_negotiate_binary_geometry(client, db_session):
+    doc = crud.create_document(db_session, schemas.DocumentCreate(file_name="geometry.pdf", pages=1))
+    crud.bulk_create_ocr_results(
+        db_session,
+        [{"page": 1, "text": f"T-{i % 3}", "x_coord": i, "y_coord": 0, "width": 2, "height": 1} for i in range(10)],
+        doc.id,
+    )
+    crud.bulk_create_line_numbers(
+        db_session, [{"page": 1, "text": "L-1", "x_coord": 0, "y_coord": 0, "width": 5, "height": 5}], doc.id
+    )
+    headers = {"Accept": GEOMETRY_MEDIA_TYPE}
+
+    as_json = client.get(f"/documents/{doc.id}/ocr_results").json()
+    response = client.get(f"/documents/{doc.id}/ocr_results", headers=headers)
+    assert response.headers["content-type"] == GEOMETRY_MEDIA_TYPE
+    assert response.headers["vary"] == "Accept, Accept-Encoding"
+    decoded = decode_geometry(response.content)
+    assert decoded["ids"].tolist() == [row["id"] for row in as_json]
+    assert decoded["texts"] == [row["text"] for row in as_json]
+    assert decoded["boxes"][:, 0].tolist() == [row["x_coord"] for row in as_json]
+    assert len(decoded["strings"]) == 4
+
+    response = client.get(f"/documents/{doc.id}/pages/1/ocr", params={"bbox": "0,0,3,1"}, headers=headers)
+    assert decode_geometry(response.content)["ids"].tolist() == [row["id"] for row in as_json[:4]]
+    response = client.get(f"/documents/{doc.id}/pages/1/lines", headers=headers)
+    assert decode_geometry(response.content)["texts"] == ["L-1"]
+
+    # JSON stays the default, and errors are still JSON.
+    assert client.get(f"/documents/{doc.id}/pages/1/ocr").headers["content-type"] == "application/json"
+    assert client.get("/documents/999/ocr_results", headers=headers).status_code == 404
+
+
+def test_json_etag_does_not_validate_geometry(client, db_session):
+    doc = crud.create_document(db_session, schemas.DocumentCreate(file_name="geometry-etag.pdf", pages=1))
+    crud.bulk_create_ocr_results(
+        db_session, [{"page": 1, "text": "T-1", "x_coord": 0, "y_coord": 0, "width": 2, "height": 1}], doc.id
+    )
+    url = f"/documents/{doc.id}/ocr_results"
+    headers = {"Accept": GEOMETRY_MEDIA_TYPE, "Accept-Encoding": "gzip"}
+    json_etag = client.get(url, headers={"Accept-Encoding": "gzip"}).headers["etag"]
+    geometry = client.get(url, headers=headers)
+    assert geometry.headers["etag"] != json_etag
+
+    response = client.get(url, headers={**headers, "If-None-Match": json_etag})
+    assert response.status_code == 200
+    assert decode_geometry(response.content)["texts"] == ["T-1"]
+    assert client.get(url, headers={**headers, "If-None-Match": geometry.headers["etag"]}).status_code == 304
+    assert client.get(url, headers={"If-None-Match": json_etag}).status_code == 304
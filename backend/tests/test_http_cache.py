@@ -0,0 +1,141 @@
+import gzip
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from backend import crud, models, schemas
+from backend.ocr.incremental import RowDiff
+from backend.routers import documents, lines
+from backend.services import http_cache
+from backend.services.dependencies import get_db
+from backend.services.http_cache import choose_encoding, etag_matches, payload_store
+
+
+@pytest.fixture
+def client(db_session):
+    app = FastAPI()
+    for module in (documents, lines):
+        app.include_router(module.router)
+    app.dependency_overrides[get_db] = lambda: db_session
+    payload_store.clear()
+    return TestClient(app)
+
+
+def _document(db_session, name):
+    doc = crud.create_document(db_session, schemas.DocumentCreate(file_name=name, pages=1))
+    crud.bulk_create_line_numbers(
+        db_session,
+        [{"page": 1, "text": f"L-{i}", "x_coord": i, "y_coord": 0, "width": 1, "height": 1} for i in range(3)],
+        doc.id,
+    )
+    return doc.id
+
+
+def test_every_write_path_bumps_the_version(db_session):
+    doc_id = _document(db_session, "versions.pdf")
+    version = crud.get_document_version(db_session, doc_id)
+    assert version == 2  # created at 1, bumped by the bulk insert
+
+    line = db_session.query(models.LineNumber).filter_by(document_id=doc_id).first()
+    crud.update_line_number(db_session, line.id, "L-9", "corrected")
+    assert crud.get_document_version(db_session, doc_id) == version + 1
+
+    crud.apply_row_diff(db_session, models.LineNumber, doc_id, RowDiff(deletes=[line.id]), "pending")
+    assert crud.get_document_version(db_session, doc_id) == version + 2
+
+    # An import that changes nothing leaves cached bodies valid.
+    crud.apply_row_diff(db_session, models.LineNumber, doc_id, RowDiff(unchanged=2), "pending")
+    assert crud.get_document_version(db_session, doc_id) == version + 2
+
+    crud.delete_line_numbers_by_document(db_session, doc_id)
+    assert crud.get_document_version(db_session, doc_id) == version + 3
+
+
+def test_if_none_match_returns_304_until_a_write(client, db_session):
+    doc_id = _document(db_session, "etag.pdf")
+    url = f"/documents/{doc_id}/line_numbers"
+    response = client.get(url)
+    etag = response.headers["etag"]
+    assert response.headers["cache-control"] == "no-cache"
+
+    not_modified = client.get(url, headers={"If-None-Match": etag})
+    assert (not_modified.status_code, not_modified.content) == (304, b"")
+    assert not_modified.headers["etag"] == etag
+
+    line_id = response.json()[0]["id"]
+    assert client.patch(f"/line/{line_id}", params={"text": "L-X", "status": "corrected"}).status_code == 200
+    changed = client.get(url, headers={"If-None-Match": etag})
+    assert changed.status_code == 200
+    assert changed.headers["etag"] != etag
+    assert changed.json()[0]["text"] == "L-X"
+
+
+def test_bodies_are_precompressed_and_kept_per_version(client, db_session, monkeypatch):
+    doc_id = _document(db_session, "gzip.pdf")
+    calls = []
+
+    def compress(body):
+        calls.append(body)
+        return gzip.compress(body)
+
+    monkeypatch.setattr(http_cache, "COMPRESSORS", {"gzip": compress})
+
+    url = f"/doc/{doc_id}"
+    first = client.get(url, headers={"Accept-Encoding": "gzip"})
+    assert first.headers["content-encoding"] == "gzip"
+    assert first.headers["etag"].endswith('-gzip"')
+    assert first.json()["line_numbers"][0]["text"] == "L-0"
+    client.get(url, headers={"Accept-Encoding": "gzip"})
+    assert len(calls) == 1
+
+    identity = client.get(url, headers={"Accept-Encoding": "identity"})
+    assert "content-encoding" not in identity.headers
+    assert identity.json() == first.json()
+    # The gzip ETag still validates the identity representation.
+    assert client.get(url, headers={"Accept-Encoding": "identity", "If-None-Match": first.headers["etag"]}).status_code == 304
+
+    crud.create_line_number(
+        db_session,
+        schemas.LineNumberCreate(page=1, text="L-new", x_coord=9, y_coord=0, width=1, height=1),
+        doc_id,
+    )
+    fresh = client.get(url, headers={"Accept-Encoding": "gzip"})
+    assert len(calls) == 2
+    assert [line["text"] for line in fresh.json()["line_numbers"]][-1] == "L-new"
+
+
+def test_missing_document_is_still_404(client):
+    assert client.get("/documents/999/line_numbers").status_code == 404
+    assert client.get("/doc/999", headers={"If-None-Match": "*"}).status_code == 404
+
+
+def test_choose_encoding(monkeypatch):
+    monkeypatch.setattr(http_cache, "COMPRESSORS", {"zstd": None, "gzip": None})
+    assert choose_encoding("gzip, deflate, br, zstd") == "zstd"
+    assert choose_encoding("gzip, zstd;q=0") == "gzip"
+    assert choose_encoding("*;q=0.5") == "zstd"
+    assert choose_encoding("deflate") == "identity"
+    assert choose_encoding(None) == "identity"
+
+
+def test_etag_matches():
+    assert etag_matches('"d1v3"', '"d1v3-gzip"')
+    assert etag_matches('W/"d1v3-zstd", "d2v1"', '"d1v3"')
+    assert etag_matches("*", '"d1v3"')
+    assert not etag_matches('"d1v2"', '"d1v3"')
+    assert not etag_matches(None, '"d1v3"')
+    assert not etag_matches('"d1v3-gzip"', '"d1v3-geom-gzip"')
+
+
+def test_viewport_reads_leave_the_payload_store_alone(client, db_session):
+    doc_id = _document(db_session, "viewport.pdf")
+    page = f"/documents/{doc_id}/pages/1/lines"
+    assert client.get(page).status_code == 200
+    assert len(payload_store) == 1
+
+    for bbox in ("0,0,0.5,1", "1.5,0,3,1"):
+        response = client.get(page, params={"bbox": bbox}, headers={"Accept-Encoding": "gzip"})
+        assert response.status_code == 200 and response.headers["Content-Encoding"] == "gzip"
+    assert [row["text"] for row in response.json()] == ["L-1", "L-2"]
+    assert len(payload_store) == 1
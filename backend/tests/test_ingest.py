@@ -0,0 +1,83 @@
+import json
+import os
+
+import pytest
+from sqlalchemy.orm import sessionmaker
+
+from backend import crud, ingest, models
+from backend.ingest import _extract, find_drawings, ingest_directory
+from backend.tests.conftest import static_engine
+from backend.tests.test_jobs import TWO_PAGES
+
+
+@pytest.fixture
+def Session():
+    for engine in static_engine():
+        yield sessionmaker(bind=engine)
+
+@pytest.fixture
+def drawings(tmp_path):
+    (tmp_path / "area-2").mkdir()
+    for name in ("a.pdf", "area-2/b.pdf", "broken.pdf", "no-ocr.pdf"):
+        (tmp_path / name).write_bytes(b"%PDF-1.4")
+    for name in ("a.pdf", "area-2/b.pdf"):
+        (tmp_path / f"{name}_processed.json").write_text(json.dumps(TWO_PAGES))
+    (tmp_path / "broken.pdf_processed.json").write_text('{"pages": [')
+    return tmp_path
+
+
+def test_find_drawings(drawings):
+    found, missing = find_drawings(str(drawings))
+    assert sorted(found) == ["a.pdf", "area-2/b.pdf", "broken.pdf"]
+    assert found["area-2/b.pdf"] == str(drawings / "area-2" / "b.pdf_processed.json")
+    assert missing == ["no-ocr.pdf"]
+
+
+def test_ingest_directory(drawings, Session):
+    lines = []
+    summary = ingest_directory(str(drawings), workers=2, parser_name="document_ai_stream", sessions=Session, echo=lines.append)
+    assert (summary.documents, summary.records, summary.stats.inserted) == (2, 4, 4)
+    assert [name for name, _ in summary.failures] == ["broken.pdf"]
+    assert summary.missing == ["no-ocr.pdf"]
+    assert len(lines) == 3
+    report = summary.report()
+    assert "2 documents, 4 records" in report and "Failures: 1" in report and "broken.pdf:" in report
+
+    with Session() as db:
+        documents = {doc.file_name: doc for doc in crud.get_documents(db)}
+        assert sorted(documents) == ["a.pdf", "area-2/b.pdf"]
+        assert documents["a.pdf"].pages == 2
+        texts = [row.text for row in crud.get_ocr_results(db, documents["a.pdf"].id)]
+        assert texts == ['6"-FH-A1-09', "SEPARATOR"]
+
+    # A second run reuses the documents and skips their unchanged pages.
+    summary = ingest_directory(str(drawings), workers=1, parser_name="document_ai_stream", sessions=Session)
+    assert (summary.documents, summary.stats.pages_skipped, summary.stats.inserted) == (2, 4, 0)
+    with Session() as db:
+        assert len(crud.get_documents(db)) == 2
+        assert db.query(models.OcrResult).count() == 4
+
+
+def _extract_or_die(parser_name, json_path):
+    # A parsing process killed mid-file, e.g. by the OOM killer.
+    if "crash" in json_path:
+        os._exit(1)
+    return _extract(parser_name, json_path)
+
+
+def test_ingest_directory_survives_a_dead_worker(drawings, Session, monkeypatch):
+    (drawings / "later").mkdir()
+    for name in ("crash.pdf", "later/c.pdf", "later/d.pdf"):
+        (drawings / name).write_bytes(b"%PDF-1.4")
+        (drawings / f"{name}_processed.json").write_text(json.dumps(TWO_PAGES))
+    monkeypatch.setattr(ingest, "_extract", _extract_or_die)
+    summary = ingest_directory(str(drawings), workers=1, parser_name="document_ai_stream", sessions=Session)
+    # One worker parses in order: a.pdf, broken.pdf, crash.pdf, then the
+    # subdirectories; those after crash.pdf are never parsed.
+    assert summary.documents == 1
+    failures = dict(summary.failures)
+    assert sorted(failures) == ["area-2/b.pdf", "broken.pdf", "crash.pdf", "later/c.pdf", "later/d.pdf"]
+    for name in ("crash.pdf", "area-2/b.pdf", "later/c.pdf", "later/d.pdf"):
+        assert failures[name].startswith("BrokenProcessPool")
+    with Session() as db:
+        assert [doc.file_name for doc in crud.get_documents(db)] == ["a.pdf"]
@@ -0,0 +1,227 @@
+import gzip
+import json
+import os
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from backend import crud, models, schemas
+from backend.config import get_settings
+from backend.database import Base
+from backend.ocr.incremental import ImportStats
+from backend.routers import jobs
+from backend.services.dependencies import get_db
+from backend.tests.conftest import static_engine
+from backend.tests.test_ocr_streaming import SAMPLE
+from backend.worker import JobWorker, WorkerPool
+
+PARSER = "document_ai_stream"
+# SAMPLE with one line on each of its pages.
+FIRST_PAGE = SAMPLE["pages"][0]
+TWO_PAGES = {**SAMPLE, "pages": [
+    {**FIRST_PAGE, "lines": FIRST_PAGE["lines"][:1]},
+    {**FIRST_PAGE, "pageNumber": 2, "lines": FIRST_PAGE["lines"][1:]},
+]}
+
+
+@pytest.fixture
+def db_engine():
+    # Every test starts from an empty queue.
+    yield from static_engine()
+
+@pytest.fixture
+def Session(db_engine):
+    return sessionmaker(bind=db_engine)
+
+@pytest.fixture
+def job_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(get_settings(), "job_dir", str(tmp_path / "jobs"))
+    return tmp_path / "jobs"
+
+@pytest.fixture
+def client(db_session, job_dir):
+    app = FastAPI()
+    app.include_router(jobs.router)
+    app.dependency_overrides[get_db] = lambda: db_session
+    return TestClient(app)
+
+
+def _document(db_session, name="jobs.pdf"):
+    return crud.create_document(db_session, schemas.DocumentCreate(file_name=name, pages=2)).id
+
+
+def _job_file(tmp_path, data=TWO_PAGES, name="job.json"):
+    path = tmp_path / name
+    path.write_text(data if isinstance(data, str) else json.dumps(data))
+    return str(path)
+
+
+def _worker(Session, name="w1", stop=None):
+    return JobWorker(Session, stop=stop or threading.Event(), name=name)
+
+
+def _ages(minutes):
+    return datetime.now(timezone.utc) - timedelta(minutes=minutes)
+
+
+def test_claim_gives_each_job_to_one_worker(db_session):
+    doc_id = _document(db_session)
+    first = crud.create_job(db_session, doc_id, PARSER, "a.json").id
+    second = crud.create_job(db_session, doc_id, PARSER, "b.json").id
+
+    assert crud.claim_job(db_session, "w1", _ages(10), 3) == first
+    assert crud.claim_job(db_session, "w2", _ages(10), 3) == second
+    assert crud.claim_job(db_session, "w3", _ages(10), 3) is None
+    job = crud.get_job(db_session, first)
+    assert (job.status, job.worker, job.attempts) == ("running", "w1", 1)
+    # Only the worker running a job reports on it.
+    assert not crud.update_job_progress(db_session, first, "w2", ImportStats())
+    assert crud.finish_job(db_session, first, "w1")
+    assert crud.get_job(db_session, first).status == "succeeded"
+
+
+def test_stale_jobs_are_claimed_again_then_failed(db_session):
+    doc_id = _document(db_session)
+    job_id = crud.create_job(db_session, doc_id, PARSER, "a.json").id
+    assert crud.claim_job(db_session, "w1", _ages(10), 2) == job_id
+    # w1 stops reporting: its heartbeat is older than the stale limit.
+    assert crud.claim_job(db_session, "w2", _ages(-1), 2) == job_id
+    assert crud.get_job(db_session, job_id).attempts == 2
+    assert not crud.finish_job(db_session, job_id, "w1")
+
+    assert crud.claim_job(db_session, "w3", _ages(-1), 2) is None
+    db_session.expire_all()
+    job = crud.get_job(db_session, job_id)
+    assert job.status == "failed" and "stopped responding" in job.error
+
+
+def test_worker_imports_the_file_and_reports_progress(Session, db_session, tmp_path, monkeypatch):
+    doc_id = _document(db_session)
+    path = _job_file(tmp_path)
+    job_id = crud.create_job(db_session, doc_id, PARSER, path).id
+    reports = []
+    original = crud.update_job_progress
+
+    def spy(db, job_id, worker, stats):
+        reports.append(stats.pages_changed)
+        return original(db, job_id, worker, stats)
+
+    monkeypatch.setattr(crud, "update_job_progress", spy)
+    assert _worker(Session).run_once() == job_id
+    assert _worker(Session).run_once() is None
+
+    db_session.expire_all()
+    job = crud.get_job(db_session, job_id)
+    assert (job.status, job.pages_done, job.rows_inserted, job.error) == ("succeeded", 2, 2, None)
+    assert reports == [1, 2]  # one report per page
+    assert [row.text for row in crud.get_ocr_results(db_session, doc_id)] == ['6"-FH-A1-09', "SEPARATOR"]
+    assert not os.path.exists(path)
+
+    # A second import of the same file skips both pages.
+    job_id = crud.create_job(db_session, doc_id, PARSER, _job_file(tmp_path)).id
+    _worker(Session).run_once()
+    job = crud.get_job(db_session, job_id)
+    assert (job.status, job.pages_done, job.rows_inserted) == ("succeeded", 2, 0)
+
+
+def test_failed_job_reports_its_error(Session, db_session, tmp_path):
+    doc_id = _document(db_session)
+    path = _job_file(tmp_path, data='{"pages": [{"lines": ')
+    job_id = crud.create_job(db_session, doc_id, PARSER, path).id
+    _worker(Session).run_once()
+    job = crud.get_job(db_session, job_id)
+    assert job.status == "failed" and job.error.startswith("JSONDecodeError")
+    assert not os.path.exists(path)
+
+
+def test_stopping_worker_queues_its_job_again(Session, db_session, tmp_path):
+    doc_id = _document(db_session)
+    job_id = crud.create_job(db_session, doc_id, PARSER, _job_file(tmp_path)).id
+    stop = threading.Event()
+    stop.set()  # seen after the first page
+    assert _worker(Session, stop=stop).run_once() == job_id
+    job = crud.get_job(db_session, job_id)
+    assert (job.status, job.worker, job.attempts, job.pages_done) == ("queued", None, 0, 1)
+
+    _worker(Session, name="w2").run_once()
+    db_session.expire_all()
+    job = crud.get_job(db_session, job_id)
+    assert (job.status, job.attempts, job.rows_inserted) == ("succeeded", 1, 1)
+
+
+def test_enqueue_returns_at_once(client, db_session, job_dir):
+    doc_id = _document(db_session)
+    response = client.post(
+        f"/documents/{doc_id}/jobs",
+        params={"parser": PARSER},
+        content=gzip.compress(json.dumps(SAMPLE).encode()),
+        headers={"Content-Encoding": "gzip"},
+    )
+    assert response.status_code == 202, response.text
+    job = response.json()
+    assert response.headers["location"] == f"/jobs/{job['id']}"
+    assert (job["status"], job["parser"], job["pages_done"]) == ("queued", PARSER, 0)
+    # The body was stored, decompressed, for a worker; nothing is imported yet.
+    source = crud.get_job(db_session, job["id"]).source_path
+    assert os.path.dirname(source) == str(job_dir)
+    assert json.load(open(source)) == SAMPLE
+    assert crud.get_ocr_results(db_session, doc_id) == []
+
+    assert client.get(f"/jobs/{job['id']}").json() == job
+    assert client.get("/jobs/999").status_code == 404
+
+
+def test_enqueue_errors_and_backpressure(client, db_session, job_dir, monkeypatch):
+    doc_id = _document(db_session)
+    url = f"/documents/{doc_id}/jobs"
+    assert client.post("/documents/999/jobs", content=b"{}").status_code == 404
+    assert client.post(url, params={"parser": "nope"}, content=b"{}").status_code == 422
+    assert client.post(url, content=b"\x1f\x8bnot gzip").status_code == 400
+
+    monkeypatch.setattr(get_settings(), "job_queue_limit", 2)
+    assert client.post(url, content=b"{}").status_code == 202
+    assert client.post(url, content=b"{}").status_code == 202
+    response = client.post(url, content=b"{}")
+    assert response.status_code == 503
+    assert response.headers["retry-after"]
+    assert crud.count_jobs(db_session, "queued") == 2
+    assert len(os.listdir(job_dir)) == 2
+
+
+def test_worker_pool_processes(tmp_path, monkeypatch):
+    url = "sqlite:///" + str(tmp_path / "pool.db")
+    engine = create_engine(url)
+    Base.metadata.create_all(engine)
+    Session = sessionmaker(bind=engine)
+    with Session() as db:
+        doc_ids = [_document(db, f"pool-{i}.pdf") for i in range(3)]
+        job_ids = [
+            crud.create_job(db, doc_id, PARSER, _job_file(tmp_path, name=f"{doc_id}.json")).id
+            for doc_id in doc_ids
+        ]
+    # Spawned workers read their settings from the environment.
+    monkeypatch.setenv("DATABASE_URL", url)
+    monkeypatch.setenv("JOB_POLL_INTERVAL", "0.1")
+    pool = WorkerPool(2)
+    pool.start()
+    try:
+        deadline = time.monotonic() + 60
+        while time.monotonic() < deadline:
+            with Session() as db:
+                statuses = [crud.get_job(db, job_id).status for job_id in job_ids]
+            if all(status in ("succeeded", "failed") for status in statuses):
+                break
+            time.sleep(0.2)
+    finally:
+        pool.stop()
+    assert statuses == ["succeeded"] * 3
+    assert not any(process.is_alive() for process in pool.processes)
+    with Session() as db:
+        assert db.query(models.OcrResult).count() == 6
+    engine.dispose()
@@ -0,0 +1,98 @@
+import pytest
+from fastapi import HTTPException
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from backend import crud, models, schemas
+from backend.database import Base
+from backend.services import LodService
+from backend.services.lod import MAX_LEVEL, lod_cache, zoom_to_level
+
+
+@pytest.fixture(scope='module')
+def db_engine():
+    engine = create_engine('sqlite:///:memory:')
+    Base.metadata.create_all(engine)
+    yield engine
+    Base.metadata.drop_all(engine)
+
+@pytest.fixture(scope='function')
+def db_session(db_engine):
+    lod_cache.clear()
+    Session = sessionmaker(bind=db_engine)
+    session = Session()
+    yield session
+    session.close()
+
+
+def _box(text, x, y, page=1):
+    return {"page": page, "text": text, "x_coord": x, "y_coord": y, "width": 10, "height": 4}
+
+
+def test_zoom_to_level():
+    assert zoom_to_level(1.0, 32) == 5
+    assert zoom_to_level(0.25, 32) == 7
+    assert zoom_to_level(100.0, 32) == 0
+    assert zoom_to_level(1e-320, 32) == zoom_to_level(1e-300, 32) == MAX_LEVEL
+
+
+def test_tiny_zoom_puts_the_page_in_one_cell(db_session):
+    doc = crud.create_document(db_session, schemas.DocumentCreate(file_name="lod-far.pdf", pages=1))
+    crud.bulk_create_ocr_results(db_session, [_box("A", 0, 0), _box("C", 1000, 1000)], doc.id)
+
+    page = LodService(db_session).get_clusters(doc.id, 1, zoom=1e-320)
+    assert page.level == MAX_LEVEL
+    assert [c.count for c in page.clusters] == [2]
+
+
+def test_clusters_aggregate_boxes_per_cell(db_session):
+    doc = crud.create_document(db_session, schemas.DocumentCreate(file_name="lod.pdf", pages=1))
+    boxes = [_box("A", 0, 0), _box("B", 20, 0), _box("C", 1000, 1000), _box("D", 0, 0, page=2)]
+    crud.bulk_create_ocr_results(db_session, boxes, doc.id)
+    service = LodService(db_session)
+
+    detailed = service.get_clusters(doc.id, 1, zoom=32.0)
+    assert detailed.level == 0
+    assert sorted(c.text for c in detailed.clusters) == ["A", "B", "C"]
+
+    overview = service.get_clusters(doc.id, 1, zoom=32.0 / 256)
+    assert overview.total == 3
+    assert sorted(c.count for c in overview.clusters) == [1, 2]
+    merged = next(c for c in overview.clusters if c.count == 2)
+    assert (merged.x_coord, merged.width, merged.text) == (0, 30, None)
+
+
+def test_cached_aggregates_are_refreshed_after_writes(db_session):
+    doc = crud.create_document(db_session, schemas.DocumentCreate(file_name="lod2.pdf", pages=1))
+    crud.bulk_create_ocr_results(db_session, [_box("A", 0, 0)], doc.id)
+    service = LodService(db_session)
+
+    first = service.get_page_lod(doc.id, 1, "ocr_results")
+    assert service.get_page_lod(doc.id, 1, "ocr_results") is first
+
+    crud.bulk_create_ocr_results(db_session, [_box("B", 500, 500)], doc.id)
+    assert service.get_clusters(doc.id, 1, zoom=1.0).total == 2
+
+
+def test_unknown_document_or_kind(db_session):
+    with pytest.raises(HTTPException) as exc:
+        LodService(db_session).get_clusters(999, 1, zoom=1.0)
+    assert exc.value.status_code == 404
+    with pytest.raises(HTTPException):
+        LodService(db_session).get_clusters(1, 1, zoom=1.0, kind="equipment")
+
+
+@pytest.mark.parametrize("kind", ["ocr_results", "line_numbers"])
+def test_same_second_corrections_refresh_the_cache(db_session, kind):
+    doc = crud.create_document(db_session, schemas.DocumentCreate(file_name=f"lod-{kind}.pdf", pages=1))
+    model, create, update = {
+        "ocr_results": (models.OcrResult, crud.bulk_create_ocr_results, crud.update_ocr_result),
+        "line_numbers": (models.LineNumber, crud.bulk_create_line_numbers, crud.update_line_number),
+    }[kind]
+    create(db_session, [_box("AAA111", 0, 0)], doc.id)
+    service = LodService(db_session)
+    assert [c.text for c in service.get_clusters(doc.id, 1, zoom=32.0, kind=kind).clusters] == ["AAA111"]
+
+    row_id = db_session.query(model.id).filter_by(document_id=doc.id).scalar()
+    update(db_session, row_id, "ZZZ999", "corrected")
+    assert [c.text for c in service.get_clusters(doc.id, 1, zoom=32.0, kind=kind).clusters] == ["ZZZ999"]
@@ -0,0 +1,213 @@
+import random
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from backend import crud, schemas
+from backend.database import Base
+from backend.matching import (
+    DEFAULT_GRAMMARS,
+    AhoCorasick,
+    BKTree,
+    Grammar,
+    GrammarMatcher,
+    Match,
+    canonical_key,
+    levenshtein,
+)
+from backend.ocr.document_ai import DocumentAiParser
+from backend.services.fuzzy import FuzzyService, fuzzy_index_cache
+
+
+@pytest.fixture(scope='module')
+def db_engine():
+    engine = create_engine('sqlite:///:memory:')
+    Base.metadata.create_all(engine)
+    yield engine
+    Base.metadata.drop_all(engine)
+
+@pytest.fixture(scope='function')
+def db_session(db_engine):
+    Session = sessionmaker(bind=db_engine)
+    session = Session()
+    yield session
+    session.close()
+
+
+def test_aho_corasick_reports_all_overlapping_matches():
+    matcher = AhoCorasick(["he", "she", "his", "hers", ""])
+    assert len(matcher) == 4
+    assert matcher.find_all("ushers") == [
+        Match("she", 1, 4),
+        Match("he", 2, 4),
+        Match("hers", 2, 6),
+    ]
+
+
+def test_aho_corasick_matches_brute_force():
+    rng = random.Random(7)
+    for _ in range(200):
+        patterns = ["".join(rng.choice("ab") for _ in range(rng.randint(1, 4))) for _ in range(5)]
+        text = "".join(rng.choice("abc") for _ in range(40))
+        expected = sorted(
+            (p, i, i + len(p)) for p in set(patterns) for i in range(len(text)) if text.startswith(p, i)
+        )
+        assert sorted(AhoCorasick(patterns).find_all(text)) == expected
+
+
+def test_create_line_numbers_exact_and_substring(db_session):
+    doc = crud.create_document(db_session, schemas.DocumentCreate(file_name="match.pdf", pages=1))
+    texts = ['6"-FH-A1-09', 'LINE 6"-FH-A1-10 / 2"-DC-A1-04', "SEPARATOR"]
+    crud.bulk_create_ocr_results(
+        db_session,
+        [{"page": 1, "text": t, "x_coord": i, "y_coord": 0, "width": 1, "height": 1} for i, t in enumerate(texts)],
+        doc.id,
+    )
+    parser = DocumentAiParser()
+    targets = ['6"-FH-A1-09', '6"-FH-A1-10', '2"-DC-A1-04']
+
+    assert parser.create_line_numbers(db_session, targets, doc.id) == 1
+    crud.delete_line_numbers_by_document(db_session, doc.id)
+
+    assert parser.create_line_numbers(db_session, targets, doc.id, substring=True) == 3
+    lines = crud.get_document(db_session, doc.id).line_numbers
+    assert sorted((l.text, l.x_coord) for l in lines) == [
+        ('2"-DC-A1-04', 1.0),
+        ('6"-FH-A1-09', 0.0),
+        ('6"-FH-A1-10', 1.0),
+    ]
+
+
+def test_grammar_matcher_combines_grammars():
+    matcher = GrammarMatcher([*DEFAULT_GRAMMARS, Grammar("equipment", r"(?<!\w)(?P<unit>\d{2})-V-(?P<seq>\d{2})(?!\w)")])
+    matches = list(matcher.iter_matches('20-V-01 6-FH-A1-06 / 10"-PL-A3-05 10" 3X-FH-A1-01'))
+    assert [(m.grammar, m.text) for m in matches] == [
+        ("equipment", "20-V-01"),
+        ("size_service_spec_seq", '6"-FH-A1-06'),
+        ("size_service_spec_seq", '10"-PL-A3-05'),
+    ]
+    assert matches[1].fields == {"size": "6", "service": "FH", "spec": "A1", "seq": "06"}
+
+
+def test_grammar_format_skips_unmatched_optional_groups():
+    grammar = Grammar(
+        "optional_parts",
+        r"(?<!\w)(?:(?P<size>\d+)-)?(?P<service>[A-Z]{2})-(?P<seq>\d{3})(?:/(?P<suffix>[A-Z]))?(?!\w)",
+        format='{size}"-{service}-{seq}/{suffix}',
+    )
+    matches = GrammarMatcher([grammar]).iter_matches("6-FH-101/B FH-102 4-PL-103")
+    assert [m.text for m in matches] == ['6"-FH-101/B', "FH-102", '4"-PL-103']
+
+
+def test_discover_line_numbers_without_ground_truth(db_session):
+    doc = crud.create_document(db_session, schemas.DocumentCreate(file_name="discover.pdf", pages=1))
+    texts = ['6"-FH-A1-09', "2-DC-A2-02", 'FROM 3"-PW-A1-03 TO 6"-OL-A1-02A', "SEPARATOR"]
+    crud.bulk_create_ocr_results(
+        db_session,
+        [{"page": 1, "text": t, "x_coord": 0, "y_coord": 0, "width": 1, "height": 1} for t in texts],
+        doc.id,
+    )
+    assert DocumentAiParser().discover_line_numbers(db_session, doc.id) == 4
+    lines = crud.get_document(db_session, doc.id).line_numbers
+    assert sorted(l.text for l in lines) == ['2"-DC-A2-02', '3"-PW-A1-03', '6"-FH-A1-09', '6"-OL-A1-02A']
+
+
+def test_canonical_key_ignores_quotes_lookalikes_and_spacing():
+    assert canonical_key('6"-FH-A1-06') == "6FHA106"
+    assert canonical_key("6\u2033-FH-A1-06") == "6FHA106"
+    assert canonical_key("6 - fh-a1-06") == "6FHA106"
+    assert canonical_key('2"\u042fBV-21') == "2RBV21"
+    assert canonical_key("\u0421\u041e-01") == "CO01"
+    assert canonical_key(None) is None
+
+
+def test_bk_tree_matches_brute_force():
+    rng = random.Random(11)
+    words = {"".join(rng.choice("AB12") for _ in range(rng.randint(1, 7))) for _ in range(300)}
+    tree = BKTree((word, word.lower()) for word in words)
+    assert len(tree) == len(words)
+    for _ in range(50):
+        query = "".join(rng.choice("AB12") for _ in range(rng.randint(1, 7)))
+        expected = sorted((levenshtein(query, word), word) for word in words if levenshtein(query, word) <= 2)
+        hits = tree.search(query, 2)
+        assert [(distance, key) for distance, key, _ in hits] == expected
+        assert all(values == [key.lower()] for _, key, values in hits)
+
+
+def test_create_line_numbers_matches_canonical_and_fuzzy_keys(db_session):
+    doc = crud.create_document(db_session, schemas.DocumentCreate(file_name="fuzzy.pdf", pages=1))
+    texts = ["6\u2033-FH-A1-06", '2"\u042fBV-21', "6-FH-A1-O7", "SEPARATOR"]
+    crud.bulk_create_ocr_results(
+        db_session,
+        [{"page": 1, "text": t, "x_coord": i, "y_coord": 0, "width": 1, "height": 1} for i, t in enumerate(texts)],
+        doc.id,
+    )
+    parser = DocumentAiParser()
+    targets = ['6"-FH-A1-06', '2"-RBV-21', '6"-FH-A1-07']
+
+    assert parser.create_line_numbers(db_session, targets, doc.id) == 2
+    lines = crud.get_document(db_session, doc.id).line_numbers
+    assert sorted((l.text, l.x_coord, l.text_key) for l in lines) == [
+        ('2"-RBV-21', 1.0, "2RBV21"),
+        ('6"-FH-A1-06', 0.0, "6FHA106"),
+    ]
+    crud.delete_line_numbers_by_document(db_session, doc.id)
+
+    # "O" read for "0" is one edit away; each OCR result goes to its closest line.
+    assert parser.create_line_numbers(db_session, targets, doc.id, max_distance=1) == 3
+    lines = crud.get_document(db_session, doc.id).line_numbers
+    assert sorted((l.text, l.x_coord) for l in lines) == [
+        ('2"-RBV-21', 1.0),
+        ('6"-FH-A1-06', 0.0),
+        ('6"-FH-A1-07', 2.0),
+    ]
+
+
+def test_fuzzy_search_across_documents_follows_writes(db_session):
+    fuzzy_index_cache.clear()
+    docs = [crud.create_document(db_session, schemas.DocumentCreate(file_name=f"p{i}.pdf", pages=1)) for i in range(2)]
+    for doc, text in zip(docs, ["10\"-PL-A3-05", "10-PL-A3-O5"]):
+        crud.bulk_create_ocr_results(
+            db_session,
+            [{"page": 1, "text": text, "x_coord": 0, "y_coord": 0, "width": 1, "height": 1}],
+            doc.id,
+        )
+    service = FuzzyService(db_session)
+
+    matches = service.search('10"-PL-A3-05', max_distance=1)
+    assert [(m.document_id, m.distance) for m in matches] == [(docs[0].id, 0), (docs[1].id, 1)]
+    assert [m.document_id for m in service.search("10PLA305", max_distance=0)] == [docs[0].id]
+    assert [m.document_id for m in service.search("10PLA305", max_distance=1, document_id=docs[1].id)] == [docs[1].id]
+
+    corrected = crud.get_ocr_results(db_session, docs[1].id)[0]
+    crud.update_ocr_result(db_session, corrected.id, '10"-PL-A3-05', "corrected")
+    assert corrected.text_key == "10PLA305"
+    assert [m.distance for m in service.search("10PLA305", max_distance=0)] == [0, 0]
+
+    crud.bulk_create_ocr_results(
+        db_session,
+        [{"page": 1, "text": "10-PL-A3-06", "x_coord": 0, "y_coord": 0, "width": 1, "height": 1}],
+        docs[1].id,
+    )
+    assert [m.text for m in service.search("10PLA306", max_distance=0)] == ["10-PL-A3-06"]
+
+
+
+@pytest.mark.parametrize("document_scoped", [True, False])
+def test_fuzzy_search_sees_same_second_corrections(db_session, document_scoped):
+    fuzzy_index_cache.clear()
+    # The module's database is shared: the texts must be unique to this case.
+    old, new = ("AAA111", "ZZZ999") if document_scoped else ("AAA222", "ZZZ888")
+    doc = crud.create_document(db_session, schemas.DocumentCreate(file_name=f"same-second-{document_scoped}.pdf", pages=1))
+    crud.bulk_create_ocr_results(
+        db_session, [{"page": 1, "text": old, "x_coord": 0, "y_coord": 0, "width": 1, "height": 1}], doc.id
+    )
+    service = FuzzyService(db_session)
+    scope = doc.id if document_scoped else None
+    assert [m.text for m in service.search(old, max_distance=0, document_id=scope)] == [old]
+
+    row = crud.get_ocr_results(db_session, doc.id)[0]
+    crud.update_ocr_result(db_session, row.id, new, "corrected")
+    assert [m.text for m in service.search(new, max_distance=0, document_id=scope)] == [new]
+    assert service.search(old, max_distance=0, document_id=scope) == []
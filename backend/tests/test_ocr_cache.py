@@ -0,0 +1,102 @@
+import json
+import os
+
+import numpy as np
+import pytest
+
+from backend.config import get_settings
+from backend.ocr.cache import OcrRecordCache
+from backend.ocr.document_ai import DocumentAiParser
+from backend.ocr.records import OcrRecordBatch
+
+
+def _batch(page, texts):
+    n = len(texts)
+    return OcrRecordBatch(
+        page=np.full(n, page, dtype=np.int32),
+        x=np.arange(n, dtype=np.float64),
+        y=np.zeros(n),
+        width=np.ones(n),
+        height=np.ones(n),
+        text_start=np.arange(n, dtype=np.int64),
+        text_end=np.arange(n, dtype=np.int64) + 1,
+        texts=texts,
+    )
+
+
+def _rows(batches):
+    return [row for batch in batches for row in batch.iter_dicts()]
+
+
+def test_cache_round_trips_batches_per_page(tmp_path):
+    cache = OcrRecordCache(str(tmp_path), max_bytes=1 << 20)
+    batches = [_batch(1, ['6"-FH-A1-06', "Ñ-01"]), _batch(3, ["", "ОК"])]
+    cache.put("k", batches)
+
+    restored = cache.get("k")
+    assert [int(b.page[0]) for b in restored] == [1, 3]
+    assert _rows(restored) == _rows(batches)
+    assert restored[1].text_end.tolist() == [1, 2]
+    assert cache.get("missing") is None
+
+
+def test_cache_entry_is_written_page_by_page(tmp_path):
+    cache = OcrRecordCache(str(tmp_path), max_bytes=1 << 20)
+    with cache.writer("k") as entry:
+        entry.add(_batch(1, ["a", "b"]))
+        assert cache.get("k") is None
+        entry.add(_batch(2, ["ç"]))
+    assert _rows(cache.get("k")) == _rows([_batch(1, ["a", "b"]), _batch(2, ["ç"])])
+
+    with pytest.raises(RuntimeError):
+        with cache.writer("failed") as entry:
+            entry.add(_batch(1, ["a"]))
+            raise RuntimeError("parser failed")
+    assert cache.get("failed") is None
+    assert sorted(os.listdir(tmp_path)) == ["k.npz"]
+
+
+def test_cache_evicts_least_recently_used(tmp_path):
+    cache = OcrRecordCache(str(tmp_path), max_bytes=1 << 20)
+    for key in ("a", "b", "c"):
+        cache.put(key, [_batch(1, ["x" * 1000] * 50)])
+    entry_size = os.path.getsize(tmp_path / "a.npz")
+    for age, key in enumerate(("a", "b", "c")):
+        os.utime(tmp_path / f"{key}.npz", ns=(age * 10**9, age * 10**9))
+    cache.get("a")
+
+    cache.max_bytes = 2 * entry_size
+    cache.evict()
+    assert sorted(os.listdir(tmp_path)) == ["a.npz", "c.npz"]
+
+
+def test_parser_reuses_cached_records(tmp_path, monkeypatch):
+    monkeypatch.setattr(get_settings(), "ocr_cache_dir", str(tmp_path / "cache"))
+    page = {
+        "pageNumber": 1,
+        "dimension": {"width": 10.0, "height": 10.0},
+        "lines": [
+            {
+                "layout": {
+                    "textAnchor": {"textSegments": [{"startIndex": "0", "endIndex": "4"}]},
+                    "boundingPoly": {"normalizedVertices": [{"x": 0.1, "y": 0.1}, {"x": 0.2, "y": 0.3}]},
+                }
+            }
+        ],
+    }
+    path = tmp_path / "doc.json"
+    path.write_text(json.dumps({"text": "L-01", "pages": [page]}), encoding="utf-8")
+    parser = DocumentAiParser()
+    extracted = []
+    extract = parser._extract_batches
+    monkeypatch.setattr(parser, "_extract_batches", lambda *args: extracted.append(1) or extract(*args))
+
+    first = _rows(parser.iter_batches(str(path)))
+    assert _rows(parser.iter_batches(str(path))) == first
+    assert len(extracted) == 1
+
+    # Different content means a different key, so the file is parsed again.
+    path.write_text(json.dumps({"text": "L-02", "pages": [page]}), encoding="utf-8")
+    assert [row["text"] for row in _rows(parser.iter_batches(str(path)))] == ["L-02"]
+    assert len(extracted) == 2
+    assert len(os.listdir(tmp_path / "cache")) == 2
@@ -0,0 +1,126 @@
+from types import SimpleNamespace
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from backend import crud, schemas
+from backend.database import Base
+from backend.ocr.document_ai import DocumentAiParser
+from backend.ocr.incremental import diff_rows
+
+
+@pytest.fixture(scope='module')
+def db_engine():
+    engine = create_engine('sqlite:///:memory:')
+    Base.metadata.create_all(engine)
+    yield engine
+    Base.metadata.drop_all(engine)
+
+@pytest.fixture(scope='function')
+def db_session(db_engine):
+    Session = sessionmaker(bind=db_engine)
+    session = Session()
+    yield session
+    session.close()
+
+
+def _row(id, text, x, status="auto", page=1):
+    return SimpleNamespace(id=id, page=page, text=text, x_coord=x, y_coord=0.0, width=1.0, height=1.0, status=status)
+
+
+def _record(text, x, page=1):
+    return {"page": page, "text": text, "x_coord": x, "y_coord": 0.0, "width": 1.0, "height": 1.0}
+
+
+def test_diff_rows_pairs_by_text_and_box_and_protects_corrections():
+    existing = [
+        _row(1, "A", 0.0),
+        _row(2, "B", 1.0),
+        _row(3, "C", 2.0),
+        _row(4, "D", 3.0),
+        _row(5, "E*", 4.0, status="corrected"),
+        _row(6, "F", 5.0, status="corrected"),
+    ]
+    incoming = [_record("A", 0.0), _record("B2", 1.0), _record("C", 9.0), _record("E", 4.0), _record("G", 6.0)]
+
+    diff = diff_rows(existing, incoming, lambda row: row.status != "auto")
+
+    assert diff.unchanged == 1
+    assert diff.updates == [
+        {"id": 2, "text": "B2", "x_coord": 1.0, "y_coord": 0.0, "width": 1.0, "height": 1.0},
+        {"id": 3, "text": "C", "x_coord": 9.0, "y_coord": 0.0, "width": 1.0, "height": 1.0},
+    ]
+    assert diff.inserts == [_record("G", 6.0)]
+    assert diff.deletes == [4]
+    assert diff.kept == 2
+
+
+def _line(text, offset, x):
+    return {
+        "layout": {
+            "textAnchor": {"textSegments": [{"startIndex": str(offset), "endIndex": str(offset + len(text))}]},
+            "boundingPoly": {"normalizedVertices": [{"x": x, "y": 0.1}, {"x": x + 0.05, "y": 0.2}]},
+        }
+    }
+
+
+def _package(pages):
+    """Document AI payload with one page per list of ``(text, x)`` lines."""
+    text = ""
+    doc_pages = []
+    for number, lines in enumerate(pages, 1):
+        page_lines = []
+        for line_text, x in lines:
+            page_lines.append(_line(line_text, len(text), x))
+            text += line_text + "\n"
+        doc_pages.append({"pageNumber": number, "dimension": {"width": 100.0, "height": 100.0}, "lines": page_lines})
+    return {"text": text, "pages": doc_pages}
+
+
+def test_sync_ocr_results_only_touches_changed_pages(db_session):
+    doc = crud.create_document(db_session, schemas.DocumentCreate(file_name="inc.pdf", pages=3))
+    parser = DocumentAiParser()
+    pages = [[("P1-A", 0.1), ("P1-B", 0.5)], [("P2-A", 0.1), ("P2-B", 0.5)], [("P3-A", 0.1)]]
+
+    stats = parser.sync_ocr_results(db_session, _package(pages), doc.id)
+    assert (stats.pages_changed, stats.inserted) == (3, 5)
+    ids = {r.text: r.id for r in crud.get_ocr_results(db_session, doc.id)}
+
+    # A human fixes one row; a revision then changes page 2 only.
+    corrected = crud.get_ocr_result_by_text(db_session, "P2-B", doc.id)
+    crud.update_ocr_result(db_session, corrected.id, "P2-B (checked)", "corrected")
+    pages[1] = [("P2-A2", 0.1), ("P2-B", 0.5), ("P2-C", 0.8)]
+
+    stats = parser.sync_ocr_results(db_session, _package(pages), doc.id)
+    assert (stats.pages_skipped, stats.pages_changed) == (2, 1)
+    assert (stats.inserted, stats.updated, stats.deleted, stats.kept) == (1, 1, 0, 1)
+    results = {r.text: r for r in crud.get_ocr_results(db_session, doc.id)}
+    assert sorted(results) == ["P1-A", "P1-B", "P2-A2", "P2-B (checked)", "P2-C", "P3-A"]
+    assert results["P1-A"].id == ids["P1-A"]
+    assert results["P2-A2"].id == ids["P2-A"]
+    assert results["P2-A2"].text_key == "P2A2"
+    assert results["P2-B (checked)"].status == "corrected"
+
+    # Dropping page 3 removes its rows; a second identical run writes nothing.
+    stats = parser.sync_ocr_results(db_session, _package(pages[:2]), doc.id)
+    assert (stats.pages_skipped, stats.pages_removed, stats.deleted) == (2, 1, 1)
+    stats = parser.sync_ocr_results(db_session, _package(pages[:2]), doc.id)
+    assert (stats.pages_skipped, stats.pages_changed, stats.pages_removed) == (2, 0, 0)
+
+
+def test_sync_line_numbers_keeps_reviewed_rows(db_session):
+    doc = crud.create_document(db_session, schemas.DocumentCreate(file_name="inc-lines.pdf", pages=1))
+    crud.bulk_create_ocr_results(db_session, [_record('6"-FH-A1-06', 0.0), _record('2"-DC-A1-04', 1.0)], doc.id)
+    parser = DocumentAiParser()
+
+    stats = parser.sync_line_numbers(db_session, ['6"-FH-A1-06', '2"-DC-A1-04'], doc.id)
+    assert stats.inserted == 2
+    lines = {l.text: l for l in crud.get_document(db_session, doc.id).line_numbers}
+    crud.update_line_number(db_session, lines['2"-DC-A1-04'].id, '2"-DC-A1-04', "verified")
+
+    stats = parser.sync_line_numbers(db_session, ['6"-FH-A1-06'], doc.id)
+    assert (stats.unchanged, stats.deleted, stats.kept) == (1, 0, 1)
+    db_session.expire_all()
+    lines = crud.get_document(db_session, doc.id).line_numbers
+    assert sorted((l.text, l.status) for l in lines) == [('2"-DC-A1-04', "verified"), ('6"-FH-A1-06', "pending")]
@@ -0,0 +1,94 @@
+import json
+
+import pytest
+
+from backend.ocr import load_parser
+from backend.ocr import parallel
+from backend.ocr.parallel import resolve_workers
+
+
+def _page(number, offset):
+    return {
+        "pageNumber": number,
+        "dimension": {"width": 100.0, "height": 50.0},
+        "lines": [
+            {
+                "layout": {
+                    "textAnchor": {"textSegments": [{"startIndex": str(offset), "endIndex": str(offset + 4)}]},
+                    "boundingPoly": {
+                        "normalizedVertices": [{"x": 0.1 * number, "y": 0.2}, {"x": 0.5, "y": 0.9}]
+                    },
+                }
+            }
+        ],
+    }
+
+
+@pytest.mark.parametrize("parser_name", ["document_ai", "document_ai_stream"])
+def test_parallel_batches_match_serial_output(tmp_path, parser_name):
+    data = {"text": 'L-01L-02L-03L-"4', "pages": [_page(n, (n - 1) * 4) for n in range(1, 5)]}
+    path = tmp_path / "package.json"
+    path.write_text(json.dumps(data), encoding="utf-8")
+
+    parser = load_parser(parser_name)
+    serial = [row for b in parser.iter_batches(str(path), workers=1) for row in b.iter_dicts()]
+    parallel = [row for b in parser.iter_batches(str(path), workers=2) for row in b.iter_dicts()]
+    from_dict = [row for b in parser.iter_batches(data, workers=2) for row in b.iter_dicts()]
+
+    assert [row["text"] for row in serial] == ["L-01", "L-02", "L-03", 'L-"4']
+    assert parallel == serial
+    assert from_dict == serial
+
+
+def test_resolve_workers():
+    assert resolve_workers(None) == 1
+    assert resolve_workers(3) == 3
+    assert resolve_workers(0) >= 1
+
+
+def test_imports_share_one_pool(tmp_path):
+    data = {"text": "L-01L-02", "pages": [_page(n, (n - 1) * 4) for n in range(1, 3)]}
+    parser = load_parser("document_ai")
+    try:
+        list(parser.iter_batches(data, workers=2))
+        executor = parallel.get_executor(2)
+        list(parser.iter_batches(data, workers=2))
+        assert parallel.get_executor(2) is executor
+        parallel.shutdown_executor()
+        assert parallel.get_executor(2) is not executor
+    finally:
+        parallel.shutdown_executor()
+
+
+def test_changing_worker_count_keeps_running_imports():
+    text = "L-01L-02L-03L-04"
+    pages = [(text, _page(n, (n - 1) * 4)) for n in range(1, 5)]
+    try:
+        running = parallel.iter_batches_parallel(pages, workers=2, max_pending=1)
+        first = next(running)
+        list(parallel.iter_batches_parallel(pages, workers=3))
+        rest = list(running)
+        assert [row["text"] for b in [first, *rest] for row in b.iter_dicts()] == [
+            "L-01", "L-02", "L-03", "L-04",
+        ]
+        assert parallel.get_executor(2) is not parallel.get_executor(3)
+    finally:
+        parallel.shutdown_executor()
+
+
+def test_text_is_sent_once_per_document(monkeypatch, tmp_path):
+    monkeypatch.setattr(parallel.tempfile, "tempdir", str(tmp_path))
+    submitted = []
+    pages = [("L-01L-02", json.dumps(_page(n, (n - 1) * 4))) for n in range(1, 3)]
+    try:
+        executor = parallel.get_executor(2)
+        monkeypatch.setattr(
+            executor, "submit", lambda fn, *args, _submit=executor.submit: submitted.append(args) or _submit(fn, *args)
+        )
+        batches = list(parallel.iter_batches_parallel(pages, workers=2))
+    finally:
+        parallel.shutdown_executor()
+
+    assert [row["text"] for b in batches for row in b.iter_dicts()] == ["L-01", "L-02"]
+    assert len({path for path, _ in submitted}) == 1
+    assert list(tmp_path.iterdir()) == []
@@ -0,0 +1,56 @@
+import pytest
+
+from backend.ocr.records import OcrRecordBatch
+
+TEXT = '6"-FH-A1-09\nSEPARATOR\n'
+PAGE = {
+    "pageNumber": 3,
+    "dimension": {"width": 200.0, "height": 100.0},
+    "lines": [
+        {
+            "layout": {
+                "textAnchor": {"textSegments": [{"endIndex": "12"}]},
+                "boundingPoly": {
+                    "normalizedVertices": [
+                        {"x": 0.1, "y": 0.2},
+                        {"x": 0.3, "y": 0.2},
+                        {"x": 0.3, "y": 0.4},
+                        {"x": 0.1, "y": 0.4},
+                    ]
+                },
+            }
+        },
+        {"layout": {"textAnchor": {"textSegments": []}}},
+        {
+            "layout": {
+                "textAnchor": {"textSegments": [{"startIndex": "12", "endIndex": "22"}]},
+                "boundingPoly": {"normalizedVertices": [{"x": 0.5, "y": 0.5}, {"y": 0.6}]},
+            }
+        },
+    ],
+}
+
+
+def test_record_batch_from_document_ai_page():
+    batch = OcrRecordBatch.from_document_ai_page(PAGE, TEXT)
+    assert batch.texts == ['6"-FH-A1-09', "SEPARATOR"]
+    assert batch.page.tolist() == [3, 3]
+    assert batch.text_start.tolist() == [0, 12]
+    assert batch.text_end.tolist() == [12, 22]
+    assert batch.x.tolist() == pytest.approx([20.0, 0.0])
+    assert batch.y.tolist() == pytest.approx([20.0, 50.0])
+    assert batch.width.tolist() == pytest.approx([40.0, 100.0])
+    assert batch.height.tolist() == pytest.approx([20.0, 10.0])
+
+
+def test_record_batch_rows_and_concat():
+    batch = OcrRecordBatch.from_document_ai_page(PAGE, TEXT, page_number=1)
+    rows = list(batch.iter_dicts())
+    assert rows[0]["text"] == '6"-FH-A1-09'
+    assert rows[0]["page"] == 1
+    assert isinstance(rows[0]["x_coord"], float)
+    assert len(OcrRecordBatch.concat([batch, OcrRecordBatch(), batch])) == 4
+
+
+def test_record_batch_skips_pages_without_dimension():
+    assert len(OcrRecordBatch.from_document_ai_page({"lines": PAGE["lines"]}, TEXT)) == 0
@@ -0,0 +1,91 @@
+import subprocess
+import sys
+from importlib import metadata
+
+import pytest
+
+from backend.ocr import ParserNotFoundError, ParserRegistry, load_parser
+from backend.ocr.document_ai import DocumentAiParser
+from backend.ocr.vision import VisionParser
+
+
+def _entry_point(name, value):
+    return metadata.EntryPoint(name=name, value=value, group="test.ocr_parsers")
+
+
+@pytest.fixture
+def entry_points(monkeypatch):
+    """Replace the installed entry points; records how often they are scanned."""
+    installed = []
+    scans = []
+
+    def fake_entry_points():
+        scans.append(1)
+        return metadata.EntryPoints(installed)
+
+    monkeypatch.setattr(metadata, "entry_points", fake_entry_points)
+    return installed, scans
+
+
+def test_entry_points_are_scanned_once_and_classes_cached(entry_points):
+    installed, scans = entry_points
+    installed.append(_entry_point("vision_ep", "backend.ocr.vision:VisionParser"))
+    registry = ParserRegistry(group="test.ocr_parsers")
+
+    assert isinstance(registry.create("vision_ep"), VisionParser)
+    assert isinstance(registry.create("document_ai"), DocumentAiParser)
+    assert registry.get_class("vision_ep") is VisionParser
+    assert "vision_ep" in registry.names()
+    assert len(scans) == 1
+
+    registry.clear()
+    registry.get_class("vision_ep")
+    assert len(scans) == 2
+
+
+def test_broken_entry_point_is_reported(entry_points):
+    installed, _ = entry_points
+    installed.append(_entry_point("broken", "backend.ocr.does_not_exist:Parser"))
+    installed.append(_entry_point("not_a_parser", "backend.ocr.records:OcrRecordBatch"))
+    registry = ParserRegistry(group="test.ocr_parsers")
+
+    with pytest.raises(ImportError, match="broken"):
+        registry.get_class("broken")
+    with pytest.raises(TypeError):
+        registry.get_class("not_a_parser")
+
+
+def test_unknown_parser_names_available_parsers(entry_points):
+    registry = ParserRegistry(group="test.ocr_parsers")
+    with pytest.raises(ParserNotFoundError, match="document_ai"):
+        registry.get_class("no_such_parser")
+    with pytest.raises(ParserNotFoundError):
+        registry.get_class("backend.ocr.vision:NoSuchClass")
+
+
+def test_module_path_names_still_resolve():
+    assert isinstance(load_parser("backend.ocr.vision:VisionParser"), VisionParser)
+
+
+def test_importing_package_does_not_import_parsers():
+    code = (
+        "import sys, backend.ocr\n"
+        "heavy = [m for m in ('backend.ocr.base', 'backend.ocr.document_ai', 'numpy', 'sqlalchemy')"
+        " if m in sys.modules]\n"
+        "print(','.join(heavy))\n"
+    )
+    out = subprocess.run([sys.executable, "-c", code], check=True, capture_output=True, text=True)
+    assert out.stdout.strip() == ""
+
+
+def test_loading_parsers_does_not_import_the_database_layer():
+    code = (
+        "import sys\n"
+        "from backend.ocr import load_parser\n"
+        "for name in ('document_ai', 'document_ai_stream', 'vision'):\n"
+        "    load_parser(name)\n"
+        "heavy = [m for m in ('sqlalchemy', 'backend.crud', 'backend.models') if m in sys.modules]\n"
+        "print(','.join(heavy))\n"
+    )
+    out = subprocess.run([sys.executable, "-c", code], check=True, capture_output=True, text=True)
+    assert out.stdout.strip() == ""
@@ -0,0 +1,69 @@
+import io
+import json
+
+import pytest
+
+from backend.ocr import load_parser
+from backend.ocr.streaming import StreamingDocumentAiParser, iter_document_ai
+
+SAMPLE = {
+    "uri": "",
+    "text": "6\"-FH-A1-09\nSEPARATOR\n",
+    "pages": [
+        {
+            "pageNumber": 1,
+            "dimension": {"width": 200.0, "height": 100.0},
+            "lines": [
+                {
+                    "layout": {
+                        "textAnchor": {"textSegments": [{"endIndex": "12"}]},
+                        "boundingPoly": {
+                            "normalizedVertices": [
+                                {"x": 0.1, "y": 0.2},
+                                {"x": 0.3, "y": 0.2},
+                                {"x": 0.3, "y": 0.4},
+                                {"x": 0.1, "y": 0.4},
+                            ]
+                        },
+                    }
+                },
+                {
+                    "layout": {
+                        "textAnchor": {"textSegments": [{"startIndex": "12", "endIndex": "22"}]},
+                        "boundingPoly": {"normalizedVertices": [{"x": 0.5, "y": 0.5}, {"y": 0.6}]},
+                    }
+                },
+            ],
+        },
+        {"pageNumber": 2, "dimension": {"width": 200.0, "height": 100.0}, "lines": []},
+    ],
+    "entities": [1.5, True, None],
+}
+
+
+@pytest.mark.parametrize("chunk_size", [1, 3, 1 << 16])
+def test_iter_document_ai_yields_pages_individually(chunk_size):
+    events = list(iter_document_ai(io.StringIO(json.dumps(SAMPLE, indent=2)), chunk_size))
+    assert [key for key, _ in events] == ["uri", "text", "page", "page", "entities"]
+    assert [value for key, value in events if key == "page"] == SAMPLE["pages"]
+    assert events[-1] == ("entities", [1.5, True, None])
+
+
+def test_streaming_parser_matches_in_memory_parser(tmp_path):
+    path = tmp_path / "sample.json"
+    path.write_text(json.dumps(SAMPLE), encoding="utf-8")
+
+    streaming = load_parser("document_ai_stream")
+    assert isinstance(streaming, StreamingDocumentAiParser)
+    expected = list(load_parser("document_ai").iter_ocr_results(str(path)))
+    assert list(streaming.iter_ocr_results(streaming.parse(str(path)))) == expected
+    assert [r.text for r in expected] == ['6"-FH-A1-09', "SEPARATOR"]
+
+
+def test_streaming_parser_handles_text_after_pages(tmp_path):
+    reordered = {"pages": SAMPLE["pages"], "text": SAMPLE["text"]}
+    path = tmp_path / "reordered.json"
+    path.write_text(json.dumps(reordered), encoding="utf-8")
+
+    parser = StreamingDocumentAiParser()
+    assert len(list(parser.iter_ocr_results(str(path)))) == 2
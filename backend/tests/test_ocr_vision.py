@@ -0,0 +1,112 @@
+import json
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from backend import crud, schemas
+from backend.database import Base
+from backend.ocr import BaseOcrParser, load_parser
+from backend.ocr.vision import VisionParser
+from backend.services.ocr import OcrService
+
+
+@pytest.fixture(scope='module')
+def db_engine():
+    engine = create_engine('sqlite:///:memory:')
+    Base.metadata.create_all(engine)
+    yield engine
+    Base.metadata.drop_all(engine)
+
+@pytest.fixture(scope='function')
+def db_session(db_engine):
+    Session = sessionmaker(bind=db_engine)
+    session = Session()
+    yield session
+    session.close()
+
+
+def _annotation(text, x0, y0, x1, y1):
+    vertices = [{"x": x0, "y": y0}, {"x": x1, "y": y0}, {"x": x1, "y": y1}, {"x": x0, "y": y1}]
+    # Vision leaves out coordinates equal to 0.
+    vertices = [{k: v for k, v in vertex.items() if v} for vertex in vertices]
+    return {"description": text, "boundingPoly": {"vertices": vertices}}
+
+
+def _response(*annotations, page=None):
+    full_text = " ".join(a["description"] for a in annotations)
+    response = {"textAnnotations": [{"description": full_text}, *annotations]}
+    if page is not None:
+        response["context"] = {"pageNumber": page}
+    return response
+
+
+VISION_DATA = {
+    "responses": [
+        _response(_annotation('6"-FH-A1-06', 0, 10, 40, 20), _annotation("  ", 0, 0, 1, 1)),
+        _response(_annotation("P-101", 5, 5, 25, 15), {"description": "NO-BOX", "boundingPoly": {}}),
+    ]
+}
+
+
+def test_vision_records_from_dict_and_file_match(tmp_path):
+    parser = load_parser("vision")
+    assert isinstance(parser, VisionParser)
+    records = list(parser.iter_records(VISION_DATA))
+    assert records == [
+        {"page": 1, "text": '6"-FH-A1-06', "x_coord": 0, "y_coord": 10, "width": 40, "height": 10},
+        {"page": 2, "text": "P-101", "x_coord": 5, "y_coord": 5, "width": 20, "height": 10},
+    ]
+
+    path = tmp_path / "vision.json"
+    path.write_text(json.dumps(VISION_DATA), encoding="utf-8")
+    parser.chunk_size = 16
+    assert list(parser.iter_records(str(path))) == records
+
+
+def test_vision_files_annotate_output_is_flattened():
+    data = {
+        "responses": [
+            {
+                "inputConfig": {"mimeType": "application/pdf"},
+                "responses": [
+                    _response(_annotation("A", 0, 0, 1, 1), page=3),
+                    _response(_annotation("B", 0, 0, 1, 1), page=4),
+                ],
+            }
+        ]
+    }
+    assert [(r["page"], r["text"]) for r in VisionParser().iter_records(data)] == [(3, "A"), (4, "B")]
+
+
+def test_parse_json_accepts_vision_payload(db_session):
+    doc = crud.create_document(db_session, schemas.DocumentCreate(file_name="vision.pdf", pages=2))
+    OcrService(db_session).parse_json(doc.id, VISION_DATA)
+    assert sorted((r.page, r.text) for r in crud.get_ocr_results(db_session, doc.id)) == [
+        (1, '6"-FH-A1-06'),
+        (2, "P-101"),
+    ]
+
+
+class _ListParser(BaseOcrParser):
+    """Minimal plugin: only ``iter_records`` is implemented."""
+
+    def iter_records(self, file_or_data):
+        yield from file_or_data
+
+
+def test_plugin_with_only_iter_records_gets_bulk_and_incremental_import(db_session):
+    doc = crud.create_document(db_session, schemas.DocumentCreate(file_name="plugin.pdf", pages=2))
+    records = [
+        {"page": 1, "text": "A", "x_coord": 0, "y_coord": 0, "width": 1, "height": 1},
+        {"page": 2, "text": "B", "x_coord": 0, "y_coord": 0, "width": 1, "height": 1},
+    ]
+    parser = _ListParser()
+    assert [int(b.page[0]) for b in parser.iter_batches(records)] == [1, 2]
+
+    stats = parser.sync_ocr_results(db_session, records, doc.id)
+    assert (stats.pages_changed, stats.inserted) == (2, 2)
+    records[1] = dict(records[1], text="B2")
+    stats = parser.sync_ocr_results(db_session, records, doc.id)
+    assert (stats.pages_skipped, stats.updated) == (1, 1)
+    assert sorted(r.text for r in crud.get_ocr_results(db_session, doc.id)) == ["A", "B2"]
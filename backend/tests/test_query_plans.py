@@ -0,0 +1,187 @@
+"""Query-plan regression suite for ``backend.crud``.
+
+Every public crud function is run against a small database while its SQL is
+recorded; each recorded SELECT, UPDATE and DELETE is then explained and must
+not scan a whole table. SQLite always runs. PostgreSQL runs when
+``TEST_POSTGRES_URL`` points at a database the suite may create tables in;
+sequential scans are disabled there so that the plan shows whether an index
+could serve the query at all, whatever the table sizes.
+"""
+
+import inspect
+import os
+import re
+from datetime import datetime, timezone
+
+import pytest
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+
+from backend import crud, models, schemas
+from backend.database import Base
+from backend.ocr.incremental import ImportStats, RowDiff
+
+POSTGRES_URL = os.environ.get("TEST_POSTGRES_URL")
+
+# Functions that read a whole table by design.
+WHOLE_TABLE = {"get_documents"}
+
+OCR = models.OcrResult
+LINES = models.LineNumber
+
+
+def _record(i, page=1):
+    return {"page": page, "text": f'6"-FH-A{i}-0308', "x_coord": i, "y_coord": 0, "width": 2, "height": 1}
+
+
+def _running_job(db, d):
+    crud.create_job(db, d.id, "document_ai", "/tmp/plans.json")
+    return crud.claim_job(db, "plans", datetime(2000, 1, 1, tzinfo=timezone.utc), 3)
+
+
+# One entry per public function of backend.crud; each runs its query variants.
+CALLS = {
+    "add_document_event": lambda db, d: crud.add_document_event(db, d.id, "rows", {"rows": []}),
+    "apply_row_diff": lambda db, d: crud.apply_row_diff(
+        db, OCR, d.id,
+        RowDiff(
+            inserts=[_record(9)],
+            updates=[{"id": d.ocr_ids[0], "text": "X-1", "x_coord": 0, "y_coord": 0, "width": 1, "height": 1}],
+            deletes=[d.ocr_ids[1]],
+        ),
+        "auto", page=1, fingerprint="f" * 64,
+    ),
+    "bulk_create_line_numbers": lambda db, d: crud.bulk_create_line_numbers(db, [_record(5)], d.id),
+    "bulk_create_ocr_results": lambda db, d: crud.bulk_create_ocr_results(db, [_record(5)], d.id),
+    "bulk_update_rows": lambda db, d: [
+        crud.bulk_update_rows(db, model, [{"id": ids[0], "text": "B-1", "status": "corrected"}])
+        for model, ids in ((OCR, d.ocr_ids), (LINES, d.line_ids))
+    ],
+    "claim_job": lambda db, d: _running_job(db, d),
+    "count_jobs": lambda db, d: crud.count_jobs(db, "queued"),
+    "create_document": lambda db, d: crud.create_document(db, schemas.DocumentCreate(file_name="new.pdf", pages=1)),
+    "create_line_number": lambda db, d: crud.create_line_number(db, schemas.LineNumberCreate(**_record(6)), d.id),
+    "create_job": lambda db, d: crud.create_job(db, d.id, "document_ai", "/tmp/plans.json"),
+    "create_ocr_result": lambda db, d: crud.create_ocr_result(db, schemas.OcrResultCreate(**_record(6)), d.id),
+    "delete_line_numbers_by_document": lambda db, d: crud.delete_line_numbers_by_document(db, d.id),
+    "delete_ocr_results_by_document": lambda db, d: crud.delete_ocr_results_by_document(db, d.id),
+    "delete_page_fingerprint": lambda db, d: crud.delete_page_fingerprint(db, d.id, 1),
+    "document_exists": lambda db, d: crud.document_exists(db, d.id),
+    "finish_job": lambda db, d: crud.finish_job(db, _running_job(db, d), "plans"),
+    "get_all_ocr_results_for_document": lambda db, d: crud.get_all_ocr_results_for_document(db, d.id),
+    "get_by_text_keys": lambda db, d: [
+        crud.get_by_text_keys(db, model, ["6FHA10308"], document_id=d.id) for model in (OCR, LINES)
+    ],
+    "get_document": lambda db, d: crud.get_document(db, d.id),
+    "get_document_by_filename": lambda db, d: crud.get_document_by_filename(db, d.file_name),
+    "get_document_rows": lambda db, d: [
+        crud.get_document_rows(db, model, d.id, page=page, skip=1, limit=2, columns=columns)
+        for model in (OCR, LINES) for page in (None, 1) for columns in (None, ["id", "text"])
+    ],
+    "get_document_summary": lambda db, d: crud.get_document_summary(db, d.id),
+    "get_document_version": lambda db, d: crud.get_document_version(db, d.id),
+    "get_documents": lambda db, d: crud.get_documents(db),
+    "get_ocr_result_by_text": lambda db, d: crud.get_ocr_result_by_text(db, '6"-FH-A1-0308', d.id),
+    "get_ocr_results": lambda db, d: crud.get_ocr_results(db, d.id),
+    "get_page_fingerprints": lambda db, d: crud.get_page_fingerprints(db, d.id),
+    "get_page_rows": lambda db, d: [crud.get_page_rows(db, OCR, d.id, page) for page in (None, 1)],
+    "get_events": lambda db, d: [crud.get_events(db, 0, document_id) for document_id in (None, d.id)],
+    "get_events_by_id": lambda db, d: crud.get_events_by_id(db, [1, 2]),
+    "get_first_event_id": lambda db, d: crud.get_first_event_id(db),
+    "get_job": lambda db, d: crud.get_job(db, _running_job(db, d)),
+    "get_last_event_id": lambda db, d: crud.get_last_event_id(db),
+    "get_missing_ids": lambda db, d: crud.get_missing_ids(db, OCR, [d.ocr_ids[0], 99999]),
+    "get_pages": lambda db, d: [crud.get_pages(db, model, d.id) for model in (OCR, LINES)],
+    "get_viewport_rows": lambda db, d: [
+        crud.get_viewport_rows(db, model, d.id, 1, bbox) for model in (OCR, LINES) for bbox in (None, (0, 0, 3, 1))
+    ],
+    "iter_document_rows": lambda db, d: list(crud.iter_document_rows(db, OCR, ["id", "text"], d.id, page=1)),
+    "iter_ocr_rows": lambda db, d: list(crud.iter_ocr_rows(db, d.id)),
+    "iter_text_keys": lambda db, d: [list(crud.iter_text_keys(db, model, d.id)) for model in (OCR, LINES)],
+    "prune_events": lambda db, d: crud.prune_events(db, datetime(2000, 1, 1, tzinfo=timezone.utc)),
+    "release_job": lambda db, d: crud.release_job(db, _running_job(db, d), "plans"),
+    "search_text": lambda db, d: crud.search_text(db, OCR, "FH-A2", document_id=d.id),
+    "touch_document": lambda db, d: crud.touch_document(db, d.id),
+    "update_job_progress": lambda db, d: crud.update_job_progress(db, _running_job(db, d), "plans", ImportStats()),
+    "update_line_number": lambda db, d: crud.update_line_number(db, d.line_ids[0], "L-2", "corrected"),
+    "update_ocr_result": lambda db, d: crud.update_ocr_result(db, d.ocr_ids[0], "T-2", "corrected"),
+}
+
+_ENGINES = ["sqlite"] + (["postgresql"] if POSTGRES_URL else [])
+
+
+@pytest.fixture(scope='module', params=_ENGINES)
+def db_engine(request):
+    engine = create_engine('sqlite://' if request.param == "sqlite" else POSTGRES_URL)
+    Base.metadata.create_all(engine)
+    yield engine
+    Base.metadata.drop_all(engine)
+    engine.dispose()
+
+@pytest.fixture(scope='function')
+def db_session(db_engine):
+    Session = sessionmaker(bind=db_engine)
+    session = Session()
+    yield session
+    session.close()
+
+@pytest.fixture
+def document(db_session):
+    doc = crud.create_document(db_session, schemas.DocumentCreate(file_name="plans.pdf", pages=2))
+    crud.bulk_create_ocr_results(db_session, [_record(i, page=1 + i % 2) for i in range(6)], doc.id)
+    crud.bulk_create_line_numbers(db_session, [_record(i) for i in range(3)], doc.id)
+    doc.ocr_ids = [row.id for row in crud.get_ocr_results(db_session, doc.id)]
+    doc.line_ids = [row.id for row in db_session.query(LINES).filter(LINES.document_id == doc.id)]
+    return doc
+
+
+def _recorded_statements(db_session, call, document):
+    statements = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        if not executemany and statement.lstrip().split(None, 1)[0].upper() in ("SELECT", "UPDATE", "DELETE"):
+            statements.append((statement, parameters))
+
+    engine = db_session.get_bind()
+    db_session.expire_all()  # lookups by primary key would be served from the identity map
+    event.listen(engine, "before_cursor_execute", record)
+    try:
+        call(db_session, document)
+    finally:
+        event.remove(engine, "before_cursor_execute", record)
+    return statements
+
+
+def _full_scans(connection, statement, parameters):
+    if connection.dialect.name == "sqlite":
+        plan = [row[-1] for row in connection.exec_driver_sql(f"EXPLAIN QUERY PLAN {statement}", parameters)]
+        # "SCAN t" and "SCAN t USING [COVERING] INDEX i" read every row of t;
+        # virtual tables (R*Tree, FTS5) report their own index lookups.
+        return [line for line in plan if re.match(r"SCAN \w+", line) and "VIRTUAL TABLE" not in line]
+    connection.exec_driver_sql("SET LOCAL enable_seqscan = off")
+    plan = [row[0] for row in connection.exec_driver_sql(f"EXPLAIN {statement}", parameters)]
+    return [line.strip() for line in plan if "Seq Scan on" in line]
+
+
+def test_every_crud_function_is_covered():
+    public = {
+        name for name, function in inspect.getmembers(crud, inspect.isfunction)
+        if function.__module__ == crud.__name__ and not name.startswith("_")
+    }
+    assert public == set(CALLS), "add new crud functions to CALLS"
+
+
+@pytest.mark.parametrize("name", sorted(CALLS))
+def test_crud_queries_use_indexes(name, db_session, document):
+    statements = _recorded_statements(db_session, CALLS[name], document)
+    assert statements
+    scans = {}
+    with db_session.get_bind().connect() as connection:
+        with connection.begin():
+            for statement, parameters in statements:
+                found = _full_scans(connection, statement, parameters)
+                if found:
+                    scans[statement] = found
+    if name in WHOLE_TABLE:
+        return
+    assert not scans, f"{name} scans whole tables: {scans}"
@@ -0,0 +1,97 @@
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import select, text
+
+from backend import crud, models, schemas, text_search
+from backend.routers import ocr
+from backend.services.dependencies import get_db
+
+
+@pytest.fixture
+def client(db_session):
+    app = FastAPI()
+    app.include_router(ocr.router)
+    app.dependency_overrides[get_db] = lambda: db_session
+    return TestClient(app)
+
+
+def _document(db_session, name, texts):
+    doc = crud.create_document(db_session, schemas.DocumentCreate(file_name=name, pages=1))
+    crud.bulk_create_ocr_results(
+        db_session,
+        [{"page": 1, "text": value, "x_coord": i, "y_coord": 0, "width": 1, "height": 1} for i, value in enumerate(texts)],
+        doc.id,
+    )
+    return doc.id
+
+
+def _texts(db_session, query, document_id=None):
+    return [row.text for row, _, _ in crud.search_text(db_session, models.OcrResult, query, document_id=document_id)]
+
+
+def test_substring_matches_are_case_insensitive(db_session):
+    doc_id = _document(db_session, "sub.pdf", ['6"-fh-a2-0308', "CW-A2-0101", "FH-A2", "PW-B1-0308X"])
+    assert sorted(_texts(db_session, "FH-A2", doc_id)) == ['6"-fh-a2-0308', "FH-A2"]
+    assert sorted(_texts(db_session, "0308", doc_id)) == ['6"-fh-a2-0308', "PW-B1-0308X"]
+    assert _texts(db_session, '6"-F', doc_id) == ['6"-fh-a2-0308']
+    assert _texts(db_session, "A2 0308", doc_id) == []
+
+
+def test_closest_matches_rank_first(db_session):
+    doc_id = _document(db_session, "rank.pdf", ["XX-P-101-YY-ZZZZ", "P-101", "P-101-B"])
+    assert _texts(db_session, "P-101", doc_id) == ["P-101", "P-101-B", "XX-P-101-YY-ZZZZ"]
+
+
+def test_index_follows_updates_and_deletes(db_session):
+    doc_id = _document(db_session, "sync.pdf", ["LT-7001", "LT-7002"])
+    rows = db_session.query(models.OcrResult).filter_by(document_id=doc_id).order_by(models.OcrResult.id).all()
+    crud.update_ocr_result(db_session, rows[0].id, "LT-9001", "corrected")
+    assert _texts(db_session, "LT-70", doc_id) == ["LT-7002"]
+    assert _texts(db_session, "LT-90", doc_id) == ["LT-9001"]
+
+    crud.delete_ocr_results_by_document(db_session, doc_id)
+    assert _texts(db_session, "LT-", doc_id) == []
+    integrity = text("INSERT INTO ocr_results_fts(ocr_results_fts, rank) VALUES ('integrity-check', 1)")
+    db_session.execute(integrity)
+
+
+def test_query_is_answered_from_the_fts_index(db_session):
+    query = text_search.search_query(select(models.OcrResult), models.OcrResult, "sqlite", "FH-A2")
+    compiled = query.compile(db_session.get_bind(), compile_kwargs={"literal_binds": True})
+    plan = " ".join(row[-1] for row in db_session.execute(text(f"EXPLAIN QUERY PLAN {compiled}")))
+    # The MATCH drives the query (index 0:M), rows are then fetched by id.
+    assert "ocr_results_fts VIRTUAL TABLE INDEX 0:M" in plan
+    assert "SEARCH ocr_results USING INTEGER PRIMARY KEY" in plan
+
+
+def test_like_fallback_matches_the_index(db_session):
+    doc_id = _document(db_session, "fallback.pdf", ["50%_OPEN", "50X_OPEN", "fh-a2"])
+    for value in ("50%_", "FH-A2"):
+        query = select(models.OcrResult.text).where(models.OcrResult.document_id == doc_id)
+        fallback = db_session.execute(text_search.search_query(query, models.OcrResult, "other", value))
+        assert [row.text for row in fallback] == _texts(db_session, value, doc_id)
+
+
+def test_search_endpoint(client, db_session):
+    first = _document(db_session, "P&ID-001.pdf", ["FH-A2-0001", "PW-A1-0002"])
+    second = _document(db_session, "P&ID-002.pdf", ["fh-a2-0003"])
+    hits = client.get("/search/text", params={"text": "fh-a2"}).json()
+    assert {(hit["document_id"], hit["file_name"]) for hit in hits} >= {(first, "P&ID-001.pdf"), (second, "P&ID-002.pdf")}
+    assert {"page", "x_coord", "y_coord", "width", "height", "score"} <= set(hits[0])
+
+    scoped = client.get("/search/text", params={"text": "FH-A2", "document_id": second}).json()
+    assert [hit["text"] for hit in scoped] == ["fh-a2-0003"]
+    assert client.get("/search/text", params={"text": "FH"}).status_code == 422
+    assert client.get("/search/text", params={"text": "FH-A2", "document_id": 999}).status_code == 404
+
+
+def test_search_endpoint_returns_rows_with_null_columns(client, db_session):
+    doc = crud.create_document(db_session, schemas.DocumentCreate(file_name="null.pdf", pages=1))
+    crud.bulk_create_ocr_results(db_session, [{"page": None, "text": "NULL-GEOM-01", "x_coord": None, "y_coord": None, "width": None, "height": None}], doc.id)
+    db_session.query(models.Document).filter_by(id=doc.id).update({"file_name": None})
+    db_session.commit()
+    response = client.get("/search/text", params={"text": "NULL-GEOM", "document_id": doc.id})
+    assert response.status_code == 200
+    hit, = response.json()
+    assert (hit["file_name"], hit["page"], hit["x_coord"], hit["height"]) == (None, None, None, None)
@@ -0,0 +1,157 @@
+import asyncio
+import gzip
+import json
+import os
+import threading
+
+import httpx
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from backend import crud, schemas
+from backend.config import get_settings
+from backend.ocr.spool import SpoolFile
+from backend.ocr.streaming import StreamingDocumentAiParser
+from backend.routers import ocr
+from backend.services.dependencies import get_db
+from backend.services.uploads import Gunzip, UploadError
+from backend.tests.test_ocr_streaming import SAMPLE
+
+
+@pytest.fixture
+def app(db_session, tmp_path, monkeypatch):
+    monkeypatch.setattr(get_settings(), "upload_dir", str(tmp_path / "spool"))
+    app = FastAPI()
+    app.include_router(ocr.router)
+    app.dependency_overrides[get_db] = lambda: db_session
+    return app
+
+@pytest.fixture
+def client(app):
+    return TestClient(app)
+
+
+def _document(db_session, name):
+    return crud.create_document(db_session, schemas.DocumentCreate(file_name=name, pages=2)).id
+
+
+def _texts(db_session, doc_id):
+    return [row.text for row in crud.get_ocr_results(db_session, doc_id)]
+
+
+EXPECTED = ['6"-FH-A1-09', "SEPARATOR"]
+
+
+def test_spool_is_read_while_it_is_written(tmp_path):
+    spool = SpoolFile(str(tmp_path))
+    received = []
+    reader = threading.Thread(target=lambda: received.append(spool.open().read()))
+    reader.start()
+    spool.write(b'{"a": ')
+    spool.write("\"é\"}".encode()[:2])
+    reader.join(timeout=0.1)
+    assert reader.is_alive()  # still waiting for the end of the file
+    spool.write("\"é\"}".encode()[2:])
+    spool.finish()
+    reader.join(timeout=5)
+    assert received == ['{"a": "é"}']
+    spool.discard()
+    assert not os.path.exists(spool.path)
+
+
+def test_spool_failure_reaches_the_reader(tmp_path):
+    spool = SpoolFile(str(tmp_path))
+    spool.write(b"{")
+    spool.fail(UploadError("client went away"))
+    with pytest.raises(UploadError):
+        spool.open().read()
+    spool.discard()
+
+
+def test_gunzip_in_chunks():
+    data = json.dumps(SAMPLE).encode()
+    compressed = gzip.compress(data[:100]) + gzip.compress(data[100:])  # two members
+    decoder = Gunzip()
+    output = b"".join(decoder.feed(compressed[i:i + 7]) for i in range(0, len(compressed), 7))
+    assert output + decoder.close() == data
+
+    plain = Gunzip()
+    assert plain.feed(b"{") == b"" and plain.feed(b"}") == b"{}" and plain.close() == b""
+    with pytest.raises(UploadError):
+        truncated = Gunzip()
+        truncated.feed(gzip.compress(data)[:50])
+        truncated.close()
+
+
+def test_upload_raw_gzip_and_multipart(client, db_session, tmp_path):
+    body = json.dumps(SAMPLE).encode()
+    uploads = [
+        {"content": body, "headers": {"Content-Type": "application/json"}},
+        {"content": gzip.compress(body), "headers": {"Content-Type": "application/json", "Content-Encoding": "gzip"}},
+        {"files": {"file": ("sample.json.gz", gzip.compress(body), "application/gzip")}, "data": {"note": "x"}},
+    ]
+    for number, upload in enumerate(uploads):
+        doc_id = _document(db_session, f"upload-{number}.pdf")
+        response = client.post(f"/documents/{doc_id}/upload", params={"parser": "document_ai_stream"}, **upload)
+        assert response.status_code == 200, response.text
+        assert response.json()["created"] == 2
+        assert _texts(db_session, doc_id) == EXPECTED
+    assert os.listdir(tmp_path / "spool") == []
+
+
+def test_upload_vision_file(client, db_session):
+    vision = {"responses": [{"textAnnotations": [
+        {"description": "FULL PAGE"},
+        {"description": "FH-A2", "boundingPoly": {"vertices": [{"x": 1, "y": 2}, {"x": 5, "y": 2}, {"x": 5, "y": 4}, {"x": 1, "y": 4}]}},
+    ]}]}
+    doc_id = _document(db_session, "vision.pdf")
+    response = client.post(f"/documents/{doc_id}/upload", params={"parser": "vision"}, content=json.dumps(vision))
+    assert response.status_code == 200
+    assert _texts(db_session, doc_id) == ["FH-A2"]
+
+
+def test_upload_errors(client, db_session):
+    doc_id = _document(db_session, "errors.pdf")
+    url = f"/documents/{doc_id}/upload"
+    assert client.post("/documents/999/upload", content=b"{}").status_code == 404
+    assert client.post(url, params={"parser": "nope"}, content=b"{}").status_code == 422
+    assert client.post(url, content=b'{"pages": [{"lines": ').status_code == 422
+    assert client.post(url, content=b"\x1f\x8bnot gzip").status_code == 400
+    fields_only = b'--b\r\nContent-Disposition: form-data; name="note"\r\n\r\nx\r\n--b--\r\n'
+    multipart = "multipart/form-data; boundary=b"
+    assert client.post(url, content=fields_only, headers={"Content-Type": multipart}).status_code == 400
+    assert client.post(url, content=b"--b", headers={"Content-Type": "multipart/form-data"}).status_code == 400
+
+
+class SignallingParser(StreamingDocumentAiParser):
+    first_page = threading.Event()
+
+    def iter_pages(self, doc_ai_data):
+        for text, page in super().iter_pages(doc_ai_data):
+            yield text, page
+            self.first_page.set()
+
+
+def test_pages_are_parsed_before_the_body_ends(app, db_session):
+    """The second half of the body is only sent once the parser has used the first."""
+    doc_id = _document(db_session, "overlap.pdf")
+    body = json.dumps(SAMPLE).encode()
+    split = body.index(b'{"pageNumber": 2')
+    SignallingParser.first_page.clear()
+
+    async def chunks():
+        yield body[:split]
+        assert await asyncio.to_thread(SignallingParser.first_page.wait, 5)
+        yield body[split:]
+
+    async def scenario():
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            return await client.post(
+                f"/documents/{doc_id}/upload", params={"parser": f"{__name__}:SignallingParser"}, content=chunks(),
+            )
+
+    response = asyncio.run(scenario())
+    assert response.status_code == 200, response.text
+    assert _texts(db_session, doc_id) == EXPECTED
@@ -0,0 +1,112 @@
+import random
+
+import pytest
+from fastapi import HTTPException
+from sqlalchemy import create_engine, select, text
+from sqlalchemy.orm import sessionmaker
+
+from backend import crud, models, schemas, spatial
+from backend.database import Base
+from backend.services import ViewportService
+
+
+@pytest.fixture(scope='module')
+def db_engine():
+    engine = create_engine('sqlite:///:memory:')
+    Base.metadata.create_all(engine)
+    yield engine
+    Base.metadata.drop_all(engine)
+
+@pytest.fixture(scope='function')
+def db_session(db_engine):
+    Session = sessionmaker(bind=db_engine)
+    session = Session()
+    yield session
+    session.close()
+
+
+def _visible(row, bbox):
+    x0, y0, x1, y1 = bbox
+    min_x, max_x = sorted((row.x_coord, row.x_coord + row.width))
+    min_y, max_y = sorted((row.y_coord, row.y_coord + row.height))
+    return min_x <= x1 and max_x >= x0 and min_y <= y1 and max_y >= y0
+
+
+def _rtree_ids(db_session, table_name):
+    return {row[0] for row in db_session.execute(text(f"SELECT id FROM {spatial.rtree_name(table_name)}"))}
+
+
+def test_viewport_matches_brute_force(db_session):
+    rng = random.Random(7)
+    docs = [crud.create_document(db_session, schemas.DocumentCreate(file_name=f"v{i}.pdf", pages=2)) for i in range(2)]
+    for doc in docs:
+        crud.bulk_create_ocr_results(
+            db_session,
+            [
+                {"page": rng.randint(1, 2), "text": f"T{i}", "x_coord": rng.uniform(0, 1000),
+                 "y_coord": rng.uniform(0, 800), "width": rng.uniform(-5, 60), "height": rng.uniform(1, 12)}
+                for i in range(400)
+            ],
+            doc.id,
+        )
+    rows = crud.get_ocr_results(db_session, docs[0].id)
+    service = ViewportService(db_session)
+    for _ in range(25):
+        x0, y0 = rng.uniform(-50, 900), rng.uniform(-50, 700)
+        bbox = (x0, y0, x0 + rng.uniform(0, 300), y0 + rng.uniform(0, 300))
+        found = service.get_boxes(docs[0].id, 2, bbox=",".join(map(str, bbox)))
+        expected = sorted(r.id for r in rows if r.page == 2 and _visible(r, bbox))
+        assert [r.id for r in found] == expected
+
+    whole_page = service.get_boxes(docs[0].id, 1)
+    assert [r.id for r in whole_page] == sorted(r.id for r in rows if r.page == 1)
+
+
+def test_viewport_query_uses_rtree(db_session):
+    query = spatial.viewport_query(
+        select(models.OcrResult.id), models.OcrResult, "sqlite", 1, 1, (0.0, 0.0, 10.0, 10.0)
+    )
+    compiled = query.compile(db_session.get_bind(), compile_kwargs={"literal_binds": True})
+    plan = " ".join(str(row[-1]) for row in db_session.execute(text(f"EXPLAIN QUERY PLAN {compiled}")))
+    assert "VIRTUAL TABLE INDEX" in plan
+
+
+def test_index_follows_inserts_updates_and_deletes(db_session):
+    doc = crud.create_document(db_session, schemas.DocumentCreate(file_name="sync.pdf", pages=1))
+    first = crud.create_ocr_result(
+        db_session, schemas.OcrResultCreate(page=1, text="A", x_coord=0, y_coord=0, width=10, height=10), doc.id
+    )
+    crud.bulk_create_line_numbers(
+        db_session, [{"page": 1, "text": "L", "x_coord": 0, "y_coord": 0, "width": 5, "height": 5}], doc.id
+    )
+    service = ViewportService(db_session)
+    assert [r.id for r in service.get_boxes(doc.id, 1, bbox="5,5,6,6")] == [first.id]
+    assert len(service.get_boxes(doc.id, 1, bbox="4,4,6,6", kind="line_numbers")) == 1
+
+    # ORM update moves the box out of the viewport.
+    first.x_coord = 500
+    db_session.commit()
+    assert service.get_boxes(doc.id, 1, bbox="5,5,6,6") == []
+    assert [r.id for r in service.get_boxes(doc.id, 1, bbox="505,5,506,6")] == [first.id]
+
+    # Plain SQL updates and bulk deletes are followed as well.
+    db_session.execute(text("UPDATE ocr_results SET page = 2 WHERE id = :id"), {"id": first.id})
+    db_session.commit()
+    assert service.get_boxes(doc.id, 1, bbox="505,5,506,6") == []
+    first_id = first.id
+    crud.delete_ocr_results_by_document(db_session, doc.id)
+    assert first_id not in _rtree_ids(db_session, "ocr_results")
+    assert service.get_boxes(doc.id, 2, bbox="0,0,1000,1000") == []
+
+
+def test_viewport_errors(db_session):
+    service = ViewportService(db_session)
+    with pytest.raises(HTTPException) as exc:
+        service.get_boxes(1, 1, bbox="1,2,3")
+    assert exc.value.status_code == 422
+    with pytest.raises(HTTPException) as exc:
+        service.get_boxes(1, 1, bbox="10,0,0,10")
+    assert exc.value.status_code == 422
+    with pytest.raises(HTTPException) as exc:
+        service.get_boxes(999, 1, bbox="0,0,1,1")
+    assert exc.value.status_code == 404
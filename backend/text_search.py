@@ -0,0 +1,109 @@
+"""Substring search over OCR text through a trigram index.
+
+On SQLite ``ocr_results`` gets an FTS5 companion ``ocr_results_fts`` with the
+trigram tokenizer. It is an external-content table over ``ocr_results.text``
+keyed by the row id, so it stores the index but not a second copy of the text.
+Triggers keep it in sync with inserts, updates and deletes. On PostgreSQL a
+``pg_trgm`` GIN index on ``text`` serves ``ILIKE`` substring filters. Other
+databases fall back to a ``LIKE`` scan.
+
+Queries match case-insensitively anywhere in the text and need at least
+:data:`MIN_QUERY_LENGTH` characters, the length of one trigram. The DDL runs
+when the table is created through the metadata and in Alembic revision
+``0006``.
+"""
+
+from typing import List
+
+from sqlalchemy import DDL, column, event, func, literal, literal_column, table
+
+SEARCH_TABLES = ("ocr_results",)
+
+MIN_QUERY_LENGTH = 3
+
+
+def fts_name(table_name: str) -> str:
+    return f"{table_name}_fts"
+
+
+def sqlite_ddl(table_name: str) -> List[str]:
+    """Statements creating the FTS5 index of ``table_name`` and its triggers."""
+    fts = fts_name(table_name)
+    # An external-content index must be told the exact values it indexed
+    # when a row goes away, hence the 'delete' commands with the old text.
+    remove = f"INSERT INTO {fts}({fts}, rowid, text) VALUES ('delete', old.id, old.text);"
+    add = f"INSERT INTO {fts}(rowid, text) VALUES (new.id, new.text);"
+    return [
+        f"CREATE VIRTUAL TABLE IF NOT EXISTS {fts} USING fts5("
+        f"text, content='{table_name}', content_rowid='id', tokenize='trigram')",
+        f"CREATE TRIGGER IF NOT EXISTS {fts}_insert AFTER INSERT ON {table_name} BEGIN {add} END",
+        f"CREATE TRIGGER IF NOT EXISTS {fts}_update AFTER UPDATE OF id, text ON {table_name} "
+        f"BEGIN {remove} {add} END",
+        f"CREATE TRIGGER IF NOT EXISTS {fts}_delete AFTER DELETE ON {table_name} BEGIN {remove} END",
+    ]
+
+
+def sqlite_backfill(table_name: str) -> str:
+    """Statement indexing the rows that existed before the triggers."""
+    fts = fts_name(table_name)
+    return f"INSERT INTO {fts}({fts}) VALUES ('rebuild')"
+
+
+def sqlite_drop(table_name: str) -> List[str]:
+    fts = fts_name(table_name)
+    return [f"DROP TRIGGER IF EXISTS {fts}_{action}" for action in ("insert", "update", "delete")] + [
+        f"DROP TABLE IF EXISTS {fts}"
+    ]
+
+
+def postgresql_ddl(table_name: str) -> List[str]:
+    return [
+        "CREATE EXTENSION IF NOT EXISTS pg_trgm",
+        f"CREATE INDEX IF NOT EXISTS ix_{table_name}_text_trgm ON {table_name} USING gin (text gin_trgm_ops)",
+    ]
+
+
+def postgresql_drop(table_name: str) -> List[str]:
+    # The extension may be used elsewhere in the database and stays.
+    return [f"DROP INDEX IF EXISTS ix_{table_name}_text_trgm"]
+
+
+def register(sa_table) -> None:
+    """Create the text index whenever ``sa_table`` is created from metadata."""
+    for statement in sqlite_ddl(sa_table.name):
+        event.listen(sa_table, "after_create", DDL(statement).execute_if(dialect="sqlite"))
+    for statement in postgresql_ddl(sa_table.name):
+        event.listen(sa_table, "after_create", DDL(statement).execute_if(dialect="postgresql"))
+
+
+def _fts_phrase(text: str) -> str:
+    # One quoted phrase: the trigrams must occur in order, i.e. a substring.
+    return '"' + text.replace('"', '""') + '"'
+
+
+def _like_pattern(text: str) -> str:
+    escaped = text.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+    return f"%{escaped}%"
+
+
+def search_query(query, model, dialect: str, text: str):
+    """Restrict ``query`` over ``model`` to rows whose text contains ``text``.
+
+    Adds a ``score`` column, higher is better, and orders by it. Scores
+    compare the hits of one query only: on SQLite they are negated BM25
+    ranks, on PostgreSQL trigram similarities, elsewhere negated text lengths.
+    """
+    if dialect == "sqlite":
+        name = fts_name(model.__tablename__)
+        fts = table(name, column("rowid"))
+        score = -func.bm25(literal_column(name))
+        query = query.join(fts, fts.c.rowid == model.id).where(
+            literal_column(name).op("MATCH")(_fts_phrase(text))
+        )
+    elif dialect == "postgresql":
+        score = func.similarity(model.text, literal(text))
+        query = query.where(model.text.ilike(_like_pattern(text), escape="\\"))
+    else:
+        score = -func.length(model.text)
+        query = query.where(func.lower(model.text).like(_like_pattern(text.lower()), escape="\\"))
+    return query.add_columns(score.label("score")).order_by(score.desc(), model.id)
@@ -1,12 +1,9 @@
 import os
-import json
 from backend.database import get_session
 from backend import crud, schemas
 from backend.ocr import load_parser
 from backend.config import get_settings
 
-parser = load_parser(get_settings().ocr_parser)
-
 def parse_document_ai_and_import():
     """
     Parses Google Document AI JSON file and imports all line numbers into the database.
@@ -33,28 +30,26 @@ def parse_document_ai_and_import():
     
             DOCUMENT_ID = db_document.id
     
-            # 2. Delete existing OCR results for the document
-            print(f"Deleting existing OCR results for document ID: {DOCUMENT_ID}...")
-            crud.delete_ocr_results_by_document(db=db, document_id=DOCUMENT_ID)
-            # crud.delete_line_numbers_by_document(db=db, document_id=DOCUMENT_ID) # Old code
-            print("Existing OCR results deleted successfully.")
-    
-            # 3. Load the Document AI JSON and import OCR results
-            print(f"Loading Document AI JSON from {json_path}...")
-            try:
-                doc_ai_data = parser.parse(json_path)
-            except FileNotFoundError:
+            # 2. Load the Document AI JSON and import OCR results
+            # The path is handed to the parser as is: with the record cache
+            # enabled, a file imported before is not parsed again.
+            print(f"Reading Document AI JSON from {json_path}...")
+            if not os.path.exists(json_path):
                 print(f"Error: JSON file not found at {json_path}")
                 return
-            except json.JSONDecodeError as e:
-                print(f"Error: Invalid JSON format: {e}")
-                return
-            print("JSON loaded successfully.")
     
+            # 3. Only pages that changed since the last import are written;
+            # hand-corrected rows are kept.
             print("Importing OCR results into the database...")
-            new_results_count = parser.create_ocr_results(db, doc_ai_data, DOCUMENT_ID)
+            parser = load_parser(get_settings().ocr_parser)
+            stats = parser.sync_ocr_results(db, json_path, DOCUMENT_ID)
             print(
-                f"Successfully added {new_results_count} unique OCR results to document ID: {DOCUMENT_ID}."
+                f"Pages: {stats.pages_changed} changed, {stats.pages_skipped} unchanged, "
+                f"{stats.pages_removed} removed."
+            )
+            print(
+                f"OCR results: {stats.inserted} added, {stats.updated} updated, {stats.deleted} deleted, "
+                f"{stats.kept} corrected rows kept (document ID: {DOCUMENT_ID})."
             )
     
         except Exception as e:
@@ -78,12 +73,7 @@ def parse_line_numbers():
         print("\nStarting line number import process...")
     
         try:
-            # 1. Clear existing line numbers for the document
-            print(f"Deleting existing line numbers for document ID: {DOCUMENT_ID}...")
-            crud.delete_line_numbers_by_document(db=db, document_id=DOCUMENT_ID)
-            print("Existing line numbers deleted successfully.")
-    
-            # 2. Read the list of line numbers to find
+            # 1. Read the list of line numbers to find
             print(f"Reading line numbers from {lines_txt_path}...")
             try:
                 with open(lines_txt_path, 'r', encoding='utf-8') as f:
@@ -93,9 +83,13 @@ def parse_line_numbers():
                 return
             print(f"Found {len(target_lines)} target line numbers to process.")
     
-            # 3. Create line numbers from OCR results
-            lines_created = parser.create_line_numbers(db, target_lines, DOCUMENT_ID)
-            print(f"Successfully created {lines_created} entries in the line_numbers table.")
+            # 2. Update line numbers from OCR results, keeping reviewed ones
+            parser = load_parser(get_settings().ocr_parser)
+            stats = parser.sync_line_numbers(db, target_lines, DOCUMENT_ID)
+            print(
+                f"Line numbers: {stats.inserted} added, {stats.updated} updated, {stats.deleted} deleted, "
+                f"{stats.unchanged} unchanged, {stats.kept} reviewed rows kept."
+            )
     
         except Exception as e:
             print(f"An error occurred during line number import: {e}")
@@ -0,0 +1,186 @@
+"""Worker processes that import the OCR files queued as ingest jobs.
+
+Usage::
+
+    python -m backend.worker --workers 4
+
+``POST /documents/{doc_id}/jobs`` only stores the file and a ``jobs`` row,
+so the web tier answers at once and never parses. Each worker is a process
+of its own: it claims the oldest queued job (:func:`backend.crud.claim_job`),
+runs the parser's incremental import over the job file, storing the
+progress counters after every page, and marks the job succeeded or failed.
+Workers of any number of processes and hosts can share a database; row
+locking gives every job to one of them.
+
+This command is how workers are run. Web processes only start workers of
+their own when ``JOB_WORKERS`` is set, e.g. for a single-process setup.
+"""
+
+import argparse
+import logging
+import multiprocessing
+import os
+import signal
+import socket
+import sys
+from datetime import datetime, timedelta, timezone
+from typing import Callable, List, Optional
+
+from sqlalchemy.orm import Session
+
+from backend import crud
+from backend.config import Settings, get_settings
+from backend.ocr import load_parser
+
+logger = logging.getLogger(__name__)
+
+
+class JobInterrupted(Exception):
+    """The worker is stopping; the job goes back to the queue."""
+
+
+class JobLost(Exception):
+    """The job was given to another worker after this one missed its heartbeat."""
+
+
+class JobWorker:
+    """Claims and runs jobs one at a time until ``stop`` is set.
+
+    ``stop`` is any object with ``is_set()`` and ``wait(timeout)``, such as a
+    :class:`threading.Event` or a :class:`multiprocessing.Event`.
+    """
+
+    def __init__(
+        self,
+        session_factory: Callable[[], Session],
+        stop=None,
+        name: Optional[str] = None,
+        settings: Optional[Settings] = None,
+    ):
+        self.session_factory = session_factory
+        self.stop = stop or multiprocessing.Event()
+        self.name = name or f"{socket.gethostname()}:{os.getpid()}"
+        self.settings = settings or get_settings()
+
+    def run(self) -> None:
+        while not self.stop.is_set():
+            try:
+                job_id = self.run_once()
+            except Exception:
+                logger.exception("Worker %s could not claim a job", self.name)
+                job_id = None
+            if job_id is None:
+                self.stop.wait(self.settings.job_poll_interval)
+
+    def run_once(self) -> Optional[int]:
+        """Claim and run one job; return its id, or None when none was claimed."""
+        settings = self.settings
+        stale_before = datetime.now(timezone.utc) - timedelta(seconds=settings.job_stale_seconds)
+        with self.session_factory() as db:
+            job_id = crud.claim_job(db, self.name, stale_before, settings.job_max_attempts)
+            if job_id is None:
+                return None
+            job = crud.get_job(db, job_id)
+            document_id, parser, source_path = job.document_id, job.parser, job.source_path
+            logger.info("Worker %s runs job %s", self.name, job_id)
+
+            def progress(stats) -> None:
+                if not crud.update_job_progress(db, job_id, self.name, stats):
+                    raise JobLost(job_id)
+                if self.stop.is_set():
+                    raise JobInterrupted(job_id)
+
+            error = None
+            try:
+                load_parser(parser).sync_ocr_results(db, source_path, document_id, progress=progress)
+            except JobInterrupted:
+                db.rollback()
+                crud.release_job(db, job_id, self.name)
+                return job_id
+            except JobLost:
+                db.rollback()
+                logger.warning("Worker %s lost job %s to another worker", self.name, job_id)
+                return job_id
+            except Exception as exc:
+                db.rollback()
+                logger.exception("Job %s failed", job_id)
+                error = f"{type(exc).__name__}: {exc}"
+            if crud.finish_job(db, job_id, self.name, error):
+                _remove(source_path)
+        return job_id
+
+
+def _remove(path: str) -> None:
+    try:
+        os.unlink(path)
+    except FileNotFoundError:
+        pass
+
+
+def _work(stop) -> None:
+    # Interrupts go to the parent, which stops the workers through ``stop``.
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    from backend.database import SessionLocal
+
+    logging.basicConfig(level=get_settings().log_level)
+    JobWorker(SessionLocal, stop).run()
+
+
+class WorkerPool:
+    """``workers`` :class:`JobWorker` processes.
+
+    They are spawned rather than forked, so none inherits the connections or
+    threads of the parent, and are not daemons, so they can use the
+    ``ingest_workers`` pool of their parser.
+    """
+
+    def __init__(self, workers: int):
+        context = multiprocessing.get_context("spawn")
+        self._stop = context.Event()
+        self.processes: List[multiprocessing.Process] = [
+            context.Process(target=_work, args=(self._stop,), name=f"ingest-worker-{number}")
+            for number in range(workers)
+        ]
+
+    def start(self) -> None:
+        for process in self.processes:
+            process.start()
+
+    def join(self) -> None:
+        for process in self.processes:
+            process.join()
+
+    def stop(self, timeout: Optional[float] = 30) -> None:
+        """Stop the workers after their current page; their jobs are queued again.
+
+        Workers still busy after ``timeout`` are killed; their jobs are
+        claimed again once ``job_stale_seconds`` have passed.
+        """
+        self._stop.set()
+        for process in self.processes:
+            process.join(timeout)
+            if process.is_alive():
+                process.kill()
+                process.join()
+
+
+def main() -> None:
+    settings = get_settings()
+    arg_parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    arg_parser.add_argument("--workers", type=int, default=max(settings.job_workers, 1))
+    args = arg_parser.parse_args()
+
+    logging.basicConfig(level=settings.log_level)
+    signal.signal(signal.SIGTERM, lambda *_: sys.exit(0))
+    pool = WorkerPool(args.workers)
+    pool.start()
+    try:
+        pool.join()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        pool.stop()
+
+
+if __name__ == "__main__":
+    main()
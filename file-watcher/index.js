@@ -1,5 +1,7 @@
 const fs = require('fs').promises;
+const { createReadStream } = require('fs');
 const path = require('path');
+const zlib = require('zlib');
 const chokidar = require('chokidar');
 const axios = require('axios');
 require('dotenv').config({ path: path.join(__dirname, '..', '.env') });
@@ -30,17 +32,16 @@ async function processFilePair(pdfFilename) {
             const documentId = docResponse.data.id;
             console.log(`Added document ${pdfFilename} to DB with ID: ${documentId}`);
 
-            // 2. Parse JSON for the document
-            const jsonData = JSON.parse(await fs.readFile(jsonPath, 'utf-8'));
-            
-            const payload = {
-                ...jsonData,
-                line_numbers: jsonData.line_numbers.map(ln => ({...ln, page: 1}))
-            };
+            // 2. Stream the raw OCR JSON, gzip-compressed, to the ingest job
+            //    queue; a backend worker imports it.
+            const body = createReadStream(jsonPath).pipe(zlib.createGzip());
+            const jobResponse = await axios.post(`${API_BASE_URL}/documents/${documentId}/jobs`, body, {
+                headers: { 'Content-Type': 'application/json', 'Content-Encoding': 'gzip' },
+                maxBodyLength: Infinity,
+                maxContentLength: Infinity,
+            });
 
-            await axios.post(`${API_BASE_URL}/documents/${documentId}/parse-json`, payload);
-
-            console.log(`Successfully processed and sent data for document ID: ${documentId}`);
+            console.log(`Queued OCR data of document ID ${documentId} as job ${jobResponse.data.id}`);
         }
     } catch (error) {
         if (error.code !== 'ENOENT') { // Ignore "file not found" errors during initial scan